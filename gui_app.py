@@ -2,13 +2,22 @@
 # ENGR489 PowerFactory model
 
 # 1.0 Enviroment Set UP
-    # 1.1 Plotting and Graphing setup
+    # 1.1 Plotting and Graphing setup (deferred import)
 
 # 2.0 UI constants and suburb display names
     # 2.1 UI Theme constents
     # 2.2 Suburb Full Name list
     # 2.3 Suburb Variable Defaults
     # 2.4 Result labels used for the results box
+    # 2.5 Voltage / loading status colours
+    # 2.6 Dashboard panel geometry
+    # 2.7 Heatmap colour scale
+    # 2.8 Load code to PF load name
+    # 2.9 Map overlay anchors
+    # 2.10 Time-scrubber playback
+    # 2.11 Virtual suburb list (RowCell)
+    # 2.12 Slider event throttle
+    # 2.13 Run comparison modes
 
 # 3.0 UI setup
     # 3.1.0 Create the main window, build layout, wire widgets
@@ -20,13 +29,13 @@
             # 3.1.5.1 Settings cog
             # 3.1.5.2 RUN button
             # 3.1.5.3 EXPORT button
-        # 3.1.6 Scrollable suburb window area
-            # 3.1.6.1 Grid widths (4 cols)
-            # 3.1.6.2 Scrollregion update
+        # 3.1.6 Scrollable suburb list (virtualised)
+            # 3.1.6.1 Viewport resize → row pool
+            # 3.1.6.2 Scroll → recycle rows
             # 3.1.6.3 Mouse wheel setup
         # 3.1.7 Suburb slider rows + state stores
         # 3.1.8 App-wide state + inverter counts
-            # 3.1.8.1 Build slider rows per suburb
+            # 3.1.8.1 Per-suburb row state (no widgets)
         # 3.1.9 Load initial slider values and bus names
             # 3.1.9.1 Track last input signature
         # 3.1.10 Right: graphs + map vertically
@@ -43,17 +52,16 @@
         # 3.1.14 Metric selector for results box
     # 3.2.0 Passive check PV using backend lists (no PF calls)
     # 3.3.0 Build a deterministic snapshot of sliders to compare runs
-    # 3.4.0 Build one two-row slider+labels group for a suburb
-        # 3.4.1 Row A: suburb button
-        # 3.4.2 Row A: kW label
-        # 3.4.3 Seed slider variable
-        # 3.4.4 Tooltip helper
-        # 3.4.5 Row A: “kW per inverter” Entry
-        # 3.4.6 Row B: slider rail + nudges
-        # 3.4.7 Row B: slider (0–100%)
-        # 3.4.8 Row B: % Entry
-        # 3.4.9 Row A/B: result lines
-        # 3.4.10 Seed initial UI state
+    # 3.4.0 Per-suburb row state (variables + display cells)
+        # 3.4.1 Build one pooled two-row slot
+        # 3.4.2 Bind a slot to a suburb
+        # 3.4.3 Lay out visible rows (ring recycling)
+        # 3.4.4 Shared tooltip
+        # 3.4.5 kW-per-inverter entry commit
+        # 3.4.6 Nudge buttons
+        # 3.4.7 Slider / entry changes → throttled row updates
+        # 3.4.8 % entry commit
+        # 3.4.9 Tooltip texts
     # 3.5.0  Run Button Handler
     # 3.6.0 Show calculated kW based on %, homes, and kW/inverter
     # 3.6.1 Sync slider widgets with backend RESULTS
@@ -75,6 +83,7 @@
             # 3.9.5.8 Min/Max p.u. markers
             # 3.9.5.9 Draw
         # 3.9.6 Display message before any results exist
+        # 3.9.7 Build the Matplotlib figure on first use
     # 3.10.0 Draw load/PV curves for selected suburb onto the axes
         # 3.10.1 Clear axes
         # 3.10.2 Left Y: load/PV (kW)
@@ -82,10 +91,26 @@
         # 3.10.4 Legend merge
         # 3.10.5 Title and refresh
         # 3.10.6 Ensure initial %/kW are populated from backend
+        # 3.10.7 Energy / reverse-flow caption under the title
     # 3.11.0 CSV Export summary + hourly PV/Load/Tx/Line
         # 3.11.1 CSV headers (summary + per-hour)
         # 3.11.2 pick save path
         # 3.11.3 CSV build and write rows
+        # 3.11.4 Full-network export on a worker thread (otaki_export)
+    # 3.12.0 Resolve result series for one suburb
+        # 3.12.1 Build all-suburb dashboard (shared LineCollections)
+        # 3.12.2 Refresh dashboard panels in place, single draw
+        # 3.12.3 Tab switch and panel click handlers
+    # 3.13.0 Hour x bus voltage heatmap (single imshow)
+        # 3.13.1 Refresh heatmap via set_data
+    # 3.14.0 Time scrubber: rebuild playback arrays per run
+        # 3.14.1 Slider drag coalescing
+        # 3.14.2 Play / pause at PLAYBACK_FPS
+        # 3.14.3 Show one instant (cursor, labels, maps)
+        # 3.14.4 Instant result labels (changed widgets only)
+        # 3.14.5 Blitted cursor on the active graph tab
+    # 3.15.0 Live preview from the sensitivity surrogate
+    # 3.16.0 Run comparison (overlay / difference vs a baseline run)
 
 # 4.0 Cool colors setup
     # 4.1.0 open_settings
@@ -99,6 +124,9 @@
 # 5.0 Load Map to GUI
     # 5.1.0 load the map images
     # 5.2.0 draw the maps on canvas
+    # 5.3.0 Live status overlay (itemconfig recolour)
+        # 5.3.1 Status colour per anchor (whole run or one step)
+        # 5.3.2 Recolour changed items only
 
 # 6.0 Simulation Run
     # 6.1.0 When Run clicked disable run button, get input and run
@@ -112,10 +140,10 @@
 
 # 7.0 Results display
     # 7.1 Copy backend values (min/max/ok) into the GUI’s per-suburb cache
-        # 7.1.1 Build Mapping from bus and PV Keys
-        # 7.1.2 Iterate over bus results and update per-suburb state
-        # 7.1.3 Link pv key to load/tx/line
-    # 7.1.4 Build load_dict by matching suburb_state to load to results
+        # 7.1.1 Name index (exact pv key ↔ bus/load/tx/line, otaki_sim 4.12)
+        # 7.1.2 Walk suburbs once, link pv key to load/tx/line
+        # 7.1.3 Update per-suburb state from its own bus
+    # 7.1.4 Build load_dict by exact load name, report names that did not resolve
     # 7.2 Format-specific text updates per suburb
     # 7.3 Read cache and redraw the two-line labels with hours
 
@@ -135,26 +163,35 @@ import threading
 import tkinter as tk                                                                                # Main Tk GUI tools
 from tkinter import ttk, messagebox                                                                 # TK Themed widgets and dialog boxes
 
-try:                                                                                                # Try to get better image handling if pillow is available
-    from PIL import Image, ImageTk                                                                  # Get pillow image handling tools
-    PIL_AVAILABLE = True                                                                            # GUI can use Pillow
-except Exception:                                                                                   # If Pillow isn't installed or fails to import, don't loose your shit
-    PIL_AVAILABLE = False                                                                           # Disable image nice bits but keep the app running
+import importlib.util                                                                               # Cheap "is it installed?" checks without importing heavy packages
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None                                         # Pillow is only imported when a map is first drawn (5.2.3)
 
-import otaki_sim as sim                                                                             # Backend code for PowerFactory logic and return results
+if os.environ.get("OTAKI_SERVER"):                                                                  # Thin client: runs go to otaki_server, no PF at start-up
+    import otaki_client as sim
+else:
+    import otaki_sim as sim                                                                         # Backend code for PowerFactory logic and return results
+from otaki_results import volt_status, volt_ok                                                      # Voltage band shared with the heatmap, studies and adaptive runs
 from copy import deepcopy                                                                           # Keep independent copies of lists etc for the GUI storage
 import time                                                                                         # Time warp baby
 import unicodedata
 
 
-# 1.1 Plotting and Graphing setup ------------------------------------------------------------------
-try:                                                                                                # Try to enable plotting inside the Tkinter window if Matplotlib is avaiable
-    from matplotlib.figure import Figure                                                            # The plotting frame
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg                                 # Puts a frame into the Tk widget
-    from matplotlib.ticker import MultipleLocator
-    MPL_OK = True                                                                                   # GUI can show charts if Matplotlib imported successfully
-except Exception:                                                                                   # If Matplotlib import fails, carry on without plots
-    MPL_OK = False                                                                                  # Disable graphing so the rest of the app still runs
+# 1.1 Plotting and Graphing setup (deferred until the first plot) ---------------------------------
+MPL_OK = importlib.util.find_spec("matplotlib") is not None                                         # Only check Matplotlib is installed, the import itself is slow
+_MPL = {}                                                                                           # Filled with Figure / FigureCanvasTkAgg / MultipleLocator on first use
+
+def _load_mpl():                                                                                    # Import Matplotlib the first time a plot is needed
+    global MPL_OK                                                                                   # Flip the flag off if the import turns out to be broken
+    if MPL_OK and not _MPL:                                                                         # Only pay for the import once
+        try:                                                                                        # Matplotlib can be installed but still fail (e.g. no Tk backend)
+            from matplotlib.figure import Figure                                                    # The plotting frame
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg                         # Puts a frame into the Tk widget
+            from matplotlib.ticker import MultipleLocator                                           # Tidy tick spacing
+            _MPL.update(Figure=Figure, FigureCanvasTkAgg=FigureCanvasTkAgg,
+                        MultipleLocator=MultipleLocator)                                            # Cache the handles for later calls
+        except Exception:                                                                           # If Matplotlib import fails, carry on without plots
+            MPL_OK = False                                                                          # Disable graphing so the rest of the app still runs
+    return _MPL                                                                                     # Empty dict when plotting is unavailable
 
 
 # =================================================================================================
@@ -174,24 +211,7 @@ MID_COLOUR = "#F57C00"
 
 
 # 2.2 Suburb Full Name list ------------------------------------------------------------------------ 
-SUBURB_FULL = {                                               
-    "OTBa_PV": "Ōtaki Beach A",                                                                     # Label shown next to its slider
-    "OTBb_PV": "Ōtaki Beach B",
-    "OTBc_PV": "Ōtaki Beach C",
-    "OTCa_PV": "Ōtaki Commercial A",
-    "OTCb_PV": "Ōtaki Commercial B",
-    "OTIa_PV": "Ōtaki Industrial",
-    "OTKa_PV": "Ōtaki Township A",
-    "OTKb_PV": "Ōtaki Township B",
-    "OTKc_PV": "Ōtaki Township C",
-    "OTS_PV" : "Ōtaki College",
-    "RGUa_PV": "Rangiuru Rd A",
-    "RGUb_PV": "Rangiuru Rd B",
-    "TRE_PV" : "Te Rauparaha",
-    "WTVa_PV": "Waitohu Valley A",
-    "WTVb_PV": "Waitohu Valley B",
-    "WTVc_PV": "Waitohu Valley C",
-}
+SUBURB_FULL = sim.NETWORK.labels()                                                                  # Label shown next to its slider (otaki_network.json "label")
 
 
 # 2.3 Suburb Variable Defaults ----------------------------------------------------------------------
@@ -223,6 +243,127 @@ METRIC_OPTIONS = [
 ]
 
 
+# 2.5 Voltage / loading status colours (labels, plot markers, dashboard) ---------------------------
+LOADING_NEAR_PCT  = 80.0                                                                            # Tx/line loading % shown orange from here
+LOADING_LIMIT_PCT = 100.0                                                                           # Tx/line loading % shown red above this
+
+PU_COLOURS = {"ok": OK_COLOUR, "near": MID_COLOUR, "out": WARN_COLOUR}                              # otaki_results.volt_status → colour
+
+def pu_colour(pu):                                                                                  # Choose colour based on p.u.
+    return PU_COLOURS.get(volt_status(pu), "grey")                                                  # Unknown → neutral grey
+
+def loading_colour(pct):                                                                            # Choose colour based on % loading
+    if pct is None: return "grey"                                                                   # Unknown → neutral grey
+    if pct > LOADING_LIMIT_PCT: return WARN_COLOUR                                                  # Overloaded
+    if pct >= LOADING_NEAR_PCT: return MID_COLOUR                                                   # Approaching the limit
+    return OK_COLOUR                                                                                # Comfortable
+
+def status_colour(u_min, u_max, loading_pct):                                                       # Worst of voltage min/max and loading → one colour
+    return worst_colour(pu_colour(u_min), pu_colour(u_max), loading_colour(loading_pct))            # Individual verdicts
+
+def worst_colour(*colours):                                                                         # Most severe of several status colours
+    for c in (WARN_COLOUR, MID_COLOUR, OK_COLOUR):                                                  # Most severe first
+        if c in colours:
+            return c
+    return "grey"                                                                                   # Nothing known yet
+
+PLOT_HOURS = 24.0                                                                                   # Suburb chart is a clock-hour day; RESULTS keeps every row of longer runs
+
+def plot_rows(t):                                                                                   # Rows of t inside the first PLOT_HOURS of the run
+    return sum(1 for ts in t if ts - t[0] < PLOT_HOURS * 3600.0) if t else 0                        # Time stamps are seconds
+
+
+# 2.6 Dashboard panel geometry (fractions of one panel) --------------------------------------------
+DASH_X0, DASH_W = 0.06, 0.88                                                                        # Curve area left edge and width
+DASH_Y0, DASH_H = 0.06, 0.66                                                                        # Curve area bottom edge and height (title/notes above)
+DASH_PCT_TOP    = 150.0                                                                             # % loading mapped to the top of the curve area
+
+
+# 2.7 Heatmap colour scale --------------------------------------------------------------------------
+HEAT_PU_SPAN        = (0.90, 1.10)                                                                  # p.u. mapped to the ends of the diverging colour map
+HEAT_MAX_BUS_LABELS = 40                                                                            # Name every bus on the axis up to this many
+
+
+# 2.8 Load code → PowerFactory load name (e.g. "OTKa" → "Otaki Town A") ----------------------------
+LOAD_CODE_TO_NAME = sim.LOAD_NAMES                                                                  # One table, shared with the headless tools (otaki_sim 1.10.0)
+
+
+# 2.9 Map overlay anchors (image pixels on the original Map.png / Single Line Map.png) -------------
+MAP_MARKER_R = 7                                                                                    # Overlay marker radius in canvas pixels
+MAP_ANCHORS = {
+    "left": {                                                                                       # Map.png (1112 × 726): pv_key → beside its area label
+        "OTBa_PV": (80, 230),  "OTBb_PV": (125, 155), "OTBc_PV": (160, 80),
+        "OTCa_PV": (556, 625), "OTCb_PV": (448, 410), "OTIa_PV": (363, 600),
+        "OTKa_PV": (582, 475), "OTKb_PV": (458, 555), "OTKc_PV": (378, 465),
+        "OTS_PV":  (602, 540), "RGUa_PV": (258, 405), "RGUb_PV": (28, 435),
+        "TRE_PV":  (455, 245), "WTVa_PV": (778, 588), "WTVb_PV": (788, 510),
+        "WTVc_PV": (790, 430),
+    },
+    "right": {                                                                                      # Single Line Map.png (1112 × 726): transformer → its symbol
+        "OTB_T1": (112, 170),  "OTB_T2": (150, 97),   "OTB_T3": (183, 25),
+        "OTCa_T1": (660, 573), "OTCb_T1": (500, 380), "OTI_T1": (455, 565),
+        "OTK_T1": (627, 444),  "OTK_T2": (545, 516),  "OTK_T3": (485, 450),
+        "OTS_T1": (660, 508),  "RGU_T1": (337, 374),  "RGU_T2": (66, 375),
+        "TRE_T1": (463, 252),  "WTV_T1": (885, 515),  "WTV_T2": (890, 463),
+        "WTV_T3": (1012, 385),
+    },
+}
+
+
+# 2.10 Time-scrubber playback -----------------------------------------------------------------------
+PLAYBACK_FPS     = 30                                                                               # Frames per second while playing
+PLAYBACK_SECONDS = 20                                                                               # Whole run plays in about this long (steps are skipped on long runs)
+
+
+# 2.11 Virtual suburb list -------------------------------------------------------------------------
+LIST_ROW_H = 56                                                                                     # Minimum px per two-line suburb row (measured on first build, may grow)
+
+
+class RowCell:
+    """
+    Display state for one widget of one suburb row (button, kW badge, entries, result lines).
+    Only the rows on screen have real widgets (3.4); a pooled widget is attached while
+    its suburb is visible. configure() always records the options and only touches a
+    widget when one is attached, so the rest of the App can treat cells like labels.
+    """
+    def __init__(self, **opts):
+        self.opts = dict(opts)                                                                      # Last options set (text, fg, bg, relief …)
+        self.widget = None                                                                          # Pooled widget showing this cell, None when scrolled away
+
+    def configure(self, **opts):                                                                    # Same call shape as Tk widgets
+        self.opts.update(opts)
+        if self.widget is not None:
+            self._apply(opts)
+
+    config = configure
+
+    def cget(self, key):                                                                            # Read back a stored option
+        return self.opts.get(key, "")
+
+    def attach(self, widget, base=None):                                                            # Show this cell in a pooled widget
+        self.widget = widget
+        if widget is not None:
+            self._apply(dict(base or {}, **self.opts))                                              # Reset what the previous suburb left, then ours
+
+    def _apply(self, opts):
+        w = self.widget
+        if isinstance(w, (tk.Entry, ttk.Entry)):                                                    # Entries hold text, not a text option
+            text = opts.get("text")
+            if text is not None and w.get() != text:                                                # Only rewrite on change (avoids cursor jumps)
+                w.delete(0, "end")
+                w.insert(0, text)
+            return
+        w.configure(**opts)
+
+
+# 2.12 Slider event throttle -----------------------------------------------------------------------
+ROW_UPDATE_FPS = 30                                                                                 # Max row-text refreshes per second while dragging / nudging / typing
+
+
+# 2.13 Run comparison -----------------------------------------------------------------------------
+COMPARE_MODES = ("Off", "Overlay", "Difference")                                                    # Graph panel: current run only / baseline under it / current − baseline
+
+
 # =================================================================================================
 # ==================================================================================================
 # 3.0 ---------- UI setup ----------
@@ -310,31 +451,28 @@ class App(tk.Tk):
         run_row.grid_columnconfigure(2, weight=1)                                                 # Expand column 2 to stretch buttons
 
 
-# 3.1.6 Scrollable suburbd window area -----------------------------------------------------------
-        scrollbar = ttk.Scrollbar(left_frame, orient="vertical")                                # Vertical scrollbar for the left panel
+# 3.1.6 Scrollable suburb list: only the rows in view exist as widgets (3.4) ------------------------
+        self.sliders_frame = tk.LabelFrame(left_frame, text="Solar " \
+        "Penetration (%)", bg=DEFAULT_BG)                                                       # titled box around the list
+        self.sliders_frame.pack(side="left", fill="both", expand=True)                          # fill the left panel above the RUN row
+        scrollbar = ttk.Scrollbar(self.sliders_frame, orient="vertical")                        # Vertical scrollbar for the list
         scrollbar.pack(side="left", fill="y")                                                   # lock the scrollbar on the far left and stretch it vertically
-        canvas = tk.Canvas(left_frame, bg=DEFAULT_BG, 
-                           highlightthickness=0)                                                # canvas will host the scrolling content window
+        canvas = tk.Canvas(self.sliders_frame, bg=DEFAULT_BG,
+                           highlightthickness=0)                                                # canvas hosts the pooled row windows
         canvas.pack(side="left", fill="both", expand=True)                                      # place canvas to the right of the scrollbar, make it resize with the window
-        canvas.configure(yscrollcommand=scrollbar.set)                                          # canvas tells the scrollbar where the view is (for the thumb position)
         scrollbar.config(command=canvas.yview)                                                  # scrollbar controls the vertical view of the canvas when dragged
-        self.sliders_frame = tk.LabelFrame(canvas, text="Solar " \
-        "Penetration (%)", bg=DEFAULT_BG)                                                       # inner frame that actually holds slider rows
-        self.sliders_frame_id = canvas.create_window((0, 0), 
-        window=self.sliders_frame, anchor="nw")                                                 # put the inner frame at (0,0) inside the canvas
-
+        canvas.configure(yscrollcommand=self._on_list_yview)                                    # every view change → move the thumb + recycle rows (3.1.6.2)
+        self.list_canvas = canvas                                                               # used by the row pool (3.4)
+        self._list_scrollbar = scrollbar
+        self._row_pool = []                                                                     # Pooled slots, about one per visible row
+        self._row_first = None                                                                  # First suburb index laid out, None = re-layout
+        self._row_h = LIST_ROW_H                                                                    # Row pitch, measured from the first slot
+        self._slot_buttons = set()                                                                  # Pooled suburb buttons (4.3.0 leaves them alone)
+        self._tip = self._tip_lbl = None                                                            # One shared tooltip window (3.4.4)
 
-# 3.1.6.1 Grid widths across 4 columns where each slider row is laid out   ---------------------
-        self.sliders_frame.columnconfigure(0, weight=0, minsize=0)                              # column 0: suburb button, fixed width
-        self.sliders_frame.columnconfigure(1, weight=0, minsize=0)                              # column 1: kW label, fixed width
-        self.sliders_frame.columnconfigure(2, weight=0, minsize=0)                              # column 2: % entry, fixed width
-        self.sliders_frame.columnconfigure(3, weight=0, minsize=190)                            # column 3: results labels, 190 px so the text won't be cramped
 
-
-# 3.1.6.2 Update scrollable area whenever content size changes -------------------------------- 
-        def on_frame_config(event):                                                             # callback fired when sliders_frame changes size like adding rows
-            canvas.configure(scrollregion=canvas.bbox("all"))                                   # set the scrollable bit to fit all the content
-        self.sliders_frame.bind("<Configure>", on_frame_config)                                 # wire the size-change event to the callback
+# 3.1.6.1 Viewport resize → grow the pool to cover it ---------------------------------------------
+        canvas.bind("<Configure>", self._on_list_configure)                                     # also fires once at first layout
 
 
 # 3.1.6.3 Mouse wheel setup -------------------------------------------------------------------                                         
@@ -353,7 +491,13 @@ class App(tk.Tk):
         self.inv_kw_vars     = {}                                                                 # kW/inverter vars
         self.inv_kw_entries  = {}                                                                 # kW/inverter entries
         self.inv_kw_start    = {}                                                                 # PF-start kW/inverter
-        row_base = 0                                                                              # Grid row index for first slider block
+        self.kw_labels       = {}                                                                 # Installed-kW badges per suburb
+        self._row_cells      = {}                                                                 # pv_key → {"btn", "kw", "inv", "pct", "l1", "l2": RowCell}
+        self._dirty_rows     = set()                                                              # Suburbs changed since the last row flush (3.4.7)
+        self._row_job        = None                                                               # after() id of the pending flush
+        self._row_flush_t    = 0.0                                                                # perf_counter of the last flush
+        self._row_hooks      = []                                                                 # fn(keys) called after each flush, e.g. live previews
+        self._row_hooks.append(self._preview_estimates)                                           # Surrogate estimates while sliders move (3.15.0)
 
 
 # 3.1.9 Prefetch PF kW/inverter per suburb (on startup) --------------------------------------------
@@ -365,20 +509,23 @@ class App(tk.Tk):
 # 3.1.8 App-wide state + pull inverter counts from model -------------------------------------------
         self.suburb_state = {}                                                                    # Master per-suburb state dict
         self.last_run_signature = None                                                            # Tracks last run inputs for change detection
-        self.pv_inverters = dict(sim.PV_INV_OVERRIDES)                                            # otaki_sim already ran refresh_pv_overrides_from_model(app) at import
+        self.pv_inverters = dict(sim.PV_INV_OVERRIDES)                                            # otaki_sim already ran refresh_pv_overrides_from_model(app) at import (otaki_client: the server's counts)
         #print("[gui] pv_inverters (from model):", self.pv_inverters)                             # Debug print of inverter counts
 
 
-# 3.1.8.1 Build one two-row slider per suburb ------------------------------------------------------
-        row_base = 0                                                                              # Reset grid row for building sliders
+# 3.1.8.1 Per-suburb row state; widgets come from the pool when a row scrolls into view ---------
         def normalize_label(pv_key):                                                              # Helper: ASCII-normalize for sorting labels
             label = SUBURB_FULL[pv_key]                                                           # Lookup display label from key
             return unicodedata.normalize("NFKD", label).encode("ASCII", "ignore").decode()        # Strip accents for stable sort
 
         self.ordered_pv_keys = sorted(SUBURB_FULL, key=normalize_label)                           # Deterministic alphabetical order
-        for pv_key in self.ordered_pv_keys:                                                       # Build rows in sorted order
-            self._build_slider_row(self.sliders_frame, row_base, pv_key)                          # Create the 2-row slider block
-            row_base += 2                                                                         # Advance to next block (two rows)
+        self._name_width = max((len(SUBURB_FULL[k]) for k in self.ordered_pv_keys), default=12)   # Button width (chars) so every slot lines up
+        for pv_key in self.ordered_pv_keys:                                                       # Variables + cells only, no widgets
+            self._init_suburb_row(pv_key)
+        self._row_pool.append(self._build_row_slot())                                             # One slot up front to measure the row pitch
+        self._row_pool[0]["frame"].update_idletasks()
+        self._row_h = max(LIST_ROW_H, self._row_pool[0]["frame"].winfo_reqheight())
+        canvas.configure(yscrollincrement=self._row_h)                                            # One wheel notch = one suburb
 
 
 # 3.1.9 Load the storage with initial slider values and bus names ----------------------------------
@@ -388,7 +535,7 @@ class App(tk.Tk):
             item = deepcopy(SUBURB_DEFAULTS)                                                      # Clone default template
             item["pv_pct"] = float(self.slider_vars[pv_key].get())                                # Seed with current slider %
             item["pv_kw"]  = None                                                                 # Will be computed after results
-            item["bus"]    = pv_key.replace("_PV", "_0.415")                                      # Derive associated bus name
+            item["bus"]    = self._bus_name(pv_key)                                               # Associated bus name from PV_CONFIG
             item["load_curve"] = None                                                             # Placeholder for load kW time-series
             item["pv_profile"] = None                                                             # Placeholder for PV kW time-series
             self.suburb_state[pv_key] = item                                                      # Save initialized record
@@ -415,31 +562,71 @@ class App(tk.Tk):
 
 
 # 3.1.11.1 Graph area (Matplotlib embedded in Tk) --------------------------------------------------
-        if MPL_OK:                                                                                  # Only build plotting area if Matplotlib was imported successfully
-            self.fig = Figure(figsize=(5, 3), dpi=100)                                              # Create a new Matplotlib Figure (canvas) with fixed size and resolution
-            self.ax = self.fig.add_subplot(111)                                                     # Add one subplot (1 row, 1 col, first cell) → left axis for PV & demand
-            self.ax2 = self.ax.twinx()                                                              # Create a second y-axis (right side) sharing the same x-axis for % loadings
-            self.ax.set_title("Select a suburb to display curves")                                  # Set the main title of the graph
-            self.ax.set_xlabel("Hour")                                                              # Label for the x-axis → simulation time in hours
-            self.ax.set_ylabel("kW")                                                                # Label for the left y-axis → PV and demand values in kW
-            self.ax2.set_ylabel("% Loading")                                                        # Label for the right y-axis → transformer/line loading in %
-            self.ax.grid(True, linestyle="--", linewidth=0.5)                                       # Enable dashed grid lines for readability
-
-            
-            self.lines = {                                                                          # Dictionary to store line objects (plot handles) for later updates when a suburb is selected
-                "pv": None,                                                                         # PV generation curve in kW
-                "load": None,                                                                       # Load demand curve in kW
-                "tx_pct": None,                                                                     # Transformer loading curve in %
-                "line_pct": None,                                                                   # Line loading curve in %
-            }
-
-            self.canvas_mpl = FigureCanvasTkAgg(self.fig,                                           # Create Tk canvas for Matplotlib figure
-            master=self.graphs_frame)                                                               # Embed the Matplotlib figure into the Tkinter frame
-            self.canvas_mpl.get_tk_widget().pack(fill="both",                                       # Pack canvas widget to fill frame
-            expand=True, padx=8, pady=(0, 8))                                                       # Pack canvas so it fills available space
-        else:                                                                                       # If Matplotlib is not available
-            ttk.Label(self.graphs_frame,                                                            # Place a text label inside the graphs frame
-                    text="Matplotlib not installed.\nInstall it to see plots.").pack(padx=8, pady=8)  # Message shown instead of graph
+        self.fig = self.ax = self.ax2 = self.canvas_mpl = None                                      # Figure, twin axes and Tk canvas are built on first plot (3.9.7)
+        self.lines = {                                                                              # Dictionary to store line objects (plot handles) for later updates when a suburb is selected
+            "pv": None,                                                                             # PV generation curve in kW
+            "load": None,                                                                           # Load demand curve in kW
+            "tx_pct": None,                                                                         # Transformer loading curve in %
+            "line_pct": None,                                                                       # Line loading curve in %
+        }
+        timeline = tk.Frame(self.graphs_frame, bg=DEFAULT_BG)                                       # Play button + time slider under the graphs (3.14.0)
+        timeline.pack(side="bottom", fill="x", padx=8, pady=(0, 6))                                 # Packed first so the tabs take the rest
+        self.play_btn = ttk.Button(timeline, text="▶", width=3, command=self._toggle_playback)      # Play / pause
+        self.play_btn.pack(side="left")
+        self.time_var = tk.DoubleVar(value=0)                                                       # Current step index
+        self.time_scale = ttk.Scale(timeline, orient="horizontal", from_=0, to=1,
+                                    variable=self.time_var, command=self._on_time_scrub)            # Drag to scrub through the run
+        self.time_scale.pack(side="left", fill="x", expand=True, padx=6)
+        self.time_lbl = tk.Label(timeline, text="--:--", width=14, bg=DEFAULT_BG, cursor="hand2")   # Click → back to whole-run view
+        self.time_lbl.pack(side="left")
+        self.time_lbl.bind("<Button-1>", self._clear_scrub)
+        self.time_scale.state(["disabled"]); self.play_btn.state(["disabled"])                      # Enabled once a run has finished
+        self._play = None                                                                           # Playback arrays, built per run (3.14.0)
+        self._play_step = None                                                                      # Step shown, None = whole-run view
+        self._play_job = None                                                                       # after() id of the next frame
+        self._scrub_job = None; self._scrub_target = None                                           # Coalesced slider drag
+        self._cursors, self._blit_bg, self._cursor_hooked = {}, {}, set()                           # Blitted cursor state per graph tab
+        self._label_cache = {}                                                                      # Label → (text, colour) on screen
+
+        compare = tk.Frame(self.graphs_frame, bg=DEFAULT_BG)                                        # Run comparison controls (3.16.0)
+        compare.pack(side="bottom", fill="x", padx=8, pady=(0, 4))                                  # Sits above the time scrubber
+        tk.Label(compare, text="Compare:", bg=DEFAULT_BG).pack(side="left")
+        self.compare_var = tk.StringVar(value=COMPARE_MODES[0])                                     # Off / Overlay / Difference
+        compare_cb = ttk.Combobox(compare, textvariable=self.compare_var, values=COMPARE_MODES,
+                                  state="readonly", width=11)
+        compare_cb.pack(side="left", padx=(4, 8))
+        compare_cb.bind("<<ComboboxSelected>>", self._on_compare_mode)                              # Redraw the selected suburb in the new mode
+        ttk.Button(compare, text="Pin baseline", command=self._pin_baseline).pack(side="left")
+        ttk.Button(compare, text="Load…", command=self._load_baseline).pack(side="left", padx=4)
+        ttk.Button(compare, text="Save run…", command=self._save_run).pack(side="left")
+        self.export_full_btn = ttk.Button(compare, text="Export all…", command=self._export_full)   # Every element and step (3.11.4)
+        self.export_full_btn.pack(side="right")
+        self.export_lbl = tk.Label(compare, text="", bg=DEFAULT_BG)                                 # Export progress
+        self.export_lbl.pack(side="right", padx=4)
+        self._export_stop = None                                                                    # threading.Event of the running export
+        self.compare_lbl = tk.Label(compare, text="Baseline: none yet", bg=DEFAULT_BG)              # Which run the deltas are against
+        self.compare_lbl.pack(side="left", padx=8)
+        self.baseline_results = None                                                                # RESULTS-shaped snapshot being compared against
+        self.baseline_name = None                                                                   # Shown in the label and the difference plot title
+        self.baseline_pinned = False                                                                # Pinned / loaded baselines survive later runs
+        self._run_before = None                                                                     # sim.RESULTS as it was before the latest RUN
+        self._comparison = None                                                                     # otaki_results.compare output, rebuilt when either side changes
+        self.graph_tabs = ttk.Notebook(self.graphs_frame)                                           # Tabs: single-suburb curves / all-suburb dashboard
+        self.graph_tabs.pack(fill="both", expand=True)                                              # Tabs fill the graph frame
+        self.suburb_tab = tk.Frame(self.graph_tabs, bg=DEFAULT_BG)                                  # Hosts the twin-axis suburb plot (3.9.7)
+        self.dashboard_tab = tk.Frame(self.graph_tabs, bg=DEFAULT_BG)                               # Hosts the small-multiples dashboard (3.12.0)
+        self.graph_tabs.add(self.suburb_tab, text="Suburb")                                         # First tab = classic view
+        self.heatmap_tab = tk.Frame(self.graph_tabs, bg=DEFAULT_BG)                                 # Hosts the hour × bus voltage heatmap (3.13.0)
+        self.graph_tabs.add(self.dashboard_tab, text="Dashboard")                                   # Second tab = every suburb at once
+        self.graph_tabs.add(self.heatmap_tab, text="Heatmap")                                       # Third tab = whole bus-voltage matrix
+        self.graph_tabs.bind("<<NotebookTabChanged>>", self._on_graph_tab_changed)                  # Build the dashboard the first time it is shown
+        self.dash = None                                                                            # Dashboard artists, built lazily (3.12.1)
+        self.heat = None                                                                            # Heatmap artists, built lazily (3.13.0)
+
+        self.graph_placeholder = tk.Label(self.suburb_tab, bg=DEFAULT_BG,                           # Plain Tk text stands in for the figure until results exist
+            text=("Please run the simulation,\nthen click a suburb to display results." if MPL_OK
+                  else "Matplotlib not installed.\nInstall it to see plots."))                      # Message shown instead of graph
+        self.graph_placeholder.pack(fill="both", expand=True, padx=8, pady=8)                       # Fill the graph frame like the canvas will
 
 
 # 3.1.12 Map frame (middle) — fixed 50/50 split (no adjustable sash) -------------------------------
@@ -473,6 +660,9 @@ class App(tk.Tk):
         self._map_img_right = None                                                                  # PhotoImage for right canvas
         self._map_img_path_left = None                                                              # file path for left image
         self._map_img_path_right = None                                                             # file path for right image
+        self._map_xform   = {}                                                                      # side → (scale, x offset, y offset) of the drawn image
+        self._map_items   = {}                                                                      # side → {anchor key: canvas oval id}
+        self._map_colours = {}                                                                      # (side, anchor key) → colour currently shown
 
 
 # 3.1.13 Default pane heights — keep so maps are visible on startup --------------------------------
@@ -480,11 +670,11 @@ class App(tk.Tk):
         self.after(80, lambda: vertical_pane.paneconfig(self.map_frame,    height=100))             # maps middle ~400 px
 
 
-# 3.1.13.1 Load both maps (absolute paths) ----------------------------------------------------------
-        self.load_map_images(                                                                       # load both map images
+# 3.1.13.1 Load both maps (absolute paths) once the window has painted (Pillow import is deferred) ---
+        self.after_idle(lambda: self.load_map_images(                                               # load both map images after first paint
             r"C:\Users\chris\OneDrive - Victoria University of Wellington - STUDENT\Vic\ENGR489\Artifact\Map.png",               # left: normal map
             r"C:\Users\chris\OneDrive - Victoria University of Wellington - STUDENT\Vic\ENGR489\Artifact\Single Line Map.png"    # right: single-line transmission map
-        )
+        ))
 
 
 # 3.1.14 Metric selector for results boxe -----------------------------------------------------------
@@ -520,187 +710,271 @@ class App(tk.Tk):
                             v in self.slider_vars.items()))                                              # Use integer percent values
 
 
-# 3.4.0 Build one two-row slider+labels group for a suburb --------------------
-
-    def _build_slider_row(self, parent, row_base, pv_key):                                              # Section 3.4.0 row builder
-
-# 3.4.1 ROW A: Suburb button (click to plot curves) ---------------------------------------------------
-
-        full_name = SUBURB_FULL.get(pv_key, pv_key)                                                     # Resolve display name
-        name_btn = tk.Button(                                                                           # Create suburb button
-            parent, text=full_name, anchor="w",
-            relief="raised", bd=1, padx=6, pady=1,
-            bg=DEFAULT_BG, activebackground="#CFCFCF",
-            highlightthickness=1, highlightbackground="#BEBEBE",
-            command=lambda k=pv_key: self._on_suburb_clicked(k)
-        )
-        name_btn.grid(row=row_base, column=0, sticky="w",                                               # Place in leftmost column
-                      padx=(6, 0), pady=(4, 0))
-        self.suburb_buttons[pv_key] = name_btn                                                          # Store handle by key
-
-
-# 3.4.2 ROW A: kW label (installed capacity summary) --------------------------------------------------
-
-        kw_lbl = tk.Label(parent, bd=1, relief="sunken", bg="white", fg="black",                        # Small numeric badge
-                          width=8, padx=6, pady=2, anchor="e")
-        kw_lbl.grid(row=row_base, column=1, sticky="e", padx=(2, 0), pady=(4, 0))                       # Right-align in col 1
-        self.kw_labels = getattr(self, 'kw_labels', {})                                                 # Ensure dict exists
-        self.kw_labels[pv_key] = kw_lbl                                                                 # Save label for updates
-
-
-# 3.4.3 Seed slider variable with current inverter count ----------------------------------------------
+# 3.4.0 Per-suburb row state: Tk variables + display cells, no widgets ----------------------------
 
+    def _init_suburb_row(self, pv_key):                                                                 # Cheap enough for hundreds of suburbs
         inv = int(self.pv_inverters.get(pv_key, 0))                                                     # Start from model inverter count
-        var = tk.DoubleVar(value=inv)                                                                   # Backing variable for slider
-        self.slider_vars[pv_key] = var                                                                  # Register var for this suburb
-
-
-# 3.4.4 Tooltip helper (local) -------------------------------------------------------------------------
-
-        def _suburb_tip_text(pv_key):                                                                   # Compose tooltip text
-            meta = sim.PV_CONFIG.get(pv_key, {})                                                        # Get config record
-            bus  = meta.get("bus", pv_key.replace("_PV", "_0.415"))                                     # Bus fallback mapping
-            load = meta.get("load", "")                                                                 # Load name if any
-            tx   = meta.get("tx", "")                                                                   # Transformer name if any
-            line = meta.get("pline", "")                                                                # Line name if any
-            return ("Click to display results\n"                                                        # Multiline tooltip body
-                    f"Load: {load}\n"
-                    f"PV: {pv_key}\n"
-                    f"Tx: {tx}\n"
-                    f"Bus: {bus}\n"
-                    f"Line: {line}")
-
-        def _tooltip(widget, text_or_fn):                                                               # Attach simple tooltip
-            tip = tk.Toplevel(widget); tip.withdraw(); tip.overrideredirect(True)                       # Floating borderless window
-            lbl = tk.Label(tip, text="", bg="#FFF9C4", relief="solid",                                # Tooltip label widget
-                           borderwidth=1, padx=6, pady=2, justify="left"); lbl.pack()
-            def _show(e):                                                                               # On enter: show near cursor
-                try:
-                    txt = text_or_fn() if callable(text_or_fn) else text_or_fn                          # Compute text if callable
-                except Exception:
-                    txt = str(text_or_fn)                                                               # Fallback to string
-                lbl.config(text=txt)                                                                    # Set text on label
-                tip.geometry(f"+{e.x_root+10}+{e.y_root+10}"); tip.deiconify()                          # Position and reveal
-            def _hide(_): tip.withdraw()                                                                # On leave: hide tooltip
-            widget.bind("<Enter>", _show); widget.bind("<Leave>", _hide)                                # Bind events
-
-        _tooltip(name_btn, lambda k=pv_key: _suburb_tip_text(k))                                        # Live suburb tooltip
-        _tooltip(kw_lbl, "Installed PV = % × homes × kW/inverter.")                                     # Explain kW badge
-
-
-# 3.4.5 ROW A: “kW per inverter” Entry (quantised to panels) ---------------------------------------
-
+        self.slider_vars[pv_key] = tk.DoubleVar(value=inv)                                              # Backing variable for the slider
         start_kw = float(self.inv_kw_start.get(pv_key, 6.0))                                            # Initial kW/inverter seed from PF (fallback 6.0)
-        inv_kw_var = tk.DoubleVar(value=start_kw)                                                       # Backing Tk variable for entry
-        self.inv_kw_vars[pv_key] = inv_kw_var                                                           # Register var for suburb
-        inv_kw_ent = ttk.Entry(parent, width=8, justify="right")                                        # Numeric entry for kW/inverter
-        inv_kw_ent.grid(row=row_base, column=2, sticky="e", padx=(2, 0), pady=(4, 0))                   # Place in col 2, right aligned
-        self.inv_kw_entries[pv_key] = inv_kw_ent                                                        # Keep handle for later reads
-        _tooltip(inv_kw_ent, f"Array size per inverter rounded for {sim.PANEL_WATT} W panels.")         # Explain rounding to panel size
-
-        def _format_inv_kw():                                                                           # Parse/quantise entry to nearest panel
-            raw = inv_kw_ent.get().strip().replace("kW","").strip()                                     # Strip units and spaces
-            try:
-                req_kw = max(0.0, float(raw)) if raw else float(inv_kw_var.get())                       # Use typed value or current var
-            except ValueError:
-                req_kw = float(inv_kw_var.get())                                                        # Fallback on parse error
-            nmods   = int(round((req_kw * 1000.0) / sim.PANEL_WATT))                                    # panels/inverter
-            show_kw = (nmods * sim.PANEL_WATT) / 1000.0                                                 # quantised kW
-            inv_kw_var.set(show_kw)                                                                     # Sync var to quantised value
-            inv_kw_ent.delete(0, tk.END)                                                                # Clear entry
-            inv_kw_ent.insert(0, f"{show_kw:.2f} kW")                                                   # e.g., ~49.92 kW
-            self._update_kw_label(pv_key)                                                               # Refresh installed kW badge
-
-        inv_kw_ent.insert(0, f"{start_kw:g} kW")                                                        # Seed entry text with start value
-        inv_kw_ent.bind("<Return>",   lambda *_: _format_inv_kw())                                      # Quantise on Enter
-        inv_kw_ent.bind("<FocusOut>", lambda *_: _format_inv_kw())                                      # Quantise on blur
-
+        self.inv_kw_vars[pv_key] = tk.DoubleVar(value=start_kw)                                         # Backing variable for the kW entry
+        cells = {"btn": RowCell(text=SUBURB_FULL.get(pv_key, pv_key)),                                  # Suburb button
+                 "kw":  RowCell(text=""),                                                               # Installed kW badge
+                 "inv": RowCell(text=f"{start_kw:g} kW"),                                               # kW per inverter entry
+                 "pct": RowCell(text="0"),                                                              # % entry
+                 "l1":  RowCell(text="", fg="black"),                                               # Result line 1
+                 "l2":  RowCell(text="", fg="black")}                                               # Result line 2
+        self._row_cells[pv_key] = cells
+        self.suburb_buttons[pv_key]  = cells["btn"]                                                 # Same dicts the rest of the App already uses
+        self.kw_labels[pv_key]       = cells["kw"]
+        self.inv_kw_entries[pv_key]  = cells["inv"]
+        self.percent_entries[pv_key] = cells["pct"]
+        self.result_labels[pv_key]   = cells["l1"]
+        self.result_lines[pv_key]    = (cells["l1"], cells["l2"])
+        self._update_percent_entry(pv_key)                                                          # Populate % entry from slider
+        self._update_kw_label(pv_key)                                                               # Update installed kW badge
+        self._touch_placeholder_capacity(pv_key)                                                    # Mark capacity as dirty
 
-# 3.4.6 ROW B: Slider rail + left/right nudge buttons ----------------------------------------------
 
+# 3.4.1 Build one pooled two-row slot (reused for whichever suburb scrolls into it) -----------------
+
+    def _build_row_slot(self):                                                                      # Returns the slot dict
+        bg = self.cget("bg")                                                                        # Current scheme background
+        f = tk.Frame(self.list_canvas, bg=bg)                                                       # One row = one canvas window
+        f.columnconfigure(3, weight=1, minsize=190)                                                 # column 3: results labels, 190 px so the text won't be cramped
+        slot = {"key": None, "frame": f}
+
+        # ROW A: suburb button, kW badge, kW/inverter entry, result line 1
+        slot["btn"] = tk.Button(f, width=self._name_width, anchor="w",
+                                relief="raised", bd=1, padx=6, pady=1,
+                                bg=bg, activebackground="#CFCFCF",
+                                highlightthickness=1, highlightbackground="#BEBEBE",
+                                command=lambda: self._on_row_button(slot))
+        slot["btn"].grid(row=0, column=0, sticky="w", padx=(6, 0), pady=(4, 0))
+        self._slot_buttons.add(slot["btn"])
+        slot["kw"] = tk.Label(f, bd=1, relief="sunken", bg="white", fg="black",
+                              width=8, padx=6, pady=2, anchor="e")
+        slot["kw"].grid(row=0, column=1, sticky="e", padx=(2, 0), pady=(4, 0))
+        slot["inv"] = ttk.Entry(f, width=8, justify="right")
+        slot["inv"].grid(row=0, column=2, sticky="e", padx=(2, 0), pady=(4, 0))
+        slot["inv"].bind("<Return>",   lambda *_: self._commit_inv_kw(slot))                        # Quantise on Enter
+        slot["inv"].bind("<FocusOut>", lambda *_: self._commit_inv_kw(slot))                            # Quantise on blur
+        slot["l1"] = tk.Label(f, bd=1, relief="sunken", bg="white", fg="black", padx=6, pady=2, anchor="w")
+        slot["l1"].grid(row=0, column=3, sticky="nsew", padx=(8, 6), pady=(4, 0))
+
+        # ROW B: < slider > rail, % entry, result line 2
         NUDGE_W, NUDGE_H = 16, 16                                                                       # Arrow button box size
-        def _nudge(k, d):                                                                               # Bump slider by delta d
-            v = self.slider_vars[k]                                                                     # Get Tk variable
-            new = max(0.0, min(100.0, float(v.get()) + d))                                              # Clamp to [0, 100]
-            v.set(new); self._update_percent_entry(k); self._update_kw_label(k); self._touch_placeholder_capacity(k)  # Sync UI
-
-        rail = tk.Frame(parent, bg=DEFAULT_BG)                                                          # Container row for slider + arrows
-        rail.grid(row=row_base+1, column=0, columnspan=2, sticky="ew", padx=(6,0), pady=(0,4))          # span only cols 0–1
+        rail = tk.Frame(f, bg=bg)
+        rail.grid(row=1, column=0, columnspan=2, sticky="ew", padx=(6, 0), pady=(0, 4))                 # span only cols 0–1
         rail.grid_columnconfigure(0, weight=0, minsize=NUDGE_W)                                         # Left arrow column
         rail.grid_columnconfigure(1, weight=1)                                                          # Slider column (expands)
         rail.grid_columnconfigure(2, weight=0, minsize=NUDGE_W)                                         # Right arrow column
         rail.grid_rowconfigure(0, minsize=NUDGE_H)                                                      # Row height matches arrow boxes
-
-        left_wrap  = tk.Frame(rail, width=NUDGE_W, height=NUDGE_H, bg=DEFAULT_BG); left_wrap.grid(row=0, column=0, sticky="w"); left_wrap.pack_propagate(False)  # Left arrow holder
-        right_wrap = tk.Frame(rail, width=NUDGE_W, height=NUDGE_H, bg=DEFAULT_BG); right_wrap.grid(row=0, column=2, sticky="e"); right_wrap.pack_propagate(False) # Right arrow holder
-
+        left_wrap  = tk.Frame(rail, width=NUDGE_W, height=NUDGE_H, bg=bg); left_wrap.grid(row=0, column=0, sticky="w"); left_wrap.pack_propagate(False)
+        right_wrap = tk.Frame(rail, width=NUDGE_W, height=NUDGE_H, bg=bg); right_wrap.grid(row=0, column=2, sticky="e"); right_wrap.pack_propagate(False)
         self.style.configure("Arrow.TButton", padding=0)                                                # Compact arrow style
-        ttk.Button(left_wrap,  text="<", style="Arrow.TButton", command=lambda k=pv_key: _nudge(k,-1)).pack(fill="both", expand=True)  # Left nudge
-
-        slider = ttk.Scale(rail, orient="horizontal", from_=0.0, to=100.0,                              # Main penetration slider
-                           variable=self.slider_vars[pv_key],
-                           command=lambda _=None, k=pv_key: (
-                               self._update_percent_entry(k),
-                               self._update_kw_label(k),
-                               self._touch_placeholder_capacity(k)
-                           ))
-        slider.grid(row=0, column=1, sticky="ew")                                                       # Stretch across center column
-
-        ttk.Button(right_wrap, text=">", style="Arrow.TButton", command=lambda k=pv_key: _nudge(k,+1)).pack(fill="both", expand=True)  # Right nudge
-
-
-# 3.4.7 ROW B: Slider (0–100%) ----------------------------------------------------------------------
-
-        slider = ttk.Scale(rail, orient="horizontal", from_=0.0, to=100.0,                              # Duplicate slider (kept as in source)
-                           variable=self.slider_vars[pv_key],
-                           command=lambda _=None, k=pv_key: (
-                               self._update_percent_entry(k),
-                               self._update_kw_label(k),
-                               self._touch_placeholder_capacity(k)
-                           ))
-        slider.grid(row=0, column=1, sticky="ew")                                                       # Place in center cell
-        _tooltip(slider, "PV penetration (%) for this suburb.")                                         # Explain slider purpose
+        ttk.Button(left_wrap,  text="<", style="Arrow.TButton",
+                   command=lambda: self._nudge_slider(slot["key"], -1)).pack(fill="both", expand=True)
+        slot["scale"] = ttk.Scale(rail, orient="horizontal", from_=0.0, to=100.0,                       # Variable is rebound per suburb (3.4.2)
+                                  command=lambda _=None: self._on_row_changed(slot["key"]))
+        slot["scale"].grid(row=0, column=1, sticky="ew")
         ttk.Button(right_wrap, text=">", style="Arrow.TButton",
-                   command=lambda k=pv_key: _nudge(k,+1)).pack(fill="both", expand=True)                # Mirror right nudge
+                   command=lambda: self._nudge_slider(slot["key"], +1)).pack(fill="both", expand=True)
+        slot["pct"] = ttk.Entry(f, width=6, justify="right")
+        slot["pct"].grid(row=1, column=2, sticky="e", padx=(2, 0), pady=(0, 4))
+        slot["pct"].bind("<Return>",   lambda *_: self._commit_percent_entry(slot))                 # Apply on Enter
+        slot["pct"].bind("<FocusOut>", lambda *_: self._commit_percent_entry(slot))                 # Apply on blur
+        slot["l2"] = tk.Label(f, bd=1, relief="sunken", bg="white", fg="black", padx=6, pady=2, anchor="w")
+        slot["l2"].grid(row=1, column=3, sticky="nsew", padx=(8, 6), pady=(0, 4))
+
+        # Tooltips read the slot's current suburb when shown (one shared window, 3.4.4)
+        self._tooltip(slot["btn"], lambda: self._suburb_tip_text(slot["key"]))
+        self._tooltip(slot["kw"], "Installed PV = % × homes × kW/inverter.")
+        self._tooltip(slot["inv"], f"Array size per inverter rounded for {sim.PANEL_WATT} W panels.")
+        self._tooltip(slot["scale"], "PV penetration (%) for this suburb.")
+        self._tooltip(slot["pct"], "Type a % value (0–100).")
+        self._tooltip(slot["l1"], lambda: f"p.u. values for {self._bus_name(slot['key'])} bus")
+        self._tooltip(slot["l2"], lambda: f"p.u. values for {self._bus_name(slot['key'])} bus")
+
+        slot["win"] = self.list_canvas.create_window(0, -2 * self._row_h, window=f, anchor="nw",    # Parked above the scroll region until used
+                                                     height=self._row_h,
+                                                     width=max(1, self.list_canvas.winfo_width()))
+        return slot
+
+
+# 3.4.2 Bind a slot to a suburb (or None = park it) -------------------------------------------------
+
+    def _bind_slot(self, slot, pv_key):
+        old = slot["key"]
+        if old == pv_key:
+            return
+        if old is not None:
+            try:
+                focus = self.focus_get()
+            except Exception:                                                                       # focus_get can fail while a popup is up
+                focus = None
+            if focus is slot["pct"]:                                                                # Typed a % then scrolled: apply it to the right suburb
+                self._commit_percent_entry(slot); self.list_canvas.focus_set()
+            elif focus is slot["inv"]:
+                self._commit_inv_kw(slot); self.list_canvas.focus_set()
+            for name, cell in self._row_cells[old].items():                                         # Detach the old suburb's cells
+                if cell.widget is slot[name]:                                                       # ...unless another slot already took them
+                    cell.widget = None
+        slot["key"] = pv_key
+        if pv_key is None:
+            return
+        slot["scale"].configure(variable=self.slider_vars[pv_key])                                  # Slider drives this suburb's variable
+        cells = self._row_cells[pv_key]
+        cells["btn"].attach(slot["btn"], dict(relief="raised", **self._normal_button_colours()))    # Highlight (3.9.1) is stored on the cell
+        cells["kw"].attach(slot["kw"])
+        cells["inv"].attach(slot["inv"])
+        cells["pct"].attach(slot["pct"])
+        cells["l1"].attach(slot["l1"])
+        cells["l2"].attach(slot["l2"])
+
+
+# 3.4.3 Lay out the visible rows: slot = pool[index % pool size], so a one-row scroll rebinds one slot
+
+    def _layout_rows(self):
+        keys = self.ordered_pv_keys
+        first = max(0, int(self.list_canvas.canvasy(0) // self._row_h))                             # First suburb index in view
+        if first == self._row_first:                                                                # Scrolled within the same row
+            return
+        self._row_first = first
+        n_pool = len(self._row_pool)
+        for idx in range(first, first + n_pool):
+            slot = self._row_pool[idx % n_pool]
+            if idx < len(keys):
+                self._bind_slot(slot, keys[idx])
+                self.list_canvas.coords(slot["win"], 0, idx * self._row_h)
+            else:                                                                                   # Past the last suburb
+                self._bind_slot(slot, None)
+                self.list_canvas.coords(slot["win"], 0, -2 * self._row_h)
+
+    def _on_list_yview(self, first, last):                                                          # canvas yscrollcommand
+        self._list_scrollbar.set(first, last)                                                       # Move the thumb
+        self._layout_rows()                                                                         # Recycle rows if the first visible one changed
+
+    def _on_list_configure(self, event):                                                            # Viewport resized
+        need = min(len(self.ordered_pv_keys), event.height // self._row_h + 2)                      # Visible rows + a partial one at each edge
+        while len(self._row_pool) < need:                                                           # Grow only; a shrink keeps spare slots parked
+            self._row_pool.append(self._build_row_slot())
+        for slot in self._row_pool:
+            self.list_canvas.itemconfigure(slot["win"], width=event.width, height=self._row_h)      # Rows span the canvas width, measured pitch
+        self.list_canvas.configure(scrollregion=(0, 0, event.width,
+                                                 len(self.ordered_pv_keys) * self._row_h))          # Full list height, not the widgets'
+        self._row_first = None                                                                      # Pool size may have changed
+        self._layout_rows()
+
+
+# 3.4.4 One tooltip window shared by every row ------------------------------------------------------
+
+    def _tooltip(self, widget, text_or_fn):                                                         # Attach simple tooltip
+        widget.bind("<Enter>", lambda e: self._tip_show(e, text_or_fn))
+        widget.bind("<Leave>", self._tip_hide)
+
+    def _tip_show(self, e, text_or_fn):                                                             # On enter: show near cursor
+        if self._tip is None:                                                                       # Created on first hover
+            self._tip = tk.Toplevel(self); self._tip.withdraw(); self._tip.overrideredirect(True)   # Floating borderless window
+            self._tip_lbl = tk.Label(self._tip, text="", bg="#FFF9C4", relief="solid",
+                                     borderwidth=1, padx=6, pady=2, justify="left")
+            self._tip_lbl.pack()
+        try:
+            txt = text_or_fn() if callable(text_or_fn) else text_or_fn                              # Compute text if callable
+        except Exception:
+            txt = str(text_or_fn)                                                                   # Fallback to string
+        self._tip_lbl.config(text=txt)                                                              # Set text on label
+        self._tip.geometry(f"+{e.x_root+10}+{e.y_root+10}"); self._tip.deiconify()                  # Position and reveal
 
+    def _tip_hide(self, _=None):                                                                    # On leave: hide tooltip
+        if self._tip is not None:
+            self._tip.withdraw()
 
-# 3.4.8 ROW B: % Entry (at end of slider) -----------------------------------------------------------
 
-        ent = ttk.Entry(parent, width=6, justify="right")                                          # Percent entry widget
-        ent.insert(0, "0")                                                                         # Seed with 0
-        ent.grid(row=row_base+1, column=2, sticky="e", padx=(2, 0), pady=(0, 4))                   # Place at end of row B
-        self.percent_entries[pv_key] = ent                                                         # Keep handle by suburb key
-        _tooltip(ent, "Type a % value (0–100).")                                                   # Tooltip: expected range
+# 3.4.5 “kW per inverter” Entry commit (quantised to panels) ----------------------------------------
 
-        def commit_entry(*_):                                                                      # Commit typed % into slider var
-            try: val = float(ent.get().replace('%',''))                                            # Parse number (strip %)
-            except ValueError: val = 0.0                                                           # Fallback to 0 on error
-            val = max(0.0, min(100.0, val))                                                        # Clamp to [0, 100]
-            var.set(val); self._update_percent_entry(pv_key); self._update_kw_label(pv_key); self._touch_placeholder_capacity(pv_key)  # Sync UI and placeholders
-        ent.bind("<Return>", commit_entry); ent.bind("<FocusOut>", commit_entry)                   # Apply on Enter/blur
+    def _commit_inv_kw(self, slot):                                                                 # Parse/quantise entry to nearest panel
+        pv_key = slot["key"]
+        if pv_key is None:
+            return
+        var = self.inv_kw_vars[pv_key]
+        raw = slot["inv"].get().strip().replace("kW","").strip()                                    # Strip units and spaces
+        try:
+            req_kw = max(0.0, float(raw)) if raw else float(var.get())                              # Use typed value or current var
+        except ValueError:
+            req_kw = float(var.get())                                                               # Fallback on parse error
+        nmods   = int(round((req_kw * 1000.0) / sim.PANEL_WATT))                                    # panels/inverter
+        show_kw = (nmods * sim.PANEL_WATT) / 1000.0                                                 # quantised kW
+        var.set(show_kw)                                                                            # Sync var to quantised value
+        self.inv_kw_entries[pv_key].configure(text=f"{show_kw:.2f} kW")                             # e.g., ~49.92 kW
+        self._on_row_changed(pv_key)                                                                # kW badge on the next row flush
 
 
-# 3.4.9 ROW A/B: Result lines -----------------------------------------------------------------------
+# 3.4.6 Nudge buttons (< >) -------------------------------------------------------------------------
 
-        res_line1 = tk.Label(parent, bd=1, relief="sunken", bg="white", fg="black", padx=6, pady=2, anchor="w")  # Upper result label
-        res_line1.grid(row=row_base, column=3, sticky="nsew", padx=(8, 6), pady=(4, 0))            # Span cell for row A
-        self.result_labels[pv_key] = res_line1                                                      # Keep reference
+    def _nudge_slider(self, pv_key, d):                                                             # Bump slider by delta d
+        if pv_key is None:
+            return
+        v = self.slider_vars[pv_key]                                                                # Get Tk variable
+        v.set(max(0.0, min(100.0, float(v.get()) + d)))                                             # Clamp to [0, 100]
+        self._on_row_changed(pv_key)
 
-        res_line2 = tk.Label(parent, bd=1, relief="sunken", bg="white", fg="black", padx=6, pady=2, anchor="w")  # Lower result label
-        res_line2.grid(row=row_base + 1, column=3, sticky="nsew", padx=(8, 6), pady=(0, 4))        # Span cell for row B
-        self.result_lines[pv_key] = (res_line1, res_line2)                                          # Tuple of both labels
 
-        # Tooltips for p.u. result labels with actual bus name
-        bus_name = sim.PV_CONFIG.get(pv_key, {}).get("bus", pv_key.replace("_PV", "_0.415"))       # Resolve bus name for tooltip
-        _tooltip(res_line1, f"p.u. values for {bus_name} bus")                                      # Attach tooltip to line 1
-        _tooltip(res_line2, f"p.u. values for {bus_name} bus")                                      # Attach tooltip to line 2
+# 3.4.7 Slider / nudge / entry changed → mark dirty, flush at most ROW_UPDATE_FPS times a second
 
+    def _on_row_changed(self, pv_key):                                                              # Cheap: no widget work here
+        if pv_key is None:
+            return
+        self._dirty_rows.add(pv_key)                                                                # Many events per suburb → one entry
+        if self._row_job is None:                                                                   # One pending flush for all suburbs
+            since_ms = (time.perf_counter() - self._row_flush_t) * 1000.0
+            self._row_job = self.after(max(0, int(1000.0 / ROW_UPDATE_FPS - since_ms)), self._flush_row_updates)
+
+    def _flush_row_updates(self):                                                                   # One pass over every dirty suburb
+        self._row_job = None
+        self._row_flush_t = time.perf_counter()
+        keys = [k for k in self.ordered_pv_keys if k in self._dirty_rows]                           # List order, stable for hooks
+        self._dirty_rows.clear()
+        for pv_key in keys:
+            self._update_percent_entry(pv_key)                                                      # “NN%” text
+            self._touch_placeholder_capacity(pv_key)                                                # Seed cached state
+        self._update_kw_labels(keys)                                                                # Installed kW for all of them at once
+        for hook in self._row_hooks:                                                                # Live previews etc.
+            try:
+                hook(keys)
+            except Exception as e:
+                print("row update hook error:", e)
 
-# 3.4.10 Seed initial UI state ----------------------------------------------------------------------
+    def _on_row_button(self, slot):                                                                 # Suburb button → suburb tab + curves
+        if slot["key"] is not None:
+            self.graph_tabs.select(self.suburb_tab)
+            self._on_suburb_clicked(slot["key"])
 
-        self._update_percent_entry(pv_key)                                                          # Populate % entry from slider
-        self._update_kw_label(pv_key)                                                               # Update installed kW badge
-        self._touch_placeholder_capacity(pv_key)                                                    # Mark capacity as dirty
+
+# 3.4.8 % Entry commit ------------------------------------------------------------------------------
+
+    def _commit_percent_entry(self, slot):                                                          # Commit typed % into slider var
+        pv_key = slot["key"]
+        if pv_key is None:
+            return
+        try: val = float(slot["pct"].get().replace('%',''))                                         # Parse number (strip %)
+        except ValueError: val = 0.0                                                                # Fallback to 0 on error
+        self.slider_vars[pv_key].set(max(0.0, min(100.0, val)))                                     # Clamp to [0, 100]
+        self._on_row_changed(pv_key)
+
+
+# 3.4.9 Tooltip texts -------------------------------------------------------------------------------
+
+    def _bus_name(self, pv_key):                                                                    # Bus for a suburb, PV_CONFIG first
+        return sim.PV_CONFIG.get(pv_key, {}).get("bus", (pv_key or "").replace("_PV", "_0.415"))
+
+    def _suburb_tip_text(self, pv_key):                                                             # Compose tooltip text
+        meta = sim.PV_CONFIG.get(pv_key, {})                                                        # Get config record
+        return ("Click to display results\n"                                                        # Multiline tooltip body
+                f"Load: {meta.get('load', '')}\n"
+                f"PV: {pv_key}\n"
+                f"Tx: {meta.get('tx', '')}\n"
+                f"Bus: {self._bus_name(pv_key)}\n"
+                f"Line: {meta.get('pline', '')}")
 
 
 # 3.5.0  Run Button Handler -------------------------------------------------------------------------
@@ -717,13 +991,19 @@ class App(tk.Tk):
 # 3.6.0 Show calculated kW based on %, homes, and kW/inverter --------------------------------------
 
     def _update_kw_label(self, pv_key):                                                             # Compute and display installed kW
-        pct = float(self.slider_vars[pv_key].get())                                                 # Current % penetration
-        homes = int(sim.PV_CONFIG[pv_key]["homes"])                                                 # Homes for this suburb
-        kw_per_inv = float(self.inv_kw_vars[pv_key].get())                                          # kW per inverter (quantised)
-        total_kw = int(round((pct/100.0) * homes * kw_per_inv))                                     # Total installed kW (rounded)
-        lbl = self.kw_labels.get(pv_key)                                                            # Lookup label widget
-        if lbl:                                                                                     # If present, update text
-            lbl.config(text=f"{total_kw} kW")                                                       # Show integer kW
+        self._update_kw_labels([pv_key])
+
+    def _update_kw_labels(self, keys):                                                              # Batch version used by the row flush (3.4.7)
+        for pv_key, total_kw in zip(keys, self._installed_kw(keys)):
+            lbl = self.kw_labels.get(pv_key)                                                        # Lookup label cell
+            if lbl:                                                                                 # If present, update text
+                lbl.config(text=f"{total_kw} kW")                                                   # Show integer kW
+
+    def _installed_kw(self, keys):                                                                  # [% × homes × kW/inverter] for each key, rounded
+        return [int(round((float(self.slider_vars[k].get()) / 100.0)                                # Current % penetration
+                          * int(sim.PV_CONFIG[k]["homes"])                                          # Homes for this suburb
+                          * float(self.inv_kw_vars[k].get())))                                      # kW per inverter (quantised)
+                for k in keys]
 
 
 # 3.6.1 Sync slider widgets with backend RESULTS ---------------------------------------------------
@@ -745,6 +1025,7 @@ class App(tk.Tk):
                     var = self.slider_vars[pv_key]                                                    # Tk variable bound to slider
                     if var.get() != inv:                                                              # Avoid redundant sets
                         var.set(inv)                                                                  # Move slider silently
+                        self._on_row_changed(pv_key)                                                  # Entry + kW text on the next row flush
 
             print("[gui] sliders updated")                                                            # Trace completion
         except Exception as e:                                                                         # Catch-all guard
@@ -756,13 +1037,10 @@ class App(tk.Tk):
     def _update_percent_entry(self, pv_key):                                                            # mirror the slider percentage into the tiny Entry field as “NN%”
         """Sync the tiny % Entry with the slider (integer 0..100)."""
         pct = int(round(float(self.slider_vars[pv_key].get())))                                         # take the slider float and round to an integer percent
-        ent = self.percent_entries.get(pv_key)                                                          # fetch the Entry widget that displays the %
-        if not ent:                                                                                     # safety: if it wasn’t created yet, bail
+        cell = self.percent_entries.get(pv_key)                                                         # display cell for the % Entry (3.4.0)
+        if not cell:                                                                                    # safety: if it wasn’t created yet, bail
             return
-        pct_str = f"{pct}%"                                                                             # format as a human-friendly percent string
-        if ent.get() != pct_str:                                                                        # only rewrite if the text actually changed (avoids cursor jumps)
-            ent.delete(0, "end")                                                                        # clear current entry text
-            ent.insert(0, pct_str)                                                                      # insert the fresh “NN%” string
+        cell.configure(text=f"{pct}%")                                                                  # entry rewritten only if on screen and changed
 
 
 # 3.8.0 Print the current % to result line 1 -----------------------------------------------------------
@@ -814,18 +1092,8 @@ class App(tk.Tk):
 
         pv_key_str = pv_key                                                                          # Alias for clarity
         st = self.suburb_state.get(pv_key, {})                                                       # Safe fetch of state again
-        code_to_name = {                                                                             # Map PF codes to names
-            "OTBa": "Otaki Beach A", "OTBb": "Otaki Beach B", "OTBc": "Otaki Beach C",
-            "OTCa": "Otaki Commercial A", "OTCb": "Otaki Commercial B",
-            "OTIa": "Otaki Industrial A",
-            "OTKa": "Otaki Town A", "OTKb": "Otaki Town B", "OTKc": "Otaki Town C",
-            "OTS":  "Otaki School",
-            "RGUa": "Rangiuru Rd A", "RGUb": "Rangiuru Rd B",
-            "TRE":  "Te Rauparaha St",
-            "WTVa": "Waitohu Valley A", "WTVb": "Waitohu Valley B", "WTVc": "Waitohu Valley C",
-        }
         load_code = st.get("load") or sim.PV_CONFIG.get(pv_key_str, {}).get("load", "")             # Resolve load code
-        pf_load_name = code_to_name.get(load_code, load_code)                                        # Human-friendly name
+        pf_load_name = sim.names().load_name(load_code)                                             # Human-friendly name
 
         load_data = sim.RESULTS.get("load", {}).get(pf_load_name, {})                                # Load demand series
         pv_data   = sim.RESULTS.get("pv", {}).get(pv_key_str, {})                                    # PV production series
@@ -868,21 +1136,9 @@ class App(tk.Tk):
         pv_key_str = pv_key                                                                         # alias for clarity
         st = self.suburb_state.get(pv_key, {})                                                      # safe fetch of state dict
 
-        # Resolve load code (e.g., "OTKa") → PF load name (e.g., "Otaki Town A")
-        code_to_name = {
-            "OTBa": "Otaki Beach A", "OTBb": "Otaki Beach B", "OTBc": "Otaki Beach C",
-            "OTCa": "Otaki Commercial A", "OTCb": "Otaki Commercial B",
-            "OTIa": "Otaki Industrial A",
-            "OTKa": "Otaki Town A", "OTKb": "Otaki Town B", "OTKc": "Otaki Town C",
-            "OTS":  "Otaki School",
-            "RGUa": "Rangiuru Rd A", "RGUb": "Rangiuru Rd B",
-            "TRE":  "Te Rauparaha St",
-            "WTVa": "Waitohu Valley A", "WTVb": "Waitohu Valley B", "WTVc": "Waitohu Valley C",
-        }
-
         # Prefer cached mapping; fall back to sim.PV_CONFIG (load code lives there). :contentReference[oaicite:2]{index=2}
         load_code = st.get("load") or sim.PV_CONFIG.get(pv_key_str, {}).get("load", "")            # resolve load code with fallback
-        pf_load_name = code_to_name.get(load_code, load_code)                                      # map to human-friendly name
+        pf_load_name = sim.names().load_name(load_code)                                            # map to human-friendly name
 
         # Pull data using PF object names saved by the backend. :contentReference[oaicite:3]{index=3}
         load_data = sim.RESULTS.get("load", {}).get(pf_load_name, {})                               # demand time-series dict
@@ -906,6 +1162,10 @@ class App(tk.Tk):
 # 3.9.5 Plot voltage, load, tx, and line data for a selected suburb ------------------------------
 
     def _plot_curves(self, pv_key, load_data, pv_data, tx_data, line_data):                        # Plot curves for the selected suburb
+        if not self._ensure_figure():                                                               # Build the figure on first use; bail if Matplotlib is unusable
+            return
+        if self.compare_var.get() == "Difference" and self._plot_difference(pv_key):                # Δ view replaces the curves (3.16.0)
+            return
         from matplotlib.ticker import MultipleLocator                                               # Import locator for tidy tick spacing
         self.ax.set_axis_on(); self.ax2.set_axis_on()                                              # Ensure both axes are visible
         self.ax.clear(); self.ax2.clear()                                                          # Clear previous plots on both axes
@@ -922,6 +1182,7 @@ class App(tk.Tk):
         if pv_data:                                                                                # If PV data available
             t = pv_data.get("t", [])                                                               # Time vector (timestamps)
             P = pv_data.get("P_W", [])                                                             # PV power vector (kW)
+            n = plot_rows(t); t, P = t[:n], P[:n]                                                  # First day only (2.5)
             if t and P:                                                                            # Only if both vectors non-empty
                 t_hours = timestamps_to_hours(t)                                                   # Convert timestamps to hours
                 PkW = [p*1 for p in P]                                                             # Copy / cast list to kW values
@@ -932,6 +1193,7 @@ class App(tk.Tk):
         if load_data:                                                                              # If load data available
             t = load_data.get("t", [])                                                             # Time vector (timestamps)
             P = load_data.get("P_W", [])                                                           # Load power vector (kW)
+            n = plot_rows(t); t, P = t[:n], P[:n]                                                  # First day only (2.5)
             if t and P:                                                                            # Only if both vectors non-empty
                 t_hours = timestamps_to_hours(t)                                                   # Convert timestamps to hours
                 LkW = [p*1 for p in P]                                                             # Copy / cast list to kW values
@@ -942,6 +1204,7 @@ class App(tk.Tk):
         if tx_data:                                                                                # If transformer data available
             t = tx_data.get("t", [])                                                               # Time vector (timestamps)
             L = tx_data.get("loading_pct", [])                                                     # Transformer loading (%)
+            n = plot_rows(t); t, L = t[:n], L[:n]                                                  # First day only (2.5)
             if t and L:                                                                            # Only if both vectors non-empty
                 t_hours = timestamps_to_hours(t)                                                   # Convert timestamps to hours
                 self.ax2.plot(t_hours, L, label="Tx Loading(%)",                                   # Plot Tx loading on right axis
@@ -952,6 +1215,7 @@ class App(tk.Tk):
         if line_data:                                                                              # If line data available
             t = line_data.get("t", [])                                                             # Time vector (timestamps)
             L = line_data.get("loading_pct", [])                                                   # Line loading (%)
+            n = plot_rows(t); t, L = t[:n], L[:n]                                                  # First day only (2.5)
             if t and L:                                                                            # Only if both vectors non-empty
                 t_hours = timestamps_to_hours(t)                                                   # Convert timestamps to hours
                 self.ax2.plot(t_hours, L, label="Line Loading(%)",                                 # Plot Line loading on right axis
@@ -959,6 +1223,10 @@ class App(tk.Tk):
                 right_values.extend(L)                                                             # Accumulate for autoscaling
 
 
+        if self.compare_var.get() == "Overlay":                                                    # Baseline drawn faintly with the current run (3.16.0)
+            self._overlay_baseline(pv_key, timestamps_to_hours, left_values, right_values)
+
+
 # 3.9.5.6 Dynamic scaling ---------------------------------------------------------------------------
 
         if left_values:                                                                                 # If there are kW-series values
@@ -991,21 +1259,14 @@ class App(tk.Tk):
         umin, tmin = st.get("u_min"), st.get("t_min")                                                   # Min p.u. and hour
         umax, tmax = st.get("u_max"), st.get("t_max")                                                   # Max p.u. and hour
 
-        def _colour_for(pu):                                                                            # Choose colour based on p.u.
-            if pu is None: return "grey"                                                                # Unknown → neutral grey
-            if pu < 0.49 or pu > 1.051: return WARN_COLOUR                                              # Extreme out-of-bounds
-            if 0.92 <= pu <= 1.02:      return OK_COLOUR                                                # Within preferred band
-            if (0.919 <= pu < 0.92) or (1.02 < pu <= 1.051): return MID_COLOUR                          # Near-limit band
-            return WARN_COLOUR                                                                           # Otherwise warn
-
         ymax_left = self.ax.get_ylim()[1]                                                               # Top of left-axis range
         if tmin is not None and umin is not None:                                                       # If min markers available
-            c = _colour_for(umin)                                                                        # Colour for min marker
+            c = pu_colour(umin)                                                                     # Colour for min marker
             self.ax.axvline(float(tmin), linestyle=":", color=c, linewidth=1, zorder=5)                 # Vertical min line
             self.ax.text(float(tmin), ymax_left, f"Min {umin:.2f}",                                     # Annotate min p.u.
                          color=c, rotation=90, va="top", ha="right", fontsize=8, zorder=6)
         if tmax is not None and umax is not None:                                                       # If max markers available
-            c = _colour_for(umax)                                                                        # Colour for max marker
+            c = pu_colour(umax)                                                                     # Colour for max marker
             self.ax.axvline(float(tmax), linestyle=":", color=c, linewidth=1, zorder=5)                 # Vertical max line
             self.ax.text(float(tmax), ymax_left, f"Max {umax:.2f}",                                     # Annotate max p.u.
                          color=c, rotation=90, va="top", ha="left", fontsize=8, zorder=6)
@@ -1020,6 +1281,9 @@ class App(tk.Tk):
 # 3.9.6 Display message before any results exist ----------------------------------------------------
 
     def _show_plot_placeholder(self):                                                                # Draw placeholder when no results
+        if self.fig is None:                                                                        # No figure yet → the Tk label already says it
+            self.graph_placeholder.pack(fill="both", expand=True, padx=8, pady=8)                   # Make sure the text is showing
+            return
         self.ax.clear(); self.ax2.clear()                                                            # Clear both axes
         self.ax.set_axis_off(); self.ax2.set_axis_off()                                              # Hide axes frames
         self.ax.text(0.5, 0.5,                                                                       # Centered instructional text
@@ -1028,9 +1292,34 @@ class App(tk.Tk):
         self.canvas_mpl.draw(); self.canvas_mpl.get_tk_widget().update_idletasks()                  # Refresh canvas/UI
 
 
+# 3.9.7 Build the Matplotlib figure, twin axes and Tk canvas the first time a plot is drawn ---------
+
+    def _ensure_figure(self):                                                                       # Returns True once the figure is ready to draw on
+        if self.fig is not None:                                                                    # Already built
+            return True
+        mpl = _load_mpl()                                                                           # Pay for the Matplotlib import now, not at startup
+        if not mpl:                                                                                 # Import failed → keep the text placeholder
+            self.graph_placeholder.config(text="Matplotlib not installed.\nInstall it to see plots.")
+            return False
+        self.fig = mpl["Figure"](figsize=(5, 3), dpi=100)                                           # Create a new Matplotlib Figure (canvas) with fixed size and resolution
+        self.ax = self.fig.add_subplot(111)                                                         # Add one subplot (1 row, 1 col, first cell) → left axis for PV & demand
+        self.ax2 = self.ax.twinx()                                                                  # Create a second y-axis (right side) sharing the same x-axis for % loadings
+        self.ax.set_xlabel("Hour")                                                                  # Label for the x-axis → simulation time in hours
+        self.ax.set_ylabel("kW")                                                                    # Label for the left y-axis → PV and demand values in kW
+        self.ax2.set_ylabel("% Loading")                                                            # Label for the right y-axis → transformer/line loading in %
+        self.ax.grid(True, linestyle="--", linewidth=0.5)                                           # Enable dashed grid lines for readability
+        self.graph_placeholder.pack_forget()                                                        # Swap the text placeholder for the real canvas
+        self.canvas_mpl = mpl["FigureCanvasTkAgg"](self.fig, master=self.suburb_tab)                # Embed the Matplotlib figure into the Tkinter frame
+        self.canvas_mpl.get_tk_widget().pack(fill="both",                                           # Pack canvas widget to fill frame
+        expand=True, padx=8, pady=(0, 8))                                                           # Pack canvas so it fills available space
+        return True
+
+
 # 3.10.0 Draw load/PV curves for selected suburb onto the axes -------------------------------------
 
     def _draw_suburb_curves(self, pv_key):                                                          # draw the currently selected suburb’s load and PV profiles
+        if not self._ensure_figure():                                                               # Figure is built lazily on first plot
+            return
         st = self.suburb_state[pv_key]                                                              # fetch cached state (contains curves and labels) for this suburb
         full_name = SUBURB_FULL.get(pv_key, pv_key)                                                 # resolve human-readable suburb name for the plot title
 
@@ -1081,7 +1370,7 @@ class App(tk.Tk):
 
 
 # 3.10.5 Title and refresh -------------------------------------------------------------------------
-        self.ax.set_title(full_name)                                                                 # title = suburb name
+        self.ax.set_title(full_name + self._metrics_caption(pv_key))                                 # title = suburb name, energy figures below
         self.canvas_mpl.draw_idle()                                                                  # redraw figure without blocking
 
 
@@ -1099,9 +1388,28 @@ class App(tk.Tk):
         self.suburb_state[pv_key] = st                                                                # Write back updated state
 
 
+# 3.10.7 Energy / reverse-flow caption under the title (otaki_metrics) -------------------------------
+    def _metrics_caption(self, pv_key):                                                               # "\nPV … kWh · export … · self-use … % · reverse flow … h", "" before a run
+        import otaki_metrics
+        try:
+            m = otaki_metrics.metrics_for(sim.RESULTS, sim.PV_CONFIG, LOAD_CODE_TO_NAME)["suburb"].get(pv_key) or {}
+        except Exception:                                                                           # Nothing to show yet
+            return ""
+        if m.get("pv_kwh") is None:
+            return ""
+        parts = [f"PV {m['pv_kwh']:,.0f} kWh"]
+        if m.get("export_kwh") is not None:
+            parts.append(f"export {m['export_kwh']:,.0f} kWh")
+        if m.get("self_consumption") is not None:
+            parts.append(f"self-use {100 * m['self_consumption']:.0f} %")
+        if m.get("rpf_hours") is not None:
+            parts.append(f"reverse flow {m['rpf_hours']:g} h")
+        return "\n" + " · ".join(parts)
+
+
 # 3.11.0 CSV Export summary + hourly PV/Load/Tx/Line ----------------------------------------------------
     def _export_to_csv(self):                                                                        # Export combined summary + timeseries to CSV
-        import csv, datetime, tkinter as tk                                                          # Local imports for dialog and CSV
+        import csv, datetime                                                                         # Local imports for CSV
         from tkinter import filedialog as fd                                                         # Save-as dialog
         now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")                                  # Timestamp for rows
 
@@ -1124,20 +1432,12 @@ class App(tk.Tk):
             with open(path, "w", newline="", encoding="utf-8") as f:                                 # Create CSV file
                 writer = csv.writer(f); writer.writerow(headers)                                     # Write header row
 
-                # load-code → PF name --------------- ----------------------------------------------
-                code_to_name = {                                                                     # Mapping from codes to PF names
-                    "OTBa": "Otaki Beach A","OTBb": "Otaki Beach B","OTBc": "Otaki Beach C",
-                    "OTCa": "Otaki Commercial A","OTCb": "Otaki Commercial B","OTIa": "Otaki Industrial A",
-                    "OTKa": "Otaki Town A","OTKb": "Otaki Town B","OTKc": "Otaki Town C",
-                    "OTS": "Otaki School","RGUa": "Rangiuru Rd A","RGUb": "Rangiuru Rd B",
-                    "TRE": "Te Rauparaha St","WTVa": "Waitohu Valley A","WTVb": "Waitohu Valley B","WTVc": "Waitohu Valley C",
-                }
-
+                names = sim.names()                                                                  # load-code → PF name (otaki_sim 4.12)
                 for pv_key in self.ordered_pv_keys:                                                  # Iterate suburbs in display order
                     meta = sim.PV_CONFIG.get(pv_key, {})                                             # Config for this suburb
                     homes = int(meta.get("homes", 0))                                                # Homes count
-                    slider_pct = float(self.slider_vars.get(pv_key, tk.DoubleVar(value=0.0)).get())  # Current slider %
-                    kw_per_inv = float(self.inv_kw_vars.get(pv_key, tk.DoubleVar(value=6.0)).get())  # kW per inverter
+                    slider_pct = float(self.slider_vars[pv_key].get()) if pv_key in self.slider_vars else 0.0 # Current slider % (no throwaway Tk variable per row)
+                    kw_per_inv = float(self.inv_kw_vars[pv_key].get()) if pv_key in self.inv_kw_vars else 6.0 # kW per inverter
                     installed_kw = round((slider_pct/100.0) * homes * kw_per_inv, 3)                 # Installed capacity (kW)
                     suburb = self.SUBURB_FULL.get(pv_key, pv_key) if hasattr(self, "SUBURB_FULL") else SUBURB_FULL.get(pv_key, pv_key)  # Suburb label
 
@@ -1147,7 +1447,7 @@ class App(tk.Tk):
 
                     # time series (24h)
                     load_code = meta.get("load", "")                                                 # Load code
-                    pf_load   = code_to_name.get(load_code, load_code)                               # PF load name
+                    pf_load   = names.load_name(load_code)                                           # PF load name
 
                     pv_P   = (sim.RESULTS.get("pv",   {}).get(pv_key,   {}).get("P_W", []) or [])[:24]        # PV kW series
                     ld_P   = (sim.RESULTS.get("load", {}).get(pf_load,  {}).get("P_W", []) or [])[:24]        # Load kW series
@@ -1170,6 +1470,615 @@ class App(tk.Tk):
             messagebox.showerror("Export failed", str(e))                                            # Error dialog
 
 
+# 3.11.4 Full-network export: every element and time step, long / wide, CSV / Parquet / Feather ----
+    def _export_full(self):                                                                          # Button toggles: start, or cancel a running export
+        from tkinter import filedialog as fd
+        import datetime
+        import otaki_export as ox
+        import otaki_results as orr
+        if self._export_stop is not None:
+            self._export_stop.set()
+            return
+        types = [("Long table CSV", "*.csv"), ("Wide table CSV", "*.csv")]
+        if ox.columnar_available():
+            types += [("Parquet", "*.parquet"), ("Feather", "*.feather")]
+        kind = tk.StringVar(self, types[0][0])
+        default = f"otaki_results_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        path = fd.asksaveasfilename(title="Export all results", defaultextension=".csv", initialfile=default,
+                                    filetypes=types, typevariable=kind)
+        if not path:
+            return
+        layout = "wide" if kind.get().startswith("Wide") else "long"
+        last = [0.0]
+
+        def progress(done, total):                                                                  # Worker thread → at most ~10 label updates / s
+            now = time.perf_counter()
+            if now - last[0] > 0.1:
+                last[0] = now
+                self.after(0, lambda: self.export_lbl.configure(text=f"Export {100 * done // max(total, 1)} %"))
+
+        def finished(info, error):
+            self.after(0, self._export_full_done, info, error)
+
+        self.export_lbl.configure(text="Export 0 %")
+        self.export_full_btn.configure(text="Cancel export")
+        _, self._export_stop = ox.start_export(orr.snapshot(sim.RESULTS), path, layout,             # Snapshot: a new RUN cannot change it mid-export
+                                               progress=progress, done=finished)
+
+    def _export_full_done(self, info, error):                                                       # Back on the Tk thread
+        import otaki_export as ox
+        self._export_stop = None
+        self.export_full_btn.configure(text="Export all…")
+        if isinstance(error, ox.Cancelled):
+            self.export_lbl.configure(text="Export cancelled")
+        elif error is not None:
+            self.export_lbl.configure(text="")
+            messagebox.showerror("Export failed", str(error))
+        else:
+            self.export_lbl.configure(text=f"Exported {info['values']:,} values in {info['seconds']:.1f} s")
+
+
+# 3.12.0 Resolve the load / PV / Tx / line result series for one suburb ------------------------------
+
+    def _suburb_elements(self, pv_key):                                                             # {"load", "pv", "tx", "line", "bus"} result keys for one suburb
+        st  = self.suburb_state.get(pv_key, {})                                                     # Cached links from the last run (7.1.3)
+        cfg = sim.PV_CONFIG.get(pv_key, {})                                                         # Config fallback before any run
+        load_code = st.get("load") or cfg.get("load", "")                                           # e.g. "OTKa"
+        return {"load": LOAD_CODE_TO_NAME.get(load_code, load_code),                                # Demand series keyed by PF load name
+                "pv": pv_key, "tx": st.get("tx") or cfg.get("tx", ""),
+                "line": st.get("line") or cfg.get("pline", ""), "bus": cfg.get("bus", "")}
+
+    def _suburb_series(self, pv_key, results=None):                                                 # Returns (load, pv, tx, line) result dicts, {} when missing
+        res = sim.RESULTS if results is None else results                                           # Latest run unless a baseline is asked for
+        el = self._suburb_elements(pv_key)
+        load_data = res.get("load", {}).get(el["load"], {})                                         # Demand series
+        pv_data   = res.get("pv", {}).get(el["pv"], {})                                             # PV production series
+        tx_data   = res.get("tx", {}).get(el["tx"], {})                                             # Transformer loading series
+        line_data = res.get("line", {}).get(el["line"], {})                                         # Line loading series
+        return load_data, pv_data, tx_data, line_data
+
+
+# 3.12.1 Build the all-suburb dashboard: one axes, shared LineCollections, one canvas ---------------
+
+    def _ensure_dashboard(self):                                                                    # Returns True once the dashboard artists exist
+        if self.dash is not None:                                                                   # Already built
+            return True
+        mpl = _load_mpl()                                                                           # Same deferred import as the suburb plot
+        if not mpl:                                                                                 # No Matplotlib → say so in the tab
+            tk.Label(self.dashboard_tab, bg=DEFAULT_BG,
+                     text="Matplotlib not installed.\nInstall it to see plots.").pack(padx=8, pady=8)
+            return False
+        import math                                                                                 # Grid maths
+        from matplotlib.collections import LineCollection, PolyCollection                           # One artist per series type, not per suburb
+
+        keys  = list(self.ordered_pv_keys)                                                          # Same order as the slider list
+        ncols = max(1, math.ceil(math.sqrt(len(keys))))                                             # Square-ish grid (4 × 4 for 16 suburbs)
+        nrows = max(1, math.ceil(len(keys) / ncols))                                                # Enough rows for every suburb
+
+        fig = mpl["Figure"](figsize=(5, 3), dpi=100)                                                # Separate figure so the suburb plot is untouched
+        ax  = fig.add_axes([0.005, 0.005, 0.99, 0.99])                                              # One axes for the whole grid, panels live in data coords
+        ax.set_axis_off(); ax.set_xlim(0, ncols); ax.set_ylim(0, nrows)                             # 1 data unit = 1 panel
+
+        cells, boxes, refs, titles, notes = {}, [], [], {}, {}                                      # Per-panel geometry and text handles
+        for i, pv_key in enumerate(keys):                                                           # Lay panels out left→right, top→bottom
+            r, c = divmod(i, ncols)                                                                 # Grid position
+            x0, y0 = c, nrows - 1 - r                                                               # Bottom-left corner of this panel
+            cells[pv_key] = (x0, y0)                                                                # Remember for refresh/click
+            boxes.append([(x0 + .02, y0 + .02), (x0 + .98, y0 + .02),
+                          (x0 + .98, y0 + .98), (x0 + .02, y0 + .98)])                              # Panel background rectangle
+            y100 = y0 + DASH_Y0 + DASH_H * (LOADING_LIMIT_PCT / DASH_PCT_TOP)                       # Height of the 100 % loading line
+            refs.append([(x0 + DASH_X0, y100), (x0 + DASH_X0 + DASH_W, y100)])                      # 100 % reference line
+            titles[pv_key] = ax.text(x0 + .05, y0 + .95, SUBURB_FULL.get(pv_key, pv_key),
+                                     fontsize=7, va="top", ha="left")                               # Suburb name
+            notes[pv_key] = ax.text(x0 + .05, y0 + .84, "", fontsize=6, va="top", ha="left")        # Peak kW / peak % summary
+
+        panels = PolyCollection(boxes, facecolors="white", edgecolors="#BEBEBE", linewidths=0.5)    # All panel backgrounds in one artist
+        pv_lc   = LineCollection([], colors="blue", linewidths=1.2)                                 # Every suburb's PV curve
+        load_lc = LineCollection([], colors="orange", linewidths=1.2)                               # Every suburb's load curve
+        pct_lc  = LineCollection([], linewidths=0.8, linestyles="--")                               # Every suburb's Tx + line % curves
+        ref_lc  = LineCollection(refs, colors=WARN_COLOUR, linewidths=0.5, linestyles=":")          # 100 % loading references
+        for coll in (panels, ref_lc, pct_lc, load_lc, pv_lc):                                       # Panels at the back, PV on top
+            ax.add_collection(coll)
+
+        canvas = mpl["FigureCanvasTkAgg"](fig, master=self.dashboard_tab)                           # Embed in the Dashboard tab
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=(0, 8))                  # Fill the tab
+        canvas.mpl_connect("button_press_event", self._on_dashboard_click)                          # Click a panel → open that suburb
+
+        self.dash = {"fig": fig, "ax": ax, "canvas": canvas, "keys": keys, "ncols": ncols,
+                     "nrows": nrows, "cells": cells, "panels": panels, "pv": pv_lc,
+                     "load": load_lc, "pct": pct_lc, "titles": titles, "notes": notes}              # Everything _refresh_dashboard needs
+        return True
+
+
+# 3.12.2 Refresh every panel in place, then draw once ------------------------------------------------
+
+    def _refresh_dashboard(self):                                                                   # Called after each run and when the tab is shown
+        if self.dash is None:                                                                       # Never opened → nothing to update
+            return
+        import numpy as np                                                                          # Ships with Matplotlib
+        from matplotlib.colors import to_rgba                                                       # Tinted panel backgrounds
+        d = self.dash                                                                               # Short alias
+        pv_segs, load_segs, pct_segs, pct_cols = [], [], [], []                                     # New segments for the shared collections
+        faces, edges, widths, scores = [], [], [], []                                               # Per-panel styling
+
+        for pv_key in d["keys"]:                                                                    # One pass over all suburbs
+            x0, y0 = d["cells"][pv_key]                                                             # Panel origin
+            load_data, pv_data, tx_data, line_data = self._suburb_series(pv_key)                    # Same series as the suburb plot
+            pv   = np.asarray(pv_data.get("P_W", []) or [], dtype=float)                            # PV kW
+            load = np.asarray(load_data.get("P_W", []) or [], dtype=float)                          # Load kW
+            tx   = np.asarray(tx_data.get("loading_pct", []) or [], dtype=float)                    # Tx %
+            line = np.asarray(line_data.get("loading_pct", []) or [], dtype=float)                  # Line %
+
+            peak_kw = max([1.0] + [float(np.abs(a).max()) for a in (pv, load) if a.size])           # Panel kW scale shared by PV and load
+            def _seg(v, top):                                                                       # Series → Nx2 panel coordinates
+                x = x0 + DASH_X0 + DASH_W * np.linspace(0.0, 1.0, v.size)                           # Time spread across the panel
+                y = y0 + DASH_Y0 + DASH_H * np.clip(v / top, 0.0, 1.0)                              # Value scaled into the panel
+                return np.column_stack((x, y))
+            if pv.size:   pv_segs.append(_seg(pv, peak_kw))                                         # PV curve
+            if load.size: load_segs.append(_seg(load, peak_kw))                                     # Load curve
+            if tx.size:   pct_segs.append(_seg(tx, DASH_PCT_TOP));   pct_cols.append("green")       # Tx loading curve
+            if line.size: pct_segs.append(_seg(line, DASH_PCT_TOP)); pct_cols.append("red")         # Line loading curve
+
+            peaks = [float(a.max()) for a in (tx, line) if a.size]                                  # Peak % of this feeder
+            peak_pct = max(peaks) if peaks else None                                                # None before any run
+            st = self.suburb_state.get(pv_key, {})                                                  # Cached min/max p.u.
+            u_min, u_max = st.get("u_min"), st.get("u_max")                                         # Voltage extremes
+            colour = status_colour(u_min, u_max, peak_pct)                                          # Worst verdict for the panel
+            faces.append(to_rgba("white") if colour == "grey" else to_rgba(colour, 0.15))           # Light tint behind the curves
+            scores.append(max([0.0] + ([peak_pct / LOADING_LIMIT_PCT] if peak_pct is not None else [])
+                              + [abs(u - 1.0) / 0.05 for u in (u_min, u_max) if u is not None]))    # 1.0 = at the limit
+            pu_txt = f"{u_min:.2f}–{u_max:.2f} pu" if u_min is not None and u_max is not None else ""
+            pct_txt = f"{peak_pct:.0f}%" if peak_pct is not None else ""
+            d["notes"][pv_key].set_text("  ".join(x for x in (f"{peak_kw:.0f} kW" if (pv.size or load.size) else "", pct_txt, pu_txt) if x))
+
+        worst = int(np.argmax(scores)) if scores and max(scores) > 0 else None                      # Feeder closest to (or furthest past) its limits
+        for i, pv_key in enumerate(d["keys"]):                                                      # Outline the worst feeder
+            edges.append(WARN_COLOUR if i == worst else "#BEBEBE")
+            widths.append(2.0 if i == worst else 0.5)
+            d["titles"][pv_key].set_fontweight("bold" if i == worst else "normal")
+
+        d["pv"].set_segments(pv_segs); d["load"].set_segments(load_segs)                            # Swap the data, keep the artists
+        d["pct"].set_segments(pct_segs); d["pct"].set_color(pct_cols or "green")                    # Tx green, line red
+        d["panels"].set_facecolors(faces); d["panels"].set_edgecolors(edges); d["panels"].set_linewidths(widths)
+        d["canvas"].draw_idle()                                                                     # One draw for the whole grid
+
+
+# 3.12.3 Tab switch and panel click handlers --------------------------------------------------------
+
+    def _on_graph_tab_changed(self, _event=None):                                                   # Build + fill the dashboard / heatmap when first shown
+        sel = self.graph_tabs.select()                                                              # Widget path of the selected tab
+        if sel == str(self.dashboard_tab) and self._ensure_dashboard():                             # Dashboard tab selected
+            self._refresh_dashboard()                                                               # Show the latest results
+        elif sel == str(self.heatmap_tab) and self._ensure_heatmap():                               # Heatmap tab selected
+            self._refresh_heatmap()                                                                 # Show the latest results
+
+    def _on_dashboard_click(self, event):                                                           # Click on a panel → switch to that suburb
+        d = self.dash                                                                               # Dashboard state
+        if d is None or event.inaxes is not d["ax"] or event.xdata is None:                         # Click outside the grid
+            return
+        c, r = int(event.xdata), d["nrows"] - 1 - int(event.ydata)                                  # Panel column / row
+        idx = r * d["ncols"] + c                                                                    # Index into the key list
+        if 0 <= c < d["ncols"] and 0 <= idx < len(d["keys"]):                                       # A real panel
+            self.graph_tabs.select(self.suburb_tab)                                                 # Back to the detailed view
+            self._on_suburb_clicked(d["keys"][idx])                                                 # Same as pressing its button
+
+
+# 3.13.0 Hour × bus voltage heatmap: one image for the whole bus-voltage matrix ----------------------
+
+    def _ensure_heatmap(self):                                                                      # Returns True once the heatmap artists exist
+        if self.heat is not None:                                                                   # Already built
+            return True
+        mpl = _load_mpl()                                                                           # Same deferred import as the other plots
+        if not mpl:                                                                                 # No Matplotlib → say so in the tab
+            tk.Label(self.heatmap_tab, bg=DEFAULT_BG,
+                     text="Matplotlib not installed.\nInstall it to see plots.").pack(padx=8, pady=8)
+            return False
+        import numpy as np                                                                          # Ships with Matplotlib
+        import matplotlib                                                                           # Colour map registry
+        from matplotlib.colors import TwoSlopeNorm, ListedColormap                                  # Diverging norm centred on nominal
+        import otaki_results as orr                                                                 # Band limits + results matrix
+
+        fig = mpl["Figure"](figsize=(5, 3), dpi=100, constrained_layout=True)                       # Own figure, built on first view; room for bus names
+        ax  = fig.add_subplot(111)                                                                  # Time up the side, buses along the bottom
+        cmap = matplotlib.colormaps["RdBu_r"].copy(); cmap.set_bad("#BFBFBF")                       # Blue = low, red = high, grey = no data
+        norm = TwoSlopeNorm(vcenter=orr.VOLT_NOM_PU, vmin=HEAT_PU_SPAN[0], vmax=HEAT_PU_SPAN[1])    # White at exactly 1.0 p.u.
+        img  = ax.imshow(np.full((1, 1), np.nan), cmap=cmap, norm=norm, aspect="auto",
+                         origin="lower", interpolation="nearest")                                   # The whole matrix is one image
+        viol = ax.imshow(np.ma.masked_all((1, 1)), cmap=ListedColormap(["black"]), vmin=0, vmax=1,
+                         alpha=0.35, aspect="auto", origin="lower", interpolation="nearest")        # Second image darkens cells outside the band
+        cbar = fig.colorbar(img, ax=ax, label="Voltage (p.u.)")                                     # Colour key
+        for lim in (orr.VOLT_MIN_PU, orr.VOLT_MAX_PU):                                              # Mark the allowed band on the key
+            cbar.ax.axhline(lim, color="black", linewidth=1)
+        for lim in (orr.VOLT_MIN_PU + orr.VOLT_NEAR_PU, orr.VOLT_MAX_PU - orr.VOLT_NEAR_PU):        # … and where pu_colour turns amber
+            cbar.ax.axhline(lim, color="black", linewidth=1, linestyle=":")
+        ax.set_xlabel("Bus"); ax.set_ylabel("Hour")                                                 # Axis labels
+        ax.set_title("Run the simulation to fill the heatmap", fontsize=9)                          # Until results arrive
+
+        canvas = mpl["FigureCanvasTkAgg"](fig, master=self.heatmap_tab)                             # Embed in the Heatmap tab
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=(0, 8))                  # Fill the tab
+        self.heat = {"fig": fig, "ax": ax, "img": img, "viol": viol, "canvas": canvas}              # Everything _refresh_heatmap needs
+        return True
+
+
+# 3.13.1 Push the latest bus-voltage matrix into the existing images (set_data, no new artists) -----
+
+    def _refresh_heatmap(self):                                                                     # Called after each run and when the tab is shown
+        if self.heat is None:                                                                       # Never opened → nothing to update
+            return
+        import numpy as np                                                                          # Ships with Matplotlib
+        import otaki_results as orr                                                                 # Results matrix helpers
+        h = self.heat                                                                               # Short alias
+        names = sorted(set(sim.BUS_LIST) | set(sim.RESULTS.get("bus", {})))                         # Every configured bus, plus any extra the run returned
+        names, t, M = orr.results_matrix(sim.RESULTS, "bus", "u_pu", names)                         # (time × bus) p.u. matrix
+        if not M.size:                                                                              # No run yet
+            h["canvas"].draw_idle()
+            return
+
+        hours = orr.hours_since_start(t) if t.size == M.shape[0] else np.arange(M.shape[0], dtype=float)
+        step  = float(np.median(np.diff(hours))) if hours.size > 1 else 1.0                         # Row height in hours
+        extent = (-0.5, len(names) - 0.5, hours[0] - step / 2, hours[-1] + step / 2)                # Pixel edges in bus index / hours
+        bad = (M < orr.VOLT_MIN_PU) | (M > orr.VOLT_MAX_PU)                                         # Violations (NaN compares False)
+
+        h["img"].set_data(M); h["img"].set_extent(extent)                                           # Swap the data in place
+        h["viol"].set_data(np.ma.masked_where(~bad, np.ones(M.shape))); h["viol"].set_extent(extent) # Only violations stay unmasked
+        ax = h["ax"]
+        ax.set_xlim(extent[0], extent[1]); ax.set_ylim(extent[2], extent[3])                        # Fit the new shape
+        if len(names) <= HEAT_MAX_BUS_LABELS:                                                       # Few enough buses to name them all
+            ax.set_xticks(range(len(names))); ax.set_xticklabels(names, rotation=90, fontsize=6)
+        else:                                                                                       # Hundreds of buses → index ticks only
+            ax.set_xticks(np.linspace(0, len(names) - 1, 10).round()); ax.set_xticklabels([])
+        ax.set_title(f"Bus voltage – {int(bad.sum())} out-of-band points "
+                     f"({len(names)} buses × {M.shape[0]} steps)", fontsize=9)                      # Summary in the title
+        h["canvas"].draw_idle()                                                                     # One draw whatever the matrix size
+
+
+# 3.14.0 Time scrubber: rebuild the playback arrays when new results arrive --------------------------
+
+    def _reset_timeline(self):                                                                      # Called after each run
+        self._stop_playback()                                                                       # A new run cancels any playback
+        self._play_step = None                                                                      # Back to whole-run view
+        self._label_cache.clear()                                                                   # refresh_results rewrote the labels
+        self._play = None                                                                           # Drop the previous run's arrays
+        try:
+            import numpy as np                                                                      # Ships with Matplotlib
+            import otaki_results as orr                                                             # Results matrix helpers
+        except Exception:                                                                           # No NumPy → no scrubber, rest of the GUI unaffected
+            return
+        keys = list(self.ordered_pv_keys)                                                           # Column order = slider order
+        cfgs = [sim.PV_CONFIG.get(k, {}) for k in keys]                                             # Element names per suburb
+        _, t, U = orr.results_matrix(sim.RESULTS, "bus", "u_pu", [c.get("bus") for c in cfgs])      # (time × suburb) p.u.
+        if not U.size or t.size != U.shape[0]:                                                      # No run yet / no time axis
+            self.time_scale.state(["disabled"]); self.play_btn.state(["disabled"])
+            self.time_lbl.config(text="--:--")
+            return
+        def _fit(M):                                                                                # Crop/pad to the bus time axis
+            out = np.full(U.shape, np.nan); n = min(M.shape[0], U.shape[0]); out[:n] = M[:n]
+            return out
+        TX = _fit(orr.results_matrix(sim.RESULTS, "tx", "loading_pct", [c.get("tx") for c in cfgs])[2])
+        LN = _fit(orr.results_matrix(sim.RESULTS, "line", "loading_pct", [c.get("pline") for c in cfgs])[2])
+        n_t = U.shape[0]                                                                            # Time steps in the run
+        self._play = {"keys": keys, "t": t, "u": U, "pct": np.fmax(TX, LN),                         # Worst of Tx / line % per step
+                      "hours": orr.hours_since_start(t),                                            # Heatmap y positions
+                      "stride": max(1, -(-n_t // (PLAYBACK_FPS * PLAYBACK_SECONDS)))}               # Steps per frame so playback fits PLAYBACK_SECONDS
+        self.time_scale.config(to=max(0, n_t - 1)); self.time_var.set(0)                            # One slider tick per time step
+        self.time_scale.state(["!disabled"]); self.play_btn.state(["!disabled"])                    # Enable the controls
+        self.time_lbl.config(text="Whole run")                                                      # Labels show the daily min/max until scrubbed
+
+
+# 3.14.1 Slider drag → coalesce to one update per idle cycle ------------------------------------------
+
+    def _on_time_scrub(self, value):                                                                # ttk.Scale command (fires per pixel of drag)
+        self._scrub_target = int(round(float(value)))                                               # Keep only the latest position
+        if self._scrub_job is None:                                                                 # One pending update at a time
+            self._scrub_job = self.after_idle(self._apply_scrub)
+
+    def _apply_scrub(self):                                                                         # Runs once per idle cycle however many drags fired
+        self._scrub_job = None
+        if self._scrub_target is not None:
+            self._scrub_to(self._scrub_target)
+
+
+# 3.14.2 Play / pause at PLAYBACK_FPS -----------------------------------------------------------------
+
+    def _toggle_playback(self):                                                                     # ▶ / ❚❚ button
+        if self._play_job is not None:                                                              # Playing → pause
+            self._stop_playback()
+            return
+        if not self._play:                                                                          # Nothing to play
+            return
+        if self._play_step is None or self._play_step >= len(self._play["t"]) - 1:                  # Start (or restart) from the first step
+            self._play_step = -self._play["stride"]
+        self.play_btn.config(text="❚❚")
+        self._play_tick()
+
+    def _stop_playback(self):                                                                       # Cancel the frame timer
+        if self._play_job is not None:
+            self.after_cancel(self._play_job)
+            self._play_job = None
+        self.play_btn.config(text="▶")
+
+    def _play_tick(self):                                                                           # One frame
+        t0 = time.perf_counter()                                                                    # Measure our own frame cost
+        step = self._play_step + self._play["stride"]                                               # Next step to show
+        last = len(self._play["t"]) - 1
+        if step >= last:                                                                            # Last frame: show it and stop
+            self.time_var.set(last); self._scrub_to(last); self._stop_playback()
+            return
+        self.time_var.set(step)                                                                     # Move the slider (does not re-fire its command)
+        self._scrub_to(step)                                                                        # Cursor + labels + maps
+        spent_ms = (time.perf_counter() - t0) * 1000.0                                              # Time this frame took
+        self._play_job = self.after(max(1, int(1000.0 / PLAYBACK_FPS - spent_ms)), self._play_tick) # Hold the frame rate
+
+
+# 3.14.3 Show one instant: cursor, labels, maps, time text -------------------------------------------
+
+    def _scrub_to(self, step):                                                                      # step = row index into the results
+        if not self._play:
+            return
+        step = max(0, min(int(step), len(self._play["t"]) - 1))                                     # Clamp
+        if step == self._play_step:                                                                 # Same instant → nothing changed
+            return
+        self._play_step = step
+        import datetime                                                                             # Local import like 3.9.5.1
+        ts = datetime.datetime.fromtimestamp(float(self._play["t"][step]))                          # PF timestamp → local time
+        self.time_lbl.config(text=ts.strftime("%d %b %H:%M"))                                       # One label, always changes
+        self._blit_cursor(step)                                                                     # Move the cursor without a full redraw
+        self._show_instant_labels(step)                                                             # Only labels whose text/colour changed
+        self._refresh_map_overlay(step)                                                             # Only markers whose colour changed
+
+    def _clear_scrub(self, _event=None):                                                            # Click the time text → back to whole-run view
+        self._stop_playback()
+        self._play_step = None
+        for art in self._cursors.values():                                                          # Hide every cursor
+            art.set_visible(False)
+        for canvas in (self.canvas_mpl, (self.dash or {}).get("canvas"), (self.heat or {}).get("canvas")):
+            if canvas is not None:
+                canvas.draw_idle()                                                                  # Full redraw without the cursor
+        self.refresh_results()                                                                      # Daily min/max text again
+        self._refresh_map_overlay()                                                                 # Whole-run map status
+        if self._play:
+            self.time_lbl.config(text="Whole run")
+
+
+# 3.14.4 Result labels for one instant (skip widgets whose text/colour did not change) ----------------
+
+    def _show_instant_labels(self, step):                                                           # Voltage on line 1, worst loading on line 2
+        import math                                                                                 # NaN checks
+        u_row, pct_row = self._play["u"][step], self._play["pct"][step]                             # One row of each matrix
+        for j, pv_key in enumerate(self._play["keys"]):                                             # Every suburb
+            lines = self.result_lines.get(pv_key)
+            if not lines:
+                continue
+            u, pct = float(u_row[j]), float(pct_row[j])                                             # Values at this instant
+            if math.isnan(u): self._set_label(lines[0], "U= n/a", "black")
+            else:             self._set_label(lines[0], f"U= {u:.2f}pu", pu_colour(u))
+            if math.isnan(pct): self._set_label(lines[1], "Load n/a", "black")
+            else:               self._set_label(lines[1], f"Load= {pct:.0f}%", loading_colour(pct))
+
+    def _set_label(self, lbl, text, colour):                                                        # configure() only on change
+        if self._label_cache.get(lbl) == (text, colour):                                            # Already showing this
+            return
+        self._label_cache[lbl] = (text, colour)
+        lbl.configure(text=text, fg=colour)
+
+
+# 3.14.5 Blitted cursor on whichever graph tab is showing --------------------------------------------
+
+    def _active_view(self):                                                                         # Returns (view, fig, canvas, ax) or None
+        sel = self.graph_tabs.select()
+        if sel == str(self.suburb_tab) and self.fig is not None:
+            return "suburb", self.fig, self.canvas_mpl, self.ax
+        if sel == str(self.dashboard_tab) and self.dash is not None:
+            return "dashboard", self.dash["fig"], self.dash["canvas"], self.dash["ax"]
+        if sel == str(self.heatmap_tab) and self.heat is not None:
+            return "heatmap", self.heat["fig"], self.heat["canvas"], self.heat["ax"]
+        return None
+
+    def _cursor_artist(self, view, canvas, ax):                                                     # Animated artist, (re)created if ax.clear() dropped it
+        art = self._cursors.get(view)
+        if art is None or art not in ax.get_children():                                             # _plot_curves clears the axes each time
+            if view == "suburb":
+                art = ax.axvline(0, color="black", linewidth=1, animated=True)                      # Vertical line at the hour
+            elif view == "heatmap":
+                art = ax.axhline(0, color="black", linewidth=1, animated=True)                      # Horizontal line at the hour
+            else:
+                from matplotlib.collections import LineCollection                                   # One artist for every panel's cursor
+                art = ax.add_collection(LineCollection([], colors="black", linewidths=0.8, animated=True))
+            self._cursors[view] = art
+        if id(canvas) not in self._cursor_hooked:                                                   # Capture a clean background after every full draw
+            canvas.mpl_connect("draw_event", lambda _e, v=view: self._on_full_draw(v))
+            self._cursor_hooked.add(id(canvas))
+        return art
+
+    def _on_full_draw(self, view):                                                                  # draw_event: save background, repaint cursor on top
+        cur = self._active_view()
+        if cur is None or cur[0] != view:
+            self._blit_bg.pop(view, None)
+            return
+        _, fig, canvas, ax = cur
+        self._blit_bg[view] = canvas.copy_from_bbox(fig.bbox)                                       # Figure without the animated cursor
+        art = self._cursors.get(view)
+        if art is not None and art.get_visible() and art in ax.get_children():
+            ax.draw_artist(art)
+
+    def _blit_cursor(self, step):                                                                   # Restore background, draw cursor, blit
+        cur = self._active_view()
+        if cur is None:
+            return
+        view, fig, canvas, ax = cur
+        art = self._cursor_artist(view, canvas, ax)
+        art.set_visible(True)
+        if view == "suburb":                                                                        # Same x as _plot_curves (hour of day)
+            import datetime
+            ts = datetime.datetime.fromtimestamp(float(self._play["t"][step]))
+            x = ts.hour + ts.minute / 60.0
+            art.set_xdata([x, x])
+        elif view == "heatmap":                                                                     # Hours since the first step
+            y = float(self._play["hours"][step])
+            art.set_ydata([y, y])
+        else:                                                                                       # Same fraction across every dashboard panel
+            frac = step / max(1, len(self._play["t"]) - 1)
+            segs = []
+            for pv_key in self.dash["keys"]:
+                x0, y0 = self.dash["cells"][pv_key]
+                x = x0 + DASH_X0 + DASH_W * frac
+                segs.append([(x, y0 + DASH_Y0), (x, y0 + DASH_Y0 + DASH_H)])
+            art.set_segments(segs)
+        bg = self._blit_bg.get(view)
+        if bg is None:                                                                              # No clean background yet → one full draw
+            canvas.draw()                                                                           # draw_event saves it and paints the cursor
+            return
+        canvas.restore_region(bg)                                                                   # Wipe the old cursor
+        ax.draw_artist(art)                                                                         # Paint the new one
+        canvas.blit(fig.bbox)                                                                       # Push just the pixels to Tk
+
+
+# 3.15.0 Live preview: surrogate estimates on the result lines while sliders move ------------------
+
+    def _preview_estimates(self, _keys):                                                            # _row_hooks entry, runs once per row flush (3.4.7)
+        if self.last_run_signature is None or self._play_step is not None:                          # No run to fit from yet / scrubbing a run
+            return
+        if self._input_signature() == self.last_run_signature:                                      # Back at the settings RUN used → real results
+            self.refresh_results()
+            return
+        inverters = {k: v.get() for k, v in self.slider_vars.items()}                               # Same values RUN would send
+        panels = {k: int(round(float(v.get()) * 1000.0 / sim.PANEL_WATT))                           # kW/inverter → panels, as in 6.3.1
+                  for k, v in self.inv_kw_vars.items()}
+        for pv_key, rec in sim.preview_from_surrogate(inverters, panels).items():                   # {} until a run has been fitted
+            lines = self.result_lines.get(pv_key)
+            if not lines or rec["u_min"] is None:
+                continue
+            load = max((v for v in (rec["tx_max"], rec["line_max"]) if v is not None), default=None) # Worst of Tx / line
+            load_txt = f" {load:.0f}%" if load is not None else ""
+            self._set_label(lines[0], f"≈Min {rec['u_min']:.2f}pu-{rec['u_min_hour']:02d}hr est",   # ≈ … est = not confirmed by RUN
+                            pu_colour(rec["u_min"]))
+            self._set_label(lines[1], f"≈Max {rec['u_max']:.2f}pu{load_txt} est",
+                            status_colour(rec["u_max"], rec["u_max"], load))
+
+
+# 3.16.0 Run comparison: current run vs a baseline (previous run, pinned, or loaded from file) ------
+
+    def _on_compare_mode(self, _event=None):                                                        # Combobox changed → redraw the selected suburb
+        pv_key = getattr(self, "current_pv_key", None)
+        if pv_key and (sim.RESULTS.get("pv") or sim.RESULTS.get("bus")):
+            self._plot_curves(pv_key, *self._suburb_series(pv_key))
+
+    def _set_baseline(self, results, name, pinned):                                                 # One place that swaps the baseline
+        self.baseline_results = results
+        self.baseline_pinned = pinned
+        self.baseline_name = name
+        self._comparison = None                                                                     # Deltas are rebuilt on next use
+        self.compare_lbl.configure(text=f"Baseline: {name}")
+
+    def _rotate_baseline(self):                                                                     # After each RUN (6.4)
+        self._comparison = None                                                                     # Current side changed
+        before = self._run_before
+        self._run_before = None
+        if self.baseline_pinned or not self.last_limits:                                            # Pinned baseline stays, failed run changes nothing
+            return
+        if before and any(before.get(g) for g in ("bus", "pv", "load")):
+            self._set_baseline(before, "previous run", False)
+
+    def _pin_baseline(self):                                                                        # Freeze the current results as the baseline
+        import otaki_results as orr
+        if not any(sim.RESULTS.get(g) for g in ("bus", "pv", "load")):
+            messagebox.showinfo("Compare", "Run the simulation first.")
+            return
+        self._set_baseline(orr.snapshot(sim.RESULTS), f"pinned {time.strftime('%H:%M')}", True)
+        self._on_compare_mode()
+
+    def _load_baseline(self):                                                                       # Archived run (JSON) as the baseline
+        from tkinter import filedialog as fd
+        import otaki_results as orr
+        path = fd.askopenfilename(title="Load baseline run", filetypes=[("Run archive", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self._set_baseline(orr.load_run(path), os.path.basename(path), True)
+        except Exception as e:
+            messagebox.showerror("Compare", f"Could not load {path}:\n{e}")
+            return
+        self._on_compare_mode()
+
+    def _save_run(self):                                                                            # Archive the current results for later comparisons
+        from tkinter import filedialog as fd
+        import otaki_results as orr
+        path = fd.asksaveasfilename(title="Save run", defaultextension=".json",
+                                    filetypes=[("Run archive", "*.json")])
+        if path:
+            orr.save_run(sim.RESULTS, path)
+
+    def _comparison_for(self):                                                                      # Cached otaki_results.compare(current, baseline), None without a baseline
+        if self.baseline_results is None:
+            return None
+        if self._comparison is None:
+            import otaki_results as orr
+            self._comparison = orr.compare(sim.RESULTS, self.baseline_results)                      # All elements, one vectorised pass
+        return self._comparison
+
+
+# 3.16.1 Overlay: baseline curves drawn thin and faded under the current ones ----------------------
+
+    def _overlay_baseline(self, pv_key, to_hours, left_values, right_values):                       # Called from 3.9.5 before scaling
+        if self.baseline_results is None:
+            return
+        load_b, pv_b, tx_b, line_b = self._suburb_series(pv_key, self.baseline_results)
+        for data, field, axis, label, colour, style, acc in (
+                (pv_b, "P_W", self.ax, "PV base", "blue", "-", left_values),
+                (load_b, "P_W", self.ax, "Load base", "orange", "-", left_values),
+                (tx_b, "loading_pct", self.ax2, "Tx base", "green", "--", right_values),
+                (line_b, "loading_pct", self.ax2, "Line base", "red", ":", right_values)):
+            t, v = data.get("t") or [], data.get(field) or []
+            if t and v:
+                n = min(len(t), len(v), plot_rows(t))                                               # First day, as the current run
+                axis.plot(to_hours(t[:n]), v[:n], label=label, color=colour, linestyle=style,
+                          linewidth=1, alpha=0.4, zorder=1)
+                acc.extend(v[:n])
+
+
+# 3.16.2 Difference: current − baseline per series, summary of the changes in the title ------------
+
+    def _plot_difference(self, pv_key):                                                             # Returns False when there is nothing to compare
+        cmp = self._comparison_for()
+        if not cmp:
+            return False
+        import numpy as np
+        el = self._suburb_elements(pv_key)
+        self.ax.set_axis_on(); self.ax2.set_axis_on()
+        self.ax.clear(); self.ax2.clear()
+        drawn = False
+        for group, axis, label, colour, style in (("pv", self.ax, "ΔPV (kW)", "blue", "-"),
+                                                 ("load", self.ax, "ΔLoad (kW)", "orange", "-"),
+                                                 ("tx", self.ax2, "ΔTx Loading (%)", "green", "--"),
+                                                 ("line", self.ax2, "ΔLine Loading (%)", "red", ":")):
+            rec = cmp.get(group) or {}
+            if el[group] in rec.get("names", []) and "delta" in rec:
+                j = rec["names"].index(el[group])
+                axis.plot(rec["hours"], rec["delta"][:, j], label=label, color=colour, linestyle=style, linewidth=1.5)
+                drawn = True
+        if not drawn:
+            return False
+        self.ax.axhline(0.0, color="grey", linewidth=0.8)
+        hours = cmp["hours"]
+        self.ax.set_xlim(0, max(23.0, float(hours.max())) if np.size(hours) else 23.0)
+        self.ax.set_xlabel("Hours from start"); self.ax.set_ylabel("Δ kW"); self.ax2.set_ylabel("Δ % Loading")
+        self.ax2.yaxis.set_label_position("right"); self.ax2.yaxis.set_ticks_position("right")
+        self.ax.grid(True, linestyle="--", linewidth=0.5)
+        self.ax.legend(loc="upper left", fontsize=8); self.ax2.legend(loc="upper right", fontsize=8)
+
+        parts = []                                                                                  # One-line summary of what changed
+        bus = (cmp.get("bus") or {}).get("summary", {}).get(el["bus"])
+        if bus:
+            parts.append(f"ΔVmax {bus['peak_delta']:+.3f} ΔVmin {bus['min_delta']:+.3f} pu")
+        for group, tag in (("tx", "Tx"), ("line", "Line")):
+            rec = (cmp.get(group) or {}).get("summary", {}).get(el[group])
+            if rec and np.isfinite(rec["peak_delta"]):
+                parts.append(f"Δ{tag} peak {rec['peak_delta']:+.1f}%")
+        self.ax.set_title(f"{pv_key} – current vs {self.baseline_name}\n" + "   ".join(parts), fontsize=9)
+        self.canvas_mpl.draw()
+        return True
+
+
 # =================================================================================================
 # ==================================================================================================
 # 4.0 ---------- ✅ Cool colors setup ✅ do not under any circumstances change this, works well
@@ -1272,7 +2181,7 @@ class App(tk.Tk):
                 widget.configure(bg=bg, fg=fg)                                                      # Set text and background colours
             if isinstance(widget, tk.Button):                                                       # Special handling for buttons
                 # If it’s one of the suburb buttons, leave as-is (we manage highlight ourselves)   # Preserve suburb highlight logic
-                if widget in getattr(self, "suburb_buttons", {}).values():                          # Detect suburb buttons
+                if widget in getattr(self, "_slot_buttons", ()):                                    # Detect pooled suburb buttons
                     pass                                                                            # Do not override styling
                 # If it’s the settings cog, leave its relief/state alone (we toggle it while the window is open)  # Preserve cog state
                 elif widget is getattr(self, "cog_btn", None):                                      # Is this the cog button?
@@ -1348,6 +2257,7 @@ class App(tk.Tk):
                 photo = ImageTk.PhotoImage(im)                                                      # Tk bitmap
             else:                                                                                   # Tk fallback (limited formats)
                 photo = tk.PhotoImage(file=path)                                                    # load without scaling
+                scale = 1.0                                                                         # overlay anchors stay in image pixels
 
             setattr(self, img_attr, photo)                                                          # keep a ref to prevent GC
             img_w, img_h = photo.width(), photo.height()                                            # final image size
@@ -1356,6 +2266,9 @@ class App(tk.Tk):
             x = (cw - img_w) // 2                                                                   # horizontal centring
             y = (ch - img_h) // 2                                                                   # vertical centring
             canvas.create_image(x, y, image=photo, anchor="nw")                                     # paint the bitmap
+            side = "left" if canvas is self.map_canvas_left else "right"                            # which anchor table applies
+            self._map_xform[side] = (scale, x, y)                                                   # image pixels → canvas pixels
+            self._draw_map_overlay(canvas, side)                                                    # status markers on top (5.3)
 
         except Exception as e:                                                                       # any load/scale error
 # 5.2.5 If anything fails, show the error text directly in the canvas-------------------------------
@@ -1368,6 +2281,54 @@ class App(tk.Tk):
         canvas.bind("<Configure>", _debounce)                                                        # keep it tidy on window resizes
 
 
+# 5.3 Live status overlay: one oval per anchor, recoloured with itemconfig (images untouched) --------
+
+    def _draw_map_overlay(self, canvas, side):                                                      # (Re)create overlay items after the image is (re)drawn
+        scale, ox, oy = self._map_xform.get(side, (1.0, 0, 0))                                      # Image pixels → canvas pixels
+        items = self._map_items[side] = {}                                                          # Fresh item ids (canvas.delete("all") dropped the old ones)
+        r = MAP_MARKER_R                                                                            # Marker radius in canvas pixels
+        for key, (px, py) in MAP_ANCHORS.get(side, {}).items():                                     # pv_key (left) or tx name (right)
+            cx, cy = ox + px * scale, oy + py * scale                                               # Anchor position on the scaled image
+            items[key] = canvas.create_oval(cx - r, cy - r, cx + r, cy + r,
+                                            fill=self._map_colours.get((side, key), "grey"),        # Keep the last known status across resizes
+                                            outline="black", width=1, tags=("overlay",))
+
+
+# 5.3.1 Work out the status colour of every anchor, for the whole run or one time step --------------
+
+    def _map_status_colours(self, step=None):                                                       # Returns ({pv_key: colour}, {tx: colour})
+        res = sim.RESULTS                                                                           # Latest backend results
+        def _vals(group, name, field):                                                              # Whole series, or just the value at `step`
+            v = (res.get(group, {}).get(name) or {}).get(field) or []
+            return v if step is None else v[step:step + 1]
+        left, right = {}, {}                                                                        # Geographic map / single-line map
+        for pv_key, cfg in sim.PV_CONFIG.items():                                                   # One suburb at a time
+            u    = _vals("bus", cfg.get("bus"), "u_pu")                                             # p.u. voltage
+            tx   = _vals("tx", cfg.get("tx"), "loading_pct")                                        # Transformer %
+            line = _vals("line", cfg.get("pline"), "loading_pct")                                   # Line %
+            u_min = min(u) if u else None; u_max = max(u) if u else None                            # Voltage extremes
+            load_pk = max(tx + line) if (tx or line) else None                                      # Worst loading on the feeder
+            left[pv_key] = status_colour(u_min, u_max, load_pk)                                     # Suburb = worst of voltage / loading
+            tx_colour = status_colour(u_min, u_max, max(tx) if tx else None)                        # Transformer = its bus voltage + own loading
+            right[cfg.get("tx")] = worst_colour(right.get(cfg.get("tx")), tx_colour)                # Shared transformer: worst of the suburbs it feeds
+        return left, right
+
+
+# 5.3.2 Recolour only the overlay items whose status changed ----------------------------------------
+
+    def _refresh_map_overlay(self, step=None):                                                      # step=None → whole-run status
+        left, right = self._map_status_colours(step)                                                # Target colours
+        for side, canvas, colours in (("left", self.map_canvas_left, left),
+                                      ("right", self.map_canvas_right, right)):
+            items = self._map_items.get(side, {})                                                   # Item ids on this canvas
+            for key, colour in colours.items():                                                     # Compare against what is on screen
+                if self._map_colours.get((side, key)) == colour:                                    # Unchanged → no Tk call at all
+                    continue
+                self._map_colours[(side, key)] = colour                                             # Remember for redraws / next step
+                if key in items:                                                                    # Anchor configured for this map
+                    canvas.itemconfig(items[key], fill=colour)                                      # Recolour in place
+
+
 # =================================================================================================
 # =================================================================================================
 # 6.0 ---------- Simulation Run ----------                                                          # Sorts run button press, gets inputs, calls backend, updates the UI
@@ -1419,6 +2380,8 @@ class App(tk.Tk):
 
 # 6.3.2 Run simulation (sim handles applying both inverter + panel overrides) ---------------------
 
+            import otaki_results as orr                                                             # Snapshot helper
+            self._run_before = orr.snapshot(sim.RESULTS)                                            # Previous run, the default baseline (3.16.0)
             results = sim.set_penetrations_and_run(sliders)                                         # Execute simulation in backend
             self.last_limits = results or {}                                                        # Cache results (empty dict on failure)
 
@@ -1436,6 +2399,10 @@ class App(tk.Tk):
 # 6.4 Refresh result labels and re-enable the RUN button ------------------------------------------
 
     def _after_run_ui(self):                                                                        # post-run UI normalization
+        try:
+            self._rotate_baseline()                                                                 # Previous run becomes the baseline unless one is pinned (3.16.0)
+        except Exception as e:
+            print("baseline update error:", e)
         fn = getattr(self, "refresh_results", None)                                                 # Get refresh function if present
         if callable(fn):                                                                            # Only if callable
             try:                                                                                    # Protect UI update
@@ -1449,6 +2416,13 @@ class App(tk.Tk):
                 self._on_suburb_clicked(sel)                                                        # Re-render its curves
         except Exception:                                                                   
             pass                                                                                    # Ignore plotting errors
+        try:                                                                                        # Update the dashboard / heatmap in place (no-op until opened)
+            self._refresh_dashboard()
+            self._refresh_heatmap()
+            self._refresh_map_overlay()                                                             # Recolour map markers for the new run
+            self._reset_timeline()                                                                  # New time axis for the scrubber
+        except Exception as e:
+            print("post-run view refresh error:", e)                                                # Keep the RUN button restore below
         try:                                                                                        # Re-enable RUN button
             self.run_btn.config(state="normal", text="RUN")                                         # Restore button state/text
         except Exception:                                                                   
@@ -1471,44 +2445,26 @@ class App(tk.Tk):
             import time                                                                                # Time utilities
             now = time.time()                                                                          # Timestamp for 'last_updated'
 
-# 7.1.1 Build mapping from bus names to pv_keys --------------------------------------------------------
+# 7.1.1 Name index: exact pv_key ↔ bus / load / tx / line, built once in otaki_sim (4.12) -------------
 
-            cfg_bus_to_key = {v["bus"]: k for k, v in sim.PV_CONFIG.items()}                           # Map bus→pv_key from config
-            cfg_items = list(cfg_bus_to_key.items())                                                   # Cached items for suffix match
+            index = sim.names()                                                                        # Cached until PV_CONFIG changes
 
             bus_dict = results.get("bus", {})                                                          # Bus results dict from backend
             if not isinstance(bus_dict, dict):                                                         # Validate structure
                 print("[gui] ⚠️ results['bus'] not a dict.")                                           # Warn and bail
                 return                                                                                 # Stop processing
 
-            def match_pv_key(result_bus: str):                                                         # Resolve pv_key for a bus name
-                # Exact match
-                pv_key = cfg_bus_to_key.get(result_bus)                                                # Try exact lookup
-                if pv_key:                                                                             # If found
-                    return pv_key                                                                      # Return mapping
+# 7.1.2 Walk suburbs once; link each pv_key to load, tx, and line from the index -------------------
 
-                # Try matching bus suffix
-                for cfg_bus, key in cfg_items:                                                         # Scan known buses
-                    if result_bus.endswith(cfg_bus):                                                   # Suffix match
-                        return key                                                                     # Map to pv_key
+            for pv_key, st in self.suburb_state.items():                                               # One pass, dict lookups only
+                st["load"] = index.name(pv_key, "load_code") or ""                                     # Load code (e.g. 'OTKa')
+                st["tx"] = index.name(pv_key, "tx") or ""                                           # Transformer id
+                st["line"] = index.name(pv_key, "line") or ""                                       # Line id
 
-                return None                                                                            # No match
-
-# 7.1.2 Iterate over bus results and update per-suburb state -----------------------------------------
-
-            for bus, info in bus_dict.items():                                                         # Walk each bus record
-                if not isinstance(info, dict):                                                         # Skip bad rows
-                    continue                                                                           # Next item
-
-                pv_key = match_pv_key(bus)                                                             # Find owning pv_key
-                if not pv_key:                                                                         # If unknown bus
-                    print(f"[gui] ⚠️ No pv_key found for bus '{bus}'")                                 # Warn
-                    continue                                                                           # Skip
-
-                st = self.suburb_state.get(pv_key)                                                     # Fetch GUI state
-                if not st:                                                                             # Ensure exists
-                    print(f"[gui] ⚠️ No GUI state for pv_key = {pv_key}")                              # Warn
-                    continue                                                                           # Skip
+# 7.1.3 Update per-suburb state from its own bus ------------------------------------------------------
+                info = bus_dict.get(index.name(pv_key, "bus"))                                         # Exact bus record
+                if not isinstance(info, dict):                                                         # Missing buses reported in 7.1.4
+                    continue                                                                           # Next suburb
 
                 u_min = info.get("u_pu_min")                                                           # Minimum p.u.
                 u_max = info.get("u_pu_max")                                                           # Maximum p.u.
@@ -1519,50 +2475,26 @@ class App(tk.Tk):
                 st["u_max"] = u_max                                                                    # Cache max p.u.
                 st["t_min"] = t_min                                                                    # Cache min hour
                 st["t_max"] = t_max                                                                    # Cache max hour
-                st["ok"] = (u_min is not None and 0.95 <= u_min <= 1.05) and (u_max is not None and 0.95 <= u_max <= 1.05)  # Within band
+                st["ok"] = volt_ok(u_min, u_max)                                                       # Within band
                 st["last_updated"] = now                                                               # Update timestamp
 
-
-
-# 7.1.3 Link each pv_key to load, tx, and line from sim.ASSOC ----------------------------------------
-            for pv_key in self.suburb_state:                                                           # For each suburb
-                for load_name, assoc in sim.ASSOC.items():                                             # Scan associations
-                    if pv_key in assoc.get("pv", []):                                                  # If linked PV
-                        self.suburb_state[pv_key]["load"] = load_name                                  # Store load name
-                        if assoc.get("tx"):                                                            # If tx exists
-                            self.suburb_state[pv_key]["tx"] = assoc["tx"][0]                           # First tx id
-                        if assoc.get("line"):                                                          # If line exists
-                            self.suburb_state[pv_key]["line"] = assoc["line"][0]                       # First line id
-                        # print(f"[cache] linked {pv_key} to load={load_name}, tx={assoc.get('tx')}, line={assoc.get('line')}")
-                        break                                                                          # Done with this pv_key
-
         except Exception as e:                                                                         # Handle errors
             print("update_cache_from_results error:", e)                                               # Log exception
+            return                                                                                     # Names unusable, keep previous load_dict
 
 
-# 7.1.4 Build load_dict by matching suburb_state → load → results["load"] ---------------------------
+# 7.1.4 Build load_dict by exact load name, report names that did not resolve ----------------------
 
-        try:                                                                                         # Build fuzzy mapping from cache to backend load keys
-            load_dict = {}                                                                           # Output dictionary {pv_key: load_data}
+        try:                                                                                         # Exact lookups, one per suburb
             load_results = results.get("load", {})                                                   # Backend load results dict
-
-            def fuzzy_match(code, target):                                                           # Case/space/underscore-insensitive match
-                """Return True if code like 'otka' is found in a string like 'Otaki Town A'."""
-                return code.replace("_", "").lower() in target.replace(" ", "").replace("_", "").lower()
-
-            for pv_key, meta in self.suburb_state.items():                                           # Iterate suburbs in GUI cache
-                suburb_code = meta.get("load", "").lower()                                           # Cached load code (e.g., 'otka')
-                matched = False                                                                      # Track if a match was found
-
-                for load_key, load_data in load_results.items():                                     # Scan backend load keys
-                    if fuzzy_match(suburb_code, load_key):                                           # Fuzzy hit found
-                        load_dict[pv_key] = load_data                                                # Store corresponding load data
-                        self.suburb_state[pv_key]["load_key"] = load_key                             # Record matched key for reference
-                        print(f"[gui] ✅ load_dict matched {pv_key} (code={suburb_code}) → {load_key}")  # Trace match
-                        matched = True                                                               # Set flag
-                        break                                                                         # Stop scanning keys for this suburb
-
+            load_dict = {}                                                                           # Output dictionary {pv_key: load_data}
+            for pv_key in self.suburb_state:                                                         # Iterate suburbs in GUI cache
+                load_key = index.name(pv_key, "load")                                                # PF load name, e.g. 'Otaki Town A'
+                if load_key in load_results:                                                         # Run returned this load
+                    load_dict[pv_key] = load_results[load_key]                                       # Store corresponding load data
+                    self.suburb_state[pv_key]["load_key"] = load_key                                 # Record matched key for reference
             self.load_dict = load_dict                                                               # Save mapping on GUI object
+            index.report(results, prefix="[gui] ⚠️")                                                 # Configured names missing from this run
 
         except Exception as e:                                                                        # Catch any errors
             print("⚠️ load_dict build failed:", e)                                                   # Log failure
@@ -1577,6 +2509,7 @@ class App(tk.Tk):
 # 7.3 refresh_results: Read cache and redraw the two-line labels with hours --------------------------
 
     def refresh_results(self):                                                                       # Update the per-suburb result labels
+        self._label_cache.clear()                                                                   # Labels rewritten below, scrubber must not trust its cache
         if self.last_run_signature is None:                                                          # If no run yet, clear labels
             for pv_key in sim.PV_CONFIG.keys():                                                      # Walk all configured suburbs
                 l1, l2 = self.result_lines[pv_key]                                                   # Fetch label widgets
@@ -1584,12 +2517,6 @@ class App(tk.Tk):
                 l2.configure(text="", fg="black")                                                    # Clear line 2
             return                                                                                   # Nothing else to show
 
-        def _colour_for(pu):                                                                         # Colour based on p.u. bands
-            if pu < 0.49 or pu > 1.051: return WARN_COLOUR                                           # Far outside limits
-            if 0.92 <= pu <= 1.02:      return OK_COLOUR                                             # Within preferred band
-            if (0.919 <= pu < 0.92) or (1.02 < pu <= 1.051): return MID_COLOUR                       # Near-limit band
-            return WARN_COLOUR                                                                        # Default warn
-
         for pv_key in sim.PV_CONFIG.keys():                                                          # Update every suburb line pair
             st = self.suburb_state[pv_key]                                                           # Cached metrics
             l1, l2 = self.result_lines[pv_key]                                                       # Label handles
@@ -1599,14 +2526,14 @@ class App(tk.Tk):
             if umin is None:                                                                         # No min available
                 l1.configure(text="Min: n/a", fg="black")                                            # Show n/a
             else:                                                                                    # Min is present
-                cmin = _colour_for(umin)                                                             # Colour for min
+                cmin = pu_colour(umin)                                                              # Colour for min
                 hmin = f"{int(tmin):02d}hr" if tmin is not None else "--"                            # Hour text
                 l1.configure(text=f"Min= {umin:.2f}pu-{hmin}", fg=cmin)                              # Render min line
 
             if umax is None:                                                                         # No max available
                 l2.configure(text="Max: n/a", fg="black")                                            # Show n/a
             else:                                                                                    # Max is present
-                cmax = _colour_for(umax)                                                             # Colour for max
+                cmax = pu_colour(umax)                                                              # Colour for max
                 hmax = f"{int(tmax):02d}hr" if tmax is not None else "--"                            # Hour text
                 l2.configure(text=f"Max= {umax:.2f}pu-{hmax}", fg=cmax)                              # Render max line
 
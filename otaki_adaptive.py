@@ -0,0 +1,176 @@
+# otaki_adaptive.py
+# 1.0 Set Up Environment
+    # 1.1.0 Screening and step settings
+
+# 2.0 Screening
+    # 2.1.0 near_limits (coarse rows close to a voltage / loading limit)
+    # 2.2.0 windows (flagged rows → merged time windows)
+
+# 3.0 Refinement Bookkeeping
+    # 3.1.0 merge (coarse outside the windows + fine inside, one time axis)
+    # 3.2.0 step_counts (steps run vs a full fine run)
+    # 3.3.0 resample (merged run → one uniform axis, for the surrogate)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Two-pass QDS: a coarse run over the whole period screens for rows where any bus
+#   is near the edge of the voltage band or any transformer / line is near 100 %;
+#   only the windows around those rows are rerun at the fine step. The series are
+#   merged onto one non-uniform time axis (fine where it matters, coarse elsewhere).
+#   This module is the NumPy side; otaki_sim.run_adaptive_simulation drives PF.
+
+
+import numpy as np                                                                                  # Row flags, window edges and merges are array ops
+import otaki_results                                                                                # Voltage band shared with the GUI colours
+
+
+# 1.1.0 Screening and step settings ------------------------------------------------------------------
+COARSE_STEP  = (1, 2)                                                                               # (stepSize, stepUnit) of the screening run: 1 h
+FINE_STEP    = (10, 1)                                                                              # … and of the refinement runs: 10 min
+V_BAND       = otaki_results.VOLT_BAND                                                              # Statutory band, p.u.
+V_MARGIN     = otaki_results.VOLT_NEAR_PU                                                           # Within this of a band edge counts as near (p.u.), amber in the GUI
+LOADING_NEAR = 90.0                                                                                 # Transformer / line loading that counts as near (%)
+PAD_STEPS    = 1                                                                                    # Coarse steps either side of a flagged row (an excursion can sit between samples)
+STEP_UNIT_S  = {0: 1, 1: 60, 2: 3600, 3: 86400}                                                     # ComStatsim stepUnit → seconds
+SERIES       = {"bus": "u_pu", "load": "P_W", "pv": "P_W", "tx": "loading_pct", "line": "loading_pct"} # RESULTS group → series field
+
+
+def step_seconds(step):                                                                             # (stepSize, stepUnit) → seconds
+    size, unit = step
+    return float(size) * STEP_UNIT_S.get(int(unit), 3600)
+
+
+#====================================================================================================
+# 2.0  Screening
+#====================================================================================================
+
+
+# 2.1.0 near_limits — one flag per coarse row, plus which group tripped it -------------------------
+def near_limits(results, v_band=V_BAND, v_margin=V_MARGIN, loading_near=LOADING_NEAR):
+    """
+    Returns (t, flags, reasons): the coarse time axis, a bool per row, and
+    {"bus" / "tx" / "line": bool per row} so the caller can say why a window exists.
+    """
+    from otaki_results import results_matrix
+    lo, hi = v_band[0] + v_margin, v_band[1] - v_margin
+    _, t, U = results_matrix(results, "bus", "u_pu")
+    reasons = {}
+    with np.errstate(invalid="ignore"):                                                             # NaN (missing) compares False
+        reasons["bus"] = ((U < lo) | (U > hi)).any(axis=1) if U.size else np.zeros(len(t), bool)
+        for group in ("tx", "line"):
+            _, tg, L = results_matrix(results, group, "loading_pct")
+            hit = (L >= loading_near).any(axis=1) if L.size else np.zeros(0, bool)
+            if len(tg) > len(t):
+                t = tg
+            reasons[group] = hit
+    n = len(t)
+    for k, hit in reasons.items():                                                                  # Same length as the time axis
+        reasons[k] = np.pad(hit, (0, max(0, n - hit.size)))[:n]
+    flags = np.zeros(n, bool)
+    for hit in reasons.values():
+        flags |= hit
+    return np.asarray(t, dtype=float), flags, reasons
+
+
+# 2.2.0 windows — each flagged row padded by `pad` coarse steps, overlapping windows joined ------
+def windows(t, flags, pad=PAD_STEPS):
+    """[(t0, t1), ...] in the coarse run's time stamps, sorted and disjoint."""
+    t, flags = np.asarray(t, dtype=float), np.asarray(flags, dtype=bool)
+    idx = np.flatnonzero(flags)
+    if not idx.size:
+        return []
+    lo = np.clip(idx - int(pad), 0, t.size - 1)
+    hi = np.clip(idx + int(pad), 0, t.size - 1)
+    out = []
+    for a, b in zip(lo, hi):                                                                        # Sorted already, join overlaps
+        if out and a <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], b)
+        else:
+            out.append([a, b])
+    return [(float(t[a]), float(t[b])) for a, b in out]
+
+
+#====================================================================================================
+# 3.0  Refinement Bookkeeping
+#====================================================================================================
+
+
+# 3.1.0 merge — RESULTS-shaped dict on one non-uniform axis -------------------------------------
+def merge(coarse, fine_runs, wins):
+    """
+    coarse: {group: {name: {"t", field}}} of the screening run.
+    fine_runs: one such dict per window in `wins`, at the fine step (rows outside
+    their window are dropped, so a run that started early or ran long is fine).
+    Coarse rows inside a window are replaced by the fine rows; series keep their
+    field names. Elements missing from a fine run keep their coarse rows.
+    """
+    edges = np.asarray(wins, dtype=float).reshape(-1, 2)
+
+    def outside(t):                                                                                 # Coarse rows not covered by any window
+        if not edges.size:
+            return np.ones(t.size, bool)
+        k = np.searchsorted(edges[:, 0], t, side="right") - 1
+        inside = (k >= 0) & (t <= edges[np.clip(k, 0, None), 1])
+        return ~inside
+
+    out = {}
+    for group, field in SERIES.items():
+        recs = coarse.get(group) or {}
+        merged = {}
+        for name, rec in recs.items():
+            t = np.asarray(rec.get("t") or [], dtype=float)
+            v = np.asarray(rec.get(field) or [], dtype=float)[:t.size]
+            keep = outside(t[:v.size])
+            ts, vs = [t[:v.size][keep]], [v[keep]]
+            for (w0, w1), run in zip(edges, fine_runs):
+                frec = (run.get(group) or {}).get(name)
+                if not frec:                                                                        # Not refined: put the coarse rows back
+                    sel = (t[:v.size] >= w0) & (t[:v.size] <= w1)
+                    ts.append(t[:v.size][sel]); vs.append(v[sel])
+                    continue
+                ft = np.asarray(frec.get("t") or [], dtype=float)
+                fv = np.asarray(frec.get(field) or [], dtype=float)[:ft.size]
+                sel = (ft[:fv.size] >= w0) & (ft[:fv.size] <= w1)
+                ts.append(ft[:fv.size][sel]); vs.append(fv[sel])
+            tt, vv = np.concatenate(ts), np.concatenate(vs)
+            order = np.argsort(tt, kind="stable")
+            tt, vv = tt[order], vv[order]
+            first = np.r_[True, tt[1:] != tt[:-1]]                                                  # Window edges sit on coarse rows
+            merged[name] = {"t": tt[first].tolist(), field: vv[first].tolist()}
+        out[group] = merged
+    return out
+
+
+# 3.2.0 step_counts — what the two passes cost against one fine run over the whole period -------
+def step_counts(t_coarse, wins, coarse_s, fine_s):
+    t_coarse = np.asarray(t_coarse, dtype=float)
+    period = float(t_coarse[-1] - t_coarse[0]) + coarse_s if t_coarse.size else 0.0
+    fine = sum(int(round((w1 - w0) / fine_s)) + 1 for w0, w1 in wins)
+    full = int(round(period / fine_s))
+    run = int(t_coarse.size) + fine
+    return {"coarse": int(t_coarse.size), "fine": fine, "total": run, "full_fine": full,
+            "windows": len(wins), "saving_pct": 100.0 * (1.0 - run / full) if full else 0.0}
+
+
+# 3.3.0 resample — every series interpolated onto `t` (e.g. the coarse axis) ---------------------
+def resample(results, t):
+    """
+    RESULTS-shaped dict on the time axis t, for code that indexes rows by position
+    (otaki_surrogate). Fine rows sit on the coarse stamps, so a merged run resampled
+    onto its own coarse axis keeps the refined values there. Gaps (NaN) are skipped.
+    """
+    t = np.asarray(t, dtype=float)
+    out = {}
+    for group, field in SERIES.items():
+        recs = {}
+        for name, rec in (results.get(group) or {}).items():
+            rt = np.asarray(rec.get("t") or [], dtype=float)
+            rv = np.asarray(rec.get(field) or [], dtype=float)[:rt.size]
+            ok = np.isfinite(rv)
+            if t.size and ok.any():
+                recs[name] = {"t": t.tolist(), field: np.interp(t, rt[:rv.size][ok], rv[ok]).tolist()}
+        out[group] = recs
+    return out
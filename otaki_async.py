@@ -0,0 +1,293 @@
+# otaki_async.py
+# 1.0 Set Up Environment
+    # 1.1.0 Cancelled
+    # 1.2.0 ThreadStdout (otaki_sim prints → progress events / a log, per thread)
+
+# 2.0 AsyncSim
+    # 2.1.0 start / close
+    # 2.2.0 run_scenario
+    # 2.3.0 stream_scenario (progress events, then the result)
+    # 2.4.0 stream_scenarios (results in order, next run already going)
+    # 2.5.0 _job (runs on the PF thread)
+
+# 3.0 Module Shortcuts
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   asyncio front end for otaki_sim, for scripted studies that want to write archives,
+#   stream CSVs or build reports while PowerFactory is busy:
+#
+#       sim = otaki_async.AsyncSim(offline=True)
+#       out = await sim.run_scenario({"Otaki_PV_1": 40})                 # plain inverter overrides
+#       async for ev in sim.stream_scenario(scenario): ...               # progress, then "result"
+#       async for rec in sim.stream_scenarios(scenarios): archive(rec)   # next run overlaps archive()
+#
+#   Every blocking PF call runs on one dedicated thread (PF is not thread safe), so the
+#   event loop never stalls. Progress events are otaki_sim's own numbered status lines.
+#   Cancelling the awaiting task drops a queued run at once; a running one stops at its
+#   next stage boundary (otaki_sim.check_stage: before the overrides, the QDS run or the
+#   extraction; a QDS already executing inside PF finishes first) and the model's own
+#   inverter / panel counts are written back to PF.
+
+
+import os, sys, time, asyncio, threading, collections, concurrent.futures                           # Standard library only
+
+
+# 1.1.0 Cancelled — raised on the PF thread to stop a run that nobody is waiting for any more -----
+class Cancelled(Exception):
+    pass
+
+
+# 1.2.0 ThreadStdout — print() on the PF thread goes to the current job, other threads unchanged ---
+class ThreadStdout:                                                                                 # Also used by otaki_server's worker
+    def __init__(self, orig):
+        self.orig = orig
+        self.sinks = {}                                                                             # thread id → callable(text)
+
+    @classmethod
+    def install(cls):                                                                               # Wrap sys.stdout once, shared by every user
+        if not isinstance(sys.stdout, cls):
+            sys.stdout = cls(sys.stdout)
+        return sys.stdout
+
+    def write(self, text):
+        sink = self.sinks.get(threading.get_ident())
+        if sink is None:
+            return self.orig.write(text)
+        sink(text)
+        return len(text)
+
+    def flush(self):
+        if threading.get_ident() not in self.sinks:
+            self.orig.flush()
+
+    def __getattr__(self, attr):                                                                    # encoding, isatty … from the real stream
+        return getattr(self.orig, attr)
+
+
+#====================================================================================================
+# 2.0  AsyncSim
+#====================================================================================================
+
+
+class AsyncSim:
+    """
+    One otaki_sim session behind an asyncio API. sim: an imported otaki_sim module, or
+    None to import it on the PF thread at the first run (offline=True → otaki_offline).
+    log: file for otaki_sim's output (None = discarded, progress events still fire).
+    Results are dicts {"name", "signature", "cached", "seconds", "results", "rows",
+    "worst", "error"} — the same rows / worst as otaki_cli (otaki_scenarios.summarise).
+    """
+    def __init__(self, sim=None, backend=None, offline=False, log=None, cache_runs=64):
+        import otaki_scenarios as osc
+        self.osc, self.sim, self.backend, self.offline, self.log = osc, sim, backend, offline, log
+        self.cache = osc.ResultCache(cache_runs)
+        self.executor = None
+        self.stdout = None
+
+    # 2.1.0 start / close -------------------------------------------------------------------------
+    def start(self):                                                                                # Called by the first run, safe to repeat
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="pf")
+            self.stdout = ThreadStdout.install()
+        return self
+
+    def close(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+            self.executor = None
+        if sys.stdout is self.stdout and not self.stdout.sinks:
+            sys.stdout = self.stdout.orig
+        self.stdout = None
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    # 2.2.0 run_scenario — await one run; progress(event) is called on the event loop ------------
+    async def run_scenario(self, scenario, progress=None):
+        """
+        scenario: otaki_scenarios layout ({"name", "inverters", "kw_per_inv"} or
+        "suburbs"), or a plain {pv_key: inverters} overrides dict.
+        Raises ValueError for a bad scenario, RuntimeError if the run fails.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+
+        def emit(event):                                                                            # PF thread → event loop
+            if progress is not None:
+                loop.call_soon_threadsafe(progress, event)
+
+        emit({"event": "queued", "time": time.time()})
+        fut = self.executor.submit(self._job, scenario, emit, stop)
+        try:
+            return await asyncio.wrap_future(fut)
+        except asyncio.CancelledError:
+            stop.set()                                                                              # Running: stops at the next stage boundary
+            fut.cancel()                                                                            # Queued: never starts
+            raise
+
+    # 2.3.0 stream_scenario — progress events as they happen, then {"event": "result", ...} -----
+    async def stream_scenario(self, scenario):
+        events = asyncio.Queue()
+        task = asyncio.ensure_future(self.run_scenario(scenario, progress=events.put_nowait))
+        try:
+            while True:
+                get = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({get, task}, return_when=asyncio.FIRST_COMPLETED)
+                if get in done:
+                    yield get.result()
+                    continue
+                get.cancel()
+                await asyncio.sleep(0)                                                              # Last call_soon_threadsafe callbacks
+                while not events.empty():
+                    yield events.get_nowait()
+                yield dict(task.result(), event="result")                                           # Re-raises the run's error
+                return
+        finally:
+            if not task.done():                                                                     # Consumer stopped early → stop the run
+                task.cancel()
+
+    # 2.4.0 stream_scenarios — results in file order; `ahead` runs queued while the caller works --
+    async def stream_scenarios(self, scenarios, ahead=1):
+        """
+        One result dict per scenario, in order. A failed scenario yields a dict with
+        "error" set instead of raising, so a batch keeps going (as otaki_cli does).
+        """
+        pending = collections.deque()
+        todo = iter(scenarios)
+
+        async def guarded(sc):
+            try:
+                return await self.run_scenario(sc)
+            except (ValueError, RuntimeError) as e:
+                return {"name": self._scenario(sc).get("name", ""), "error": f"{e.__class__.__name__}: {e}",
+                        "results": {}, "rows": [], "worst": {}}
+
+        def top_up():
+            while len(pending) <= ahead:
+                sc = next(todo, None)
+                if sc is None:
+                    return
+                pending.append(asyncio.ensure_future(guarded(sc)))
+
+        try:
+            top_up()
+            while pending:
+                rec = await pending.popleft()
+                top_up()                                                                            # Next run starts before the caller sees this one
+                yield rec
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # 2.5.0 _job — everything that touches otaki_sim / PowerFactory ------------------------------
+    def _scenario(self, scenario):
+        keys = ("name", "inverters", "kw_per_inv", "suburbs")
+        if isinstance(scenario, dict) and scenario and not any(k in scenario for k in keys):
+            return {"name": "overrides", "inverters": scenario}                                     # Plain {pv_key: count}
+        return scenario or {}
+
+    def _job(self, scenario, emit, stop):
+        if stop.is_set():
+            raise Cancelled("cancelled before start")
+        buf = []
+
+        def sink(text):                                                                             # Whole lines → progress events
+            if self.log is not None:
+                self.log.write(text)
+            buf.append(text)
+            if "\n" not in text:
+                return
+            lines = "".join(buf).split("\n")
+            buf[:] = [lines.pop()]
+            for line in lines:
+                stage, _, message = line.strip().partition(" ")
+                if stage:
+                    emit({"event": "progress", "stage": stage, "message": message.strip(), "time": time.time()})
+
+        reached = []
+
+        def check(stage):                                                                           # otaki_sim.check_stage, between PF stages only
+            if stop.is_set():
+                raise Cancelled(f"cancelled before {stage}")
+            reached.append(stage)
+
+        self.stdout.sinks[threading.get_ident()] = sink
+        try:
+            if self.sim is None:                                                                    # PF connect on this thread, once
+                if self.offline:
+                    os.environ["OTAKI_OFFLINE"] = "1"
+                import otaki_sim
+                self.sim = otaki_sim
+            sim, osc = self.sim, self.osc
+            sc = osc._normalise(self._scenario(scenario), 0, sim.PV_CONFIG)
+            inverters, panels, sig = osc.resolve(sim, sc, self.backend)
+            emit({"event": "started", "name": sc["name"], "signature": sig, "time": time.time()})
+            t0 = time.perf_counter()
+            sim.STAGE_CHECK["fn"] = check
+            try:
+                results, sig, cached = osc.run_scenario(sim, sc, self.cache, self.backend)
+            except Cancelled:
+                if reached:                                                                         # Overrides may be in PF: put the model's counts back
+                    self._restore_counts(sim)
+                raise
+            finally:
+                sim.STAGE_CHECK["fn"] = None
+            if not results:
+                raise RuntimeError(f"Scenario '{sc['name']}': simulation failed")
+            rows, worst = osc.summarise(results, sim.PV_CONFIG, inverters, panels, sim.PANEL_WATT)
+            out = {"name": sc["name"], "signature": sig, "cached": cached, "seconds": time.perf_counter() - t0,
+                   "results": results, "rows": rows, "worst": worst, "error": ""}
+            emit({"event": "finished", "name": sc["name"], "signature": sig, "time": time.time()})
+            return out
+        finally:
+            self.stdout.sinks.pop(threading.get_ident(), None)
+
+    def _restore_counts(self, sim):                                                                 # run_scenario already reset the dicts, PF still has the scenario's
+        try:
+            sim.apply_pv_inverter_overrides(sim.app, dict(sim.PV_INV_OVERRIDES))
+            sim.apply_pv_panel_overrides(sim.app, dict(sim.PV_PANEL_OVERRIDES))
+        except Exception as e:
+            print(f"2.5.0  Counts not restored after cancel: {e}")
+
+
+#====================================================================================================
+# 3.0  Module Shortcuts
+#====================================================================================================
+#   `await otaki_async.run_scenario(...)` without managing an AsyncSim: one shared
+#   session, created at first use with configure()'s settings.
+
+
+_DEFAULT = {"sim": None, "kwargs": {}}
+
+
+def configure(**kwargs):                                                                            # AsyncSim(...) arguments for the shared session
+    _DEFAULT["kwargs"] = kwargs
+    if _DEFAULT["sim"] is not None:
+        _DEFAULT["sim"].close()
+        _DEFAULT["sim"] = None
+
+
+def default():
+    if _DEFAULT["sim"] is None:
+        _DEFAULT["sim"] = AsyncSim(**_DEFAULT["kwargs"])
+    return _DEFAULT["sim"]
+
+
+async def run_scenario(scenario, progress=None):
+    return await default().run_scenario(scenario, progress)
+
+
+def stream_scenario(scenario):
+    return default().stream_scenario(scenario)
+
+
+def stream_scenarios(scenarios, ahead=1):
+    return default().stream_scenarios(scenarios, ahead)
@@ -0,0 +1,410 @@
+# otaki_bench.py
+# 1.0 Set Up Environment
+    # 1.1.0 Startup budget
+
+# 2.0 GUI Startup Benchmark
+    # 2.1.0 Child probe (runs in a fresh interpreter so imports are cold)
+    # 2.2.0 measure_startup
+    # 2.3.0 check_startup_budget
+
+# 3.0 Hot-Path Benchmarks (offline PowerFactory stand-in)
+    # 3.1.0 Hot-path settings
+    # 3.2.0 _measure
+    # 3.3.0 _GuiHost
+    # 3.4.0 hot_path_cases
+    # 3.5.0 run_hot_paths
+    # 3.6.0 save_baseline / check_regressions
+
+# 4.0 Monitor Scaling Benchmark (offline PowerFactory stand-in)
+    # 4.1.0 Scaling settings
+    # 4.2.0 run_scaling
+    # 4.3.0 check_scaling (per-element cost and log-log slope)
+
+# 5.0 Main
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import os, sys, json, subprocess                                                                    # Standard library only, the benchmark must run wherever the GUI runs
+HERE = os.path.dirname(os.path.abspath(__file__))                                                   # Repo folder (gui_app.py / otaki_sim.py live here)
+
+
+# 1.1.0 Startup budget -------------------------------------------------------------------------------
+STARTUP_BUDGET_S  = 1.5                                                                             # GUI import + App() + first paint, excluding the PowerFactory connect
+STARTUP_RUNS      = 3                                                                               # Cold starts to take the median over
+DEFERRED_MODULES  = ("matplotlib", "PIL")                                                           # Must NOT be imported before the window first paints
+
+
+#====================================================================================================
+# 2.0  GUI Startup Benchmark
+#====================================================================================================
+
+
+# 2.1.0 Child probe — timed in a brand new interpreter ----------------------------------------------
+_PROBE = r"""
+import sys, time, json
+t0 = time.perf_counter()
+import otaki_sim                                                                      # PF connect + project activation (not part of the budget)
+t1 = time.perf_counter()
+import gui_app
+t2 = time.perf_counter()
+app = gui_app.App()
+app.update_idletasks()                                                                # First paint of the window
+t3 = time.perf_counter()
+loaded = {m: (m in sys.modules) for m in %(deferred)r}                                # Heavy modules already pulled in?
+app.update()                                                                          # Let after_idle work (map images) run
+t4 = time.perf_counter()
+app.destroy()
+print(json.dumps({"backend_s": t1 - t0, "gui_import_s": t2 - t1, "window_s": t3 - t2,
+                  "startup_s": t3 - t1, "idle_s": t4 - t3, "loaded_at_paint": loaded}))
+"""
+
+
+# 2.2.0 measure_startup — median of several cold starts ---------------------------------------------
+def measure_startup(runs=STARTUP_RUNS):                                                             # Returns a dict of median timings + deferred-import flags
+    samples = []                                                                                    # One dict per cold start
+    for _ in range(runs):                                                                           # Fresh interpreter each time so nothing is cached in sys.modules
+        out = subprocess.run([sys.executable, "-c", _PROBE % {"deferred": DEFERRED_MODULES}],
+                             cwd=HERE, capture_output=True, text=True)                              # Run the probe next to gui_app.py
+        if out.returncode != 0:                                                                     # GUI failed to start at all
+            raise RuntimeError(f"2.2.0  Startup probe failed:\n{out.stderr}")                       # Surface the child traceback
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))                             # Last line is the JSON (backend prints before it)
+    result = {}                                                                                     # Median of every timing key
+    for key in ("backend_s", "gui_import_s", "window_s", "startup_s", "idle_s"):
+        vals = sorted(s[key] for s in samples)                                                      # Sort for the median
+        result[key] = vals[len(vals) // 2]                                                          # Middle sample
+    result["loaded_at_paint"] = {m: any(s["loaded_at_paint"][m] for s in samples)
+                                 for m in DEFERRED_MODULES}                                         # True if ANY run imported it early
+    return result
+
+
+# 2.3.0 check_startup_budget — print a report and say whether the budget held -----------------------
+def check_startup_budget(result, budget=STARTUP_BUDGET_S):                                          # Returns True if within budget and imports stayed deferred
+    print("2.3.0     GUI Startup Benchmark")
+    print(f"2.3.0      Backend (PF connect, excluded) = {result['backend_s']:.3f} s")
+    print(f"2.3.0      gui_app import                 = {result['gui_import_s']:.3f} s")
+    print(f"2.3.0      App() + first paint            = {result['window_s']:.3f} s")
+    print(f"2.3.0      Deferred work (maps)           = {result['idle_s']:.3f} s")
+    print(f"2.3.0      Startup total                  = {result['startup_s']:.3f} s  (budget {budget:.2f} s)")
+    ok = result["startup_s"] <= budget                                                              # Budget check
+    for mod, loaded in result["loaded_at_paint"].items():                                           # Deferred import check
+        if loaded:                                                                                  # Someone imported it at module level again
+            print(f"2.3.0  {mod} was imported before first paint.")
+            ok = False
+    print("2.3.0      Startup within budget." if ok else "2.3.0  Startup budget exceeded.")
+    print()
+    return ok
+
+
+#====================================================================================================
+# 3.0  Hot-Path Benchmarks (offline PowerFactory stand-in)
+#====================================================================================================
+#   Times the code that runs on every RUN — result extraction, overrides, monitor /
+#   results setup, the GUI cache update, the suburb plot and CSV export — against
+#   otaki_offline with a chosen number of suburbs and result rows. Median time and
+#   tracemalloc peak per case are compared with a saved baseline; slower or larger
+#   than the thresholds is reported as a regression.
+
+
+# 3.1.0 Hot-path settings ----------------------------------------------------------------------------
+HOT_SIZES      = ((16, 24), (200, 24), (16, 8760))                                                  # (suburbs, result rows); 16 = the Otaki model itself
+HOT_REPEAT     = 5                                                                                  # Timed calls per case, the median is kept
+BASELINE_PATH  = os.path.join(HERE, "otaki_bench_baseline.json")                                    # Per machine, not committed
+REGRESSION_PCT = 25.0                                                                               # Median slower than baseline by more than this → flagged
+MEMORY_PCT     = 25.0                                                                               # Peak memory above baseline by more than this → flagged
+NOISE_S        = 2e-4                                                                               # Differences below this are timer noise
+NOISE_KB       = 64.0                                                                               # … and below this allocator noise
+
+
+# 3.2.0 _measure — median / best time over `repeat` calls, then one call under tracemalloc --------
+def _measure(fn, repeat=HOT_REPEAT):
+    import time, tracemalloc, statistics, contextlib
+    times = []
+    with open(os.devnull, "w", encoding="utf-8") as null, contextlib.redirect_stdout(null):         # otaki_sim / gui_app progress prints are not timed
+        fn()                                                                                        # Warm-up (imports, first figure draw)
+        for _ in range(int(repeat)):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+    return {"median_s": statistics.median(times), "best_s": min(times), "peak_kb": peak / 1024.0}
+
+
+# 3.3.0 _GuiHost — the App state the GUI hot paths read, with an Agg canvas instead of Tk -------------
+class _Value:                                                                                       # Stands in for tk.StringVar / DoubleVar
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _GuiHost:
+    """App methods bound to a plain object: no Tk root, so it runs headless."""
+    def __init__(self, gui, keys):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self._gui = gui
+        self.fig = Figure(figsize=(5, 3), dpi=100)
+        self.ax = self.fig.add_subplot(111)
+        self.ax2 = self.ax.twinx()
+        self.canvas_mpl = FigureCanvasAgg(self.fig)
+        self.canvas_mpl.get_tk_widget = lambda: self                                                # _plot_curves flushes Tk after drawing
+        self.compare_var = _Value("Off")
+        self.baseline_results = None
+        self.ordered_pv_keys = list(keys)
+        self.slider_vars = {k: _Value(50.0) for k in keys}
+        self.inv_kw_vars = {k: _Value(6.0) for k in keys}
+        self.suburb_state = {k: dict(gui.SUBURB_DEFAULTS, bus=k.replace("_PV", "_0.415")) for k in keys}
+
+    def __getattr__(self, name):                                                                    # Any other App method, bound to this host
+        fn = getattr(self._gui.App, name)
+        if not callable(fn):
+            raise AttributeError(name)
+        return fn.__get__(self)
+
+    def update_idletasks(self):
+        pass
+
+    def _ensure_figure(self):
+        return True
+
+
+# 3.4.0 hot_path_cases — {case name: zero-argument callable} for one network size ----------------
+def hot_path_cases(sim, gui, host, res, csv_path):
+    app = sim.app
+    buses = sorted(sim.BUS_LIST)
+    key = host.ordered_pv_keys[0]
+
+    def csv_export():
+        import tkinter.filedialog as fd
+        ask, box = fd.asksaveasfilename, gui.messagebox
+        fd.asksaveasfilename = lambda **kw: csv_path                                                # No dialogs in a benchmark
+        gui.messagebox = type("Quiet", (), {"showinfo": staticmethod(print), "showerror": staticmethod(print)})
+        try:
+            host._export_to_csv()
+        finally:
+            fd.asksaveasfilename, gui.messagebox = ask, box
+
+    return {
+        "get_dynamic_results": lambda: [sim.get_dynamic_results(app, res, f"{b}.ElmTerm", "m:u1", verbose=False) for b in buses],
+        "extract_qds_results": lambda: sim.extract_qds_results(app, res),
+        "apply_overrides":     lambda: (sim.apply_pv_inverter_overrides(app, sim.PV_INV_OVERRIDES),
+                                        sim.apply_pv_panel_overrides(app, sim.PV_PANEL_OVERRIDES)),
+        "gui_cache_update":    lambda: host._update_cache_from_results(sim.RESULTS),
+        "gui_plot_curves":     lambda: host._plot_curves(key, *host._suburb_series(key)),
+        "csv_export":          csv_export,
+        "monitor_setup":       lambda: sim.prepare_quasi_dynamic(app, sim.build_monitored_dict()),  # Last: it clears `res`
+    }
+
+
+# 3.5.0 run_hot_paths — every case at every size, results keyed "case@suburbs×rows" ------------
+def run_hot_paths(sizes=HOT_SIZES, repeat=HOT_REPEAT, cases=None):
+    import tempfile, contextlib
+    os.environ["OTAKI_OFFLINE"] = "1"                                                               # Must be set before otaki_sim is imported
+    with open(os.devnull, "w", encoding="utf-8") as null, contextlib.redirect_stdout(null):
+        import otaki_sim as sim
+    if not getattr(sim, "OFFLINE", False):
+        raise RuntimeError("3.5.0  otaki_sim is already connected to PowerFactory, run the benchmark on its own")
+    import matplotlib
+    matplotlib.use("Agg")
+    import otaki_offline as off, gui_app as gui
+
+    results = {}
+    tmp = tempfile.mkdtemp(prefix="otaki_bench_")
+    for suburbs, rows in sizes:
+        net = (off.network_from_sim(sim, gui.LOAD_CODE_TO_NAME) if int(suburbs) == 16
+               else off.scaled_network(suburbs))
+        saved_names = dict(gui.LOAD_CODE_TO_NAME)
+        with open(os.devnull, "w", encoding="utf-8") as null, contextlib.redirect_stdout(null):
+            saved = off.use_network(sim, net)
+            gui.LOAD_CODE_TO_NAME.update(net["code_to_name"])                                       # Plot / export find the generated loads
+            off.configure(rows=rows)
+            res, qds = sim.prepare_quasi_dynamic(sim.app, sim.build_monitored_dict())
+            sim.run_quasi_dynamic(qds)
+            sim.extract_qds_results(sim.app, res)                                                   # GUI cases read these RESULTS
+        try:
+            host = _GuiHost(gui, sorted(sim.PV_CONFIG))
+            for name, fn in hot_path_cases(sim, gui, host, res, os.path.join(tmp, "export.csv")).items():
+                if cases and name not in cases:
+                    continue
+                results[f"{name}@{suburbs}x{rows}"] = _measure(fn, repeat)
+        finally:
+            off.restore_network(sim, saved)
+            gui.LOAD_CODE_TO_NAME.clear(); gui.LOAD_CODE_TO_NAME.update(saved_names)
+            off.configure(rows=24)
+    return results
+
+
+# 3.6.0 save_baseline / check_regressions ------------------------------------------------------------
+def save_baseline(results, path=BASELINE_PATH):
+    import platform
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "machine": platform.node(), "results": results}, f, indent=1)
+    return path
+
+
+def check_regressions(results, path=BASELINE_PATH, time_pct=REGRESSION_PCT, mem_pct=MEMORY_PCT):
+    """Prints one line per case; returns the list of flagged "case: reason" strings."""
+    base = {}
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            base = json.load(f).get("results", {})
+    flagged = []
+    print("3.6.0     Hot-Path Benchmark" + ("" if base else "  (no baseline yet, --save-baseline to store one)"))
+    print(f"3.6.0      {'case':<36}{'median ms':>11}{'best ms':>10}{'peak KB':>11}  vs base")
+    for name, r in results.items():
+        b = base.get(name)
+        note = ""
+        if b:
+            dt = r["median_s"] - b["median_s"]
+            dm = r["peak_kb"] - b["peak_kb"]
+            note = f"{100.0 * dt / max(b['median_s'], 1e-12):+.0f}%"
+            if dt > NOISE_S and dt > b["median_s"] * time_pct / 100.0:
+                flagged.append(f"{name}: {b['median_s'] * 1e3:.2f} → {r['median_s'] * 1e3:.2f} ms")
+                note += " SLOWER"
+            if dm > NOISE_KB and dm > b["peak_kb"] * mem_pct / 100.0:
+                flagged.append(f"{name}: peak {b['peak_kb']:.0f} → {r['peak_kb']:.0f} KB")
+                note += " MEMORY"
+        print(f"3.6.0      {name:<36}{r['median_s'] * 1e3:>11.2f}{r['best_s'] * 1e3:>10.2f}{r['peak_kb']:>11.0f}  {note}")
+    for f in flagged:
+        print(f"3.6.0  Regression {f}")
+    print("3.6.0      No regressions." if not flagged else f"3.6.0  {len(flagged)} regression(s).")
+    print()
+    return flagged
+
+
+#====================================================================================================
+# 4.0  Monitor Scaling Benchmark (offline PowerFactory stand-in)
+#====================================================================================================
+#   Monitor setup (prepare_quasi_dynamic) and extraction (extract_qds_results) timed at
+#   growing element counts, per MONITOR_MODE. Synthetic suburbs have five monitored
+#   elements each (bus, load, PV, transformer, line). Near-linear means the time per
+#   element stays flat: the log-log slope between sizes is close to 1.
+
+
+# 4.1.0 Scaling settings -----------------------------------------------------------------------------
+SCALE_ELEMENTS  = (100, 1000, 10000)                                                                # Monitored elements per size
+SCALE_MODES     = ("element", "bulk")                                                               # otaki_sim.MONITOR_MODE values compared
+SCALE_REPEAT    = 3                                                                                 # Timed calls per size, the median is kept
+SCALE_MAX_SLOPE = 1.2                                                                               # Log-log slope above this is not near-linear
+
+
+# 4.2.0 run_scaling — {mode: {elements: {"setup_s", "extract_s", "series"}}} ---------------------
+def run_scaling(elements=SCALE_ELEMENTS, modes=SCALE_MODES, repeat=SCALE_REPEAT, rows=24):
+    import time, statistics, contextlib
+    os.environ["OTAKI_OFFLINE"] = "1"
+    with open(os.devnull, "w", encoding="utf-8") as null, contextlib.redirect_stdout(null):
+        import otaki_sim as sim
+    if not getattr(sim, "OFFLINE", False):
+        raise RuntimeError("4.2.0  otaki_sim is already connected to PowerFactory, run the benchmark on its own")
+    import otaki_offline as off
+
+    def timed(fn):
+        times = []
+        for _ in range(int(repeat)):
+            t0 = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+        return statistics.median(times), out
+
+    results, mode0 = {}, sim.MONITOR_MODE
+    for n in elements:
+        with open(os.devnull, "w", encoding="utf-8") as null, contextlib.redirect_stdout(null):
+            saved = off.use_network(sim, off.scaled_network(max(1, int(n) // 5)))
+            off.configure(rows=rows)
+            try:
+                monitored = sim.build_monitored_dict()
+                for mode in modes:
+                    sim.MONITOR_MODE = mode
+                    setup_s, (res, qds) = timed(lambda: sim.prepare_quasi_dynamic(sim.app, monitored))
+                    sim.run_quasi_dynamic(qds)                                                      # Not timed: the stand-in's own "solve"
+                    extract_s, _ = timed(lambda: sim.extract_qds_results(sim.app, res))
+                    series = sum(len(sim.RESULTS[g]) for g in ("bus", "load", "pv", "tx", "line"))
+                    results.setdefault(mode, {})[int(n)] = {"setup_s": setup_s, "extract_s": extract_s, "series": series}
+            finally:
+                sim.MONITOR_MODE = mode0
+                off.restore_network(sim, saved)
+                off.configure(rows=24)
+    return results
+
+
+# 4.3.0 check_scaling — per-element cost at each size and the slope between the first and last ---
+def check_scaling(results, max_slope=SCALE_MAX_SLOPE, require=("bulk",)):
+    """Prints a table per mode; returns the modes in `require` that did not scale near-linearly."""
+    import math
+    flagged = []
+    print("4.3.0     Monitor Scaling Benchmark")
+    print(f"4.3.0      {'mode':<9}{'elements':>9}{'series':>8}{'setup ms':>11}{'µs/elem':>9}{'extract ms':>12}{'µs/elem':>9}")
+    for mode, sizes in results.items():
+        ns = sorted(sizes)
+        for n in ns:
+            r = sizes[n]
+            print(f"4.3.0      {mode:<9}{n:>9}{r['series']:>8}{r['setup_s'] * 1e3:>11.1f}{r['setup_s'] / n * 1e6:>9.1f}"
+                  f"{r['extract_s'] * 1e3:>12.1f}{r['extract_s'] / n * 1e6:>9.1f}")
+        if len(ns) < 2:
+            continue
+        a, b = sizes[ns[0]], sizes[ns[-1]]
+        span = math.log(ns[-1] / ns[0])
+        slopes = {k: math.log(max(b[k], 1e-9) / max(a[k], 1e-9)) / span for k in ("setup_s", "extract_s")}
+        bad = [k for k, v in slopes.items() if v > max_slope]
+        print(f"4.3.0      {mode:<9}slope setup {slopes['setup_s']:.2f}, extract {slopes['extract_s']:.2f}"
+              + ("" if not bad else f"  above {max_slope:.2f}"))
+        if bad and mode in require:
+            flagged.append(mode)
+    print("4.3.0      Near-linear." if not flagged else f"4.3.0  Not near-linear: {', '.join(flagged)}.")
+    print()
+    return flagged
+
+
+#====================================================================================================
+# 5.0  Main
+#====================================================================================================
+#   python otaki_bench.py                      GUI cold-start budget (2.0)
+#   python otaki_bench.py hot [--sizes 16x24,1000x24] [--save-baseline]
+#   python otaki_bench.py scale [--elements 100,1000,10000] [--modes element,bulk]
+#   python otaki_bench.py all
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Otaki GUI / simulation benchmarks")
+    ap.add_argument("suite", nargs="?", default="startup", choices=("startup", "hot", "scale", "all"))
+    ap.add_argument("--sizes", default=None, help="suburbs x rows list, e.g. 16x24,1000x24")
+    ap.add_argument("--repeat", type=int, default=HOT_REPEAT)
+    ap.add_argument("--cases", default=None, help="comma separated case names (default: all)")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    ap.add_argument("--elements", default=None, help="monitored element counts for scale, e.g. 100,1000,10000")
+    ap.add_argument("--modes", default=None, help="MONITOR_MODE values for scale (default: element,bulk)")
+    ap.add_argument("--threshold", type=float, default=REGRESSION_PCT, help="%% slower that counts as a regression")
+    args = ap.parse_args(argv)
+
+    ok = True
+    if args.suite in ("startup", "all"):
+        ok = check_startup_budget(measure_startup()) and ok
+    if args.suite in ("hot", "all"):
+        sizes = HOT_SIZES if not args.sizes else [tuple(int(x) for x in s.lower().split("x")) for s in args.sizes.split(",")]
+        results = run_hot_paths(sizes, args.repeat, args.cases.split(",") if args.cases else None)
+        ok = not check_regressions(results, args.baseline, args.threshold) and ok
+        if args.save_baseline:
+            print(f"3.6.0      Baseline saved to {save_baseline(results, args.baseline)}")
+    if args.suite in ("scale", "all"):
+        elements = [int(x) for x in args.elements.split(",")] if args.elements else SCALE_ELEMENTS
+        modes = args.modes.split(",") if args.modes else SCALE_MODES
+        ok = not check_scaling(run_scaling(elements, modes)) and ok
+    return 0 if ok else 1                                                                           # Non-zero exit so CI / scripts notice a regression
+
+
+if __name__ == "__main__":
+    sys.exit(main())
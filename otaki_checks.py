@@ -0,0 +1,160 @@
+# otaki_checks.py
+# 1.0 Set Up Environment
+    # 1.1.0 Tolerances
+
+# 2.0 Known-Answer Checks
+    # 2.1.0 check_radial_single_feeder (hand-solved sweep)
+    # 2.2.0 check_radial_screen_shapes (scenario axis = separate runs)
+    # 2.3.0 check_adaptive_merge
+    # 2.4.0 check_compare_offsets
+    # 2.5.0 check_extreme_hours
+
+# 3.0 Command Line
+    # 3.1.0 run_all / main
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Small cases with answers worked out by hand, so a sign or per-unit-base slip in the
+#   NumPy code fails loudly instead of only changing a benchmark time:
+#       python otaki_checks.py          → one line per check, exit 1 if any fails
+#   No PowerFactory, workbook or network file is needed.
+
+
+import math, sys                                                                                    # Hand-solved answers, exit code
+import numpy as np                                                                                  # Same arrays the checked code returns
+
+
+# 1.1.0 Tolerances -----------------------------------------------------------------------------------
+TOL_PU  = 1e-7                                                                                      # Voltage (p.u.)
+TOL_PCT = 1e-5                                                                                      # Loading (%)
+
+
+def _close(what, got, want, tol):
+    got = np.asarray(got, dtype=float)
+    if got.shape != np.shape(want) or not np.allclose(got, want, rtol=0.0, atol=tol):
+        raise AssertionError(f"{what}: got {got.tolist()}, expected {np.asarray(want).tolist()}")
+
+
+#====================================================================================================
+# 2.0  Known-Answer Checks
+#====================================================================================================
+
+
+# 2.1.0 check_radial_single_feeder — one purely resistive feeder exporting PV ----------------------
+#   Transformer 500 kVA, uk = ur = 2 %   → z_tx = 0.02 × (1000 / 500) = 0.04 p.u. on 1 MVA
+#   Line r = 0.06 × 0.415² Ω, x = 0      → z_ln = 0.06 p.u.              (R = 0.1 p.u. in total)
+#   PV 500 kW, no load                    → s = −0.5 p.u. at unity power factor
+#   V real: V = 1 + R·0.5 / V  →  V² − V − 0.05 = 0  →  V = (1 + √1.2) / 2 = 1.0477…  (a rise)
+#   I = 0.5 / V; tx rated 0.5 p.u. → 2·I·100 %; line rated i_base / 2 → 2·I·100 % as well
+def _one_feeder():
+    import otaki_radial
+    i_base = otaki_radial.S_BASE_KVA / (math.sqrt(3.0) * otaki_radial.U_LV_KV)
+    return otaki_radial.build_model({"u_lv_kv": otaki_radial.U_LV_KV, "suburbs": {"X_PV": {
+        "bus": "X_0.415", "tx": "X_T1", "line": "X_pline", "loads": [], "u_source_pu": 1.0,
+        "sn_kva": 500.0, "uk_pct": 2.0, "ur_pct": 2.0,
+        "r_ohm": 0.06 * otaki_radial.U_LV_KV ** 2, "x_ohm": 0.0, "i_rated_a": i_base / 2.0}}})
+
+
+def check_radial_single_feeder():
+    import otaki_radial
+    model = _one_feeder()
+    _close("z_tx (p.u.)", model["z_tx"].real, [0.04], 1e-12)
+    _close("z_ln (p.u.)", model["z_ln"].real, [0.06], 1e-12)
+    v = (1.0 + math.sqrt(1.2)) / 2.0
+    i = 0.5 / v
+    out = otaki_radial.screen(model, np.array([[0.0], [0.0]]), np.array([[500.0], [0.0]]))
+    _close("u_pu", out["u_pu"][:, 0], [v, 1.0], TOL_PU)                                             # Export lifts the bus, no flow leaves it at 1.0
+    _close("tx_pct", out["tx_pct"][:, 0], [200.0 * i, 0.0], TOL_PCT)
+    _close("line_pct", out["line_pct"][:, 0], [200.0 * i, 0.0], TOL_PCT)
+
+
+# 2.2.0 check_radial_screen_shapes — an (S, T, K) call equals S separate (T, K) calls -------------
+def check_radial_screen_shapes():
+    import otaki_radial
+    model = _one_feeder()
+    rng = np.random.default_rng(0)
+    load, pv = rng.uniform(0, 300, (3, 4, 1)), rng.uniform(0, 300, (3, 4, 1))
+    batch = otaki_radial.screen(model, load, pv)["u_pu"]
+    each = np.stack([otaki_radial.screen(model, load[s], pv[s])["u_pu"] for s in range(3)])
+    _close("batched u_pu", batch, each, 10 * otaki_radial.TOL_PU)                                   # Rows may stop a sweep apart
+    lo = otaki_radial.screen(model, np.array([[300.0]]), np.array([[0.0]]))["u_pu"][0, 0]
+    if not lo < 1.0:                                                                                # Import must drop the voltage
+        raise AssertionError(f"import raised the bus voltage to {lo}")
+
+
+# 2.3.0 check_adaptive_merge — coarse rows outside the window, fine rows inside, one axis --------
+def check_adaptive_merge():
+    import otaki_adaptive
+    coarse = {"bus": {"B": {"t": [0, 3600, 7200, 10800], "u_pu": [1.0, 1.1, 1.2, 1.3]}}}
+    ft = list(range(0, 10801, 1200))                                                                # Fine run longer than its window
+    fine = {"bus": {"B": {"t": ft, "u_pu": [2.0 + k for k in range(len(ft))]}}}
+    out = otaki_adaptive.merge(coarse, [fine], [(3600.0, 7200.0)])["bus"]["B"]
+    _close("merged t", out["t"], [0, 3600, 4800, 6000, 7200, 10800], 0.0)
+    _close("merged u_pu", out["u_pu"], [1.0, 5.0, 6.0, 7.0, 8.0, 1.3], 0.0)
+    back = otaki_adaptive.resample({"bus": {"B": out}}, coarse["bus"]["B"]["t"])["bus"]["B"]        # Surrogate axis: coarse stamps, fine values
+    _close("resampled u_pu", back["u_pu"], [1.0, 5.0, 8.0, 1.3], 0.0)
+    t, flags, _ = otaki_adaptive.near_limits(coarse)
+    _close("near_limits flags", flags, [False, True, True, True], 0.0)
+    _close("windows", otaki_adaptive.windows(t, [False, False, True, False], pad=1), [(3600.0, 10800.0)], 0.0)
+
+
+# 2.4.0 check_compare_offsets — runs on different days line up by offset from their own start ----
+def check_compare_offsets():
+    import otaki_results
+    base = {"bus": {"B": {"t": [100.0, 3700.0, 7300.0], "u_pu": [1.00, 1.02, 1.01]}}}
+    cur = {"bus": {"B": {"t": [86500.0, 90100.0], "u_pu": [1.00, 1.05]}}}
+    out = otaki_results.compare(cur, base, fields=(("bus", "u_pu"),))
+    _close("hours", out["hours"], [0.0, 1.0], 0.0)
+    s = out["bus"]["summary"]["B"]
+    _close("max_abs / hour", [s["max_abs"], s["max_abs_hour"]], [0.03, 1.0], 1e-12)
+    _close("peak_delta", [s["peak_delta"]], [0.03], 1e-12)
+
+
+# 2.5.0 check_extreme_hours — min / max hours from the stamps, the same after pack / unpack -------
+def check_extreme_hours():
+    import otaki_results
+    rec = otaki_results.volt_extremes({"t": [3600.0, 5400.0, 9000.0], "u_pu": [1.00, 1.06, 0.94]})  # Uneven axis, as an adaptive run
+    _close("hours", [rec["u_pu_max_hour"], rec["u_pu_min_hour"]], [0.5, 1.5], 0.0)
+    back = otaki_results.unpack_results(otaki_results.pack_results({"bus": {"B": rec}}))["bus"]["B"]
+    _close("unpacked hours", [back["u_pu_max_hour"], back["u_pu_min_hour"]], [0.5, 1.5], 0.0)
+    gap = otaki_results.volt_extremes({"t": [0.0, 3600.0, 7200.0, 10800.0], "u_pu": [1.0, float("nan"), 1.06, 0.9]})
+    back = otaki_results.unpack_results(otaki_results.pack_results({"bus": {"B": gap}}))["bus"]["B"] # A gap must not shift later rows
+    _close("gap hours", [back["u_pu_min_hour"], back["u_pu_max_hour"], len(back["u_pu"])], [3, 2, 4], 0.0)
+    hourly = otaki_results.volt_extremes({"t": [0.0, 3600.0, 7200.0], "u_pu": [1.0, 0.9, 1.1]})
+    if [hourly["u_pu_min_hour"], hourly["u_pu_max_hour"]] != [1, 2]:                                # 1 h rows: the row index, as before
+        raise AssertionError(f"hourly rows gave {hourly['u_pu_min_hour']} / {hourly['u_pu_max_hour']}")
+
+
+#====================================================================================================
+# 3.0  Command Line
+#====================================================================================================
+
+
+CHECKS = (check_radial_single_feeder, check_radial_screen_shapes, check_adaptive_merge, check_compare_offsets,
+          check_extreme_hours)
+
+
+# 3.1.0 run_all / main — every check, failures listed, exit 1 if any ----------------------------
+def run_all(checks=CHECKS):
+    failed = []
+    for check in checks:
+        try:
+            check()
+            print(f"3.1.0      ok    {check.__name__}")
+        except Exception as e:
+            failed.append(check.__name__)
+            print(f"3.1.0      FAIL  {check.__name__}: {e}")
+    return failed
+
+
+def main():
+    failed = run_all()
+    print(f"3.1.0  {len(CHECKS) - len(failed)} of {len(CHECKS)} checks passed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# otaki_cli.py
+# 1.0 Set Up Environment
+    # 1.1.0 Output columns
+
+# 2.0 Streaming Outputs
+    # 2.1.0 CsvSink
+    # 2.2.0 ArchiveSink (JSON lines)
+
+# 3.0 Batch Run
+    # 3.1.0 run_batch
+    # 3.2.0 print_summary
+
+# 4.0 Main
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Headless batch runs, no Tk needed:
+#       python otaki_cli.py scenarios.json --csv out.csv --archive runs.jsonl
+#       python otaki_cli.py scenarios.csv --backend radial --resume --archive runs.jsonl
+#       python otaki_cli.py scenarios.json --offline            (otaki_offline stand-in)
+#   One PowerFactory session serves the whole file. Every scenario's rows are written
+#   and flushed as soon as it finishes, so an interrupted overnight batch keeps what it
+#   did, and --resume skips scenarios already in the archive.
+
+
+import os, sys, csv, json, time, contextlib                                                         # Standard library only, otaki_sim is imported in main()
+
+
+# 1.1.0 Output columns -------------------------------------------------------------------------------
+CSV_FIELDS = ("scenario", "signature", "pv_key", "inverters", "kw_per_inv", "installed_kw",
+              "u_min", "u_max", "hours_out", "tx_loading_max", "line_loading_max", "pv_energy",
+              "load_kwh", "pv_kwh", "import_kwh", "export_kwh", "self_consumption", "self_sufficiency",
+              "rpf_hours", "peak_load_kw", "peak_pv_kw", "tx_rpf_hours", "tx_peak_loading_pct")     # One row per scenario × suburb
+
+
+#====================================================================================================
+# 2.0  Streaming Outputs
+#====================================================================================================
+
+
+# 2.1.0 CsvSink — per-suburb rows, flushed after every scenario -----------------------------------
+class CsvSink:
+    def __init__(self, path, append=False):
+        new = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self.f = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self.w = csv.DictWriter(self.f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        if new:
+            self.w.writeheader()
+
+    def write(self, name, sig, rows):
+        for r in rows:
+            self.w.writerow(dict(r, scenario=name, signature=sig))
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# 2.2.0 ArchiveSink — one JSON object per line: inputs, summary and the full result snapshot --------
+class ArchiveSink:
+    def __init__(self, path, append=False):
+        self.f = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record):
+        self.f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.f.flush()
+        os.fsync(self.f.fileno())                                                                   # A crash at 3 am loses at most the current scenario
+
+    def close(self):
+        self.f.close()
+
+    @staticmethod
+    def done(path):                                                                                 # Signatures already archived (for --resume)
+        sigs = set()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:                                                              # Half-written last line
+                        continue
+                    if rec.get("ok"):
+                        sigs.add(rec.get("signature"))
+        return sigs
+
+
+#====================================================================================================
+# 3.0  Batch Run
+#====================================================================================================
+
+
+# 3.1.0 run_batch — every scenario in order through one otaki_sim session -------------------------
+def run_batch(sim, scenarios, sinks=(), backend=None, skip=(), log=None, out=None):
+    """
+    sim: the imported otaki_sim module. sinks: objects with write(name, sig, rows)
+    (CsvSink) or write(record) (ArchiveSink). skip: signatures not to run again.
+    log: file for otaki_sim's own prints (None = discarded). out: progress stream.
+    Returns one summary dict per scenario.
+    """
+    import otaki_scenarios as osc
+    out = out or sys.stdout
+    cache = osc.ResultCache()
+    summary = []
+    null = None if log else open(os.devnull, "w", encoding="utf-8")
+    try:
+        _run_all(sim, osc, scenarios, sinks, backend, skip, log or null, out, cache, summary)
+    finally:
+        if null:
+            null.close()
+    return summary
+
+
+def _run_all(sim, osc, scenarios, sinks, backend, skip, log, out, cache, summary):
+    for i, sc in enumerate(scenarios, 1):
+        inverters, panels, sig = osc.resolve(sim, sc, backend)
+        if sig in skip:
+            print(f"[{i}/{len(scenarios)}] {sc['name']}: already archived, skipped", file=out)
+            summary.append({"name": sc["name"], "signature": sig, "status": "skipped"})
+            continue
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            try:
+                results, sig, cached = osc.run_scenario(sim, sc, cache, backend)
+                error = "" if results else "simulation failed"
+            except Exception as e:                                                                  # One bad scenario must not end the batch
+                results, cached, error = {}, False, f"{e.__class__.__name__}: {e}"
+        dt = time.perf_counter() - t0
+        rows, worst = osc.summarise(results, sim.PV_CONFIG, inverters, panels, sim.PANEL_WATT) if results else ([], {})
+        status = "error" if error else ("cached" if cached else "ok")
+        for sink in sinks:
+            if isinstance(sink, ArchiveSink):
+                sink.write({"name": sc["name"], "signature": sig, "ok": not error, "error": error,
+                            "seconds": round(dt, 3), "inverters": inverters, "panels": panels,
+                            "worst": worst, "rows": rows, "results": results})
+            elif rows:
+                sink.write(sc["name"], sig, rows)
+        summary.append(dict(worst, name=sc["name"], signature=sig, status=status, seconds=dt, error=error))
+        print(f"[{i}/{len(scenarios)}] {sc['name']}: {status} in {dt:.1f} s"
+              + (f" — {error}" if error else f", Vmin {worst['u_min'] or float('nan'):.3f} Vmax {worst['u_max'] or float('nan'):.3f}"),
+              file=out)
+
+
+# 3.2.0 print_summary — one line per scenario, worst values across the network ------------------
+def print_summary(summary, out=None):
+    out = out or sys.stdout
+
+    def f(v, fmt):
+        return format(v, fmt) if isinstance(v, (int, float)) else "-"
+
+    print(f"\n{'scenario':<24}{'status':>8}{'s':>8}{'Vmin':>8}{'Vmax':>8}{'Tx %':>8}{'Line %':>8}{'buses out':>11}"
+          f"{'export kWh':>12}{'Tx RPF':>8}", file=out)
+    for s in summary:
+        print(f"{s['name'][:23]:<24}{s['status']:>8}{f(s.get('seconds'), '.1f'):>8}{f(s.get('u_min'), '.3f'):>8}"
+              f"{f(s.get('u_max'), '.3f'):>8}{f(s.get('tx_loading_max'), '.1f'):>8}"
+              f"{f(s.get('line_loading_max'), '.1f'):>8}{f(s.get('buses_out'), 'd'):>11}"
+              f"{f(s.get('export_kwh'), ',.0f'):>12}{f(s.get('rpf_transformers'), 'd'):>8}", file=out)
+    failed = sum(1 for s in summary if s["status"] == "error")
+    print(f"\n{len(summary)} scenario(s), {failed} failed.", file=out)
+
+
+#====================================================================================================
+# 4.0  Main
+#====================================================================================================
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Run Otaki PV scenarios without the GUI")
+    ap.add_argument("scenarios", help="scenario file (.json or .csv)")
+    ap.add_argument("--csv", help="per-suburb results, written as each scenario finishes")
+    ap.add_argument("--archive", help="JSON lines archive with the full results of every scenario")
+    ap.add_argument("--backend", choices=("pf", "radial"), default=None, help="default: otaki_sim.SIM_BACKEND")
+    ap.add_argument("--resume", action="store_true", help="append to the outputs, skip scenarios already archived")
+    ap.add_argument("--offline", action="store_true", help="use the otaki_offline stand-in instead of PowerFactory")
+    ap.add_argument("--trace", action="store_true", help="PF API hotspot report after each run (into --log)")
+    ap.add_argument("--log", help="file for otaki_sim's progress output (default: discarded)")
+    args = ap.parse_args(argv)
+
+    if args.offline:
+        os.environ["OTAKI_OFFLINE"] = "1"                                                           # Read by otaki_sim at import
+    if args.trace:
+        os.environ["OTAKI_TRACE"] = "1"
+    log = open(args.log, "a", encoding="utf-8") if args.log else open(os.devnull, "w", encoding="utf-8")
+    sinks = []
+    try:
+        with contextlib.redirect_stdout(log):
+            import otaki_sim as sim                                                                 # PF connect + project activation, once
+        if (args.backend or sim.SIM_BACKEND) == "radial":                                           # Missing otaki_radial.json would fail every scenario
+            import otaki_radial
+            otaki_radial.load_network()                                                             # FileNotFoundError says to export it first
+        import otaki_scenarios as osc
+        scenarios = osc.load_scenarios(args.scenarios, sim.PV_CONFIG)
+        print(f"{len(scenarios)} scenario(s) from {args.scenarios}")
+        skip = ArchiveSink.done(args.archive) if args.resume else set()
+        if args.csv:
+            sinks.append(CsvSink(args.csv, append=args.resume))
+        if args.archive:
+            sinks.append(ArchiveSink(args.archive, append=args.resume))
+        summary = run_batch(sim, scenarios, sinks, args.backend, skip, log)
+    except (OSError, ValueError) as e:
+        print(f"otaki_cli: {e}", file=sys.stderr)
+        return 2
+    finally:
+        for s in sinks:
+            s.close()
+        log.close()
+    print_summary(summary)
+    return 0 if all(s["status"] != "error" for s in summary) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
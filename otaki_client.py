@@ -0,0 +1,127 @@
+# otaki_client.py
+# 1.0 Set Up Environment
+    # 1.1.0 Server
+    # 1.2.0 Network definition (same file otaki_sim loads)
+    # 1.3.0 Results store and the model's counts (from the server)
+
+# 2.0 Runs
+    # 2.1.0 set_penetrations_and_run (GUI adapter, one server job)
+    # 2.2.0 preview_from_surrogate (fitted here from the returned runs)
+
+# 3.0 Indexes
+    # 3.1.0 names
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Thin-client stand-in for otaki_sim in the GUI. With OTAKI_SERVER set, gui_app imports
+#   this module instead of otaki_sim, so nothing connects to PowerFactory at start-up:
+#
+#       python otaki_server.py                                   # owns the PF session
+#       set OTAKI_SERVER=http://127.0.0.1:8765 && python gui_app.py
+#
+#   It carries the names the GUI reads from otaki_sim (PV_CONFIG, RESULTS, PANEL_WATT,
+#   overrides, names(), set_penetrations_and_run …). Each RUN is one otaki_server job;
+#   its results are copied into RESULTS in place, as otaki_sim does after a QDS run.
+
+
+import os                                                                                           # OTAKI_SERVER / OTAKI_NETWORK
+import otaki_network                                                                                # Network file, no PowerFactory needed
+import otaki_server                                                                                 # Client, default host / port
+
+
+# 1.1.0 Server ---------------------------------------------------------------------------------------
+SERVER_URL  = os.environ.get("OTAKI_SERVER") or f"http://{otaki_server.HOST}:{otaki_server.PORT}"   # Where otaki_server listens
+RUN_TIMEOUT = None                                                                                  # Seconds to wait for a run, None = as long as it takes
+CLIENT      = otaki_server.Client(SERVER_URL, timeout=5.0)                                          # Per request; runs are polled
+PRINT_PV_OVERRIDES = False                                                                          # Read by the GUI, as otaki_sim 1.3.0
+
+
+# 1.2.0 Network definition (otaki_network.json, or OTAKI_NETWORK=<file>) ---------------------------
+NETWORK    = otaki_network.load(os.environ.get("OTAKI_NETWORK") or otaki_network.DEFAULT_FILE)      # Must match the server's file
+BUS_LIST   = NETWORK.lists()["bus"]                                                                 # Heatmap columns
+PV_CONFIG  = NETWORK.pv_config()                                                                    # pv_key → {bus, load, pline, tx, homes}
+LOAD_NAMES = NETWORK.load_names()                                                                   # Load code → PF load name
+
+
+# 1.3.0 Results store and the model's counts (from the server) ---------------------------------------
+RESULTS            = {"bus": {}, "load": {}, "pv": {}, "tx": {}, "line": {}}                        # Filled in place after each run
+PV_INV_OVERRIDES   = {}                                                                             # pv_key → inverters, the server's model counts
+PV_PANEL_OVERRIDES = {}                                                                             # pv_key → panels per inverter (the GUI sets these before RUN)
+PANEL_WATT         = 240.0                                                                          # Replaced by the server's otaki_sim.PANEL_WATT
+
+
+def refresh_from_server():                                                                          # True if the server answered
+    global PANEL_WATT
+    try:
+        st = CLIENT.status()
+    except Exception as e:                                                                          # GUI still starts, RUN reports the error
+        print(f"1.3.0  otaki_server not reachable at {SERVER_URL}: {e}")
+        return False
+    PANEL_WATT = float(st.get("panel_watt") or PANEL_WATT)
+    PV_INV_OVERRIDES.update({k: int(v) for k, v in (st.get("inverters") or {}).items()})
+    PV_PANEL_OVERRIDES.update({k: int(v) for k, v in (st.get("panels") or {}).items()})
+    print(f"1.3.0      otaki_server at {SERVER_URL}: {st.get('backend')} backend, {len(PV_INV_OVERRIDES)} PV systems.")
+    return True
+
+
+refresh_from_server()
+
+
+#====================================================================================================
+# 2.0  Runs
+#====================================================================================================
+
+
+# 2.1.0 set_penetrations_and_run — same contract as otaki_sim 4.4.0 ------------------------------
+def set_penetrations_and_run(pv_overrides=None):                                                    # {} on failure, else a copy of RESULTS
+    inverters = dict(pv_overrides or PV_INV_OVERRIDES)
+    scenario = {"name": "gui", "inverters": inverters,
+                "kw_per_inv": {k: n * PANEL_WATT / 1000.0 for k, n in PV_PANEL_OVERRIDES.items()}}  # otaki_scenarios turns kW back into whole panels
+    try:
+        results = CLIENT.run(scenario, timeout=RUN_TIMEOUT)
+    except Exception as e:
+        print(f"2.1.0  Server run failed: {e}")
+        return {}
+    for key in [k for k in RESULTS if k not in results]:                                            # e.g. the previous run's metrics
+        RESULTS.pop(key)
+    for key, value in results.items():                                                              # In place, the GUI holds these dicts
+        if isinstance(value, dict) and isinstance(RESULTS.get(key), dict):
+            RESULTS[key].clear(); RESULTS[key].update(value)
+        else:
+            RESULTS[key] = value
+    try:                                                                                            # Live preview fitted here, as otaki_sim 4.5 does
+        import otaki_surrogate
+        otaki_surrogate.add_run(RESULTS, inverters, PV_PANEL_OVERRIDES, PV_CONFIG)
+    except Exception as e:
+        print(f"2.1.0  Surrogate not updated: {e}")
+    print("2.1.0  Server run completed, returning RESULTS.")
+    return dict(RESULTS)
+
+
+# 2.2.0 preview_from_surrogate — {} before the first run -------------------------------------------
+def preview_from_surrogate(inverters, panels):
+    try:
+        import otaki_surrogate
+        return otaki_surrogate.predict(inverters, panels)
+    except Exception as e:
+        print(f"2.2.0  Surrogate preview failed: {e}")
+        return {}
+
+
+#====================================================================================================
+# 3.0  Indexes
+#====================================================================================================
+
+
+# 3.1.0 names — exact pv_key ↔ element names, as otaki_sim 4.12 -----------------------------------
+NAMES = {"index": None}
+
+
+def names():
+    if NAMES["index"] is None:
+        import otaki_names
+        NAMES["index"] = otaki_names.from_config(PV_CONFIG, LOAD_NAMES)
+    return NAMES["index"]
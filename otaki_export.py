@@ -0,0 +1,307 @@
+# otaki_export.py
+# 1.0 Set Up Environment
+    # 1.1.0 Export settings
+    # 1.2.0 Cancelled
+
+# 2.0 Series Tables
+    # 2.1.0 _series (RESULTS → one time × element matrix per group / field)
+    # 2.2.0 stats_rows (per element min / max / mean + stored scalars and metrics)
+
+# 3.0 Writers (streamed in chunks)
+    # 3.1.0 _CsvOut
+    # 3.2.0 _ArrowOut (Parquet / Feather, needs pyarrow)
+    # 3.3.0 _write_long
+    # 3.4.0 _write_wide
+
+# 4.0 Export
+    # 4.1.0 export_results
+    # 4.2.0 start_export (worker thread)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Full-network export: every bus, load, PV, transformer and line, every time step,
+#   plus a per-element stats sidecar (<name>_stats.csv). Two layouts:
+#       long : group, element, field, step, t, value       (one row per element × step)
+#       wide : step, t, <group>/<element>/<field> ...      (one row per time step)
+#   Rows are written in chunks so memory stays flat and progress can be reported;
+#   start_export() runs the whole thing on a worker thread for the GUI.
+#   .parquet / .feather need pyarrow, imported only when asked for.
+
+
+import os, csv, time, threading                                                                     # Standard library writers, worker thread
+import numpy as np                                                                                  # Series matrices
+
+
+# 1.1.0 Export settings ------------------------------------------------------------------------------
+CHUNK_ROWS = 50_000                                                                                 # Time steps per block / progress callback
+FLOAT_FMT  = "%.6g"                                                                                 # CSV number format (~1 W / 0.000001 p.u.)
+FORMATS    = {".csv": "csv", ".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+LAYOUTS    = ("long", "wide")
+
+
+# 1.2.0 Cancelled — the stop event was set; the partial file has been removed ---------------------
+class Cancelled(Exception):
+    pass
+
+
+def columnar_available():                                                                           # Parquet / Feather possible here?
+    try:
+        import pyarrow
+        return bool(pyarrow.__version__)
+    except ImportError:
+        return False
+
+
+#====================================================================================================
+# 2.0  Series Tables
+#====================================================================================================
+
+
+# 2.1.0 _series — [(group, field, names, t, M)] for every list-valued field in RESULTS -------------
+def _series(results):
+    from otaki_results import results_matrix
+    out = []
+    for group, recs in (results or {}).items():
+        if not isinstance(recs, dict):
+            continue
+        fields = []
+        for rec in recs.values():                                                                   # Fields in first-seen order
+            for k, v in (rec or {}).items():
+                if k != "t" and isinstance(v, (list, tuple)) and k not in fields:
+                    fields.append(k)
+        for field in fields:
+            names = [n for n, rec in recs.items() if isinstance((rec or {}).get(field), (list, tuple))]
+            names, t, M = results_matrix(results, group, field, names)
+            if M.size:
+                out.append((group, field, names, t, M))
+    return out
+
+
+# 2.2.0 stats_rows — one row per element / field, plus the scalars already stored (u_pu_min_hour …) -
+STATS_FIELDS = ("group", "element", "field", "n", "min", "min_t", "max", "max_t", "mean")
+
+
+def stats_rows(results, series=None):
+    rows = []
+    for group, field, names, t, M in (series if series is not None else _series(results)):
+        valid = ~np.isnan(M)
+        n = valid.sum(axis=0)
+        with np.errstate(all="ignore"):
+            lo, hi = np.where(valid, M, np.inf), np.where(valid, M, -np.inf)
+            i_lo, i_hi = lo.argmin(axis=0), hi.argmax(axis=0)
+            mean = np.nansum(M, axis=0) / np.maximum(n, 1)
+        for j, name in enumerate(names):
+            if not n[j]:
+                continue
+            rows.append({"group": group, "element": name, "field": field, "n": int(n[j]),
+                         "min": float(M[i_lo[j], j]), "min_t": float(t[i_lo[j]]) if i_lo[j] < t.size else None,
+                         "max": float(M[i_hi[j], j]), "max_t": float(t[i_hi[j]]) if i_hi[j] < t.size else None,
+                         "mean": float(mean[j])})
+    for group, recs in (results or {}).items():                                                     # Precomputed scalars and pv_meta
+        if not isinstance(recs, dict) or group == "metrics":
+            continue
+        for name, rec in recs.items():
+            for k, v in (rec or {}).items() if isinstance(rec, dict) else ():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    rows.append({"group": group, "element": name, "field": k, "n": 1,
+                                 "min": v, "max": v, "mean": v})
+    met = (results or {}).get("metrics") or {}                                                      # Energy / reverse-flow figures (otaki_metrics)
+    for kind in ("suburb", "tx", "line", "network"):
+        recs = {"network": met["network"]} if kind == "network" and "network" in met else met.get(kind) or {}
+        for name, rec in recs.items():
+            for k, v in rec.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    rows.append({"group": f"metrics/{kind}", "element": name, "field": k, "n": 1,
+                                 "min": v, "max": v, "mean": v})
+    return rows
+
+
+#====================================================================================================
+# 3.0  Writers
+#====================================================================================================
+
+
+# 3.1.0 _CsvOut — text built per block; step / time prefixes shared by every element ---------------
+class _CsvOut:
+    def __init__(self, path, columns, fmt=None, kinds=None):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.f.write(",".join(_csv_quote(c) for c in columns) + "\n")
+        self._prefix = (None, None)                                                                 # (t array, ["step,t," …]) of the last group
+
+    def _step_prefix(self, steps, t):
+        if self._prefix[0] is not t:
+            self._prefix = (t, [f"{i},{x:.6g}," for i, x in zip(steps.tolist(), t.tolist())])
+        return self._prefix[1]
+
+    def long_block(self, group, name, field, steps, t, v, keep):                                    # keep: mask of non-NaN steps
+        common = self._step_prefix(steps, t)
+        if not keep.all():
+            common = [common[i] for i in np.flatnonzero(keep)]
+        head = f"{_csv_quote(group)},{_csv_quote(name)},{_csv_quote(field)},"
+        vals = map((FLOAT_FMT).__mod__, v[keep].tolist())
+        self.f.write(head + ("\n" + head).join(map(str.__add__, common, vals)) + "\n")
+
+    def wide_block(self, steps, t, W):
+        row = ",".join([FLOAT_FMT] * W.shape[1])
+        text = "\n".join(map(str.__add__, self._step_prefix(steps, t), map(row.__mod__, map(tuple, W.tolist()))))
+        self.f.write(text.replace("nan", "") + "\n")                                                # Numbers only here: NaN padding → empty cell
+
+    def close(self):
+        self.f.close()
+
+
+def _csv_quote(s):
+    s = str(s)
+    return '"' + s.replace('"', '""') + '"' if any(c in s for c in ',"\n') else s
+
+
+# 3.2.0 _ArrowOut — same blocks as record batches (Parquet row groups / Feather batches) -----------
+class _ArrowOut:
+    def __init__(self, path, columns, fmt, kinds):
+        import pyarrow as pa                                                                        # Optional dependency
+        self.pa = pa
+        self.schema = pa.schema([(c, pa.dictionary(pa.int32(), pa.string()) if k == "U" else
+                                  pa.int64() if k == "i" else pa.float64()) for c, k in zip(columns, kinds)])
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self.w = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            import pyarrow.ipc as ipc
+            self.sink = pa.OSFile(path, "wb")
+            self.w = ipc.new_file(self.sink, self.schema)
+
+    def _batch(self, arrays):
+        self.w.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def long_block(self, group, name, field, steps, t, v, keep):
+        pa, n = self.pa, int(keep.sum())
+        idx = pa.array(np.zeros(n, dtype=np.int32))
+        label = [pa.DictionaryArray.from_arrays(idx, pa.array([s])) for s in (group, name, field)]  # One dictionary entry per block
+        self._batch(label + [pa.array(steps[keep]), pa.array(t[keep]), pa.array(v[keep])])
+
+    def wide_block(self, steps, t, W):
+        pa = self.pa
+        self._batch([pa.array(steps), pa.array(t)] + [pa.array(W[:, k]) for k in range(W.shape[1])])
+
+    def close(self):
+        self.w.close()
+        if hasattr(self, "sink"):
+            self.sink.close()
+
+
+# 3.3.0 _write_long — one element at a time, sliced into CHUNK_ROWS blocks ------------------------
+def _write_long(out, series, tick):
+    for group, field, names, t, M in series:
+        steps = np.arange(M.shape[0])
+        tt = t if t.size == M.shape[0] else np.pad(t, (0, M.shape[0] - t.size), constant_values=np.nan)
+        for a in range(0, M.shape[0], CHUNK_ROWS):
+            b = min(a + CHUNK_ROWS, M.shape[0])
+            s, ts = steps[a:b], tt[a:b]                                                             # Same objects for every element → shared prefixes
+            for j, name in enumerate(names):
+                v = M[a:b, j]
+                keep = ~np.isnan(v)                                                                 # Short series: no padding rows
+                if keep.any():
+                    out.long_block(group, name, field, s, ts, v, keep)
+                    tick(int(keep.sum()))
+
+
+# 3.4.0 _write_wide — all elements side by side, CHUNK_ROWS values at a time ---------------------
+def _wide_columns(series):
+    return ["step", "t"] + [f"{g}/{n}/{f}" for g, f, names, _, _ in series for n in names]
+
+
+def _write_wide(out, series, tick):
+    n_t = max(M.shape[0] for *_, M in series)
+    t = max((s[3] for s in series), key=len)
+    t = np.pad(np.asarray(t, float), (0, n_t - len(t)), constant_values=np.nan)
+    W = np.hstack([np.pad(M, ((0, n_t - M.shape[0]), (0, 0)), constant_values=np.nan) for *_, M in series])
+    steps = np.arange(n_t)
+    rows_per = max(1, CHUNK_ROWS // max(1, W.shape[1]))
+    for a in range(0, n_t, rows_per):
+        b = min(a + rows_per, n_t)
+        out.wide_block(steps[a:b], t[a:b], W[a:b])
+        tick((b - a) * W.shape[1])
+
+
+#====================================================================================================
+# 4.0  Export
+#====================================================================================================
+
+
+# 4.1.0 export_results — blocking; call from a worker (4.2.0) for anything large -----------------
+def export_results(results, path, layout="long", fmt=None, progress=None, stop=None, stats=True):
+    """
+    results: RESULTS-shaped dict (pass otaki_results.snapshot(sim.RESULTS) from a GUI
+    so a new run cannot change it mid-export). fmt: "csv" | "parquet" | "feather",
+    default from the extension. progress(done, total) after every chunk (values
+    written). stop: threading.Event → Cancelled, partial file removed.
+    Returns {"path", "stats_path", "layout", "format", "values", "seconds"}.
+    """
+    t0 = time.perf_counter()
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+    if fmt not in FORMATS.values():
+        raise ValueError(f"4.1.0  Unknown export format '{fmt}'")
+    if layout not in LAYOUTS:
+        raise ValueError(f"4.1.0  Unknown layout '{layout}' (long / wide)")
+    series = _series(results)
+    if not series:
+        raise ValueError("4.1.0  Nothing to export, run a simulation first")
+    total = sum(int((~np.isnan(M)).sum()) for *_, M in series) if layout == "long" else \
+        max(M.shape[0] for *_, M in series) * sum(M.shape[1] for *_, M in series)
+    done = [0]
+
+    def tick(n):
+        done[0] += n
+        if stop is not None and stop.is_set():
+            raise Cancelled("export cancelled")
+        if progress:
+            progress(done[0], total)
+
+    if layout == "long":
+        columns, kinds = ["group", "element", "field", "step", "t", "value"], "UUUiff"
+    else:
+        columns = _wide_columns(series)
+        kinds = "if" + "f" * (len(columns) - 2)
+    out = (_CsvOut if fmt == "csv" else _ArrowOut)(path, columns, fmt, kinds)
+    try:
+        (_write_long if layout == "long" else _write_wide)(out, series, tick)
+    except BaseException:
+        out.close()
+        os.remove(path)                                                                             # No half-written file left behind
+        raise
+    out.close()
+    stats_path = None
+    if stats:
+        stats_path = os.path.splitext(path)[0] + "_stats.csv"
+        with open(stats_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=STATS_FIELDS)
+            w.writeheader()
+            w.writerows(stats_rows(results, series))
+    return {"path": path, "stats_path": stats_path, "layout": layout, "format": fmt,
+            "values": done[0], "seconds": time.perf_counter() - t0}
+
+
+# 4.2.0 start_export — same, on a daemon thread; done(info, error) when it ends ------------------
+def start_export(results, path, layout="long", fmt=None, progress=None, done=None, stats=True):
+    """
+    Returns (thread, stop_event). progress and done are called on the worker thread,
+    so a Tk caller should hand them on with widget.after(0, ...).
+    """
+    stop = threading.Event()
+
+    def work():
+        try:
+            info = export_results(results, path, layout, fmt, progress, stop, stats)
+        except BaseException as e:                                                                  # Cancelled included
+            if done:
+                done(None, e)
+            return
+        if done:
+            done(info, None)
+
+    th = threading.Thread(target=work, name="otaki-export", daemon=True)
+    th.start()
+    return th, stop
@@ -0,0 +1,245 @@
+# otaki_loads.py
+# 1.0 Set Up Environment
+    # 1.1.0 Workbook and cache paths
+    # 1.2.0 Sheet layout (row labels in column A)
+    # 1.3.0 QDS step units
+
+# 2.0 Workbook Parsing (slow path, once per workbook change)
+    # 2.1.0 _parse_workbook
+    # 2.2.0 _validate
+
+# 3.0 Binary Cache
+    # 3.1.0 _fingerprint / _file_hash
+    # 3.2.0 load_profiles
+
+# 4.0 Resampling
+    # 4.1.0 step_seconds
+    # 4.2.0 resample
+    # 4.3.0 load_kw / pv_pu (profiles at the QDS step)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import os, hashlib                                                                                  # Cache key = mtime + size, confirmed by SHA-256 when mtime moves
+import numpy as np                                                                                  # Profiles are stored and resampled as arrays
+HERE = os.path.dirname(os.path.abspath(__file__))                                                   # Repo folder
+
+
+# 1.1.0 Workbook and cache paths ---------------------------------------------------------------------
+WORKBOOK   = os.path.join(HERE, "Otaki Load Data.xlsx")                                             # Shipped with the repo
+CACHE_PATH = WORKBOOK + ".cache.npz"                                                                # Written next to it, rebuilt when the workbook changes
+SHEET      = "Raw Data"
+
+
+# 1.2.0 Sheet layout (row labels in column A) --------------------------------------------------------
+#   "Name"           → load codes (OTKa … OTIa) across the columns
+#   "# of Buildings" → buildings behind each load
+#   "Hours"          → header row, the next 24 rows are hourly W per building (one winter day)
+#   "PV Profile"     → column PV_COL below it is the hourly PV output in p.u. of nameplate (one year),
+#                      IRR_COL the matching plane-of-array irradiance in W/m²
+HOURS_PER_DAY = 24
+PV_COL        = 3
+IRR_COL       = 4
+
+
+# 1.3.0 QDS step units (same codes as otaki_sim.QDS_STEP_UNIT) ---------------------------------------
+STEP_UNIT_S = {0: 1, 1: 60, 2: 3600, 3: 86400}                                                      # 0=seconds, 1=minutes, 2=hours, 3=days
+
+_MEMO = {}                                                                                          # {"key": fingerprint, "data": dict}, so repeat calls skip the disk too
+
+
+#====================================================================================================
+# 2.0  Workbook Parsing
+#====================================================================================================
+
+
+# 2.1.0 _parse_workbook — openpyxl read of the Raw Data sheet → plain arrays -------------------------
+def _parse_workbook(path):
+    import openpyxl                                                                                 # Only needed when the cache is stale
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = list(wb[SHEET].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+    def row_of(label, start=0):                                                                     # First row whose column A is `label`
+        for i in range(start, len(rows)):
+            if rows[i] and isinstance(rows[i][0], str) and rows[i][0].strip() == label:
+                return i
+        raise ValueError(f"2.1.0  '{label}' row not found in sheet '{SHEET}'")
+
+    r_name = row_of("Name")
+    cols = [j for j, v in enumerate(rows[r_name]) if j > 0 and isinstance(v, str) and v.strip()]
+    codes = [rows[r_name][j].strip() for j in cols]
+    r_bld = row_of("# of Buildings", r_name)
+    r_hrs = row_of("Hours", r_bld)
+    day = rows[r_hrs + 1:r_hrs + 1 + HOURS_PER_DAY]
+    per_bld = np.array([[r[j] if isinstance(r[j], (int, float)) else np.nan for j in cols] for r in day], dtype=float)
+    bld = np.array([rows[r_bld][j] if isinstance(rows[r_bld][j], (int, float)) else np.nan for j in cols], dtype=float)
+
+    r_pv = row_of("PV Profile", r_hrs)
+
+    def column(j):                                                                                  # Numeric run below the PV header, stops at the first blank
+        out = []
+        for r in rows[r_pv + 1:]:
+            v = r[j] if j < len(r) else None
+            if not isinstance(v, (int, float)):
+                break
+            out.append(float(v))
+        return np.array(out, dtype=float)
+
+    return {
+        "codes":      np.array(codes),
+        "buildings":  bld,                                                                          # (K,)
+        "load_w":     per_bld * bld[None, :],                                                       # (24, K) whole-suburb W
+        "t_load":     np.arange(len(day), dtype=float) * 3600.0,                                    # s from midnight
+        "pv_pu":      column(PV_COL),                                                               # (hours of the year,)
+        "irradiance": column(IRR_COL),
+    }
+
+
+# 2.2.0 _validate — refuse a half-edited workbook rather than cache nonsense -------------------------
+def _validate(data):
+    K = len(data["codes"])
+    if K == 0:
+        raise ValueError("2.2.0  No load codes found on the 'Name' row")
+    if len(set(data["codes"].tolist())) != K:
+        raise ValueError("2.2.0  Duplicate load codes on the 'Name' row")
+    if data["load_w"].shape != (HOURS_PER_DAY, K) or not np.isfinite(data["load_w"]).all():
+        raise ValueError(f"2.2.0  Load block must be {HOURS_PER_DAY} numeric hours for every load")
+    if (data["load_w"] < 0).any() or (data["buildings"] <= 0).any():
+        raise ValueError("2.2.0  Negative load or non-positive building count")
+    pv = data["pv_pu"]
+    if pv.size < HOURS_PER_DAY or pv.size % HOURS_PER_DAY or pv.min() < 0 or pv.max() > 1.0 + 1e-9:
+        raise ValueError("2.2.0  PV profile must be whole days of 0…1 p.u. values")
+
+
+#====================================================================================================
+# 3.0  Binary Cache
+#====================================================================================================
+
+
+# 3.1.0 _fingerprint / _file_hash -------------------------------------------------------------------
+def _fingerprint(path):                                                                             # Cheap check, no file read
+    st = os.stat(path)
+    return (int(st.st_mtime_ns), int(st.st_size))
+
+
+def _file_hash(path):                                                                               # Full read, only when mtime / size moved
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# 3.2.0 load_profiles — cached arrays, re-parsed only when the workbook really changed --------------
+def load_profiles(path=None, cache_path=None, refresh=False):
+    """
+    Returns {"codes", "buildings", "load_w", "t_load", "pv_pu", "irradiance"}.
+    load_w is (24, K) W per suburb in codes order, t_load the matching seconds.
+    The workbook is parsed once; later calls read the .npz cache (or memory).
+    A touched-but-identical workbook (same SHA-256) keeps its cache.
+    """
+    path = path or WORKBOOK
+    cache_path = cache_path or (CACHE_PATH if path == WORKBOOK else path + ".cache.npz")
+    fp = _fingerprint(path)
+    if not refresh and _MEMO.get("key") == (path, fp):
+        return _MEMO["data"]
+
+    data, digest = None, None
+    if not refresh and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as z:
+                cached = {k: z[k] for k in z.files}
+            same_fp = (int(cached["mtime_ns"]), int(cached["size"])) == fp
+            if not same_fp:
+                digest = _file_hash(path)
+            if same_fp or str(cached["sha256"]) == digest:
+                data = {k: v for k, v in cached.items() if k not in ("mtime_ns", "size", "sha256")}
+                if not same_fp:                                                                     # Same content, new mtime → just re-stamp
+                    _write_cache(cache_path, data, fp, digest)
+        except Exception as e:                                                                      # Corrupt / old-format cache → rebuild
+            print(f"3.2.0  Load profile cache ignored: {e}")
+            data = None
+
+    if data is None:
+        data = _parse_workbook(path)
+        _validate(data)
+        _write_cache(cache_path, data, fp, digest or _file_hash(path))
+
+    _MEMO.update(key=(path, fp), data=data)
+    return data
+
+
+def _write_cache(cache_path, data, fp, digest):                                                     # Atomic, a crash never leaves half a cache
+    tmp = cache_path + ".tmp.npz"
+    np.savez(tmp, mtime_ns=np.int64(fp[0]), size=np.int64(fp[1]), sha256=np.array(digest), **data)
+    os.replace(tmp, cache_path)
+
+
+#====================================================================================================
+# 4.0  Resampling
+#====================================================================================================
+
+
+# 4.1.0 step_seconds ---------------------------------------------------------------------------------
+def step_seconds(step_size=1, step_unit=2):                                                         # Defaults match otaki_sim 1.2.0
+    return float(step_size) * STEP_UNIT_S[int(step_unit)]
+
+
+# 4.2.0 resample — (T, ...) series on a regular grid → new step, all columns at once ----------------
+def resample(t, values, step_s):
+    """
+    Finer steps: linear interpolation between samples.
+    Coarser steps: mean over each new step (energy preserving).
+    t in seconds (regular), values (T,) or (T, K). Returns (t_new, values_new).
+    """
+    t = np.asarray(t, dtype=float)
+    v = np.asarray(values, dtype=float)
+    if t.size < 2:
+        return t, v
+    src = float(t[1] - t[0])
+    span = src * t.size                                                                             # Each sample covers one source step
+    n = max(1, int(round(span / step_s)))
+    t_new = t[0] + np.arange(n) * step_s
+    if step_s >= src:                                                                               # Block mean
+        edges = np.searchsorted(t, t_new, side="left")
+        sums = np.add.reduceat(v, edges, axis=0)
+        counts = np.diff(np.append(edges, t.size)).reshape((-1,) + (1,) * (v.ndim - 1))
+        return t_new, sums / np.maximum(counts, 1)
+    x = (t_new - t[0]) / src                                                                        # Fractional source index
+    i0 = np.clip(np.floor(x).astype(int), 0, t.size - 1)
+    i1 = np.minimum(i0 + 1, t.size - 1)
+    w = (x - i0).reshape((-1,) + (1,) * (v.ndim - 1))
+    return t_new, v[i0] * (1.0 - w) + v[i1] * w
+
+
+# 4.3.0 load_kw / pv_pu — ready-to-use profiles at the configured QDS step --------------------------
+def load_kw(codes=None, step_size=1, step_unit=2, days=1, path=None):
+    """
+    (t, kW) for the given load codes (default: all), shape (T, K), the workbook's
+    daily profile repeated over `days` and resampled to the QDS step.
+    """
+    d = load_profiles(path)
+    allc = d["codes"].tolist()
+    idx = [allc.index(c) for c in (codes or allc)]                                                  # KeyError-style ValueError on unknown codes
+    v = np.tile(d["load_w"][:, idx] / 1000.0, (int(days), 1))
+    t = np.arange(v.shape[0], dtype=float) * 3600.0
+    return resample(t, v, step_seconds(step_size, step_unit))
+
+
+def pv_pu(day=0, days=1, step_size=1, step_unit=2, path=None):
+    """
+    (t, p.u.) PV output for `days` days starting at day-of-year `day`, resampled to the QDS step.
+    """
+    d = load_profiles(path)
+    pv = d["pv_pu"].reshape(-1, HOURS_PER_DAY)
+    rows = np.arange(int(day), int(day) + int(days)) % pv.shape[0]                                  # Wraps past the year end
+    v = pv[rows].ravel()
+    t = np.arange(v.size, dtype=float) * 3600.0
+    return resample(t, v, step_seconds(step_size, step_unit))
@@ -0,0 +1,192 @@
+# otaki_metrics.py
+# 1.0 Set Up Environment
+    # 1.1.0 Units and limits
+
+# 2.0 Energy and Reverse Power Flow
+    # 2.1.0 _step_hours / _row_hours
+    # 2.2.0 compute (suburb / transformer / line / network)
+    # 2.3.0 _peaks (value and time of peak, per column)
+
+# 3.0 Cached Access
+    # 3.1.0 metrics_for (stored with the run in results["metrics"])
+    # 3.2.0 suburb_rows (flat rows for the CLI / export)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Hosting-capacity numbers derived from one run's series, all suburbs and
+#   transformers at once (one (time × element) matrix per quantity):
+#       per suburb      : load / PV energy, grid import / export, self-consumption,
+#                         self-sufficiency, reverse-flow hours, peak load / PV and when
+#       per transformer : reverse-power-flow hours and energy (suburbs it feeds,
+#                         PV > load), peak loading and when, hours over the limit
+#       per line        : peak loading and when
+#   Loading series are unsigned, so reverse flow is taken from the net demand of
+#   the suburbs behind each transformer (PV_CONFIG "tx").
+
+
+import numpy as np                                                                                  # Vectorised over time × element
+
+
+# 1.1.0 Units and limits -----------------------------------------------------------------------------
+P_TO_KW   = 1000.0                                                                                  # RESULTS P_W holds PF m:P:bus1, in MW
+LIMIT_PCT = 100.0                                                                                   # Loading above this counts as overloaded
+
+
+#====================================================================================================
+# 2.0  Energy and Reverse Power Flow
+#====================================================================================================
+
+
+# 2.1.0 _step_hours — length of one step in hours (1 h for a single step) -------------------------
+def _step_hours(t):
+    return float(np.median(np.diff(t))) / 3600.0 if len(t) > 1 else 1.0
+
+
+def _row_hours(t, n):                                                                               # Hours each of n rows stands for (gap to the next stamp)
+    t = np.asarray(t, dtype=float)[:n]
+    w = np.full(n, _step_hours(t))                                                                  # Rows past the time axis: the typical step
+    if t.size > 1:                                                                                  # Non-uniform axes (otaki_adaptive) weigh each row by its own gap
+        w[:t.size - 1] = np.diff(t) / 3600.0
+        w[t.size - 1] = w[t.size - 2]
+    return w
+
+
+# 2.2.0 compute — every metric in one pass over the result matrices ------------------------------
+def compute(results, pv_config, load_names=None, limit_pct=LIMIT_PCT):
+    """
+    results: RESULTS-shaped dict. pv_config: otaki_sim.PV_CONFIG.
+    load_names: load code → PF load name (otaki_sim.LOAD_NAMES); codes that are
+    already RESULTS["load"] keys need no entry.
+    Returns {"suburb": {pv_key: {...}}, "tx": {tx: {...}}, "line": {line: {...}},
+    "network": {...}}. Energies in kWh, powers in kW, times in PF seconds.
+    """
+    from otaki_results import results_matrix
+    load_names = load_names or {}
+    keys = list(pv_config)
+    loads = [load_names.get(pv_config[k].get("load"), pv_config[k].get("load")) for k in keys]
+    _, t_pv, PV = results_matrix(results, "pv", "P_W", keys)
+    _, t_ld, LD = results_matrix(results, "load", "P_W", loads)
+    n_t = max(PV.shape[0], LD.shape[0])
+    PV = np.pad(PV, ((0, n_t - PV.shape[0]), (0, 0)), constant_values=np.nan) * P_TO_KW             # (T, S) kW
+    LD = np.pad(LD, ((0, n_t - LD.shape[0]), (0, 0)), constant_values=np.nan) * P_TO_KW
+    t = t_pv if len(t_pv) >= len(t_ld) else t_ld
+    dt = _step_hours(t)
+    w = _row_hours(t, n_t)[:, None]                                                                 # (T, 1) hours per row
+
+    has_pv, has_ld = ~np.isnan(PV).all(axis=0), ~np.isnan(LD).all(axis=0)
+    pv0, ld0 = np.nan_to_num(PV), np.nan_to_num(LD)
+    net = ld0 - pv0                                                                                 # + import, − export
+    pv_kwh, ld_kwh = (pv0 * w).sum(axis=0), (ld0 * w).sum(axis=0)
+    imp_kwh = (np.clip(net, 0, None) * w).sum(axis=0)
+    exp_kwh = (np.clip(-net, 0, None) * w).sum(axis=0)
+    used_kwh = (np.minimum(pv0, ld0) * w).sum(axis=0)                                               # PV consumed behind the transformer
+    rpf_h = ((net < 0) * w).sum(axis=0)
+    with np.errstate(all="ignore"):
+        self_cons = np.where(pv_kwh > 0, used_kwh / pv_kwh, np.nan)
+        self_suff = np.where(ld_kwh > 0, used_kwh / ld_kwh, np.nan)
+    pk_ld, pk_ld_t = _peaks(LD, t)
+    pk_pv, pk_pv_t = _peaks(PV, t)
+
+    def val(ok, x):
+        return float(x) if ok and x == x else None
+
+    suburb = {}
+    for j, k in enumerate(keys):
+        cfg = pv_config[k]
+        both = has_pv[j] and has_ld[j]
+        suburb[k] = {
+            "load": loads[j], "tx": cfg.get("tx"), "line": cfg.get("pline"),
+            "load_kwh": val(has_ld[j], ld_kwh[j]), "pv_kwh": val(has_pv[j], pv_kwh[j]),
+            "import_kwh": val(both, imp_kwh[j]), "export_kwh": val(both, exp_kwh[j]),
+            "net_kwh": val(both, ld_kwh[j] - pv_kwh[j]),
+            "self_consumption": val(both, self_cons[j]), "self_sufficiency": val(both, self_suff[j]),
+            "rpf_hours": val(both, rpf_h[j]),
+            "peak_load_kw": val(has_ld[j], pk_ld[j]), "peak_load_t": val(has_ld[j], pk_ld_t[j]),
+            "peak_pv_kw": val(has_pv[j], pk_pv[j]), "peak_pv_t": val(has_pv[j], pk_pv_t[j]),
+        }
+
+    # Transformers: suburbs summed through a (suburb × tx) incidence matrix, then loading peaks
+    tx_names, tx_t, TX = results_matrix(results, "tx", "loading_pct")
+    fed = sorted({pv_config[k].get("tx") for k in keys if pv_config[k].get("tx")} - set(tx_names))
+    tx_names = list(tx_names) + fed                                                                 # Fed transformers without a loading series
+    col = {n: i for i, n in enumerate(tx_names)}
+    A = np.zeros((len(keys), len(tx_names)))
+    for j, k in enumerate(keys):
+        if pv_config[k].get("tx") in col and has_pv[j] and has_ld[j]:
+            A[j, col[pv_config[k]["tx"]]] = 1.0
+    tx_net = net @ A                                                                                # (T, X) kW through each transformer
+    tx_rpf_h = ((tx_net < 0) * w).sum(axis=0)
+    tx_rpf_kwh = (np.clip(-tx_net, 0, None) * w).sum(axis=0)
+    TX = np.pad(TX, ((0, 0), (0, len(fed))), constant_values=np.nan) if TX.size else np.full((0, len(tx_names)), np.nan)
+    pk_tx, pk_tx_t = _peaks(TX, tx_t)
+    over_h = ((np.nan_to_num(TX) > limit_pct) * _row_hours(tx_t, TX.shape[0])[:, None]).sum(axis=0)
+    tx = {}
+    for i, name in enumerate(tx_names):
+        fed_by = [k for j, k in enumerate(keys) if A[j, i]]
+        has_l = TX.shape[0] > 0 and not np.isnan(TX[:, i]).all()
+        tx[name] = {"suburbs": fed_by,
+                    "rpf_hours": val(bool(fed_by), tx_rpf_h[i]), "rpf_kwh": val(bool(fed_by), tx_rpf_kwh[i]),
+                    "peak_loading_pct": val(has_l, pk_tx[i]), "peak_t": val(has_l, pk_tx_t[i]),
+                    "hours_over": val(has_l, over_h[i])}
+
+    ln_names, ln_t, LN = results_matrix(results, "line", "loading_pct")
+    pk_ln, pk_ln_t = _peaks(LN, ln_t)
+    over_ln = ((np.nan_to_num(LN) > limit_pct) * _row_hours(ln_t, LN.shape[0])[:, None]).sum(axis=0)
+    line = {n: {"peak_loading_pct": val(True, pk_ln[i]), "peak_t": val(True, pk_ln_t[i]), "hours_over": float(over_ln[i])}
+            for i, n in enumerate(ln_names)}
+
+    total = net[:, has_pv & has_ld].sum(axis=1) if n_t else np.zeros(0)                             # Whole-network net demand
+    network = {
+        "load_kwh": float(ld_kwh[has_ld].sum()), "pv_kwh": float(pv_kwh[has_pv].sum()),
+        "import_kwh": float(imp_kwh[has_pv & has_ld].sum()), "export_kwh": float(exp_kwh[has_pv & has_ld].sum()),
+        "rpf_hours": float(((total < 0) * w[:, 0]).sum()),
+        "rpf_transformers": sum(1 for r in tx.values() if r["rpf_hours"]), "step_h": dt,
+    }
+    return {"suburb": suburb, "tx": tx, "line": line, "network": network}
+
+
+# 2.3.0 _peaks — nan-safe max and its time stamp for each column ----------------------------------
+def _peaks(M, t):
+    if not M.size:
+        return np.full(M.shape[1], np.nan), np.full(M.shape[1], np.nan)
+    filled = np.where(np.isnan(M), -np.inf, M)
+    i = filled.argmax(axis=0)
+    peak = M[i, np.arange(M.shape[1])]
+    t = np.asarray(t, dtype=float)
+    when = np.full(i.shape, np.nan)
+    ok = i < t.size                                                                                 # Time axis shorter than the series
+    when[ok] = t[i[ok]]
+    return peak, when
+
+
+#====================================================================================================
+# 3.0  Cached Access
+#====================================================================================================
+
+
+# 3.1.0 metrics_for — the run's own metrics (otaki_sim stores them), computed for older archives --
+def metrics_for(results, pv_config, load_names=None):
+    m = (results or {}).get("metrics")
+    if isinstance(m, dict) and "suburb" in m:
+        return m
+    m = compute(results, pv_config, load_names)
+    if results is not None:
+        results["metrics"] = m                                                                      # Next caller gets it for free
+    return m
+
+
+# 3.2.0 suburb_rows — one flat dict per suburb with its transformer's reverse-flow figures -------
+SUBURB_FIELDS = ("load_kwh", "pv_kwh", "import_kwh", "export_kwh", "self_consumption", "self_sufficiency",
+                 "rpf_hours", "peak_load_kw", "peak_pv_kw", "tx_rpf_hours", "tx_peak_loading_pct")
+
+
+def suburb_rows(metrics):
+    rows = {}
+    for k, r in metrics["suburb"].items():
+        tr = metrics["tx"].get(r.get("tx")) or {}
+        rows[k] = dict({f: r.get(f) for f in SUBURB_FIELDS[:9]},
+                       tx_rpf_hours=tr.get("rpf_hours"), tx_peak_loading_pct=tr.get("peak_loading_pct"))
+    return rows
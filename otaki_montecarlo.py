@@ -0,0 +1,187 @@
+# otaki_montecarlo.py
+# 1.0 Set Up Environment
+    # 1.1.0 Run size and envelope settings
+    # 1.2.0 Input distributions
+
+# 2.0 Sampling
+    # 2.1.0 _draw
+    # 2.2.0 sample
+
+# 3.0 Evaluators (batch of samples → voltage / loading arrays)
+    # 3.1.0 radial_evaluator
+    # 3.2.0 surrogate_evaluator
+
+# 4.0 Monte Carlo Run
+    # 4.1.0 run
+    # 4.2.0 _envelopes
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import numpy as np                                                                                  # Sampling and aggregation are whole-array ops
+import otaki_results                                                                                # Shared voltage band
+
+
+# 1.1.0 Run size and envelope settings ---------------------------------------------------------------
+N_SAMPLES   = 10000                                                                                 # Samples per Monte Carlo run
+BATCH       = 1000                                                                                  # Samples handed to the evaluator at once (memory vs speed)
+PERCENTILES = (5, 50, 95)                                                                           # Envelope lines per element and time step
+PANEL_WATT  = 240.0                                                                                 # Same as otaki_sim 1.4.0, inverter sizes are whole panels
+VOLT_BAND   = otaki_results.VOLT_BAND                                                               # p.u. band for the violation risk
+LOADING_MAX = 100.0                                                                                 # % above which a tx / line counts as overloaded
+
+
+# 1.2.0 Input distributions (edit to suit the study) -------------------------------------------------
+#   dist: "beta" (a, b) | "uniform" (low, high) | "normal" (mean, sd) | "lognormal" (mean, sigma)
+#         "triangular" (low, mode, high) | "choice" (values, p)
+#   load_scale "corr" = correlation between suburbs (0 = independent, 1 = one shared factor)
+DISTRIBUTIONS = {
+    "uptake":      {"dist": "beta", "a": 2.0, "b": 5.0},                                            # Fraction of homes with PV
+    "inverter_kw": {"dist": "choice", "values": (3.0, 5.0, 6.0, 8.0, 10.0),
+                    "p": (0.15, 0.35, 0.25, 0.15, 0.10)},                                           # System size per home, rounded to panels
+    "load_scale":  {"dist": "lognormal", "mean": 0.0, "sigma": 0.10, "corr": 0.5},                  # Multiplier on every load profile
+}
+
+
+#====================================================================================================
+# 2.0  Sampling
+#====================================================================================================
+
+
+# 2.1.0 _draw — one distribution spec → array of the requested shape --------------------------------
+def _draw(rng, spec, size):
+    d = spec["dist"]
+    if d == "beta":
+        return rng.beta(spec["a"], spec["b"], size)
+    if d == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    if d == "normal":
+        return rng.normal(spec["mean"], spec["sd"], size)
+    if d == "lognormal":
+        return rng.lognormal(spec["mean"], spec["sigma"], size)
+    if d == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    if d == "choice":
+        p = np.asarray(spec.get("p") or np.ones(len(spec["values"])), dtype=float)
+        return rng.choice(np.asarray(spec["values"], dtype=float), size=size, p=p / p.sum())
+    raise ValueError(f"2.1.0  Unknown distribution '{d}'")
+
+
+# 2.2.0 sample — n scenarios of (inverters, panels per inverter, load scale) per suburb -------------
+def sample(n, homes, rng, dists=None):
+    """
+    homes: (K,) homes per suburb (PV_CONFIG "homes").
+    Returns inverters (n, K) int, panels (n, K) int, load_scale (n, K) float.
+    """
+    dists = dists or DISTRIBUTIONS
+    homes = np.asarray(homes, dtype=int)
+    K = homes.size
+    uptake = np.clip(_draw(rng, dists["uptake"], (n, K)), 0.0, 1.0)
+    inverters = rng.binomial(homes[None, :], uptake)                                                # Homes that actually install
+    kw = _draw(rng, dists["inverter_kw"], (n, K))
+    panels = np.maximum(1, np.rint(kw * 1000.0 / PANEL_WATT)).astype(int)                           # Quantised to whole panels
+
+    spec = dists["load_scale"]
+    if spec["dist"] == "lognormal":                                                                 # Correlated across suburbs
+        c = float(np.clip(spec.get("corr", 0.0), 0.0, 1.0))
+        z = np.sqrt(c) * rng.standard_normal((n, 1)) + np.sqrt(1.0 - c) * rng.standard_normal((n, K))
+        load_scale = np.exp(spec["mean"] + spec["sigma"] * z)
+    else:
+        load_scale = np.maximum(_draw(rng, spec, (n, K)), 0.0)
+    return inverters, panels, load_scale
+
+
+#====================================================================================================
+# 3.0  Evaluators
+#====================================================================================================
+#   An evaluator takes (inverters, panels, load_scale), each (B, K), and returns
+#   {"u_pu", "tx_pct", "line_pct"} arrays of shape (B, T, K).
+
+
+# 3.1.0 radial_evaluator — otaki_radial sweep, every sample and time step in one call --------------
+def radial_evaluator(model, load_kw, pv_unit_kw):                                                   # load_kw (T, K) base load, pv_unit_kw (T, K) per inverter × panel
+    import otaki_radial
+    load_kw = np.asarray(load_kw, dtype=float)
+    pv_unit_kw = np.asarray(pv_unit_kw, dtype=float)
+
+    def evaluate(inverters, panels, load_scale):
+        units = (inverters * panels).astype(float)                                                  # (B, K)
+        out = otaki_radial.screen(model, load_kw[None] * load_scale[:, None, :],
+                                  pv_unit_kw[None] * units[:, None, :])
+        return {"u_pu": out["u_pu"], "tx_pct": out["tx_pct"], "line_pct": out["line_pct"]}
+    return evaluate
+
+
+# 3.2.0 surrogate_evaluator — otaki_surrogate fit (load scale is ignored by the fit) ----------------
+def surrogate_evaluator():
+    import otaki_surrogate
+
+    def evaluate(inverters, panels, load_scale):
+        Y = otaki_surrogate.predict_series(inverters * panels)                                      # (B, T, K, J)
+        if Y is None:
+            raise RuntimeError("3.2.0  Surrogate has no runs yet, run one QDS first")
+        return {"u_pu": Y[..., 0], "tx_pct": Y[..., 1], "line_pct": Y[..., 2]}
+    return evaluate
+
+
+#====================================================================================================
+# 4.0  Monte Carlo Run
+#====================================================================================================
+
+
+# 4.1.0 run — sample, evaluate in batches, reduce to percentile envelopes --------------------------
+def run(evaluate, names, homes, t, n=N_SAMPLES, batch=BATCH, seed=None, dists=None, progress=None):
+    """
+    evaluate : evaluator from section 3 (or any callable with the same contract)
+    names    : {"pv": [...], "bus": [...], "tx": [...], "line": [...]} names per suburb column
+    homes    : (K,) homes per suburb
+    t        : time axis of the evaluator's outputs (s)
+    progress : optional callable(done, n) after each batch
+    Returns {"t", "n", "percentiles", "bus" / "tx" / "line": {name: {"p5": [...], ...}},
+             "risk": {group: {name: share of samples out of band / overloaded}},
+             "installed_kw": {pv_key: {"p5", ...}}}.
+    """
+    rng = np.random.default_rng(seed)
+    inverters, panels, load_scale = sample(int(n), homes, rng, dists)
+    store = {}
+    for s0 in range(0, int(n), int(batch)):
+        s1 = min(int(n), s0 + int(batch))
+        out = evaluate(inverters[s0:s1], panels[s0:s1], load_scale[s0:s1])
+        for key, arr in out.items():
+            if key not in store:                                                                    # float32 keeps 10⁴ × T × K small
+                store[key] = np.empty((int(n),) + arr.shape[1:], dtype=np.float32)
+            store[key][s0:s1] = arr
+        if progress:
+            progress(s1, int(n))
+    env = _envelopes(store, names, t)
+    kw = inverters * panels * PANEL_WATT / 1000.0
+    keys = names.get("pv") or list(range(kw.shape[1]))
+    env["installed_kw"] = {k: dict(zip((f"p{p}" for p in PERCENTILES), np.percentile(kw[:, j], PERCENTILES).tolist()))
+                           for j, k in enumerate(keys)}
+    env["n"] = int(n)
+    return env
+
+
+# 4.2.0 _envelopes — one np.percentile per output over the sample axis ------------------------------
+def _envelopes(store, names, t):
+    env = {"t": [float(x) for x in t], "percentiles": list(PERCENTILES), "risk": {}}
+    lo, hi = VOLT_BAND
+    for group, key in (("bus", "u_pu"), ("tx", "tx_pct"), ("line", "line_pct")):
+        A = store.get(key)
+        if A is None:
+            continue
+        P = np.nanpercentile(A, PERCENTILES, axis=0)                                                # (P, T, K)
+        bad = ((A < lo) | (A > hi)) if group == "bus" else (A > LOADING_MAX)
+        risk = bad.any(axis=1).mean(axis=0)                                                         # (K,) share of samples with any violation
+        env[group] = {}
+        env["risk"][group] = {}
+        for j, name in enumerate(names.get(group) or []):
+            if name is None:
+                continue
+            env[group][name] = {f"p{p}": P[i, :, j].tolist() for i, p in enumerate(PERCENTILES)}
+            env["risk"][group][name] = float(risk[j])
+    return env
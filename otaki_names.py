@@ -0,0 +1,139 @@
+# otaki_names.py
+# 1.0 Set Up Environment
+    # 1.1.0 Element kinds
+
+# 2.0 Name Index
+    # 2.1.0 NameIndex (pv_key ↔ bus / load code / load name / tx / line)
+    # 2.2.0 Lookups
+    # 2.3.0 check (configured names vs a run's RESULTS keys)
+    # 2.4.0 report
+
+# 3.0 Building the Index
+    # 3.1.0 from_config
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   One exact, two-way table of every name a suburb goes by, built once from PV_CONFIG
+#   and the load code → PF load name table:
+#       index.name("OTKa_PV", "load")            → "Otaki Town A"   (RESULTS["load"] key)
+#       index.pv_keys("tx", "OTK_T1")            → ["OTKa_PV", ...]
+#       index.load_name("OTKa") / load_code("Otaki Town A")
+#   Every lookup is one dict access. Names are never matched by suffix or substring;
+#   a configured name the run did not return is listed by check() / report() instead.
+
+
+# 1.1.0 Element kinds --------------------------------------------------------------------------------
+KINDS = ("bus", "load_code", "load", "tx", "line")                                                  # Names each pv_key maps to
+CONFIG_FIELD = {"bus": "bus", "load_code": "load", "tx": "tx", "line": "pline"}                     # Kind → PV_CONFIG field
+RESULT_GROUP = {"pv": "pv", "bus": "bus", "load": "load", "tx": "tx", "line": "line"}               # Kind → RESULTS group
+
+
+#====================================================================================================
+# 2.0  Name Index
+#====================================================================================================
+
+
+# 2.1.0 NameIndex — forward (pv_key → name) and reverse (name → pv_keys) per kind ------------------
+class NameIndex:
+    """
+    pv_config: otaki_sim.PV_CONFIG. load_names: load code → PF load name
+    (otaki_sim.LOAD_NAMES); a code without an entry is its own load name.
+    Transformers and lines feed several suburbs, so reverse lookups return lists.
+    """
+    def __init__(self, pv_config, load_names=None):
+        load_names = dict(load_names or {})
+        self.forward = {}                                                                           # pv_key → {kind: name}
+        self.reverse = {k: {} for k in KINDS}                                                       # kind → {name: [pv_key, ...]}
+        self.code_to_name = {}
+        self.name_to_code = {}
+        for pv_key, cfg in pv_config.items():
+            names = {kind: cfg.get(field) or None for kind, field in CONFIG_FIELD.items()}
+            code = names["load_code"]
+            names["load"] = load_names.get(code, code) if code else None
+            if code:
+                self.code_to_name[code] = names["load"]
+                self.name_to_code[names["load"]] = code
+            self.forward[pv_key] = names
+            for kind in KINDS:
+                if names[kind]:
+                    self.reverse[kind].setdefault(names[kind], []).append(pv_key)
+
+    def __len__(self):
+        return len(self.forward)
+
+    def __contains__(self, pv_key):
+        return pv_key in self.forward
+
+    # 2.2.0 Lookups -----------------------------------------------------------------------------
+    def name(self, pv_key, kind):                                                                   # None if the suburb has no such element
+        return self.forward.get(pv_key, {}).get(kind)
+
+    def names(self, pv_key):                                                                        # {kind: name} for one suburb
+        return dict(self.forward.get(pv_key, {}))
+
+    def pv_keys(self, kind, name):                                                                  # Suburbs behind a bus / load / tx / line
+        return list(self.reverse[kind].get(name, ()))
+
+    def pv_key(self, kind, name):                                                                   # First suburb, for 1:1 kinds (bus, load)
+        keys = self.reverse[kind].get(name)
+        return keys[0] if keys else None
+
+    def load_name(self, code):                                                                      # "OTKa" → "Otaki Town A"
+        return self.code_to_name.get(code, code)
+
+    def load_code(self, name):                                                                      # "Otaki Town A" → "OTKa"
+        return self.name_to_code.get(name, name)
+
+    def series(self, results, pv_key, kind):                                                        # One suburb's RESULTS record, {} if absent
+        name = pv_key if kind == "pv" else self.name(pv_key, kind)
+        return (results or {}).get(RESULT_GROUP[kind], {}).get(name) or {}
+
+    # 2.3.0 check — which configured names the run is missing, which result names nobody maps ---
+    def check(self, results):
+        """
+        Returns {"missing": {kind: [(pv_key, name), ...]}, "unmapped": {kind: [name, ...]}}.
+        missing: configured names with no RESULTS record (the suburb shows nothing).
+        unmapped: RESULTS keys no suburb refers to (monitored elements outside PV_CONFIG,
+        or a renamed element). Only kinds with a RESULTS group are checked.
+        """
+        results = results or {}
+        missing, unmapped = {}, {}
+        for kind, group in RESULT_GROUP.items():
+            stored = results.get(group)
+            if not isinstance(stored, dict):
+                continue
+            if kind == "pv":
+                pairs, known = [(k, k) for k in self.forward], self.forward
+            else:
+                pairs, known = [(k, n[kind]) for k, n in self.forward.items() if n[kind]], self.reverse[kind]
+            miss = [(k, n) for k, n in pairs if n not in stored]
+            extra = [n for n in stored if n not in known]
+            if miss:
+                missing[kind] = miss
+            if extra:
+                unmapped[kind] = extra
+        return {"missing": missing, "unmapped": unmapped}
+
+    # 2.4.0 report — check() as printed lines, nothing printed when every name resolves ---------
+    def report(self, results, prefix="names", show_unmapped=False):
+        found = self.check(results)
+        for kind, pairs in found["missing"].items():
+            print(f"{prefix}  {len(pairs)} {kind} name(s) not in results: "
+                  + ", ".join(f"{k}→{n}" for k, n in pairs))
+        if show_unmapped:
+            for kind, names in found["unmapped"].items():
+                print(f"{prefix}  {len(names)} {kind} result(s) not in PV_CONFIG: " + ", ".join(names))
+        return found
+
+
+#====================================================================================================
+# 3.0  Building the Index
+#====================================================================================================
+
+
+# 3.1.0 from_config — same arguments as otaki_topology.from_config -------------------------------
+def from_config(pv_config, load_names=None):
+    return NameIndex(pv_config, load_names)
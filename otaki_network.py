@@ -0,0 +1,364 @@
+# otaki_network.py
+# 1.0 Set Up Environment
+    # 1.1.0 File, fields and naming patterns
+    # 1.2.0 NetworkError
+
+# 2.0 Network
+    # 2.1.0 Network (validated definition, compiled tables)
+    # 2.2.0 Tables for otaki_sim (lists, PV_CONFIG, load names, labels)
+    # 2.3.0 Indexes (otaki_names / otaki_topology)
+    # 2.4.0 offline (otaki_offline network dict)
+    # 2.5.0 to_dict / save
+
+# 3.0 Loading and Validation
+    # 3.1.0 _pattern_regex
+    # 3.2.0 validate (errors, warnings)
+    # 3.3.0 from_dict / load
+
+# 4.0 Discovery from a PowerFactory Project
+    # 4.1.0 discover (element class + connectivity + naming pattern)
+
+# 5.0 Command Line
+    # 5.1.0 main (check / discover)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   The network otaki_sim studies, as data instead of hand-kept literals:
+#
+#       {"name": "Otaki", "version": 1,
+#        "suburbs": {pv_key: {"label", "bus", "load", "load_name", "pline", "tx", "homes"}},
+#        "monitor": {"bus" / "load" / "pv" / "tx" / "line": [extra elements to record]},
+#        "zones":   {tx: zone substation},                   (optional, else tx name prefix)
+#        "patterns": {"bus": "{load}_0.415", ...}}           (optional naming convention)
+#
+#   Loaded once by otaki_sim (otaki_network.json next to this file, or OTAKI_NETWORK=<path>)
+#   and compiled into BUS_LIST … LINE_LIST, PV_CONFIG, LOAD_NAMES and the GUI's labels.
+#   Broken definitions stop at load time with every problem listed; names that break
+#   the naming pattern are warnings. Another town is another file, or
+#   `python otaki_network.py discover town.json` against its PF project.
+
+
+import os, re, sys, json, argparse                                                                  # Standard library only
+
+
+# 1.1.0 File, fields and naming patterns --------------------------------------------------------------
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "otaki_network.json")       # The Otaki model
+VERSION      = 1                                                                                    # File layout version
+KINDS        = ("bus", "load", "pv", "tx", "line")                                                  # Monitored element groups (RESULTS groups)
+REQUIRED     = ("bus", "load", "pline", "tx")                                                       # Every suburb names these
+OPTIONAL     = {"label": None, "load_name": None, "homes": 1}                                       # None = derived (pv_key / load code)
+PATTERNS     = {                                                                                    # Otaki naming convention; "" switches a check off
+    "pv":    "{load}_PV",
+    "bus":   "{load}_0.415",
+    "pline": "{load}_pline_{bus}",
+    "tx":    "{zone}_T{n}",
+}
+
+
+# 1.2.0 NetworkError — every problem in the file at once, not just the first ---------------------
+class NetworkError(ValueError):
+    def __init__(self, source, errors):
+        self.errors = list(errors)
+        super().__init__(f"{source}: {len(self.errors)} problem(s)\n  " + "\n  ".join(self.errors))
+
+
+#====================================================================================================
+# 2.0  Network
+#====================================================================================================
+
+
+# 2.1.0 Network — a validated definition; use from_dict / load / discover to make one ---------------
+class Network:
+    def __init__(self, doc, warnings=()):
+        self.name = doc.get("name", "network")
+        self.suburbs = {k: dict(OPTIONAL, **v) for k, v in doc["suburbs"].items()}
+        for k, s in self.suburbs.items():
+            s["label"] = s["label"] or k
+            s["load_name"] = s["load_name"] or s["load"]
+        self.monitor = {kind: list((doc.get("monitor") or {}).get(kind, ())) for kind in KINDS}
+        self.zones = dict(doc.get("zones") or {})
+        self.patterns = dict(PATTERNS, **(doc.get("patterns") or {}))
+        self.warnings = list(warnings)
+        self._names = self._topology = None
+
+    def __len__(self):
+        return len(self.suburbs)
+
+    # 2.2.0 Tables for otaki_sim ------------------------------------------------------------------
+    def lists(self):                                                                                # kind → set of names to monitor
+        out = {kind: set(self.monitor[kind]) for kind in KINDS}
+        for k, s in self.suburbs.items():
+            out["bus"].add(s["bus"]); out["load"].add(s["load_name"]); out["pv"].add(k)
+            out["tx"].add(s["tx"]); out["line"].add(s["pline"])
+        return out
+
+    def pv_config(self):                                                                            # otaki_sim.PV_CONFIG layout
+        return {k: {"bus": s["bus"], "load": s["load"], "pline": s["pline"], "tx": s["tx"], "homes": int(s["homes"])}
+                for k, s in self.suburbs.items()}
+
+    def load_names(self):                                                                           # Load code → PF load name
+        return {s["load"]: s["load_name"] for s in self.suburbs.values()}
+
+    def labels(self):                                                                               # pv_key → GUI label
+        return {k: s["label"] for k, s in self.suburbs.items()}
+
+    # 2.3.0 Indexes — built on first use, the definition does not change afterwards ---------------
+    def names(self):
+        if self._names is None:
+            import otaki_names
+            self._names = otaki_names.from_config(self.pv_config(), self.load_names())
+        return self._names
+
+    def topology(self):
+        if self._topology is None:
+            import otaki_topology
+            self._topology = otaki_topology.from_config(self.pv_config(), self.load_names(), self.zones, self.name)
+        return self._topology
+
+    # 2.4.0 offline — the same network for otaki_offline.use_network (benchmarks, no licence) -----
+    def offline(self):
+        lists = self.lists()
+        bus_of = {"load": {s["load_name"]: s["bus"] for s in self.suburbs.values()},
+                  "pv": {k: s["bus"] for k, s in self.suburbs.items()},
+                  "tx": {s["tx"]: s["bus"] for s in self.suburbs.values()},
+                  "line": {s["pline"]: s["bus"] for s in self.suburbs.values()}}
+        net = {"bus": sorted(lists["bus"]), "config": self.pv_config(), "code_to_name": self.load_names()}
+        for kind in ("load", "pv", "tx", "line"):
+            net[kind] = {n: bus_of[kind].get(n, "") for n in sorted(lists[kind])}                   # Monitor-only elements float
+        return net
+
+    # 2.5.0 to_dict / save — one suburb per line, so a diff shows which suburb changed -------------
+    def to_dict(self):
+        doc = {"name": self.name, "version": VERSION, "suburbs": {k: dict(s) for k, s in self.suburbs.items()},
+               "monitor": {kind: list(v) for kind, v in self.monitor.items()}, "zones": dict(self.zones)}
+        if self.patterns != PATTERNS:
+            doc["patterns"] = dict(self.patterns)
+        return doc
+
+    def save(self, path):
+        doc = self.to_dict()
+        dump = lambda v: json.dumps(v, ensure_ascii=False)
+        lines = ["{", f'  "name": {dump(doc["name"])},', f'  "version": {VERSION},', '  "suburbs": {']
+        subs = list(doc["suburbs"].items())
+        lines += [f"    {dump(k)}: {dump(s)}" + ("," if i < len(subs) - 1 else "") for i, (k, s) in enumerate(subs)]
+        lines.append("  },")
+        rest = [k for k in ("monitor", "zones", "patterns") if k in doc]
+        lines += [f"  {dump(k)}: {dump(doc[k])}" + ("," if i < len(rest) - 1 else "") for i, k in enumerate(rest)]
+        lines.append("}")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+
+#====================================================================================================
+# 3.0  Loading and Validation
+#====================================================================================================
+
+
+# 3.1.0 _pattern_regex — "{load}_pline_{bus}" → regex with named groups ---------------------------
+def _pattern_regex(pattern):
+    parts = re.split(r"\{(\w+)\}", pattern)
+    out, seen = [], set()
+    for i, part in enumerate(parts):
+        if not i % 2:
+            out.append(re.escape(part))
+        elif part == "n":
+            out.append(r"\d+")
+        else:
+            out.append(f"(?P={part})" if part in seen else f"(?P<{part}>.+?)")                      # Same placeholder twice = same text
+            seen.add(part)
+    return re.compile("^" + "".join(out) + "$")
+
+
+# 3.2.0 validate — (errors, warnings); errors stop the load, warnings are printed --------------------
+def validate(doc):
+    errors, warnings = [], []
+    if not isinstance(doc, dict):
+        return ["top level must be a JSON object"], warnings
+    if doc.get("version", VERSION) != VERSION:
+        errors.append(f"version {doc.get('version')!r} not supported (expected {VERSION})")
+    suburbs = doc.get("suburbs")
+    if not isinstance(suburbs, dict) or not suburbs:
+        return errors + ['"suburbs" must be a non-empty object {pv_key: {...}}'], warnings
+
+    patterns = dict(PATTERNS, **(doc.get("patterns") or {}))
+    checks = {f: _pattern_regex(p) for f, p in patterns.items() if p}
+    owner = {"bus": {}, "load": {}, "load_name": {}}                                                # 1:1 names → first pv_key using them
+    code_name = {}
+    for k, s in suburbs.items():
+        if not isinstance(s, dict):
+            errors.append(f"{k}: must be an object"); continue
+        for f in REQUIRED:
+            if not isinstance(s.get(f), str) or not s[f].strip():
+                errors.append(f"{k}: missing or empty '{f}'")
+        for f in set(s) - set(REQUIRED) - set(OPTIONAL):
+            warnings.append(f"{k}: unknown field '{f}' ignored")
+        homes = s.get("homes", 1)
+        if not isinstance(homes, int) or isinstance(homes, bool) or homes < 0:
+            errors.append(f"{k}: homes must be a whole number ≥ 0, got {homes!r}")
+        if any(not isinstance(s.get(f), str) for f in REQUIRED):
+            continue
+        name = s.get("load_name") or s["load"]
+        for f, v in (("bus", s["bus"]), ("load", s["load"]), ("load_name", name)):
+            if v in owner[f] and owner[f][v] != k:
+                errors.append(f"{k}: {f} '{v}' already belongs to {owner[f][v]}")
+            owner[f].setdefault(v, k)
+        if code_name.setdefault(s["load"], name) != name:
+            errors.append(f"{k}: load '{s['load']}' named both '{code_name[s['load']]}' and '{name}'")
+
+        values = {"pv": k, "bus": s["bus"], "pline": s["pline"], "tx": s["tx"]}                      # Naming convention, warnings only
+        for f, rx in checks.items():
+            if f not in values:
+                continue
+            m = rx.match(values[f])
+            if not m or m.groupdict().get("load", s["load"]) != s["load"] or m.groupdict().get("bus", s["bus"]) != s["bus"]:
+                want = patterns[f].replace("{load}", s["load"]).replace("{bus}", s["bus"])
+                warnings.append(f"{k}: {f} '{values[f]}' does not follow '{want}'")
+
+    monitor = doc.get("monitor") or {}
+    if not isinstance(monitor, dict):
+        errors.append('"monitor" must be an object {kind: [names]}')
+    else:
+        for kind, names in monitor.items():
+            if kind not in KINDS:
+                errors.append(f"monitor: unknown kind '{kind}' (use {', '.join(KINDS)})")
+            elif not isinstance(names, list) or not all(isinstance(n, str) and n for n in names):
+                errors.append(f"monitor.{kind}: must be a list of names")
+    zones = doc.get("zones") or {}
+    if not isinstance(zones, dict) or not all(isinstance(v, str) for v in zones.values()):
+        errors.append('"zones" must be an object {tx: zone}')
+    else:
+        txs = {s.get("tx") for s in suburbs.values() if isinstance(s, dict)}
+        warnings += [f"zones: transformer '{tx}' is not used by any suburb" for tx in zones if tx not in txs]
+    return errors, warnings
+
+
+# 3.3.0 from_dict / load — validate, then compile ---------------------------------------------------
+def from_dict(doc, source="network"):
+    errors, warnings = validate(doc)
+    if errors:
+        raise NetworkError(source, errors)
+    return Network(doc, warnings)
+
+
+def load(path=None):
+    path = path or DEFAULT_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError) as e:
+        raise NetworkError(path, [f"{e.__class__.__name__}: {e}"])
+    return from_dict(doc, path)
+
+
+#====================================================================================================
+# 4.0  Discovery from a PowerFactory Project
+#====================================================================================================
+
+
+# 4.1.0 discover — one suburb per PV system, wired up through the terminals the elements share -----
+def discover(app, name="network", patterns=None, homes=1):
+    """
+    PV systems named by the "pv" pattern ("{load}_PV") give the suburbs. Each one's
+    terminal gives the bus; the load, line and transformer are the elements connected
+    there (the transformer may sit at the line's far end). Homes are not in the model,
+    so every suburb gets `homes` until the file is edited. Returns a Network whose
+    warnings list suburbs that could not be completed.
+    """
+    pats = dict(PATTERNS, **(patterns or {}))
+    pv_rx = _pattern_regex(pats["pv"])
+
+    def term(elm, attr):                                                                            # Terminal name on one side of an element
+        cub = getattr(elm, attr, None)
+        t = getattr(cub, "cterm", None) if cub is not None else None
+        return getattr(t, "loc_name", None) if t is not None else None
+
+    at = {}                                                                                         # terminal → class → [elements], one pass per class
+    ends = {}                                                                                       # line → its terminals
+    for cls, sides in (("ElmLod", ("bus1",)), ("ElmLne", ("bus1", "bus2")), ("ElmTr2", ("buslv", "bushv", "bus1"))):
+        for o in app.GetCalcRelevantObjects(f"*.{cls}") or []:
+            seen = {term(o, side) for side in sides} - {None}
+            for b in seen:
+                at.setdefault(b, {}).setdefault(cls, []).append(o.loc_name)
+            if cls == "ElmLne":
+                ends[o.loc_name] = seen
+
+    suburbs, warnings = {}, []
+    for pv in sorted(app.GetCalcRelevantObjects("*.ElmPvsys") or [], key=lambda o: o.loc_name):
+        m = pv_rx.match(pv.loc_name)
+        bus = term(pv, "bus1")
+        if not m or not bus:
+            warnings.append(f"{pv.loc_name}: " + ("name does not follow '" + pats["pv"] + "'" if not m else "not connected"))
+            continue
+        here = at.get(bus, {})
+        loads, lines, txs = here.get("ElmLod", []), here.get("ElmLne", []), list(here.get("ElmTr2", []))
+        for ln in lines:                                                                            # Transformer at the service line's far end
+            for far in ends.get(ln, ()) - {bus}:
+                txs += [t for t in at.get(far, {}).get("ElmTr2", []) if t not in txs]
+        code = m.group("load")
+        s = {"label": loads[0] if loads else code, "bus": bus, "load": code,
+             "load_name": loads[0] if loads else "", "pline": lines[0] if lines else "",
+             "tx": txs[0] if txs else "", "homes": int(homes)}
+        for f, found in (("load_name", loads), ("pline", lines), ("tx", txs)):
+            if len(found) > 1:
+                warnings.append(f"{pv.loc_name}: {len(found)} candidates for {f}, took '{found[0]}'")
+        missing = [f for f in ("load_name", "pline", "tx") if not s[f]]
+        if missing:
+            warnings.append(f"{pv.loc_name}: no {', '.join(missing)} found at '{bus}', left out")
+            continue
+        suburbs[pv.loc_name] = s
+
+    doc = {"name": name, "version": VERSION, "suburbs": suburbs, "monitor": {}, "zones": {}}
+    if patterns:
+        doc["patterns"] = dict(patterns)
+    errors, more = validate(doc)
+    if errors:
+        raise NetworkError(f"discover({name})", errors)
+    return Network(doc, warnings + more)
+
+
+#====================================================================================================
+# 5.0  Command Line
+#====================================================================================================
+#   python otaki_network.py check [file.json]
+#   python otaki_network.py discover town.json [--name Town] [--homes 100] [--offline]
+
+
+# 5.1.0 main ---------------------------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check or discover an otaki_sim network definition.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ck = sub.add_parser("check", help="validate a network file")
+    ck.add_argument("file", nargs="?", default=DEFAULT_FILE)
+    dc = sub.add_parser("discover", help="build a network file from the active PF project")
+    dc.add_argument("out")
+    dc.add_argument("--name", default="network")
+    dc.add_argument("--homes", type=int, default=1, help="homes per suburb until edited (default 1)")
+    dc.add_argument("--offline", action="store_true", help="use the otaki_offline stand-in")
+    args = ap.parse_args(argv)
+
+    try:
+        if args.cmd == "check":
+            net = load(args.file)
+        else:
+            if args.offline:
+                os.environ["OTAKI_OFFLINE"] = "1"
+            import otaki_sim                                                                        # Connects and activates the study case
+            net = discover(otaki_sim.app, args.name, homes=args.homes)
+            net.save(args.out)
+    except NetworkError as e:
+        print(e, file=sys.stderr)
+        return 1
+    lists = net.lists()
+    print(f"{net.name}: {len(net)} suburbs, " + ", ".join(f"{len(lists[k])} {k}" for k in KINDS)
+          + f", {len(set(s['tx'] for s in net.suburbs.values()))} transformers fed")
+    for w in net.warnings:
+        print(f"  warning: {w}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+# otaki_offline.py
+# 1.0 Set Up Environment
+    # 1.1.0 Stand-in settings
+
+# 2.0 Networks
+    # 2.1.0 network_from_sim
+    # 2.2.0 scaled_network
+    # 2.3.0 use_network / restore_network
+
+# 3.0 PowerFactory Objects
+    # 3.1.0 Obj / Cubicle / Typ / Folder
+    # 3.2.0 Results (ElmRes)
+    # 3.3.0 Qds (ComStatsim) / SetTime
+
+# 4.0 Application
+    # 4.1.0 App (object lookup, result reads)
+    # 4.2.0 GetApplication / configure
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Offline stand-in for the `powerfactory` module. otaki_sim imports it instead of
+#   PowerFactory when OTAKI_OFFLINE=1, so runs, benchmarks and traces work without a
+#   licence. Only the API calls otaki_sim makes are provided, with the same return
+#   conventions (lists from GetCalcRelevantObjects, 0 = OK from Execute, [err, value]
+#   from ResGetData). Values are smooth synthetic profiles: PV follows the inverter and
+#   panel counts, load follows scale0, voltage and loading follow the net bus power.
+
+
+import bisect, fnmatch, math, time                                                                  # Name lookups and the synthetic day
+import numpy as np                                                                                  # Result matrix is generated in one go
+
+
+# 1.1.0 Stand-in settings ----------------------------------------------------------------------------
+CONFIG = {
+    "rows":       24,                                                                               # Result rows per QDS run (≥ 24 for a full day at 1 h)
+    "network":    None,                                                                             # 2.0 network dict, None = built from otaki_sim on first use
+    "study_case": "Study Case",                                                                     # Name the study folder reports
+    "start":      int(time.mktime((2024, 6, 21, 0, 0, 0, 0, 0, -1))),                               # Local midnight, first result time stamp (s)
+}
+PANEL_WATT  = 240.0                                                                                 # Same as otaki_sim 1.4.0
+LOAD_MW     = 0.15                                                                                  # plini of a generated load (MW)
+TX_MVA      = 0.5                                                                                   # strn of a generated transformer (MVA)
+STEP_UNIT_S = {0: 1, 1: 60, 2: 3600, 3: 86400}                                                      # ComStatsim stepUnit → seconds
+
+
+#====================================================================================================
+# 2.0  Networks
+#====================================================================================================
+#   network = {"bus": [names], "load" / "pv" / "tx" / "line": {name: bus name or ""},
+#              "config": PV_CONFIG-shaped dict, "code_to_name": {load code: load name}}
+
+
+# 2.1.0 network_from_sim — the Otaki model as otaki_sim lists it ------------------------------------
+def network_from_sim(sim, code_to_name=None):                                                       # code_to_name links load codes to PF load names (otaki_sim.LOAD_NAMES)
+    code_to_name = dict(code_to_name or getattr(sim, "LOAD_NAMES", {}))
+    load_bus = {code_to_name.get(c["load"], ""): c["bus"] for c in sim.PV_CONFIG.values()}
+    return {
+        "bus":  sorted(sim.BUS_LIST),
+        "load": {n: load_bus.get(n, "") for n in sorted(sim.LOAD_LIST)},                            # Unlinked loads still report results
+        "pv":   {k: c["bus"] for k, c in sim.PV_CONFIG.items()},
+        "tx":   {c["tx"]: c["bus"] for c in sim.PV_CONFIG.values()},
+        "line": {c["pline"]: c["bus"] for c in sim.PV_CONFIG.values()},
+        "config": {k: dict(c) for k, c in sim.PV_CONFIG.items()},
+        "code_to_name": code_to_name,
+    }
+
+
+# 2.2.0 scaled_network — n synthetic suburbs named like the Otaki ones ------------------------------
+def scaled_network(n, homes=100):
+    w = max(4, len(str(int(n))))                                                                    # Zero padded so "S0001*" never matches "S00010"
+    net = {"bus": [], "load": {}, "pv": {}, "tx": {}, "line": {}, "config": {}, "code_to_name": {}}
+    for i in range(int(n)):
+        code = f"S{i:0{w}d}"
+        bus, load, pv, tx, line = f"{code}_0.415", f"Suburb {i:0{w}d}", f"{code}_PV", f"{code}_T1", f"{code}_pline_{code}_0.415"
+        net["bus"].append(bus)
+        net["load"][load] = net["pv"][pv] = net["tx"][tx] = net["line"][line] = bus
+        net["config"][pv] = {"bus": bus, "load": code, "pline": line, "tx": tx, "homes": int(homes)}
+        net["code_to_name"][code] = load
+    return net
+
+
+# 2.3.0 use_network / restore_network — point otaki_sim (and the stand-in) at a network -------------
+def use_network(sim, net):                                                                          # Returns what restore_network needs
+    saved = {k: getattr(sim, k) for k in ("BUS_LIST", "LOAD_LIST", "PV_LIST", "TX_LIST", "LINE_LIST")}
+    saved["PV_CONFIG"] = dict(sim.PV_CONFIG)
+    saved["PV_INV_OVERRIDES"], saved["PV_PANEL_OVERRIDES"] = dict(sim.PV_INV_OVERRIDES), dict(sim.PV_PANEL_OVERRIDES)
+    saved["network"] = CONFIG["network"]
+    sim.BUS_LIST, sim.LOAD_LIST = set(net["bus"]), set(net["load"])
+    sim.PV_LIST, sim.TX_LIST, sim.LINE_LIST = set(net["pv"]), set(net["tx"]), set(net["line"])
+    _clear_results(sim)
+    sim.PV_CONFIG.clear(); sim.PV_CONFIG.update(net["config"])                                      # In place, the GUI holds this dict
+    configure(network=net)
+    sim.PV_INV_OVERRIDES.clear(); sim.PV_PANEL_OVERRIDES.clear()
+    sim.refresh_pv_overrides_from_model(sim.app)
+    sim.refresh_pv_panels_from_model(sim.app)
+    return saved
+
+
+def restore_network(sim, saved):
+    for k in ("BUS_LIST", "LOAD_LIST", "PV_LIST", "TX_LIST", "LINE_LIST"):
+        setattr(sim, k, saved[k])
+    for k in ("PV_CONFIG", "PV_INV_OVERRIDES", "PV_PANEL_OVERRIDES"):
+        getattr(sim, k).clear(); getattr(sim, k).update(saved[k])
+    _clear_results(sim)
+    configure(network=saved["network"])
+
+
+def _clear_results(sim):                                                                            # Results of one network mean nothing on another
+    for recs in sim.RESULTS.values():
+        recs.clear()
+    sim.ASSOC.clear()
+
+
+#====================================================================================================
+# 3.0  PowerFactory Objects
+#====================================================================================================
+
+
+# 3.1.0 Obj / Cubicle / Typ / Folder — elements with the attributes otaki_sim reads and writes ---
+class Typ:                                                                                          # TypTr2 / TypLne
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+class Cubicle:                                                                                      # elm.bus1.cterm → terminal
+    def __init__(self, cterm):
+        self.cterm = cterm
+
+
+class Obj:
+    def __init__(self, loc_name, cls, bus=None, **attrs):
+        self.loc_name = loc_name
+        self._cls = cls
+        self.bus1 = Cubicle(bus)
+        self.__dict__.update(attrs)
+
+    def GetClassName(self):
+        return self._cls
+
+    def Activate(self):
+        return 0
+
+    def __repr__(self):
+        return f"{self.loc_name}.{self._cls}"
+
+
+class Folder:                                                                                       # IntPrjfolder, only GetContents is used
+    def __init__(self, contents):
+        self.contents = contents
+
+    def GetContents(self, pattern="*", recursive=0):
+        return [o for o in self.contents if fnmatch.fnmatchcase(f"{o.loc_name}.{o.GetClassName()}", pattern)]
+
+
+# 3.2.0 Results — ElmRes: registered columns plus the last run's value matrix ----------------------
+class Results:
+    def __init__(self):
+        self.Clear()
+
+    def GetClassName(self):
+        return "ElmRes"
+
+    def Clear(self):
+        self.columns = []                                                                           # [(element, variable)]
+        self.index = {}                                                                             # (id(element), variable) → column
+        self.data = np.zeros((0, 0))                                                                # (rows, columns)
+        self.t = np.zeros(0)
+        return 0
+
+    def AddVars(self, elm, *names):
+        for v in names:
+            key = (id(elm), v)
+            if key not in self.index:
+                self.index[key] = len(self.columns)
+                self.columns.append((elm, v))
+        return 0
+
+    def GetColumnValues(self, col):                                                                 # [error, values] for one whole column
+        if not 0 <= col < self.data.shape[1]:
+            return [1, []]
+        return [0, self.data[:, col].tolist()]
+
+
+# 3.3.0 Qds / SetTime — ComStatsim fills its results object, SetTime moves the start ---------------
+class SetTime:
+    def __init__(self):
+        self.datetime = CONFIG["start"]
+
+    def GetClassName(self):
+        return "SetTime"
+
+    def SetTimeUTC(self, t):
+        self.datetime = int(t)
+
+    def GetTimeUTC(self):
+        return int(self.datetime)
+        return 0
+
+
+class Qds:
+    def __init__(self, app):
+        self.app = app
+        self.results = Results()
+        self.stepSize, self.stepUnit, self.calcPeriod = 1, 2, 0
+        self.startTime, self.endTime = 0, 0                                                         # Used when calcPeriod = 4 (user-defined window)
+
+    def GetClassName(self):
+        return "ComStatsim"
+
+    def Execute(self):
+        app, res = self.app, self.results
+        if app.network is None:
+            app._build()
+        rows = int(CONFIG["rows"])
+        step = float(self.stepSize) * STEP_UNIT_S.get(int(self.stepUnit), 3600)
+        start = app.set_time.datetime
+        if int(self.calcPeriod) == 4:                                                               # startTime..endTime inclusive, any step
+            start = float(self.startTime)
+            rows = int((float(self.endTime) - start) // step) + 1
+        res.t = start + np.arange(rows) * step
+        h = (res.t - app.set_time.datetime) / 3600.0 % 24.0
+        pv_shape = np.clip(np.sin(np.pi * (h - 6.0) / 12.0), 0.0, None)                             # Zero outside 06:00–18:00
+        load_shape = 0.55 + 0.35 * np.exp(-((h - 18.5) / 2.5) ** 2) + 0.2 * np.exp(-((h - 8.0) / 1.5) ** 2)
+
+        P = {}                                                                                      # (element id) → MW series
+        net_mw = {}                                                                                 # bus → load − PV (MW)
+        for ld in app.by_class.get("ElmLod", []):
+            P[id(ld)] = ld.plini * float(getattr(ld, "scale0", 1.0) or 0.0) * load_shape
+            net_mw[ld.bus] = net_mw.get(ld.bus, 0.0) + P[id(ld)]
+        for pv in app.by_class.get("ElmPvsys", []):
+            P[id(pv)] = int(pv.ngnum or 0) * int(pv.npnum or 0) * PANEL_WATT / 1e6 * pv_shape
+            net_mw[pv.bus] = net_mw.get(pv.bus, 0.0) - P[id(pv)]
+
+        cols = []
+        zero = np.zeros(rows)
+        for elm, v in res.columns:
+            cls = elm.GetClassName()
+            if cls == "ElmTerm":                                                                    # Reverse flow lifts the LV bus
+                col = 1.0 - 0.08 * net_mw.get(elm.loc_name, zero) / TX_MVA
+            elif cls in ("ElmLod", "ElmPvsys"):
+                col = P[id(elm)]
+            elif cls == "ElmTr2":
+                col = 100.0 * np.abs(net_mw.get(elm.bus, zero)) / (elm.typ_id.strn * elm.ntnum)
+            elif cls == "ElmLne":
+                col = 100.0 * np.abs(net_mw.get(elm.bus, zero)) * 1000.0 / (math.sqrt(3) * 0.415 * elm.typ_id.sline * 1000.0)
+            else:
+                col = zero
+            cols.append(np.broadcast_to(col, (rows,)))
+        res.data = np.column_stack(cols) if cols else np.zeros((rows, 0))
+        return 0
+
+
+#====================================================================================================
+# 4.0  Application
+#====================================================================================================
+
+
+# 4.1.0 App — GetCalcRelevantObjects, study case objects and the Res* readers ---------------------
+class App:
+    def __init__(self):
+        self.network = None
+        self.set_time = SetTime()
+        self.qds = Qds(self)
+
+    def _build(self):                                                                               # Elements for CONFIG["network"] (built lazily)
+        net = CONFIG["network"]
+        if net is None:
+            import sys
+            net = CONFIG["network"] = network_from_sim(sys.modules["otaki_sim"])
+        terms = {b: Obj(b, "ElmTerm") for b in net["bus"]}
+        self.by_class = {"ElmTerm": list(terms.values())}
+        homes = {k: int(c.get("homes", 1) or 1) for k, c in net["config"].items()}
+        for cls, group, make in (
+                ("ElmLod", "load", lambda n: dict(plini=LOAD_MW, scale0=1.0)),
+                ("ElmPvsys", "pv", lambda n: dict(ngnum=homes.get(n, 1), npnum=25)),
+                ("ElmTr2", "tx", lambda n: dict(ntnum=1, typ_id=Typ(strn=TX_MVA, uktr=4.0, uktrr=1.0))),
+                ("ElmLne", "line", lambda n: dict(nlnum=1, dline=0.3, typ_id=Typ(rline=0.2, xline=0.08, sline=0.8)))):
+            objs = []
+            for name, bus in net[group].items():
+                o = Obj(name, cls, terms.get(bus), **make(name))
+                o.bus = bus                                                                         # Fast bus lookup for Execute
+                objs.append(o)
+            self.by_class[cls] = objs
+        self.names = {cls: sorted((o.loc_name, i) for i, o in enumerate(objs)) for cls, objs in self.by_class.items()}
+        self.network = net
+
+    # Project / study case
+    def ActivateProject(self, name):
+        return 0
+
+    def GetProjectFolder(self, kind):
+        return Folder([Obj(CONFIG["study_case"], "IntCase")])
+
+    def GetFromStudyCase(self, cls):
+        return {"ComStatsim": self.qds, "SetTime": self.set_time}.get(cls)
+
+    # Object lookup: exact names and "prefix*" patterns by bisect, anything else by fnmatch
+    def GetCalcRelevantObjects(self, selector):
+        if self.network is not CONFIG["network"] or self.network is None:
+            self._build()
+        pattern, _, cls = selector.rpartition(".")
+        objs, names = self.by_class.get(cls, []), self.names.get(cls, [])
+        exact = not any(c in pattern for c in "*?[")
+        head = pattern if exact else pattern[:-1]
+        if exact or (pattern.endswith("*") and not any(c in head for c in "*?[")):
+            out = []
+            for name, j in names[bisect.bisect_left(names, (head, -1)):]:
+                if name != head if exact else not name.startswith(head):
+                    break
+                out.append(objs[j])
+            return out
+        return [o for o in objs if fnmatch.fnmatchcase(o.loc_name, pattern)]
+
+    # Result reads
+    def ResLoadData(self, res):
+        return 0
+
+    def ResGetIndex(self, res, elm, var):
+        return res.index.get((id(elm), var), -1)
+
+    def ResGetValueCount(self, res, col=0):
+        return int(res.data.shape[0])
+
+    def ResGetData(self, res, row, col):
+        if col < 0:
+            return [0, float(res.t[row])]
+        return [0, float(res.data[row, col])]
+
+
+# 4.2.0 GetApplication / configure -------------------------------------------------------------------
+_APP  = App()
+_KEEP = object()                                                                                    # configure(): leave this setting alone
+
+
+def GetApplication():                                                                               # Same entry point as powerfactory.GetApplication
+    return _APP
+
+
+def configure(rows=None, network=_KEEP):                                                            # Change the size of the stand-in between runs (network None = from otaki_sim)
+    if rows is not None:
+        CONFIG["rows"] = int(rows)
+    if network is not _KEEP:
+        CONFIG["network"] = network
+    _APP.network = None                                                                             # Rebuilt on the next lookup
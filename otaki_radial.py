@@ -0,0 +1,265 @@
+# otaki_radial.py
+# 1.0 Set Up Environment
+    # 1.1.0 Per-unit bases and solver settings
+    # 1.2.0 Network file
+
+# 2.0 Network Model (impedances exported once from PowerFactory)
+    # 2.1.0 load_network / save_network
+    # 2.2.0 build_model
+
+# 3.0 Load / PV Profiles
+    # 3.1.0 profiles_from_results
+    # 3.2.0 profiles_from_workbook
+
+# 4.0 Backward / Forward Sweep
+    # 4.1.0 sweep
+    # 4.2.0 screen (any number of scenarios × time steps at once)
+    # 4.3.0 simulate (RESULTS-shaped output)
+
+# 5.0 Validation Against PowerFactory
+    # 5.1.0 validate
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import os, json                                                                                     # Network file is plain JSON next to this module
+import numpy as np                                                                                  # Whole sweep is array maths over (rows × suburbs)
+from otaki_results import results_matrix, volt_extremes                                             # RESULTS dict → (time × element) arrays, bus min / max
+HERE = os.path.dirname(os.path.abspath(__file__))                                                   # Repo folder
+
+
+# 1.1.0 Per-unit bases and solver settings ----------------------------------------------------------
+S_BASE_KVA  = 1000.0                                                                                # System power base (1 MVA)
+U_LV_KV     = 0.415                                                                                 # LV bus voltage base
+P_UNIT_KW   = 1000.0                                                                                # RESULTS P_W values are PF's m:P / m:Psum (MW) → × this = kW
+PANEL_WATT  = 240.0                                                                                 # Same as otaki_sim 1.4.0, for pv_meta ratings
+LOAD_PF     = 0.95                                                                                  # Loads only store P, assume this lagging power factor for Q
+MAX_ITER    = 30                                                                                    # Sweep iterations before giving up
+TOL_PU      = 1e-9                                                                                  # Largest |ΔV| between sweeps that counts as converged
+
+
+# 1.2.0 Network file ---------------------------------------------------------------------------------
+#   {"u_lv_kv": 0.415,
+#    "suburbs": {pv_key: {"bus", "tx", "line", "loads": [...], "load_code", "u_source_pu",
+#                         "sn_kva", "uk_pct", "ur_pct",                   # transformer (TypTr2)
+#                         "r_ohm", "x_ohm", "i_rated_a"}}}                # pline (TypLne × length)
+#   Written by otaki_sim.export_radial_network(), so PowerFactory is only needed once.
+NETWORK_FILE = os.path.join(HERE, "otaki_radial.json")
+
+
+#====================================================================================================
+# 2.0  Network Model
+#====================================================================================================
+
+
+# 2.1.0 load_network / save_network -----------------------------------------------------------------
+def load_network(path=None):                                                                        # Returns the network dict
+    path = path or NETWORK_FILE
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"2.1.0  No radial network at {path}, run otaki_sim.export_radial_network() once")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_network(network, path=None):                                                               # Returns the path written
+    path = path or NETWORK_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(network, f, indent=2, sort_keys=True)
+    return path
+
+
+# 2.2.0 build_model — network dict → per-unit arrays, one column per suburb -------------------------
+def build_model(network):
+    """
+    Convert the exported impedances to per-unit on S_BASE_KVA.
+    Each suburb is one radial chain: 11 kV source → transformer → pline → 0.415 kV bus.
+    """
+    subs = network["suburbs"]
+    keys = list(subs)
+    col = lambda f, d=0.0: np.array([float(subs[k].get(f, d) or d) for k in keys])                  # One float per suburb
+
+    u_kv = float(network.get("u_lv_kv", U_LV_KV))
+    sn = np.maximum(col("sn_kva"), 1e-6)
+    uk, ur = col("uk_pct"), col("ur_pct")
+    xr = np.sqrt(np.maximum(uk ** 2 - ur ** 2, 0.0))
+    z_tx = (ur + 1j * xr) / 100.0 * (S_BASE_KVA / sn)                                               # Own base → system base
+    z_base = u_kv ** 2 / (S_BASE_KVA / 1000.0)                                                      # Ω
+    z_ln = (col("r_ohm") + 1j * col("x_ohm")) / z_base
+    i_base = S_BASE_KVA / (np.sqrt(3.0) * u_kv)                                                     # A
+    return {
+        "keys":    keys,
+        "bus":     [subs[k].get("bus") for k in keys],
+        "tx":      [subs[k].get("tx") for k in keys],
+        "line":    [subs[k].get("line") for k in keys],
+        "loads":   [list(subs[k].get("loads") or []) for k in keys],
+        "load_code": [subs[k].get("load_code") or k.rsplit("_", 1)[0] for k in keys],               # Workbook column (PV_CONFIG "load")
+        "v0":      col("u_source_pu", 1.0).astype(complex),                                         # (K,) fixed 11 kV side voltage
+        "z_tx":    z_tx,                                                                            # (K,) p.u.
+        "z_ln":    z_ln,                                                                            # (K,) p.u.
+        "tx_rate": sn / S_BASE_KVA,                                                                 # (K,) p.u. current at 1 p.u. voltage
+        "ln_rate": np.maximum(col("i_rated_a"), 1e-6) / i_base,                                     # (K,) p.u. current
+    }
+
+
+#====================================================================================================
+# 3.0  Load / PV Profiles
+#====================================================================================================
+
+
+# 3.1.0 profiles_from_results — stored PF run → (t, load kW, PV kW) for new inverter / panel counts -
+def profiles_from_results(results, model, inverters=None, panels=None):
+    """
+    Rebuild (t, load_kw, pv_kw) arrays, each (T, K) in model["keys"] order, from a stored RESULTS.
+    With inverters / panels ({pv_key: count}) the PV column is rescaled from the
+    run's own counts in RESULTS["pv_meta"], i.e. same irradiance shape, new size.
+    """
+    keys = model["keys"]
+    _, t_pv, pv = results_matrix(results, "pv", "P_W", keys)
+    names = [n for ls in model["loads"] for n in ls]
+    _, t_ld, L = results_matrix(results, "load", "P_W", names)
+    T = max(pv.shape[0], L.shape[0])
+    t = t_pv if len(t_pv) >= len(t_ld) else t_ld
+
+    load_kw = np.zeros((T, len(keys)))
+    j = 0
+    for i, ls in enumerate(model["loads"]):                                                         # Sum every load on that suburb's bus
+        if ls:
+            load_kw[:L.shape[0], i] = np.nansum(L[:, j:j + len(ls)], axis=1)
+        j += len(ls)
+    pv_kw = np.zeros((T, len(keys)))
+    pv_kw[:pv.shape[0]] = np.nan_to_num(pv)
+
+    if inverters is not None or panels is not None:                                                 # Resize the PV to the new counts
+        meta = results.get("pv_meta") or {}
+        old = np.array([float((meta.get(k) or {}).get("inverters", 0) or 0) *
+                        float((meta.get(k) or {}).get("panels_per_inverter", 0) or 0) for k in keys])
+        new = np.array([float((inverters or {}).get(k, (meta.get(k) or {}).get("inverters", 0)) or 0) *
+                        float((panels or {}).get(k, (meta.get(k) or {}).get("panels_per_inverter", 0)) or 0)
+                        for k in keys])
+        pv_kw *= np.where(old > 0, new / np.where(old > 0, old, 1.0), 0.0)[None, :]
+    return t, load_kw * P_UNIT_KW, pv_kw * P_UNIT_KW
+
+
+# 3.2.0 profiles_from_workbook — Otaki Load Data.xlsx (cached) → (t, load kW, PV kW), no PF run needed
+def profiles_from_workbook(model, inverters, panels, day=0, days=1, step_size=1, step_unit=2):
+    """
+    Same return as profiles_from_results, built from the workbook's daily load
+    profile and its annual PV p.u. profile starting at day-of-year `day`.
+    """
+    import otaki_loads
+    t, load_kw = otaki_loads.load_kw(model["load_code"], step_size, step_unit, days)
+    _, pu = otaki_loads.pv_pu(day, days, step_size, step_unit)
+    units = np.array([float((inverters or {}).get(k, 0) or 0) * float((panels or {}).get(k, 0) or 0)
+                      for k in model["keys"]])
+    return t, load_kw, pu[:, None] * units[None, :] * PANEL_WATT / 1000.0
+
+
+#====================================================================================================
+# 4.0  Backward / Forward Sweep
+#====================================================================================================
+
+
+# 4.1.0 sweep — every row (time step / scenario) and every suburb solved together -------------------
+def sweep(model, s_pu):                                                                             # s_pu: (R, K) complex net load at the LV bus
+    """
+    Backward sweep: branch current = bus load current (one bus per chain).
+    Forward sweep: V_mid = V0 − z_tx·I, V_bus = V_mid − z_ln·I.
+    Returns (V_bus, I, iterations), all (R, K) complex.
+    """
+    v0, z_tx, z_ln = model["v0"], model["z_tx"], model["z_ln"]
+    V = np.broadcast_to(v0, s_pu.shape).copy()                                                      # Flat start at the source voltage
+    I = np.zeros_like(V)
+    for it in range(1, MAX_ITER + 1):
+        I = np.conj(s_pu / V)                                                                       # Backward: injected current at the bus
+        V_new = v0 - (z_tx + z_ln) * I                                                              # Forward: drop down the chain
+        err = float(np.abs(V_new - V).max()) if V.size else 0.0
+        V = V_new
+        if err < TOL_PU:
+            break
+    return V, I, it
+
+
+# 4.2.0 screen — load / PV arrays of any leading shape → voltage and loading arrays ------------------
+def screen(model, load_kw, pv_kw):
+    """
+    load_kw, pv_kw: (..., K) arrays, e.g. (T, K) for one run or (S, T, K) for S scenarios.
+    Returns {"u_pu", "tx_pct", "line_pct"} with the same leading shape, plus "iterations".
+    """
+    load_kw, pv_kw = np.broadcast_arrays(np.asarray(load_kw, float), np.asarray(pv_kw, float))
+    shape = load_kw.shape
+    K = shape[-1]
+    q_kvar = load_kw * np.tan(np.arccos(LOAD_PF))
+    s_pu = ((load_kw - pv_kw) + 1j * q_kvar).reshape(-1, K) / S_BASE_KVA                            # PV at unity power factor
+    V, I, it = sweep(model, s_pu)
+    Ia = np.abs(I)
+    return {
+        "u_pu":       np.abs(V).reshape(shape),
+        "tx_pct":     (Ia / model["tx_rate"] * 100.0).reshape(shape),
+        "line_pct":   (Ia / model["ln_rate"] * 100.0).reshape(shape),
+        "iterations": it,
+    }
+
+
+# 4.3.0 simulate — one run in the same RESULTS shape as otaki_sim.extract_qds_results --------------
+def simulate(model, t, load_kw, pv_kw, inverters=None, panels=None):                                # load_kw / pv_kw: (T, K)
+    out = screen(model, load_kw, pv_kw)
+    tl = [float(x) for x in t][:len(load_kw)]
+    results = {"bus": {}, "load": {}, "pv": {}, "tx": {}, "line": {}, "pv_meta": {}}
+    for i, k in enumerate(model["keys"]):
+        u = out["u_pu"][:, i].tolist()
+        if u:
+            results["bus"][model["bus"][i]] = volt_extremes({"t": tl, "u_pu": u})
+        loads = model["loads"][i]
+        for name in loads:                                                                          # Split the bus total evenly back over its loads
+            results["load"][name] = {"t": tl, "P_W": (load_kw[:, i] / len(loads) / P_UNIT_KW).tolist()}
+        results["pv"][k] = {"t": tl, "P_W": (pv_kw[:, i] / P_UNIT_KW).tolist()}
+        results["tx"][model["tx"][i]] = {"t": tl, "loading_pct": out["tx_pct"][:, i].tolist()}
+        results["line"][model["line"][i]] = {"t": tl, "loading_pct": out["line_pct"][:, i].tolist()}
+        n_inv = int((inverters or {}).get(k, 0) or 0)
+        n_pan = int((panels or {}).get(k, 0) or 0)
+        results["pv_meta"][k] = {"rating_kW_calc": n_inv * n_pan * PANEL_WATT / 1000.0,
+                                 "inverters": n_inv, "panels_per_inverter": n_pan}
+    return results
+
+
+#====================================================================================================
+# 5.0  Validation Against PowerFactory
+#====================================================================================================
+
+
+# 5.1.0 validate — per-element max / RMS error of a radial run against a PF run ---------------------
+def validate(pf_results, radial_results, verbose=True):
+    """
+    Compare bus u_pu and tx / line loading_pct element by element.
+    Returns {group: {name: {"max_abs", "rms"}}} plus "worst": {group: (name, max_abs)}.
+    """
+    report, worst = {}, {}
+    for group, field in (("bus", "u_pu"), ("tx", "loading_pct"), ("line", "loading_pct")):
+        names = sorted(set(pf_results.get(group) or {}) & set(radial_results.get(group) or {}))
+        if not names:
+            continue
+        _, _, A = results_matrix(pf_results, group, field, names)
+        _, _, B = results_matrix(radial_results, group, field, names)
+        n = min(A.shape[0], B.shape[0])
+        d = np.abs(A[:n] - B[:n])                                                                   # (T, E) absolute error, NaN = missing
+        ok = np.isfinite(d).any(axis=0)
+        mx, rms = np.full(len(names), np.nan), np.full(len(names), np.nan)
+        if ok.any():
+            mx[ok] = np.nanmax(d[:, ok], axis=0)
+            rms[ok] = np.sqrt(np.nanmean(d[:, ok] ** 2, axis=0))
+        report[group] = {nm: {"max_abs": float(mx[j]), "rms": float(rms[j])} for j, nm in enumerate(names)}
+        if ok.any():
+            j = int(np.nanargmax(mx))
+            worst[group] = (names[j], float(mx[j]))
+    report["worst"] = worst
+    if verbose:
+        print("5.1.0     Radial vs PowerFactory")
+        for group, (name, err) in worst.items():
+            unit = "p.u." if group == "bus" else "%"
+            print(f"5.1.0      {group:<4} worst = {err:.4f} {unit}  ({name})")
+        print()
+    return report
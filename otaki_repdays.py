@@ -0,0 +1,196 @@
+# otaki_repdays.py
+# 1.0 Set Up Environment
+    # 1.1.0 Selection settings
+
+# 2.0 Daily Shapes
+    # 2.1.0 daily_profiles
+    # 2.2.0 _features
+
+# 3.0 Clustering
+    # 3.1.0 kmedoids
+    # 3.2.0 select_days
+    # 3.3.0 error_curve
+
+# 4.0 Annual Reconstruction
+    # 4.1.0 day_epoch
+    # 4.2.0 day_metrics
+    # 4.3.0 annual_from_days
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import calendar                                                                                     # Day-of-year → PF study time
+import numpy as np                                                                                  # Distances, assignments and weights are all array ops
+import otaki_loads                                                                                  # Cached workbook profiles (load day + PV year)
+from otaki_results import VOLT_MIN_PU, VOLT_MAX_PU                                                  # Shared voltage band
+
+
+# 1.1.0 Selection settings ---------------------------------------------------------------------------
+REPDAYS_K   = 8                                                                                     # Representative days per annual study
+N_INIT      = 8                                                                                     # Random restarts, best total cost wins
+MAX_ITER    = 100                                                                                   # Assignment / medoid update rounds per restart
+PV_WEIGHT   = 1.0                                                                                   # Feature weight of the daily PV shape
+LOAD_WEIGHT = 1.0                                                                                   # Feature weight of the daily load shape
+YEAR        = 2024                                                                                  # Leap year, the workbook's PV profile has 366 days
+
+
+#====================================================================================================
+# 2.0  Daily Shapes
+#====================================================================================================
+
+
+# 2.1.0 daily_profiles — (days, 24) PV p.u. and total load kW from the cached workbook ---------------
+def daily_profiles(path=None):
+    d = otaki_loads.load_profiles(path)
+    pv = d["pv_pu"].reshape(-1, otaki_loads.HOURS_PER_DAY)                                          # (D, 24)
+    load = d["load_w"].sum(axis=1) / 1000.0                                                         # (24,) whole network kW
+    if load.ndim == 1:                                                                              # Workbook has one load day → same every day
+        load = np.broadcast_to(load, pv.shape)
+    return pv, np.asarray(load, dtype=float)
+
+
+# 2.2.0 _features — both shapes scaled to 0…1 and weighted, one row per day --------------------------
+def _features(pv, load):
+    f_pv = pv / max(float(pv.max()), 1e-12)
+    f_ld = load / max(float(load.max()), 1e-12)
+    return np.hstack([PV_WEIGHT * f_pv, LOAD_WEIGHT * f_ld])
+
+
+#====================================================================================================
+# 3.0  Clustering
+#====================================================================================================
+
+
+# 3.1.0 kmedoids — alternating k-medoids on a precomputed distance matrix ---------------------------
+def kmedoids(X, k, n_init=N_INIT, max_iter=MAX_ITER, seed=0):
+    """
+    X: (D, F) feature rows. Returns (medoids (k,), labels (D,), cost).
+    k-means++ seeding, then assign-to-nearest / best-medoid-per-cluster until stable.
+    """
+    X = np.asarray(X, dtype=float)
+    n = X.shape[0]
+    k = max(1, min(int(k), n))
+    sq = (X * X).sum(axis=1)
+    dist = np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2.0 * X @ X.T, 0.0))                      # (D, D) Euclidean
+    rng = np.random.default_rng(seed)
+    best = None
+    for _ in range(max(1, int(n_init))):
+        med = [int(rng.integers(n))]                                                                # k-means++ seeding
+        for _ in range(1, k):
+            d2 = dist[:, med].min(axis=1) ** 2
+            p = d2 / d2.sum() if d2.sum() > 0 else None
+            med.append(int(rng.choice(n, p=p)))
+        med = np.array(med)
+        for _ in range(max_iter):
+            labels = dist[:, med].argmin(axis=1)                                                    # Nearest medoid per day
+            onehot = labels[None, :] == np.arange(k)[:, None]                                       # (k, D) membership
+            within = onehot.astype(float) @ dist                                                    # (k, D) cost of each day as cluster c's medoid
+            within = np.where(onehot, within, np.inf)                                               # Medoid must be a member
+            new = np.where(onehot.any(axis=1), within.argmin(axis=1), med)                          # Empty cluster keeps its medoid
+            if np.array_equal(new, med):
+                break
+            med = new
+        labels = dist[:, med].argmin(axis=1)
+        cost = float(dist[np.arange(n), med[labels]].sum())
+        if best is None or cost < best[2]:
+            best = (med.copy(), labels, cost)
+    return best
+
+
+# 3.2.0 select_days — representative days, their weights and the approximation error --------------
+def select_days(k=REPDAYS_K, path=None, seed=0):
+    """
+    Returns {"days": (k,) day-of-year (0-based), "weights": (k,) days each represents,
+    "labels": (D,), "error": {...}}. Weights sum to the number of days in the year.
+    error compares the weighted representative days with the full year:
+        pv_energy_pct / load_energy_pct  annual energy error in %
+        pv_peak_pct / load_peak_pct      error in the largest hourly value in %
+        profile_rms_pu                   RMS of (day − its medoid) in PV p.u.
+    """
+    pv, load = daily_profiles(path)
+    med, labels, _ = kmedoids(_features(pv, load), k, seed=seed)
+    order = np.argsort(med)                                                                         # Chronological order for QDS runs
+    med = med[order]
+    labels = np.argsort(order)[labels]
+    weights = np.bincount(labels, minlength=len(med)).astype(float)
+
+    def pct(a, b):
+        return float(100.0 * (a - b) / b) if b else 0.0
+
+    err = {
+        "pv_energy_pct":   pct((weights[:, None] * pv[med]).sum(), pv.sum()),
+        "load_energy_pct": pct((weights[:, None] * load[med]).sum(), load.sum()),
+        "pv_peak_pct":     pct(pv[med].max(), pv.max()),
+        "load_peak_pct":   pct(load[med].max(), load.max()),
+        "profile_rms_pu":  float(np.sqrt(((pv - pv[med][labels]) ** 2).mean())),
+    }
+    return {"days": med, "weights": weights, "labels": labels, "error": err}
+
+
+# 3.3.0 error_curve — approximation error for several k, to choose how many days to run ------------
+def error_curve(ks=(2, 4, 6, 8, 12, 16, 24), path=None):                                            # {k: error dict}
+    return {int(k): select_days(k, path)["error"] for k in ks}
+
+
+#====================================================================================================
+# 4.0  Annual Reconstruction
+#====================================================================================================
+
+
+# 4.1.0 day_epoch — 0-based day-of-year → UTC seconds at midnight (PF SetTime) ----------------------
+def day_epoch(day, year=YEAR):
+    return calendar.timegm((int(year), 1, 1, 0, 0, 0)) + int(day) * 86400
+
+
+# 4.2.0 day_metrics — one day's RESULTS → energies, extremes and out-of-band hours per element -----
+def day_metrics(results, u_min=VOLT_MIN_PU, u_max=VOLT_MAX_PU, limit_pct=100.0):
+    """
+    {"pv_energy", "load_energy"}: {name: Σ P·h} (P in RESULTS units)
+    {"u_min", "u_max", "hours_out"}: per bus, {"loading_max", "hours_over"}: per tx / line
+    """
+    from otaki_results import results_matrix
+    out = {}
+    for group, key in (("pv", "pv_energy"), ("load", "load_energy")):
+        names, t, P = results_matrix(results, group, "P_W")
+        dt = float(np.median(np.diff(t))) / 3600.0 if len(t) > 1 else 1.0                           # Step length in hours
+        out[key] = dict(zip(names, (np.nansum(P, axis=0) * dt).tolist()))
+    names, t, U = results_matrix(results, "bus", "u_pu")
+    dt = float(np.median(np.diff(t))) / 3600.0 if len(t) > 1 else 1.0
+    out["u_min"] = dict(zip(names, np.nanmin(U, axis=0).tolist())) if U.size else {}
+    out["u_max"] = dict(zip(names, np.nanmax(U, axis=0).tolist())) if U.size else {}
+    out["hours_out"] = dict(zip(names, (((U < u_min) | (U > u_max)).sum(axis=0) * dt).tolist()))
+    for group in ("tx", "line"):
+        names, t, L = results_matrix(results, group, "loading_pct")
+        dt = float(np.median(np.diff(t))) / 3600.0 if len(t) > 1 else 1.0
+        out[f"{group}_loading_max"] = dict(zip(names, np.nanmax(L, axis=0).tolist())) if L.size else {}
+        out[f"{group}_hours_over"] = dict(zip(names, ((L > limit_pct).sum(axis=0) * dt).tolist()))
+    return out
+
+
+# 4.3.0 annual_from_days — weighted sums for totals, plain extremes for limits ---------------------
+def annual_from_days(per_day, selection):
+    """
+    per_day: list of day_metrics, one per selection["days"] entry (same order).
+    Energies and hour counts are weighted sums; min / max values are taken over
+    the representative days (they are the only days simulated).
+    """
+    w = np.asarray(selection["weights"], dtype=float)
+    annual = {}
+    for key in per_day[0] if per_day else ():
+        names = sorted(set().union(*(d[key] for d in per_day)))
+        M = np.array([[d[key].get(n, np.nan) for n in names] for d in per_day], dtype=float)        # (k, E)
+        if key.endswith("_min"):
+            vals = np.nanmin(M, axis=0)
+        elif key.endswith("_max"):
+            vals = np.nanmax(M, axis=0)
+        else:
+            vals = np.nansum(M * w[:, None], axis=0)
+        annual[key] = dict(zip(names, vals.tolist()))
+    annual["days"] = [int(d) for d in selection["days"]]
+    annual["weights"] = [float(x) for x in w]
+    annual["error"] = dict(selection["error"])
+    return annual
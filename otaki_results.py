@@ -0,0 +1,237 @@
+# otaki_results.py
+# 1.0 Set Up Environment
+    # 1.1.0 Voltage band limits (one definition for the GUI, studies and adaptive runs)
+
+# 2.0 Results Matrix (RESULTS dict → NumPy arrays)
+    # 2.1.0 results_matrix
+    # 2.2.0 hours_since_start
+    # 2.3.0 volt_extremes (bus min / max and their hours, every producer)
+
+# 3.0 Run Comparison (current vs baseline)
+    # 3.1.0 snapshot / save_run / load_run
+    # 3.2.0 compare
+
+# 4.0 Binary Transfer
+    # 4.1.0 pack_results / unpack_results
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import io, json                                                                                     # Archived runs are plain JSON (same shape as RESULTS)
+import numpy as np                                                                                  # Vectorised maths over the whole results set (ships with Matplotlib)
+
+
+# 1.1.0 Voltage band limits --------------------------------------------------------------------------
+VOLT_MIN_PU  = 0.95                                                                                 # Lower statutory voltage limit (p.u.)
+VOLT_MAX_PU  = 1.05                                                                                 # Upper statutory voltage limit (p.u.)
+VOLT_NOM_PU  = 1.0                                                                                  # Nominal voltage, centre of diverging colour maps
+VOLT_NEAR_PU = 0.01                                                                                 # Within this of a limit counts as near (amber in the GUI, refined by otaki_adaptive)
+VOLT_BAND    = (VOLT_MIN_PU, VOLT_MAX_PU)                                                           # (min, max) for callers that take the band as a pair
+
+
+def volt_status(pu):                                                                                # "ok" | "near" | "out", None when unknown
+    if pu is None or pu != pu:                                                                      # None / NaN
+        return None
+    if pu < VOLT_MIN_PU or pu > VOLT_MAX_PU:
+        return "out"
+    if pu < VOLT_MIN_PU + VOLT_NEAR_PU or pu > VOLT_MAX_PU - VOLT_NEAR_PU:
+        return "near"
+    return "ok"
+
+
+def volt_ok(u_min, u_max):                                                                          # Both extremes known and inside the band
+    return volt_status(u_min) in ("ok", "near") and volt_status(u_max) in ("ok", "near")
+
+
+#====================================================================================================
+# 2.0  Results Matrix (RESULTS dict → NumPy arrays)
+#====================================================================================================
+
+
+# 2.1.0 results_matrix — stack one field of one element group into a (time × element) array ---------
+def results_matrix(results, kind, field, names=None):                                               # e.g. results_matrix(RESULTS, "bus", "u_pu")
+    """
+    Stack RESULTS[kind][name][field] for every name into one float array.
+    Returns (names, t, M) where M has shape (time steps, len(names)).
+    Missing elements and short series are padded with NaN.
+    """
+    group = (results or {}).get(kind, {}) or {}                                                     # e.g. RESULTS["bus"]
+    names = sorted(group) if names is None else list(names)                                         # Column order
+    series = [(group.get(n) or {}).get(field) or [] for n in names]                                 # Raw lists per element
+    n_t = max((len(s) for s in series), default=0)                                                  # Longest series sets the row count
+    M = np.full((n_t, len(names)), np.nan)                                                          # NaN = no data for that element/time
+    for j, s in enumerate(series):                                                                  # One vectorised copy per column
+        if s:
+            M[:len(s), j] = s
+    t = []                                                                                          # Time axis from the longest element
+    for n in names:
+        tt = (group.get(n) or {}).get("t") or []
+        if len(tt) > len(t):
+            t = tt
+    return names, np.asarray(t, dtype=float), M
+
+
+# 2.2.0 hours_since_start — PF timestamps (s) → decimal hours from the first step -------------------
+def hours_since_start(t):                                                                           # Works for any step size and multi-day runs
+    t = np.asarray(t, dtype=float)                                                                  # Accept lists too
+    return (t - t[0]) / 3600.0 if t.size else t                                                     # Empty in, empty out
+
+
+# 2.3.0 volt_extremes — u_pu_min / u_pu_max and the hour of each, stored into the bus record --------
+#   "hour" is always hours since the record's first time stamp (the GUI plots against the
+#   same axis), so 1 h rows from the start give the row index and uneven axes still agree.
+def row_hours(t, n):                                                                                # Hours of the first n rows, ints where whole
+    t = list(t or [])[:n]
+    if len(t) < n:                                                                                  # No usable stamps: 1 h rows
+        return list(range(n))
+    return [int(h) if float(h).is_integer() else float(h) for h in hours_since_start(t)]
+
+
+def volt_extremes(rec, n=None):                                                                     # n: only the first n rows (otaki_sim 4.2.1 keeps 24)
+    u = list(rec.get("u_pu") or [])[:n]
+    if not u:                                                                                       # Nothing to store
+        return rec
+    hours = row_hours(rec.get("t"), len(u))
+    v = np.asarray(u, dtype=float)
+    if not np.isfinite(v).any():                                                                    # Only gaps: no extremes to store
+        return rec
+    i_min, i_max = int(np.nanargmin(v)), int(np.nanargmax(v))                                       # NaN rows (gaps) never win
+    rec.update(u_pu_min=u[i_min], u_pu_min_hour=hours[i_min], u_pu_max=u[i_max], u_pu_max_hour=hours[i_max])
+    return rec
+
+
+#====================================================================================================
+# 3.0  Run Comparison (current vs baseline)
+#====================================================================================================
+
+
+COMPARE_FIELDS = (("bus", "u_pu"), ("tx", "loading_pct"), ("line", "loading_pct"),
+                  ("pv", "P_W"), ("load", "P_W"))                                                   # (group, field) pairs compared
+
+
+# 3.1.0 snapshot / save_run / load_run — keep a run after the next one overwrites RESULTS ---------
+def snapshot(results):                                                                              # Group and record dicts copied, series lists shared
+    return {g: ({n: dict(r) if isinstance(r, dict) else r for n, r in recs.items()} if isinstance(recs, dict) else recs)
+            for g, recs in (results or {}).items()}
+
+
+def save_run(results, path):                                                                        # Archive one run as JSON
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(results), f)
+    return path
+
+
+def load_run(path):                                                                                 # Archived run → RESULTS-shaped dict
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 3.2.0 compare — align two runs by element and time step, deltas + summaries in one pass ----------
+def compare(current, baseline, fields=COMPARE_FIELDS):
+    """
+    Align current and baseline on the elements both contain and on the time
+    steps both cover (offsets from each run's own start, so runs on different
+    days still line up). Returns
+        {"hours": (T,),
+         group: {"names", "hours", "current", "baseline", "delta" (T × E arrays),
+                 "summary": {name: {"mean", "max_abs", "max_abs_hour", "peak_cur", "peak_base", "peak_delta",
+                                    "min_cur", "min_base", "min_delta"}},
+                 "only_current", "only_baseline"}}
+    """
+    out = {"hours": np.zeros(0)}
+    for group, field in fields:
+        cur, base = (current or {}).get(group) or {}, (baseline or {}).get(group) or {}
+        names = sorted(set(cur) & set(base))
+        rec = {"names": names, "only_current": sorted(set(cur) - set(base)),
+               "only_baseline": sorted(set(base) - set(cur)), "summary": {}}
+        out[group] = rec
+        if not names:
+            continue
+        _, tc, A = results_matrix(current, group, field, names)
+        _, tb, B = results_matrix(baseline, group, field, names)
+        sc = np.round((tc - tc[0])).astype(np.int64) if tc.size else np.arange(A.shape[0])          # Seconds from each run's start
+        sb = np.round((tb - tb[0])).astype(np.int64) if tb.size else np.arange(B.shape[0])
+        common, ia, ib = np.intersect1d(sc[:A.shape[0]], sb[:B.shape[0]], return_indices=True)
+        A, B = A[ia], B[ib]
+        D = A - B                                                                                   # (T, E) delta, NaN where either is missing
+        if out["hours"].size == 0:
+            out["hours"] = common / 3600.0
+        rec.update(hours=common / 3600.0, current=A, baseline=B, delta=D)
+        if not len(common):
+            continue
+        ok = np.isfinite(D).any(axis=0)
+        absD = np.where(np.isfinite(D), np.abs(D), -1.0)
+        i_max = absD.argmax(axis=0)                                                                 # Step of the largest change per element
+        cols = np.arange(len(names))
+        with np.errstate(all="ignore"):
+            stats = {
+                "mean":         np.where(ok, np.nanmean(np.where(ok, D, 0.0), axis=0), np.nan),
+                "max_abs":      np.where(ok, D[i_max, cols], np.nan),
+                "max_abs_hour": np.where(ok, common[i_max] / 3600.0, np.nan),
+                "peak_cur":     np.nanmax(np.where(np.isfinite(A), A, -np.inf), axis=0),
+                "peak_base":    np.nanmax(np.where(np.isfinite(B), B, -np.inf), axis=0),
+                "min_cur":      np.nanmin(np.where(np.isfinite(A), A, np.inf), axis=0),
+                "min_base":     np.nanmin(np.where(np.isfinite(B), B, np.inf), axis=0),
+            }
+        stats["peak_delta"] = stats["peak_cur"] - stats["peak_base"]
+        stats["min_delta"] = stats["min_cur"] - stats["min_base"]
+        for key in stats:                                                                           # ±inf (all NaN column) → NaN
+            stats[key] = np.where(np.isfinite(stats[key]), stats[key], np.nan)
+        rec["summary"] = {n: {k: float(v[j]) for k, v in stats.items()} for j, n in enumerate(names)}
+    return out
+
+
+#====================================================================================================
+# 4.0  Binary Transfer
+#====================================================================================================
+
+
+PACK_FIELDS = {"bus": ("u_pu",), "load": ("P_W",), "pv": ("P_W",), "tx": ("loading_pct",),
+               "line": ("loading_pct",)}                                                            # Series that travel, min / max are rebuilt
+
+
+# 4.1.0 pack_results / unpack_results — RESULTS ↔ compressed .npz bytes (float32 series) ----------
+def pack_results(results):                                                                          # ~10× smaller than the JSON of a 24 h run
+    arrays = {"meta": np.array(json.dumps({k: v for k, v in (results or {}).items() if k not in PACK_FIELDS}))}
+    for group, fields in PACK_FIELDS.items():
+        names, t, _ = results_matrix(results, group, fields[0])
+        recs = (results or {}).get(group) or {}
+        arrays[f"{group}/names"] = np.array(names, dtype=str)
+        arrays[f"{group}/t"] = t
+        arrays[f"{group}/t_len"] = np.array([len(recs[n].get("t") or []) for n in names], dtype=np.int64) # Own axis length per element
+        for field in fields:
+            arrays[f"{group}/{field}"] = results_matrix(results, group, field, names)[2].astype(np.float32)
+            arrays[f"{group}/{field}/len"] = np.array([len(recs[n].get(field) or []) for n in names], dtype=np.int64) # NaNs inside a series stay
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **arrays)
+    return buf.getvalue()
+
+
+def unpack_results(blob):                                                                           # Same shape as otaki_sim.RESULTS, bus min / max hours included
+    with np.load(io.BytesIO(blob), allow_pickle=False) as z:
+        out = json.loads(str(z["meta"]))
+        for group, fields in PACK_FIELDS.items():
+            names, t = z[f"{group}/names"].tolist(), z[f"{group}/t"].tolist()
+            cols = {f: z[f"{group}/{f}"] for f in fields}
+            lens = {f: _lengths(z, f"{group}/{f}/len", M) for f, M in cols.items()}
+            t_len = _lengths(z, f"{group}/t_len", None, len(names), len(t))
+            recs = out.setdefault(group, {})
+            for j, name in enumerate(names):
+                rec = {"t": t[:t_len[j]]}
+                for f, M in cols.items():
+                    rec[f] = M[:lens[f][j], j].astype(float).tolist()                               # Padding off, NaNs inside kept in place
+                recs[name] = volt_extremes(rec)                                                     # Hours from t, as otaki_sim stores them
+    return out
+
+
+def _lengths(z, key, M, n_cols=0, n_rows=0):                                                        # Stored lengths; older blobs: trim trailing padding only
+    if key in z.files:
+        return z[key].tolist()
+    if M is None:
+        return [n_rows] * n_cols
+    finite = np.isfinite(M)
+    return [int(np.flatnonzero(finite[:, j])[-1]) + 1 if finite[:, j].any() else 0 for j in range(M.shape[1])]
@@ -0,0 +1,227 @@
+# otaki_scenarios.py
+# 1.0 Set Up Environment
+    # 1.1.0 File columns
+
+# 2.0 Scenario Files
+    # 2.1.0 load_scenarios (JSON / CSV)
+    # 2.2.0 _normalise
+
+# 3.0 Signatures and Cache
+    # 3.1.0 panels_from_kw
+    # 3.2.0 signature
+    # 3.3.0 ResultCache
+
+# 4.0 Running and Summaries
+    # 4.1.0 resolve (scenario + model defaults → counts)
+    # 4.2.0 run_scenario
+    # 4.3.0 summarise
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   A scenario is {"name", "inverters": {pv_key: count}, "kw_per_inv": {pv_key: kW}}.
+#   Suburbs a scenario leaves out keep the model's own counts, so a file only has to
+#   list what changes. Shared by otaki_cli (batch runs), the job server and the
+#   asyncio API, so all three key and summarise runs the same way.
+
+
+import os, csv, json, hashlib                                                                       # Scenario files, signatures
+
+
+# 1.1.0 File columns ---------------------------------------------------------------------------------
+CSV_COLUMNS = ("scenario", "pv_key", "inverters", "kw_per_inv")                                     # One row per scenario × suburb, either count may be blank
+
+
+#====================================================================================================
+# 2.0  Scenario Files
+#====================================================================================================
+
+
+# 2.1.0 load_scenarios — JSON or CSV → list of scenarios in file order -----------------------------
+def load_scenarios(path, pv_keys=None):
+    """
+    JSON: a list (or {"scenarios": [...]}) of
+          {"name": ..., "suburbs": {pv_key: {"inverters": n, "kw_per_inv": kW}}}
+          or {"name": ..., "inverters": {...}, "kw_per_inv": {...}}.
+    CSV:  columns scenario, pv_key, inverters, kw_per_inv.
+    pv_keys: known suburbs (otaki_sim.PV_CONFIG); anything else is a ValueError.
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        scenarios = {}
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            missing = {"scenario", "pv_key"} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"2.1.0  {path}: missing column(s) {', '.join(sorted(missing))}")
+            for row in reader:
+                sc = scenarios.setdefault(row["scenario"].strip(), {"name": row["scenario"].strip(),
+                                                                    "inverters": {}, "kw_per_inv": {}})
+                key = row["pv_key"].strip()
+                if (row.get("inverters") or "").strip():
+                    sc["inverters"][key] = row["inverters"]
+                if (row.get("kw_per_inv") or "").strip():
+                    sc["kw_per_inv"][key] = row["kw_per_inv"]
+        raw = list(scenarios.values())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        raw = raw.get("scenarios", []) if isinstance(raw, dict) else raw
+        if not isinstance(raw, list):
+            raise ValueError(f"2.1.0  {path}: expected a list of scenarios, got {type(raw).__name__}")
+    return [_normalise(sc, i, pv_keys) for i, sc in enumerate(raw, 1)]
+
+
+# 2.2.0 _normalise — one scenario in either JSON layout → {"name", "inverters", "kw_per_inv"} -------
+def _normalise(sc, index, pv_keys=None):                                                            # Every malformed input is a ValueError("2.2.0 Scenario …")
+    if not isinstance(sc, dict):
+        raise ValueError(f"2.2.0  Scenario {index}: expected an object, got {type(sc).__name__}")
+    name = str(sc.get("name") or f"scenario_{index}")
+    try:
+        inv, kw = _mapping(sc, "inverters"), _mapping(sc, "kw_per_inv")
+        for key, rec in _mapping(sc, "suburbs").items():
+            if not isinstance(rec, dict):
+                raise TypeError(f"suburbs['{key}'] must be an object, got {type(rec).__name__}")
+            if "inverters" in rec:
+                inv[key] = rec["inverters"]
+            if "kw_per_inv" in rec:
+                kw[key] = rec["kw_per_inv"]
+        inv = {str(k): int(round(float(v))) for k, v in inv.items()}
+        kw = {str(k): float(v) for k, v in kw.items()}
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"2.2.0  Scenario '{name}': {e}")
+    if pv_keys is not None:
+        unknown = sorted((set(inv) | set(kw)) - set(pv_keys))
+        if unknown:
+            raise ValueError(f"2.2.0  Scenario '{name}': unknown suburb(s) {', '.join(unknown)}")
+    if any(v < 0 for v in inv.values()) or any(not 0 <= v < float("inf") for v in kw.values()):
+        raise ValueError(f"2.2.0  Scenario '{name}': negative or non-finite inverter count or kW")
+    return {"name": name, "inverters": inv, "kw_per_inv": kw}
+
+
+def _mapping(sc, field):                                                                            # sc[field] as a fresh dict, TypeError if it is not one
+    value = sc.get(field) or {}
+    if not isinstance(value, dict):
+        raise TypeError(f"'{field}' must be an object of pv_key → value, got {type(value).__name__}")
+    return dict(value)
+
+
+#====================================================================================================
+# 3.0  Signatures and Cache
+#====================================================================================================
+
+
+# 3.1.0 panels_from_kw — kW per inverter → whole panels, as the GUI does (6.3.1) -------------------
+def panels_from_kw(kw, panel_watt):
+    return max(0, int(round(float(kw) * 1000.0 / float(panel_watt))))
+
+
+# 3.2.0 signature — identical inputs give the same key whatever the scenario is called ------------
+def signature(inverters, panels, backend="pf"):
+    blob = json.dumps([backend, sorted(inverters.items()), sorted(panels.items())], separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# 3.3.0 ResultCache — signature → result snapshot, so repeated scenarios are not re-run ------------
+class ResultCache:
+    def __init__(self, limit=64):                                                                   # Snapshots are small (24 rows × ~80 elements)
+        self.limit = int(limit)
+        self.items = {}
+
+    def get(self, sig):
+        return self.items.get(sig)
+
+    def put(self, sig, results):
+        self.items.pop(sig, None)
+        self.items[sig] = results
+        while len(self.items) > self.limit:                                                         # Oldest first
+            self.items.pop(next(iter(self.items)))
+
+    def __contains__(self, sig):
+        return sig in self.items
+
+
+#====================================================================================================
+# 4.0  Running and Summaries
+#====================================================================================================
+
+
+# 4.1.0 resolve — scenario + the model's current counts → full inverter / panel maps --------------
+def resolve(sim, scenario, backend=None):                                                           # Returns (inverters, panels, signature)
+    inverters = {k: int(sim.PV_INV_OVERRIDES.get(k, sim.PV_CONFIG[k].get("homes", 0))) for k in sim.PV_CONFIG}
+    panels = {k: int(sim.PV_PANEL_OVERRIDES.get(k, 0)) for k in sim.PV_CONFIG}
+    inverters.update(scenario.get("inverters") or {})
+    panels.update({k: panels_from_kw(kw, sim.PANEL_WATT) for k, kw in (scenario.get("kw_per_inv") or {}).items()})
+    return inverters, panels, signature(inverters, panels, backend or sim.SIM_BACKEND)
+
+
+# 4.2.0 run_scenario — apply the counts and run through otaki_sim's GUI adapter --------------------
+def run_scenario(sim, scenario, cache=None, backend=None):
+    """
+    Returns (results snapshot or {}, signature, from_cache). The model's override
+    dicts are restored afterwards so a batch does not leak into the next caller.
+    """
+    from otaki_results import snapshot
+    inverters, panels, sig = resolve(sim, scenario, backend)
+    if cache is not None and sig in cache:
+        return cache.get(sig), sig, True
+    saved_inv, saved_pan, saved_backend = dict(sim.PV_INV_OVERRIDES), dict(sim.PV_PANEL_OVERRIDES), sim.SIM_BACKEND
+    try:
+        sim.SIM_BACKEND = backend or sim.SIM_BACKEND
+        sim.PV_PANEL_OVERRIDES.clear(); sim.PV_PANEL_OVERRIDES.update(panels)                       # Same hand-off as gui_app 6.3.1
+        ok = sim.set_penetrations_and_run(inverters)
+        results = snapshot(sim.RESULTS) if ok else {}
+    finally:
+        sim.SIM_BACKEND = saved_backend
+        sim.PV_INV_OVERRIDES.clear(); sim.PV_INV_OVERRIDES.update(saved_inv)
+        sim.PV_PANEL_OVERRIDES.clear(); sim.PV_PANEL_OVERRIDES.update(saved_pan)
+    if results and cache is not None:
+        cache.put(sig, results)
+    return results, sig, False
+
+
+# 4.3.0 summarise — per-suburb rows and one worst-case line per scenario --------------------------
+def summarise(results, pv_config, inverters=None, panels=None, panel_watt=240.0, load_names=None):
+    """
+    rows: one dict per suburb (u_min / u_max / hours_out at its bus, tx / line peak
+    loading, PV energy in RESULTS units × h, installed kW, and the otaki_metrics
+    energy / reverse-flow figures in kWh and hours).
+    worst: network-wide extremes and how many buses left the voltage band.
+    """
+    from otaki_repdays import day_metrics
+    from otaki_results import VOLT_MIN_PU, VOLT_MAX_PU
+    from otaki_metrics import metrics_for, suburb_rows
+    m = day_metrics(results, VOLT_MIN_PU, VOLT_MAX_PU)
+    met = metrics_for(results, pv_config, load_names)                                               # Stored with the run by otaki_sim 4.10
+    energy = suburb_rows(met)
+    inverters, panels = inverters or {}, panels or {}
+    rows = []
+    for key, cfg in pv_config.items():
+        kw_inv = panels.get(key, 0) * panel_watt / 1000.0
+        rows.append({
+            "pv_key": key, "inverters": inverters.get(key), "kw_per_inv": round(kw_inv, 3),
+            "installed_kw": round(kw_inv * (inverters.get(key) or 0), 3),
+            "u_min": m["u_min"].get(cfg.get("bus")), "u_max": m["u_max"].get(cfg.get("bus")),
+            "hours_out": m["hours_out"].get(cfg.get("bus")),
+            "tx_loading_max": m["tx_loading_max"].get(cfg.get("tx")),
+            "line_loading_max": m["line_loading_max"].get(cfg.get("pline")),
+            "pv_energy": m["pv_energy"].get(key),
+            **energy.get(key, {}),
+        })
+
+    def extreme(d, fn):
+        vals = [v for v in d.values() if v is not None and v == v]                                  # Drop None / NaN
+        return fn(vals) if vals else None
+
+    worst = {
+        "u_min": extreme(m["u_min"], min), "u_max": extreme(m["u_max"], max),
+        "tx_loading_max": extreme(m["tx_loading_max"], max),
+        "line_loading_max": extreme(m["line_loading_max"], max),
+        "buses_out": sum(1 for v in m["hours_out"].values() if v),
+        "pv_energy": sum(v for v in m["pv_energy"].values() if v == v),
+        "load_energy": sum(v for v in m["load_energy"].values() if v == v),
+        "export_kwh": met["network"]["export_kwh"],
+        "rpf_transformers": met["network"]["rpf_transformers"],
+    }
+    return rows, worst
@@ -0,0 +1,311 @@
+# otaki_server.py
+# 1.0 Set Up Environment
+    # 1.1.0 Server settings
+
+# 2.0 Job Queue (owns the PowerFactory session)
+    # 2.1.0 JobServer.submit (deduplicated by input signature)
+    # 2.2.0 JobServer worker
+    # 2.3.0 JobServer.status
+
+# 3.0 HTTP Front End
+    # 3.1.0 Handler (routes)
+
+# 4.0 Client
+    # 4.1.0 Client
+
+# 5.0 Main
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   One process opens PowerFactory (otaki_sim 2.1–2.3) once and serves scenario jobs
+#   to any number of local clients — GUI, otaki_cli, notebooks — over HTTP/JSON on
+#   127.0.0.1. Jobs with the same inputs share one run. PF is driven from a single
+#   worker thread; the HTTP threads only queue work and read finished results.
+#
+#       python otaki_server.py [--port 8765] [--backend radial] [--offline] [--trace] [--log server.log]
+#
+#   POST /jobs               scenario JSON (otaki_scenarios layout) → {"id", "signature", "status"}
+#   GET  /jobs/<id>          status, position in the queue, worst-case summary when done
+#   GET  /jobs/<id>/result   results as compressed .npz bytes (otaki_results.unpack_results),
+#                            ?format=json for plain RESULTS JSON
+#   GET  /status             queue length, job counts, backend, the model's own inverter / panel counts
+
+
+import os, sys, json, time, queue, threading, itertools                                             # Standard library server, no extra installs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from types import SimpleNamespace
+from otaki_async import ThreadStdout                                                                # Per-thread print redirection, shared with the asyncio API
+
+
+# 1.1.0 Server settings ------------------------------------------------------------------------------
+HOST        = "127.0.0.1"                                                                           # Local clients only, never a public interface
+PORT        = 8765
+JOB_HISTORY = 500                                                                                   # Finished jobs kept for clients to collect
+CACHE_RUNS  = 64                                                                                    # Result snapshots kept for repeated inputs
+
+
+#====================================================================================================
+# 2.0  Job Queue
+#====================================================================================================
+
+
+class JobServer:
+    """
+    Queue + single worker around one otaki_sim session. Jobs are dicts:
+    {"id", "name", "signature", "status": queued|running|done|error, "submitted",
+     "started", "finished", "error", "worst", "results", "packed"}.
+    """
+    def __init__(self, sim, backend=None, log=None):
+        import otaki_scenarios as osc
+        self.sim, self.osc, self.log = sim, osc, log
+        self.backend = backend or sim.SIM_BACKEND
+        self.defaults = SimpleNamespace(                                                            # Model counts at start-up, so signatures never
+            PV_CONFIG=sim.PV_CONFIG, PANEL_WATT=sim.PANEL_WATT, SIM_BACKEND=self.backend,           # see a run's temporary overrides
+            PV_INV_OVERRIDES=dict(sim.PV_INV_OVERRIDES), PV_PANEL_OVERRIDES=dict(sim.PV_PANEL_OVERRIDES))
+        self.cache = osc.ResultCache(CACHE_RUNS)
+        self.stdout = ThreadStdout.install()                                                        # Worker prints → log, HTTP / main threads untouched
+        self.jobs = {}                                                                              # id → job (insertion ordered, trimmed)
+        self.active = {}                                                                            # signature → queued / running job id
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.worker = threading.Thread(target=self._work, name="pf-worker", daemon=True)
+        self.worker.start()
+
+    # 2.1.0 submit — new job, or the id of an identical queued / running / cached one ------------
+    def submit(self, scenario):
+        sc = self.osc._normalise(scenario, 0, self.sim.PV_CONFIG)                                   # ValueError → HTTP 400
+        inverters, panels, sig = self.osc.resolve(self.defaults, sc, self.backend)
+        with self.lock:
+            if sig in self.active:                                                                  # Same inputs already waiting / running
+                return self.jobs[self.active[sig]]
+            job = {"id": str(next(self.ids)), "name": sc["name"], "signature": sig, "scenario": sc,
+                   "status": "queued", "submitted": time.time(), "started": None, "finished": None,
+                   "error": "", "worst": None, "results": None, "packed": None}
+            cached = self.cache.get(sig)
+            if cached is not None:                                                                  # Finished earlier → done immediately
+                job.update(status="done", started=job["submitted"], finished=job["submitted"], results=cached,
+                           worst=self.osc.summarise(cached, self.sim.PV_CONFIG, inverters, panels, self.sim.PANEL_WATT)[1])
+            else:
+                self.active[sig] = job["id"]
+                self.queue.put(job["id"])
+            self.jobs[job["id"]] = job
+            while len(self.jobs) > JOB_HISTORY:                                                     # Oldest finished jobs go first
+                old = next((k for k, j in self.jobs.items() if j["status"] in ("done", "error")), None)
+                if old is None:
+                    break
+                self.jobs.pop(old)
+            return job
+
+    # 2.2.0 worker — the only thread that touches otaki_sim / PowerFactory ------------------------
+    def _work(self):
+        null = open(os.devnull, "w", encoding="utf-8")
+        self.stdout.sinks[threading.get_ident()] = (self.log or null).write                         # This thread only, for its whole life
+        while True:
+            jid = self.queue.get()
+            with self.lock:
+                job = self.jobs.get(jid)
+                if job is None:
+                    continue
+                job.update(status="running", started=time.time())
+            try:
+                results, _, _ = self.osc.run_scenario(self.sim, job["scenario"], self.cache, self.backend)
+                if not results:
+                    raise RuntimeError("simulation failed")
+                inverters, panels, _ = self.osc.resolve(self.defaults, job["scenario"], self.backend)
+                worst = self.osc.summarise(results, self.sim.PV_CONFIG, inverters, panels, self.sim.PANEL_WATT)[1]
+                update = {"status": "done", "results": results, "worst": worst}
+            except Exception as e:                                                                  # Reported to the client, the server keeps going
+                update = {"status": "error", "error": f"{e.__class__.__name__}: {e}"}
+            with self.lock:
+                job.update(update, finished=time.time())
+                self.active.pop(job["signature"], None)
+
+    # 2.3.0 status — one job (without its results) or the whole server --------------------------
+    def job_status(self, jid):
+        with self.lock:
+            job = self.jobs.get(jid)
+            if job is None:
+                return None
+            out = {k: v for k, v in job.items() if k not in ("results", "packed", "scenario")}
+            if job["status"] == "queued":
+                out["position"] = list(self.active.values()).index(jid) if jid in self.active.values() else 0
+            return out
+
+    def result_bytes(self, jid):                                                                    # Packed once, served many times
+        from otaki_results import pack_results
+        with self.lock:
+            job = self.jobs.get(jid)
+        if job is None or job["status"] != "done":
+            return None
+        if job["packed"] is None:
+            job["packed"] = pack_results(job["results"])
+        return job["packed"]
+
+    def server_status(self):
+        with self.lock:
+            counts = {}
+            for j in self.jobs.values():
+                counts[j["status"]] = counts.get(j["status"], 0) + 1
+            return {"backend": self.backend, "offline": bool(getattr(self.sim, "OFFLINE", False)),
+                    "queued": self.queue.qsize(), "jobs": counts, "cached_runs": len(self.cache.items),
+                    "panel_watt": self.defaults.PANEL_WATT,                                         # Model counts at start-up, for thin clients (otaki_client)
+                    "inverters": self.defaults.PV_INV_OVERRIDES, "panels": self.defaults.PV_PANEL_OVERRIDES}
+
+
+#====================================================================================================
+# 3.0  HTTP Front End
+#====================================================================================================
+
+
+# 3.1.0 Handler — JSON in, JSON or .npz bytes out -------------------------------------------------
+class Handler(BaseHTTPRequestHandler):
+    jobs = None                                                                                     # JobServer, set in serve()
+
+    def _send(self, code, body, ctype="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            n = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(n) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError(f"3.1.0  Expected one scenario object, got {type(body).__name__}")
+            job = self.jobs.submit(body)
+        except ValueError as e:                                                                     # Bad JSON / malformed scenario / unknown suburb / negative count
+            return self._send(400, {"error": str(e)})
+        except Exception as e:                                                                      # Never leave the client without a response
+            return self._send(500, {"error": f"{e.__class__.__name__}: {e}"})
+        self._send(202 if job["status"] != "done" else 200, self.jobs.job_status(job["id"]))
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        parts = [p for p in path.split("/") if p]
+        if parts == ["status"]:
+            return self._send(200, self.jobs.server_status())
+        if len(parts) >= 2 and parts[0] == "jobs":
+            st = self.jobs.job_status(parts[1])
+            if st is None:
+                return self._send(404, {"error": "unknown job"})
+            if len(parts) == 2:
+                return self._send(200, st)
+            if parts[2:] == ["result"]:
+                if st["status"] != "done":
+                    return self._send(409, st)                                                      # Not ready (or failed) yet
+                if "format=json" in query:
+                    return self._send(200, self.jobs.jobs[parts[1]]["results"])
+                return self._send(200, self.jobs.result_bytes(parts[1]), "application/octet-stream")
+        self._send(404, {"error": "not found"})
+
+    def log_message(self, fmt, *args):                                                              # Quiet unless --log is given
+        if self.jobs.log:
+            self.jobs.log.write("%s %s\n" % (self.log_date_time_string(), fmt % args))
+
+
+#====================================================================================================
+# 4.0  Client
+#====================================================================================================
+
+
+# 4.1.0 Client — for the GUI, otaki_cli or a notebook ---------------------------------------------
+class Client:
+    def __init__(self, url=f"http://{HOST}:{PORT}", timeout=10.0):
+        self.url, self.timeout = url.rstrip("/"), timeout
+
+    def _call(self, path, body=None):
+        import urllib.request, urllib.error
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        req = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                raw, ctype = r.read(), r.headers.get("Content-Type", "")
+        except urllib.error.HTTPError as e:
+            raw, ctype = e.read(), e.headers.get("Content-Type", "")
+            if e.code != 409:
+                raise RuntimeError(f"4.1.0  {path}: {e.code} {raw.decode('utf-8', 'replace')}")
+        return json.loads(raw) if ctype.startswith("application/json") else raw
+
+    def status(self):
+        return self._call("/status")
+
+    def submit(self, scenario):                                                                     # {"name", "inverters", "kw_per_inv"} or "suburbs" layout
+        return self._call("/jobs", scenario)
+
+    def job(self, jid):
+        return self._call(f"/jobs/{jid}")
+
+    def result(self, jid):                                                                          # RESULTS-shaped dict
+        from otaki_results import unpack_results
+        raw = self._call(f"/jobs/{jid}/result")
+        if isinstance(raw, dict):
+            raise RuntimeError(f"4.1.0  Job {jid} is {raw.get('status')}: {raw.get('error', '')}")
+        return unpack_results(raw)
+
+    def run(self, scenario, timeout=None, poll=0.2):                                                # Submit and wait
+        job = self.submit(scenario)
+        t_end = None if timeout is None else time.time() + timeout
+        while job["status"] in ("queued", "running"):
+            if t_end is not None and time.time() > t_end:
+                raise TimeoutError(f"4.1.0  Job {job['id']} still {job['status']} after {timeout} s")
+            time.sleep(poll)
+            job = self.job(job["id"])
+        return self.result(job["id"])
+
+
+#====================================================================================================
+# 5.0  Main
+#====================================================================================================
+
+
+def serve(port=PORT, backend=None, log=None):                                                       # Blocks; otaki_sim must already be importable
+    stdout = ThreadStdout.install()
+    stdout.sinks[threading.get_ident()] = (log or open(os.devnull, "w", encoding="utf-8")).write    # Import chatter → log, this thread only
+    try:
+        import otaki_sim as sim                                                                     # The slow part, once per server
+    finally:
+        stdout.sinks.pop(threading.get_ident(), None)
+    Handler.jobs = JobServer(sim, backend, log)
+    httpd = ThreadingHTTPServer((HOST, int(port)), Handler)
+    print(f"otaki_server: {Handler.jobs.backend} backend on http://{HOST}:{httpd.server_address[1]}", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Share one PowerFactory session between local clients")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--backend", choices=("pf", "radial"), default=None)
+    ap.add_argument("--offline", action="store_true", help="otaki_offline stand-in instead of PowerFactory")
+    ap.add_argument("--trace", action="store_true", help="PF API hotspot report after each run (into --log)")
+    ap.add_argument("--log", help="file for otaki_sim output and request logs")
+    args = ap.parse_args(argv)
+    if args.offline:
+        os.environ["OTAKI_OFFLINE"] = "1"                                                           # Read by otaki_sim at import
+    if args.trace:
+        os.environ["OTAKI_TRACE"] = "1"
+    log = open(args.log, "a", encoding="utf-8", buffering=1) if args.log else None
+    try:
+        serve(args.port, args.backend, log)
+    finally:
+        if log:
+            log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
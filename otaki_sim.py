@@ -6,6 +6,7 @@
     # 1.4.0 PV panel wattage (per panel)
     # 1.5.0 Results Store and Monitor Registry
     # 1.6.0 PV inverter and panel overrides
+    # 1.7.0 Network definition (otaki_network.json)
 
 # 2.0 Connect, Activate Project & Study Case
     # 2.1.0 Connect to PowerFactory
@@ -22,6 +23,8 @@
     # 3.4.0 get_dynamic_results (read results)
     # 3.5.0 apply_pv_inverter_overrides
     # 3.6.0 apply_pv_panel_overrides
+    # 3.7.0 register_monitors_bulk (one model scan per element class)
+    # 3.8.0 read_result_columns (one load, whole-column reads)
 
 # 4.0 Quasi-Dynamic Simulation Core (GUI wrapper)
     # 4.1.0 build_monitored_dict
@@ -34,8 +37,21 @@
         # 4.2.5 TRANSFORMER Loading (24h)
         # 4.2.6 LINE Loading (24h)
         # 4.2.7 BUILD ASSOCIATIONS
+        # 4.2.8 Report configured names missing from the results
+        # 4.2.9 extract_qds_results_bulk (MONITOR_MODE = "bulk")
     # 4.3.0 run_simulation (main entry)
     # 4.4.0 set_penetrations_and_run (GUI adapter)
+    # 4.5.0 Sensitivity surrogate (fit after each run, preview for the GUI)
+    # 4.6.0 Radial NumPy backend (export impedances, run, validate)
+    # 4.7.0 Representative-day annual study
+    # 4.8.0 Monte Carlo PV uptake / load study
+    # 4.9.0 PowerFactory API call tracing (hotspot report per run)
+    # 4.10.0 Energy / reverse-power-flow metrics (stored with the run)
+    # 4.11.0 Network topology index (upstream / downstream, feeder totals)
+    # 4.12.0 Name-resolution index (pv_key ↔ bus / load / tx / line, exact)
+    # 4.13.0 Adaptive two-pass QDS (coarse screening, fine windows)
+    # 4.14.0 Stage checks (a caller can stop a run between PF stages)
+    # 4.15.0 Study runs (Monte Carlo / representative days leave the user's run alone)
 
 
 
@@ -46,9 +62,13 @@
 
 import os, sys, time                                                                                # Import standard Python libraries for OS, system path, and timing
 DIG_PATH = r"C:\Program Files\DIgSILENT\PowerFactory 2025 SP1\Python\3.9"                           # Path to PowerFactory Python API
-sys.path.append(DIG_PATH)                                                                           # Add PowerFactory Python path to system path
-os.environ['PATH'] += ';' + DIG_PATH                                                                # Append PowerFactory path to environment variables
-import powerfactory as pf                                                                           # Import PowerFactory Python module
+OFFLINE  = os.environ.get("OTAKI_OFFLINE", "") == "1"                                               # 1 = otaki_offline stand-in instead of PowerFactory (benchmarks, no licence)
+if OFFLINE:
+    import otaki_offline as pf                                                                      # Same API subset, synthetic results
+else:
+    sys.path.append(DIG_PATH)                                                                       # Add PowerFactory Python path to system path
+    os.environ['PATH'] += ';' + DIG_PATH                                                            # Append PowerFactory path to environment variables
+    import powerfactory as pf                                                                       # Import PowerFactory Python module
 
 
 # 1.1.0 Project and Study Case Names-----------------------------------------------------------------
@@ -60,6 +80,11 @@ STUDY_CASE_NAME = "Study Case"
 QDS_STEP_SIZE   = 1                                                                                 # Step size for simulation (1 hour steps)
 QDS_STEP_UNIT   = 2                                                                                 # Step unit: 0=seconds, 1=minutes, 2=hours, 3=days
 QDS_CALC_PERIOD = 0                                                                                 # Simulation period: 0=full day, 12=12 hours, etc.
+QDS_ADAPTIVE    = False                                                                             # True = run_simulation screens at a coarse step, reruns only windows near a limit (4.13)
+QDS_USER_PERIOD = 4                                                                                 # calcPeriod value for a user-defined startTime / endTime window
+QDS_KEEP_ROWS   = None                                                                              # Rows stored per series in RESULTS, None = every row (the suburb chart shows the first day)
+MONITOR_MODE    = "bulk"                                                                            # "bulk" = one object scan per class + column reads (3.7 / 3.8), "element" = one lookup per element
+SIM_BACKEND     = "pf"                                                                              # "pf" = PowerFactory QDS, "radial" = otaki_radial sweep (stored PF run or workbook profiles)
 
 
 # 1.3.0 Print Results in Terminal ------------------------------------------------------------------
@@ -72,6 +97,7 @@ PRINT_LINE_HOURLY       = False
 PRINT_VARIABLE_CHECKS   = False                                                                     # Toggle printing debug variable checks
 PRINT_PV_META           = False                                                                     # Toggle printing PV metadata
 PRINT_PV_OVERRIDES      = False                                                                     # Toggle printing PV override information
+TRACE_PF                = os.environ.get("OTAKI_TRACE", "") == "1"                                  # Trace every PF API call, hotspot report after each run (4.9)
 
 
 # 1.4.0 PV panel wattage (per panel) ---------------------------------------------------------------
@@ -81,6 +107,7 @@ PANEL_WATT = 240.0
 # 1.5.0 Results Store and Monitor Registry ---------------------------------------------------------
 RESULTS   = {"bus": {}, "load": {}, "pv": {}, "tx": {},"line": {}}                                  # Dictionary to store simulation results for buses, loads, PV, transformers, and lines
 ASSOC     = {}                                                                                      # Mapping of load names to their associated bus, PV, transformer, and line connections
+REGISTRY  = {}                                                                                      # RESULTS group → [(element, [variables])] registered by register_monitors_bulk
 MONITORED = []                                                                                      # List of monitored variables for GUI (each entry is a tuple: selector + list of variable names)
 
 
@@ -89,130 +116,20 @@ PV_INV_OVERRIDES   = {}
 PV_PANEL_OVERRIDES = {}                                                                             # Dictionary to store user-defined panel overrides from GUI
 
 
-# 1.5.0 Full Bus Element List-------------------------------------------------------------------------
-BUS_LIST = {
-    "OTBa_0.415",
-    "OTBb_0.415",
-    "OTBc_0.415",
-    "OTCa_0.415",
-    "OTCb_0.415",
-    "OTIa_0.415",
-    "OTKa_0.415",
-    "OTKb_0.415",
-    "OTKc_0.415",
-    "OTS_0.415",
-    "RGUa_0.415",
-    "RGUb_0.415",
-    "TRE_0.415",
-    "WTVa_0.415",
-    "WTVb_0.415",
-    "WTVc_0.415",
-}
-
-
-# 1.6.0 Full Load Element List------------------------------------------------------------------------ 
-LOAD_LIST = {
-    "Otaki Beach A",
-    "Otaki Beach B",
-    "Otaki Beach C",
-    "Otaki Commercial A",
-    "Otaki Commercial B",
-    "Otaki Industrial A",
-    "Otaki School",
-    "Otaki Town A",
-    "Otaki Town B",
-    "Otaki Town C",
-    "Rangiuru Rd A",
-    "Rangiuru Rd B",
-    "Te Rauparaha St",
-    "Waitohu Valley A",
-    "Waitohu Valley B",
-    "Waitohu Valley C",
-}
-
-
-#1.7.0 Full PV Element list---------------------------------------------------------------------------
-PV_LIST = {
-    "OTBa_PV",
-    "OTBb_PV",
-    "OTBc_PV",
-    "OTCa_PV",
-    "OTCb_PV",
-    "OTIa_PV",
-    "OTKa_PV",
-    "OTKb_PV",
-    "OTKc_PV",
-    "OTS_PV",
-    "RGUa_PV",
-    "RGUb_PV",
-    "TRE_PV",
-    "WTVa_PV",
-    "WTVb_PV",
-    "WTVc_PV",
-}
-
-
-#1.8.0 Full TX Element list--------------------------------------------------------------------------
-TX_LIST = {
-    "OTB_T1",
-    "OTB_T2",
-    "OTB_T3",
-    "OTCa_T1",
-    "OTCb_T1",
-    "OTI_T1",
-    "OTK_T1",
-    "OTK_T2",
-    "OTK_T3",
-    "OTS_T1",
-    "RGU_T1",
-    "RGU_T2",
-    "TRE_T1",
-    "WTV_T1",
-    "WTV_T2",
-    "WTV_T3",
-}
-
-
-#1.9.0 Full Line Element list------------------------------------------------------------------------
-LINE_LIST = {
-    "OTBa_pline_OTBa_0.415",
-    "OTBb_pline_OTBb_0.415",
-    "OTBc_pline_OTBc_0.145",
-    "OTCa_pline_OTCa_0.415",
-    "OTCb_pline_OTCb_0.415",
-    "OTIa_pline_OTIa_0.415",
-    "OTKa_pline_OTKa_0.415",
-    "OTKb_pline_OTKb_0.415",
-    "OTKc_pline_OTKc_0.415",
-    "OTS_pline_OTS_0.415",
-    "RGUa_pline_RGUa_0.415",
-    "RGUb_pline_RGUb_0.415",
-    "TRE_pline_TRE_0.415",
-    "WTVa_pline_WTVa_0.415",
-    "WTVb_pline_WTVb_0.415",
-    "WTVc_pline_WTVc_0.415",
-}
-
-
-# 1.10.0 mapping for GUI use ------------------------------------------------------------------------
-PV_CONFIG = {
-    "OTBa_PV": {"bus": "OTBa_0.415", "load": "OTBa", "pline": "OTBa_pline_OTBa_0.415", "tx": "OTB_T1", "homes": 100},
-    "OTBb_PV": {"bus": "OTBb_0.415", "load": "OTBb", "pline": "OTBb_pline_OTBb_0.415", "tx": "OTB_T2", "homes": 100},
-    "OTBc_PV": {"bus": "OTBc_0.415", "load": "OTBc", "pline": "OTBc_pline_OTBc_0.145", "tx": "OTB_T3", "homes": 100},
-    "OTCa_PV": {"bus": "OTCa_0.415", "load": "OTCa", "pline": "OTCa_pline_OTCa_0.415", "tx": "OTCa_T1", "homes": 1},
-    "OTCb_PV": {"bus": "OTCb_0.415", "load": "OTCb", "pline": "OTCb_pline_OTCb_0.415", "tx": "OTCb_T1", "homes": 1},
-    "OTIa_PV": {"bus": "OTIa_0.415", "load": "OTIa", "pline": "OTIa_pline_OTIa_0.415", "tx": "OTI_T1", "homes": 1},
-    "OTKa_PV": {"bus": "OTKa_0.415", "load": "OTKa", "pline": "OTKa_pline_OTKa_0.415", "tx": "OTK_T1", "homes": 100},
-    "OTKb_PV": {"bus": "OTKb_0.415", "load": "OTKb", "pline": "OTKb_pline_OTKb_0.415", "tx": "OTK_T2", "homes": 100},
-    "OTKc_PV": {"bus": "OTKc_0.415", "load": "OTKc", "pline": "OTKc_pline_OTKc_0.415", "tx": "OTK_T3", "homes": 100},
-    "OTS_PV":  {"bus": "OTS_0.415",  "load": "OTS",  "pline": "OTS_pline_OTS_0.415",  "tx": "OTS_T1",  "homes": 1},
-    "RGUa_PV": {"bus": "RGUa_0.415", "load": "RGUa", "pline": "RGUa_pline_RGUa_0.415", "tx": "RGU_T1", "homes": 100},
-    "RGUb_PV": {"bus": "RGUb_0.415", "load": "RGUb", "pline": "RGUb_pline_RGUb_0.415", "tx": "RGU_T2", "homes": 100},
-    "TRE_PV":  {"bus": "TRE_0.415",  "load": "TRE",  "pline": "TRE_pline_TRE_0.415",  "tx": "TRE_T1",  "homes": 100},
-    "WTVa_PV": {"bus": "WTVa_0.415", "load": "WTVa", "pline": "WTVa_pline_WTVa_0.415", "tx": "WTV_T1", "homes": 100},
-    "WTVb_PV": {"bus": "WTVb_0.415", "load": "WTVb", "pline": "WTVb_pline_WTVb_0.415", "tx": "WTV_T2", "homes": 100},
-    "WTVc_PV": {"bus": "WTVc_0.415", "load": "WTVc", "pline": "WTVc_pline_WTVc_0.415", "tx": "WTV_T3", "homes": 100},
-}
+# 1.7.0 Network definition (otaki_network.json, or OTAKI_NETWORK=<file>) ---------------------------
+import otaki_network                                                                                # Validated at load, NetworkError lists every problem
+NETWORK = otaki_network.load(os.environ.get("OTAKI_NETWORK") or otaki_network.DEFAULT_FILE)         # Another town = another file
+for _w in NETWORK.warnings:                                                                         # Names that break the naming pattern
+    print(f"1.7.0  {NETWORK.name}: {_w}")
+
+_LISTS     = NETWORK.lists()                                                                        # Element names to monitor, per class
+BUS_LIST   = _LISTS["bus"]                                                                          # Terminals (p.u. voltage)
+LOAD_LIST  = _LISTS["load"]                                                                         # PF load names (demand)
+PV_LIST    = _LISTS["pv"]                                                                           # PV systems (output)
+TX_LIST    = _LISTS["tx"]                                                                           # Transformers (loading)
+LINE_LIST  = _LISTS["line"]                                                                         # Service lines (loading)
+PV_CONFIG  = NETWORK.pv_config()                                                                    # pv_key → {bus, load, pline, tx, homes} for the GUI
+LOAD_NAMES = NETWORK.load_names()                                                                   # PV_CONFIG load code → PF load name (RESULTS["load"] key)
 
 
 #====================================================================================================
@@ -319,7 +236,8 @@ def get_panels_per_inverter():
 def prepare_quasi_dynamic(app, monitored_vars,
                           step_size=QDS_STEP_SIZE,
                           step_unit=QDS_STEP_UNIT,
-                          period=QDS_CALC_PERIOD):                                                # Function to set up quasi-dynamic simulation results
+                          period=QDS_CALC_PERIOD,
+                          mode=None):                                                           # Function to set up quasi-dynamic simulation results
     print("3.1.0     Results Setup Begin.")                                                     # Print start of results setup
     qds = app.GetFromStudyCase("ComStatsim")                                                      # Get quasi-dynamic simulation object
     if not qds:                                                                                   # Check if missing
@@ -332,12 +250,16 @@ def prepare_quasi_dynamic(app, monitored_vars,
     print()                                                                                        # Blank line
 
     print("3.1.2     Adding Variables to Check.")                                                # Print variable check start
-    for sel, var_list in monitored_vars.items():                                                   # Loop through monitored selectors
-        elems = app.GetCalcRelevantObjects(sel) or []                                              # Get matching elements
-        for e in elems:                                                                            # Loop through each element
-            res.AddVars(e, *var_list)                                                              # Add variables to results
-            if PRINT_VARIABLE_CHECKS:                                                              # If variable check printing enabled
-                print(f"3.1.2     Checking Variables {e.loc_name}: {var_list}")                   # Print variable list
+    REGISTRY.clear()                                                                             # Filled again by bulk mode only
+    if (mode or MONITOR_MODE) == "bulk":                                                         # One object scan per class (3.7)
+        register_monitors_bulk(app, res, monitored_vars)                                         # Register and fill REGISTRY
+    else:                                                                                        # One lookup per selector
+        for sel, var_list in monitored_vars.items():                                             # Loop through monitored selectors
+            elems = app.GetCalcRelevantObjects(sel) or []                                        # Get matching elements
+            for e in elems:                                                                      # Loop through each element
+                res.AddVars(e, *var_list)                                                        # Add variables to results
+                if PRINT_VARIABLE_CHECKS:                                                        # If variable check printing enabled
+                    print(f"3.1.2     Checking Variables {e.loc_name}: {var_list}")              # Print variable list
     print("3.1.2      Variable Checking Done.")                                                  # Print success
     print()                                                                                        # Blank line
 
@@ -432,6 +354,93 @@ def apply_pv_panel_overrides(app, overrides):
     print("3.6.0      Panel overrides applied."); print()                                          # Print completion message and blank line
 
 
+# 3.7 Bulk monitor registration — one GetCalcRelevantObjects per element class, not per element ----
+MONITOR_CLASSES = {"ElmTerm": "bus", "ElmLod": "load", "ElmPvsys": "pv", "ElmTr2": "tx", "ElmLne": "line"} # PF class → RESULTS group
+RESULT_FIELD    = {"bus": "u_pu", "load": "P_W", "pv": "P_W", "tx": "loading_pct", "line": "loading_pct"} # RESULTS group → series field
+
+
+def register_monitors_bulk(app, res, monitored_vars):                                               # Same selectors as build_monitored_dict, same elements registered
+    """
+    Selectors are grouped by class; each class is fetched once ("*.ElmTerm") and its
+    elements matched against the exact names and "prefix*" patterns with dict lookups.
+    PF has no multi-element AddVars, so each matched element is still one AddVars call,
+    but nothing scans the model per element. Fills REGISTRY for extract_qds_results_bulk.
+    """
+    by_cls, odd = {}, []                                                                            # class → (exact names, prefixes); other wildcards
+    for sel, var_list in monitored_vars.items():                                                    # Loop through monitored selectors
+        pattern, _, cls = sel.rpartition(".")                                                       # Split "OTB*.ElmTerm" into pattern and class
+        exact, prefix = by_cls.setdefault(cls, ({}, {}))                                            # Lookup tables for this class
+        head = pattern[:-1] if pattern.endswith("*") else pattern                                   # Pattern without its trailing "*"
+        if any(c in head for c in "*?["):                                                           # Wildcard anywhere else
+            odd.append((sel, var_list))                                                             # Rare: looked up on its own
+        elif not pattern.endswith("*"):                                                             # Exact element name
+            exact[pattern] = var_list                                                               # Name → variables
+        else:                                                                                       # Trailing "*" only
+            prefix[head] = var_list                                                                 # Prefix → variables
+
+    seen = set()                                                                                    # Elements already registered (selectors may overlap)
+    for cls, (exact, prefix) in by_cls.items():                                                     # Loop through element classes
+        regs = REGISTRY.setdefault(MONITOR_CLASSES.get(cls, cls), [])                               # Registry list for this RESULTS group
+        lengths = sorted({len(h) for h in prefix})                                                  # Prefix lengths to try, shortest first
+        for e in app.GetCalcRelevantObjects(f"*.{cls}") or []:                                      # One model scan per class
+            name = e.loc_name                                                                       # Element name
+            var_list = exact.get(name)                                                              # Exact match first
+            for n in lengths if var_list is None else ():                                           # Shortest matching prefix wins
+                if n > len(name):                                                                   # Prefix longer than the name
+                    break                                                                           # No longer prefix can match
+                var_list = prefix.get(name[:n])                                                     # Prefix lookup
+                if var_list is not None:                                                            # If matched
+                    break                                                                           # Match found
+            if var_list is None or id(e) in seen:                                                   # Not monitored, or already registered
+                continue                                                                            # Skip element
+            res.AddVars(e, *var_list)                                                               # Add variables to results
+            regs.append((e, list(var_list)))                                                        # Remember for extract_qds_results_bulk
+            seen.add(id(e))                                                                         # Mark registered
+    for sel, var_list in odd:                                                                       # Loop through other wildcard selectors
+        cls = sel.rpartition(".")[2]                                                                # Element class
+        for e in app.GetCalcRelevantObjects(sel) or []:                                             # PF resolves the wildcard
+            if id(e) not in seen:                                                                   # Not registered by the class scans
+                res.AddVars(e, *var_list)                                                           # Add variables to results
+                REGISTRY.setdefault(MONITOR_CLASSES.get(cls, cls), []).append((e, list(var_list)))  # Remember for extract_qds_results_bulk
+                seen.add(id(e))                                                                     # Mark registered
+    print(f"3.7.0      Bulk registration: {len(seen)} elements, {len(by_cls)} class scans.")        # Print summary
+
+
+# 3.8 Whole-result read — one ResLoadData, then one read per column instead of per cell ------------
+def read_result_columns(app, res, items, rows=None):                                                # items: [(element, variable)]
+    """
+    Returns (t, columns): the time axis and one list per item (None if the variable is
+    not in the results). Uses ElmRes.GetColumnValues where PF has it, otherwise
+    ResGetData per cell; either way the data is loaded once for all items.
+    """
+    app.ResLoadData(res)                                                                            # Once, not once per element
+    n = app.ResGetValueCount(res, 0)                                                                # Number of stored rows
+    if rows is not None:                                                                            # If a row limit is given
+        n = min(n, int(rows))                                                                       # Read only the first rows
+    t = [app.ResGetData(res, i, -1)[1] for i in range(n)]                                           # Time column, shared by every series
+    getcol = getattr(res, "GetColumnValues", None)                                                  # Whole-column read, newer PF only
+
+    def column(col):                                                                                # One column → list of floats
+        nonlocal getcol                                                                             # Cleared below if it fails once
+        if getcol is not None:                                                                      # If whole-column read available
+            try:                                                                                    # Attempt whole-column read
+                out = getcol(col)                                                                   # Read column
+                if isinstance(out, (list, tuple)) and len(out) == 2 and isinstance(out[1], (list, tuple)): # Returned with an error code
+                    err, out = out                                                                  # [error, values], as ResGetData
+                    if err:                                                                         # If PF reported an error
+                        return None                                                                 # Treat as missing
+                return [float(v) for v in list(out)[:n]]                                            # Return column values
+            except Exception:                                                                       # Older PF: fall back for good
+                getcol = None                                                                       # Stop trying it
+        return [app.ResGetData(res, i, col)[1] for i in range(n)]                                   # Per-cell read fallback
+
+    columns = []                                                                                    # One entry per item
+    for elm, var in items:                                                                          # Loop through requested items
+        col = app.ResGetIndex(res, elm, var)                                                        # Column index, -1 if not recorded
+        columns.append(column(col) if col >= 0 else None)                                           # Read column or mark missing
+    return t, columns                                                                               # Return time axis and columns
+
+
 #====================================================================================================
 # 4.0  Quasi-Dynamic Simulation Core (Wrapped for GUI Use)
 #====================================================================================================
@@ -461,6 +470,8 @@ def build_monitored_dict():
 
 # 4.2 Extract all results ----------------------------------------------------------------------------
 def extract_qds_results(app, res):                                                                  # Function to extract QDS results
+    if MONITOR_MODE == "bulk" and REGISTRY:                                                         # Registered in bulk → read in bulk (4.2.9)
+        return extract_qds_results_bulk(app, res)
 
     # 4.2 BUS Hourly p.u. voltage (24hrs) -----------------------------------------------------------
     print("4.2.0      Hourly p.u. Voltages Begin.")                                               # Print start
@@ -470,7 +481,7 @@ def extract_qds_results(app, res):
         if not u:                                                                                   # If no results found
             print(f"4.2.0  No voltage data for {bus}")                                            # Warn missing data
             continue                                                                                # Skip to next bus
-        RESULTS["bus"][bus] = {"t": t[:24], "u_pu": u[:24]}                                         # Store first 24 hours of results
+        RESULTS["bus"][bus] = {"t": t[:QDS_KEEP_ROWS], "u_pu": u[:QDS_KEEP_ROWS]}                   # Store every row (or QDS_KEEP_ROWS)
         if PRINT_BUS_HOURLY:                                                                        # If debug printing enabled
             for hr in range(min(24, len(u))):                                                       # Loop through 24 hours
                 print(f"{hr:02d} {bus} = {u[hr]:.4f} p.u")                                          # Print voltage per hour
@@ -480,21 +491,18 @@ def extract_qds_results(app, res):
 
     # 4.2.1 Bus 24hr Min/Max Voltage p.u ------------------------------------------------------------
     print("4.2.1     Bus 24hr Min/Max p.u Begin.")                                                # Print start
+    import otaki_results                                                                          # volt_extremes, shared with the bulk / adaptive reads
     for bus in BUS_LIST:                                                                            # Loop through buses
         rec = RESULTS["bus"].get(bus)                                                               # Get recorded bus data
         if not rec:                                                                                 # If no record
             print(f"4.2.1  No data for {bus}"); continue                                          # Warn and continue
-        u = rec.get("u_pu", [])[:24]                                                                # Extract first 24h voltage list
+        u = rec.get("u_pu", [])[:QDS_KEEP_ROWS]                                                   # Extract the stored voltage list
         if not u:                                                                                   # If empty list
             print(f"4.2.1  Empty voltage list for {bus}"); continue                               # Warn and continue
-        u_min = min(u); h_min = u.index(u_min)                                                      # Find minimum and hour
-        u_max = max(u); h_max = u.index(u_max)                                                      # Find maximum and hour
-        rec.update({                                                                                # Update record with min/max values
-            "u_pu_min": u_min, "u_pu_min_hour": h_min,
-            "u_pu_max": u_max, "u_pu_max_hour": h_max
-        })
+        otaki_results.volt_extremes(rec, n=QDS_KEEP_ROWS)                                         # Min / max and their hours since the first stamp
         if PRINT_BUS_MIN_MAX:                                                                       # If debug printing enabled
-            print(f"4.2.1 📌 {bus} min={u_min:.4f} @ {h_min:02d}h, max={u_max:.4f} @ {h_max:02d}h") # Print results
+            print(f"4.2.1 📌 {bus} min={rec['u_pu_min']:.4f} @ {rec['u_pu_min_hour']:02g}h, "        # Print results
+                  f"max={rec['u_pu_max']:.4f} @ {rec['u_pu_max_hour']:02g}h")
     print("4.2.1      Bus 24hr Min/Max p.u Done. -------------------------------")                 # Print completion
     print()                                                                                         # Blank line
 
@@ -510,7 +518,7 @@ def extract_qds_results(app, res):
             tP, P = get_dynamic_results(app, res, ld.loc_name + ".ElmLod", "m:P:bus1", verbose=PRINT_LOAD_HOURLY)  # Get load demand
             if not P:                                                                               # If no demand data
                 print(f"4.2.2  No demand data for {ld.loc_name}"); continue                       # Warn and continue
-            RESULTS["load"][ld.loc_name] = {"t": tP[:24], "P_W": P[:24]}                            # Store first 24h demand
+            RESULTS["load"][ld.loc_name] = {"t": tP[:QDS_KEEP_ROWS], "P_W": P[:QDS_KEEP_ROWS]}    # Store every row of demand
             if PRINT_LOAD_HOURLY:                                                                   # If debug printing enabled
                 for hr in range(min(24, len(P))):                                                   # Loop through 24h
                     print(f"{hr:02d} {ld.loc_name} = {P[hr]:.4f} kW")                               # Print hourly demand
@@ -534,7 +542,7 @@ def extract_qds_results(app, res):
 
             if not P:                                                                              # If no production data
                 print(f"4.2.3  No production data for {p.loc_name}"); continue                   # Warn and continue
-            RESULTS["pv"][p.loc_name] = {"t": tP[:24], "P_W": P[:24]}                              # Store first 24h PV production
+            RESULTS["pv"][p.loc_name] = {"t": tP[:QDS_KEEP_ROWS], "P_W": P[:QDS_KEEP_ROWS]}      # Store every row of PV production
             #print(f"[DEBUG] Raw PV values for {p.loc_name}:", P[:24])                             # Debug print (disabled)
             if PRINT_PV_HOURLY:                                                                    # If debug printing enabled
                 for hr in range(min(24, len(P))):                                                  # Loop through 24h
@@ -582,7 +590,7 @@ def extract_qds_results(app, res):
             ".ElmTr2", "m:loading:bus1", verbose=PRINT_TX_HOURLY)                                  # Get transformer loading
             if not P:                                                                              # If no data
                 print(f"4.2.5  No Loading Data for {t.loc_name}"); continue                      # Warn and continue
-            RESULTS["tx"][t.loc_name] = {"t": tP[:24], "loading_pct": P[:24]}                      # Store 24h loading data
+            RESULTS["tx"][t.loc_name] = {"t": tP[:QDS_KEEP_ROWS], "loading_pct": P[:QDS_KEEP_ROWS]} # Store every row of loading data
             if PRINT_TX_HOURLY:                                                                    # If debug printing enabled
                 for hr in range(min(24, len(P))):                                                  # Loop through 24h
                     print(f"{hr:02d} {t.loc_name} = {P[hr]:.2f} %")                                # Print hourly loading
@@ -602,7 +610,7 @@ def extract_qds_results(app, res):
             tL, L = get_dynamic_results(app, res, ln.loc_name + ".ElmLne", "m:loading:bus1", verbose=PRINT_LINE_HOURLY)  # Get line loading
             if not L:                                                                              # If no data
                 print(f"4.2.6  No Loading Data for Line {ln.loc_name}"); continue                # Warn and continue
-            RESULTS["line"][ln.loc_name] = {"t": tL[:24], "loading_pct": L[:24]}                   # Store 24h line loading data
+            RESULTS["line"][ln.loc_name] = {"t": tL[:QDS_KEEP_ROWS], "loading_pct": L[:QDS_KEEP_ROWS]} # Store every row of line loading data
             if PRINT_LINE_HOURLY:                                                                  # If debug printing enabled
                 for hr in range(min(24, len(L))):                                                  # Loop through 24h
                     print(f"{hr:02d} {ln.loc_name} Loading = {L[hr]:.2f} %")                       # Print hourly loading
@@ -611,7 +619,11 @@ def extract_qds_results(app, res):
     print()                                                                                        # Blank line
 
 
+    build_associations()                                                                           # ASSOC + name check (4.2.7 / 4.2.8)
+
+
 # 4.2.7 BUILD ASSOCIATIONS --------------------------------------------------------------------------
+def build_associations():                                                                        # Shared by both extraction modes
     print("4.2.7     Build Associations (using PV_CONFIG).")                                     # Print start
     ASSOC.clear()                                                                                  # Clear associations dict
 
@@ -638,32 +650,95 @@ def extract_qds_results(app, res):
     print()                                                                                        # Blank line
 
 
+# 4.2.8 Report configured names missing from the results -------------------------------------------
+    names().report(RESULTS, prefix="4.2.8")                                                        # Exact lookups only, so say what did not resolve
+
+
+# 4.2.9 Bulk extraction — every registered column in one pass, same RESULTS layout as 4.2.0–4.2.6 ---
+def extract_qds_results_bulk(app, res, keep=None):                                                 # keep: rows stored per series, None = QDS_KEEP_ROWS as 4.2.0–4.2.6
+    print("4.2.9     Bulk Result Read Begin.")                                                     # Print start
+    found, n_rows, empty = read_registered(app, res, rows=keep or QDS_KEEP_ROWS)                   # Every registered column, every stored row
+    for group, recs in found.items():                                                              # Loop through RESULTS groups
+        RESULTS[group].update(recs)                                                                # Store series
+    bus_extremes(RESULTS["bus"])                                                                   # 4.2.1 min / max and their hours since the first stamp
+    record_pv_meta(app)                                                                            # 4.2.4 nameplate, one inverter scan
+    print(f"4.2.9      Bulk Result Read Done: {sum(map(len, found.values()))} series, {n_rows} rows" # Print summary
+          + (f", {empty} registered but not in results." if empty else "."))                       # … and what was missing
+    print()                                                                                        # Blank line
+    build_associations()                                                                           # 4.2.7 / 4.2.8
+
+
+def read_registered(app, res, rows=None):                                                          # REGISTRY columns → RESULTS-shaped dict, nothing stored
+    items = [(group, e, var_list[0]) for group, regs in REGISTRY.items() if group in RESULT_FIELD  # (group, element, first variable) per registered element
+             for e, var_list in regs if var_list]                                                  # … skipping elements with no variables
+    t, columns = read_result_columns(app, res, [(e, var) for _, e, var in items], rows=rows)       # One load, one read per column (3.8)
+    found, empty = {group: {} for group in RESULT_FIELD}, 0                                         # RESULTS-shaped output, missing-column count
+    for (group, e, var), vals in zip(items, columns):                                               # Loop through the columns read
+        if not vals:                                                                                # Not in the results
+            empty += 1; continue                                                                    # Count it and skip
+        found[group][e.loc_name] = {"t": list(t), RESULT_FIELD[group]: vals}                        # Same record layout as 4.2.0–4.2.6
+    return found, len(t), empty                                                                     # Return series, row count, missing count
+
+
+def bus_extremes(bus_recs):                                                                         # Hours since each record's first stamp, as unpack_results
+    import otaki_results                                                                            # One definition of min / max hours (2.3.0 there)
+    for rec in bus_recs.values():                                                                   # Loop through bus records
+        otaki_results.volt_extremes(rec)                                                            # Store min / max and their hours
+
+
+def record_pv_meta(app):                                                                            # Nameplate of every registered PV system
+    if "pv_meta" not in RESULTS: RESULTS["pv_meta"] = {}                                            # Create PV meta store if missing
+    inverters = {}                                                                                  # PV name → inverter count
+    for inv in app.GetCalcRelevantObjects("*.ElmInv") or []:                                        # One scan for every inverter
+        inverters[inv.loc_name] = inverters.get(inv.loc_name, 0) + 1                                # Count by name
+    for p, _ in REGISTRY.get("pv", ()):                                                             # Loop through registered PV systems
+        inv_count = inverters.get(p.loc_name) or int(getattr(p, "ngnum", 0) or 0)                   # Inverter objects, else ngnum
+        par_mods = int(getattr(p, "npnum", 0) or 0)                                                 # Panels per inverter
+        RESULTS["pv_meta"][p.loc_name] = {"rating_kW_calc": (inv_count * par_mods * float(PANEL_WATT)) / 1000.0, # Store nameplate in kW
+                                          "inverters": inv_count, "panels_per_inverter": par_mods} # … with the counts behind it
+
+
 # 4.3 MAIN ENTRY POINT -------------------------------------------------------------------------------
-def run_simulation(pv_overrides=None):                                                             # Main entry point for QDS simulation
+def run_simulation(pv_overrides=None, backend=None):                                               # Main entry point for QDS simulation
     """
     Executes the full QDS simulation. Accepts optional PV inverter overrides.
     Updates global RESULTS and ASSOC. Returns True if OK, False otherwise.
+    backend overrides SIM_BACKEND ("pf" or "radial") for this call.
     """
+    RESULTS.pop("metrics", None)                                                                   # Belongs to the previous run
+    check_stage("overrides")                                                                       # Stop point before the model is touched (4.14)
+    if (backend or SIM_BACKEND) == "radial":                                                       # Offline sweep, no QDS / licence needed
+        return run_radial_simulation(pv_overrides) and record_metrics()
+    if QDS_ADAPTIVE:                                                                               # Coarse screening + fine windows (4.13)
+        return run_adaptive_simulation(pv_overrides)
     if pv_overrides:                                                                               # If overrides provided
         apply_pv_inverter_overrides(app, pv_overrides)                                             # Apply inverter overrides
         apply_pv_panel_overrides(app, PV_PANEL_OVERRIDES)                                          # Apply panel overrides
     monitored = build_monitored_dict()                                                             # Build monitored dictionary
     res, qds = prepare_quasi_dynamic(app, monitored)                                               # Prepare QDS
 
+    check_stage("qds")                                                                           # Stop point before the long PF call (4.14)
     print("4.1.0     Execute QDS Begin.")                                                        # Print execution start
     ok = run_quasi_dynamic(qds)                                                                    # Run QDS
     print(f"4.1.0      Execute QDS Status = {ok} -------------------------------")                # Print execution status
     print()                                                                                        # Blank line
     if not ok:                                                                                     # If QDS failed
+        pf_trace_report()                                                                          # Where a failed run spent its PF time
         return False                                                                               # Return False
 
+    check_stage("extract")                                                                         # Stop point before RESULTS is rewritten (4.14)
     extract_qds_results(app, res)                                                                  # Extract results
+    record_pf_run()                                                                                # Reference for radial profiles / validate_radial (4.6)
+    record_surrogate_run(pv_overrides or PV_INV_OVERRIDES)                                         # Refine the live-preview fit with this run
+    record_metrics()                                                                               # Energy / reverse-flow figures (4.10)
+    pf_trace_report()                                                                              # Hotspot report when tracing is on (4.9)
     return True                                                                                    # Return success flag
 
 
 # 4.4 set_penetrations_and_run — adapter for GUI -----------------------------------------------------
 def set_penetrations_and_run(pv_overrides=None):                                                   # Adapter for GUI Run button / threads
     # 4.4.1  Apply overrides here (SIM touches PF; GUI does not)
+    check_stage("overrides")                                                                       # Outside the try below, a stop must not be swallowed (4.14)
     try:                                                                                           # Attempt inverter overrides
         apply_pv_inverter_overrides(app, pv_overrides or PV_INV_OVERRIDES)                         # Apply inverter overrides
     except Exception as e:                                                                         # Catch errors
@@ -681,3 +756,419 @@ def set_penetrations_and_run(pv_overrides=None):
     print("4.8.1  Simulation completed, returning RESULTS.")                                      # Print success
     return dict(RESULTS)                                                                           # Return results dictionary
 
+
+# 4.5 Sensitivity surrogate — linear fit of voltage / loading vs PV, refined every run -------------
+def record_surrogate_run(inverters, results=None):                                                 # Called by run_simulation after extract_qds_results; results: default RESULTS
+    if STUDY["depth"]:                                                                             # Study samples are not the user's runs (4.15)
+        return
+    try:                                                                                           # NumPy is optional here, a failed fit must not fail the run
+        import otaki_surrogate
+        otaki_surrogate.add_run(results or RESULTS, inverters or {}, PV_PANEL_OVERRIDES, PV_CONFIG)
+    except Exception as e:
+        print(f"4.5.0  Surrogate not updated: {e}")
+
+
+def preview_from_surrogate(inverters, panels):                                                      # Estimated min/max p.u. + loading per suburb, {} before the first run
+    try:
+        import otaki_surrogate
+        return otaki_surrogate.predict(inverters, panels)
+    except Exception as e:
+        print(f"4.5.0  Surrogate preview failed: {e}")
+        return {}
+
+
+# 4.6 Radial NumPy backend — impedances exported once, then no PowerFactory needed to run -----------
+PF_RUN = {"results": None}                                                                          # Snapshot of the last PowerFactory run (profiles + validation reference)
+
+
+def record_pf_run():                                                                                # Called after every PF extraction, radial runs never overwrite it
+    if STUDY["depth"]:                                                                              # Keep the user's run as the reference (4.15)
+        return
+    import otaki_results
+    PF_RUN["results"] = otaki_results.snapshot(RESULTS)
+
+
+def _terminal_name(elm):                                                                            # Terminal an element's bus1 cubicle sits on ("" if unknown)
+    try:
+        return elm.bus1.cterm.loc_name
+    except Exception:
+        return ""
+
+
+def export_radial_network(path=None):                                                               # Writes otaki_radial.json from the live PF model
+    import otaki_radial
+    loads = app.GetCalcRelevantObjects("*.ElmLod") or []
+    suburbs = {}
+    for pv_key, cfg in PV_CONFIG.items():
+        txs = app.GetCalcRelevantObjects(f"{cfg['tx']}.ElmTr2") or []
+        lns = app.GetCalcRelevantObjects(f"{cfg['pline']}.ElmLne") or []
+        if not txs or not lns:
+            print(f"4.6.0  No transformer / pline for {pv_key}, left out of the radial model"); continue
+        tx, ln = txs[0], lns[0]
+        tt, lt = tx.typ_id, ln.typ_id
+        n_tx = int(getattr(tx, "ntnum", 1) or 1)                                                    # Parallel transformers
+        n_ln = int(getattr(ln, "nlnum", 1) or 1)                                                    # Parallel line systems
+        suburbs[pv_key] = {
+            "bus": cfg["bus"], "tx": tx.loc_name, "line": ln.loc_name, "load_code": cfg["load"],
+            "loads": sorted(ld.loc_name for ld in loads if _terminal_name(ld) == cfg["bus"]),
+            "u_source_pu": 1.0,
+            "sn_kva": float(tt.strn) * 1000.0 * n_tx,                                               # MVA → kVA
+            "uk_pct": float(tt.uktr),
+            "ur_pct": float(tt.uktrr),
+            "r_ohm": float(lt.rline) * float(ln.dline) / n_ln,                                      # Ω/km × km
+            "x_ohm": float(lt.xline) * float(ln.dline) / n_ln,
+            "i_rated_a": float(lt.sline) * 1000.0 * n_ln,                                           # kA → A
+        }
+    path = otaki_radial.save_network({"u_lv_kv": 0.415, "suburbs": suburbs}, path)
+    print(f"4.6.0      Radial network: {len(suburbs)} feeders written to {path}")
+    return path
+
+
+def run_radial_simulation(pv_overrides=None, day=None):                                             # Same contract as run_simulation, profiles from the stored RESULTS (or the workbook for `day`)
+    try:
+        import otaki_radial
+        model = otaki_radial.build_model(otaki_radial.load_network())
+        t = []
+        if day is None:
+            t, load_kw, pv_kw = otaki_radial.profiles_from_results(PF_RUN["results"] or RESULTS, model,
+                                                                   pv_overrides or PV_INV_OVERRIDES,
+                                                                   PV_PANEL_OVERRIDES)
+        if not len(t):                                                                              # No PF run yet → workbook profiles at the QDS step
+            t, load_kw, pv_kw = otaki_radial.profiles_from_workbook(model, pv_overrides or PV_INV_OVERRIDES,
+                                                                    PV_PANEL_OVERRIDES, day=day or 0,
+                                                                    step_size=QDS_STEP_SIZE, step_unit=QDS_STEP_UNIT)
+        new = otaki_radial.simulate(model, t, load_kw, pv_kw,
+                                    pv_overrides or PV_INV_OVERRIDES, PV_PANEL_OVERRIDES)
+    except Exception as e:
+        print(f"4.6.0  Radial run failed: {e}")
+        return False
+    for group, recs in new.items():                                                                 # Replace in place so the GUI keeps its RESULTS reference
+        RESULTS.setdefault(group, {}).clear()
+        RESULTS[group].update(recs)
+    print(f"4.6.0      Radial run done, {len(t)} steps × {len(model['keys'])} feeders.")
+    return True
+
+
+def validate_radial():                                                                              # Radial run at the last PF run's own counts vs that PF run
+    import otaki_radial
+    pf = PF_RUN["results"]                                                                          # Not RESULTS: after a radial run that is the radial answer itself
+    if not pf:
+        raise RuntimeError("4.6.0  [Validate Radial] No PowerFactory run to validate against, run with backend='pf' first.")
+    model = otaki_radial.build_model(otaki_radial.load_network())
+    t, load_kw, pv_kw = otaki_radial.profiles_from_results(pf, model)
+    meta = pf.get("pv_meta") or {}
+    radial = otaki_radial.simulate(model, t, load_kw, pv_kw,
+                                   {k: m.get("inverters", 0) for k, m in meta.items()},
+                                   {k: m.get("panels_per_inverter", 0) for k, m in meta.items()})
+    return otaki_radial.validate(pf, radial)
+
+
+# 4.7 Representative-day annual study — k QDS days instead of 366 ----------------------------------
+def run_representative_days(k=None, pv_overrides=None, backend=None):                               # Annual metrics rebuilt from weighted days
+    """
+    Clusters the workbook's daily load / PV shapes, runs only the k medoid days
+    (study time moved to each day in turn) and returns otaki_repdays.annual_from_days:
+    weighted annual energies and out-of-band hours, extremes over the days, plus
+    the chosen days, their weights and the approximation error. The day runs are study
+    runs (4.15): RESULTS, PF_RUN and the live preview are left as the user's last run.
+    """
+    import otaki_repdays
+    sel = otaki_repdays.select_days(k or otaki_repdays.REPDAYS_K)
+    st = app.GetFromStudyCase("SetTime")                                                            # Study time object the QDS day follows
+    if not st:
+        raise RuntimeError("4.7.0  [Representative Days] SetTime not found in the study case.")
+    old = _study_time_utc(st)                                                                       # Read before anything moves, restored in finally
+    per_day = []
+    study = begin_study()                                                                           # Days must not reach the surrogate / PF_RUN, RESULTS put back (4.15)
+    try:
+        for n, day in enumerate(sel["days"], 1):
+            st.SetTimeUTC(otaki_repdays.day_epoch(day))
+            print(f"4.7.0      Representative day {n}/{len(sel['days'])}: day {int(day) + 1}, weight {sel['weights'][n - 1]:.0f}")
+            ok = (run_radial_simulation(pv_overrides, day=int(day)) if (backend or SIM_BACKEND) == "radial"
+                  else run_simulation(pv_overrides, "pf"))
+            if not ok:
+                print(f"4.7.0  Day {int(day) + 1} failed, annual study stopped."); return {}
+            per_day.append(otaki_repdays.day_metrics(RESULTS))
+    finally:
+        st.SetTimeUTC(old)                                                                          # Put the study case back where the user left it
+        end_study(study)
+    annual = otaki_repdays.annual_from_days(per_day, sel)
+    err = annual["error"]
+    print(f"4.7.0      Annual study from {len(per_day)} days: PV energy error {err['pv_energy_pct']:+.2f} %, "
+          f"PV peak error {err['pv_peak_pct']:+.2f} %, profile RMS {err['profile_rms_pu']:.3f} p.u.")
+    return annual
+
+
+def _study_time_utc(st):                                                                            # SetTime → UTC seconds, the unit SetTimeUTC takes
+    getter = getattr(st, "GetTimeUTC", None)
+    value = getter() if callable(getter) else getattr(st, "datetime", None)
+    if value is None:
+        raise RuntimeError("4.7.0  [Representative Days] Cannot read the study time, so it could not be restored; nothing was run.")
+    return int(value)
+
+
+# 4.8 Monte Carlo PV uptake / load study — percentile envelopes per bus / tx / line ---------------
+def _pf_mc_evaluator(keys):                                                                         # Every sample is one full QDS run, only for small n
+    import numpy as np
+    loads = app.GetCalcRelevantObjects("*.ElmLod") or []
+    bus_of = {pv_key: PV_CONFIG[pv_key]["bus"] for pv_key in keys}
+    by_bus = {}
+    for ld in loads:                                                                                # Loads grouped by the bus they sit on
+        by_bus.setdefault(_terminal_name(ld), []).append(ld)
+
+    def evaluate(inverters, panels, load_scale):
+        base = {ld: float(getattr(ld, "scale0", 1.0) or 1.0) for ld in loads}
+        out = {"u_pu": [], "tx_pct": [], "line_pct": []}
+        try:
+            for b in range(inverters.shape[0]):
+                inv = {k: int(inverters[b, j]) for j, k in enumerate(keys)}
+                PV_PANEL_OVERRIDES.update({k: int(panels[b, j]) for j, k in enumerate(keys)})
+                for j, k in enumerate(keys):
+                    for ld in by_bus.get(bus_of[k], []):
+                        ld.scale0 = base[ld] * float(load_scale[b, j])
+                apply_pv_inverter_overrides(app, inv)
+                apply_pv_panel_overrides(app, PV_PANEL_OVERRIDES)
+                if not run_simulation(inv, "pf"):
+                    raise RuntimeError(f"4.8.0  QDS failed on sample {b}")
+                evaluate.t = next((r.get("t") for r in RESULTS["bus"].values() if r.get("t")), [])  # RESULTS is put back after the study
+                for key, grp, fld, cfg in (("u_pu", "bus", "u_pu", "bus"), ("tx_pct", "tx", "loading_pct", "tx"),
+                                           ("line_pct", "line", "loading_pct", "pline")):
+                    rows = max((len(r.get(fld) or []) for r in RESULTS[grp].values()), default=0)   # This run's row count, for missing elements
+                    out[key].append(np.array([RESULTS[grp].get(PV_CONFIG[k][cfg], {}).get(fld) or [np.nan] * rows
+                                              for k in keys], dtype=float).T)
+        finally:
+            for ld, v in base.items():                                                              # Loads back to their model scaling
+                ld.scale0 = v
+        return {key: np.stack(v) for key, v in out.items()}
+    return evaluate
+
+
+def run_monte_carlo(n=None, method="radial", seed=None, progress=None):                             # "radial" | "surrogate" | "pf"
+    """
+    Samples PV uptake, inverter size (whole PANEL_WATT panels) and load scaling
+    per suburb from otaki_montecarlo.DISTRIBUTIONS and returns its percentile
+    envelopes and violation risk per bus / tx / line.
+    """
+    global QDS_ADAPTIVE
+    import otaki_montecarlo as mc
+    keys = list(PV_CONFIG)
+    if method == "radial":
+        import otaki_radial
+        model = otaki_radial.build_model(otaki_radial.load_network())
+        keys, ones = model["keys"], {k: 1 for k in model["keys"]}
+        t, load_kw, pv_unit = otaki_radial.profiles_from_results(RESULTS, model, ones, ones)
+        if not len(t):
+            t, load_kw, pv_unit = otaki_radial.profiles_from_workbook(model, ones, ones, step_size=QDS_STEP_SIZE,
+                                                                      step_unit=QDS_STEP_UNIT)
+        evaluate = mc.radial_evaluator(model, load_kw, pv_unit)
+    elif method == "surrogate":
+        import otaki_surrogate
+        keys = otaki_surrogate.STATE["keys"] or keys
+        evaluate = mc.surrogate_evaluator()
+        t = next((r.get("t") for r in RESULTS["bus"].values() if r.get("t")), list(range(otaki_surrogate.STATE["T"])))
+    else:
+        evaluate = _pf_mc_evaluator(keys)
+        t = []
+    names = {"pv": keys, "bus": [PV_CONFIG.get(k, {}).get("bus") for k in keys],
+             "tx": [PV_CONFIG.get(k, {}).get("tx") for k in keys], "line": [PV_CONFIG.get(k, {}).get("pline") for k in keys]}
+    homes = [int(PV_CONFIG.get(k, {}).get("homes", 1) or 1) for k in keys]
+    n = n or (mc.N_SAMPLES if method != "pf" else 20)
+    saved = dict(PV_PANEL_OVERRIDES)
+    study = begin_study() if method == "pf" else None                                               # Samples must not reach RESULTS / PF_RUN / the surrogate
+    adaptive = QDS_ADAPTIVE
+    if method == "pf":                                                                              # Envelopes need one time axis; adaptive samples refine different windows
+        QDS_ADAPTIVE = False
+    try:
+        env = mc.run(evaluate, names, homes, t, n=n, batch=(mc.BATCH if method != "pf" else 1),
+                     seed=seed, progress=progress)
+    finally:
+        PV_PANEL_OVERRIDES.clear(); PV_PANEL_OVERRIDES.update(saved)                                # GUI settings survive the study
+        QDS_ADAPTIVE = adaptive
+        if method == "pf":                                                                          # Model back to the GUI's counts
+            end_study(study)
+            apply_pv_inverter_overrides(app, PV_INV_OVERRIDES)
+            apply_pv_panel_overrides(app, PV_PANEL_OVERRIDES)
+    if method == "pf":
+        env["t"] = getattr(evaluate, "t", [])                                                       # Axis of the sampled runs
+    print(f"4.8.0      Monte Carlo ({method}): {env['n']} samples.")
+    return env
+
+
+# 4.9 PowerFactory API call tracing — `app` swapped for an otaki_trace proxy while enabled ---------
+PF_TRACE = {"tracer": None, "app": None, "last": None}                                              # Active tracer, the untraced app, last run's trace
+
+
+def enable_pf_trace():                                                                              # Every later PF call through `app` is counted and timed
+    global app
+    import otaki_trace
+    if PF_TRACE["tracer"] is None:
+        PF_TRACE["tracer"], PF_TRACE["app"] = otaki_trace.Tracer(), app
+        app = otaki_trace.wrap(app, PF_TRACE["tracer"], "app")
+    return PF_TRACE["tracer"]
+
+
+def disable_pf_trace():
+    global app
+    if PF_TRACE["app"] is not None:
+        app = PF_TRACE["app"]
+    PF_TRACE.update(tracer=None, app=None)
+
+
+def pf_trace_report(reset=True):                                                                    # Prints the hotspot tables, keeps them in PF_TRACE["last"]
+    tracer = PF_TRACE["tracer"]
+    if tracer is None or not tracer.calls:
+        return None
+    print(tracer.report())
+    print()
+    PF_TRACE["last"] = tracer.as_dict()
+    if reset:
+        tracer.reset()
+    return PF_TRACE["last"]
+
+
+# 4.10 Energy / reverse-power-flow metrics — computed once per run, kept in RESULTS["metrics"] ------
+def record_metrics():                                                                               # Called by run_simulation after a successful run
+    try:                                                                                            # A metrics failure must not fail the run
+        import otaki_metrics
+        RESULTS["metrics"] = otaki_metrics.compute(RESULTS, PV_CONFIG, LOAD_NAMES)
+    except Exception as e:
+        print(f"4.10.0  Metrics skipped: {e}")
+    return True
+
+
+
+# 4.11 Network topology index — built from PV_CONFIG, rebuilt only when the wiring changes --------
+TOPOLOGY = {"index": None, "config": None, "loads": None}                                           # Cached otaki_topology.Topology and what it was built from
+
+
+def topology():                                                                                     # e.g. topology().downstream("tx", "OTB_T1", "pv")
+    import otaki_topology
+    if TOPOLOGY["index"] is None or TOPOLOGY["config"] != PV_CONFIG or TOPOLOGY["loads"] != LOAD_NAMES:
+        TOPOLOGY.update(index=otaki_topology.from_config(PV_CONFIG, LOAD_NAMES, NETWORK.zones),
+                        config={k: dict(v) for k, v in PV_CONFIG.items()}, loads=dict(LOAD_NAMES))
+    return TOPOLOGY["index"]
+
+
+# 4.12 Name-resolution index — exact pv_key ↔ element names, rebuilt only when the wiring changes --
+NAMES = {"index": None, "config": None, "loads": None}                                              # Cached otaki_names.NameIndex and what it was built from
+
+
+def names():                                                                                        # e.g. names().name("OTKa_PV", "load") → "Otaki Town A"
+    import otaki_names
+    if NAMES["index"] is None or NAMES["config"] != PV_CONFIG or NAMES["loads"] != LOAD_NAMES:
+        NAMES.update(index=otaki_names.from_config(PV_CONFIG, LOAD_NAMES),
+                     config={k: dict(v) for k, v in PV_CONFIG.items()}, loads=dict(LOAD_NAMES))
+    return NAMES["index"]
+
+
+# 4.13 Adaptive two-pass QDS — coarse run over the period, fine reruns only where a limit is near ---
+ADAPTIVE = {"last": None}                                                                           # Windows, why they were refined and the steps run (otaki_adaptive.step_counts)
+
+
+def run_adaptive_simulation(pv_overrides=None, coarse=None, fine=None):                             # Same contract as run_simulation
+    """
+    coarse / fine: (stepSize, stepUnit), default otaki_adaptive.COARSE_STEP / FINE_STEP.
+    RESULTS series end up on one non-uniform time axis per element: fine rows inside
+    each window, coarse rows elsewhere. Windows are run as user-defined periods
+    (calcPeriod = QDS_USER_PERIOD, startTime / endTime); where ComStatsim has no such
+    attributes, one full-period fine run is made and cut to the windows instead.
+    """
+    import otaki_adaptive                                                                          # Screening, windows and merge (NumPy)
+    coarse, fine = coarse or otaki_adaptive.COARSE_STEP, fine or otaki_adaptive.FINE_STEP          # Default steps
+    RESULTS.pop("metrics", None)                                                                   # Belongs to the previous run
+    check_stage("overrides")                                                                       # Stop points as in run_simulation (4.14)
+    if pv_overrides:                                                                               # If overrides provided
+        apply_pv_inverter_overrides(app, pv_overrides)                                             # Apply inverter overrides
+        apply_pv_panel_overrides(app, PV_PANEL_OVERRIDES)                                          # Apply panel overrides
+    res, qds = prepare_quasi_dynamic(app, build_monitored_dict(), coarse[0], coarse[1], mode="bulk") # Reads need REGISTRY
+
+    check_stage("qds")                                                                               # Stop point before the coarse run (4.14)
+    print("4.13.0    Adaptive QDS: coarse pass.")                                                    # Print coarse pass start
+    if not run_quasi_dynamic(qds):                                                                  # Run coarse QDS
+        pf_trace_report()                                                                           # Where a failed run spent its PF time
+        return False                                                                                # Return False
+    first, _, _ = read_registered(app, res)                                                         # Every row, not only the first day
+    t, flags, reasons = otaki_adaptive.near_limits(first)                                           # Coarse rows near a limit, and why
+    wins = otaki_adaptive.windows(t, flags)                                                         # Padded, merged time windows
+    print(f"4.13.0     {len(wins)} window(s) to refine, {int(flags.sum())} of {len(t)} coarse rows near a limit.") # Print screening result
+
+    runs, whole = [], None                                                                          # Fine results per window; whole: fallback full run
+    qds.stepSize, qds.stepUnit = fine                                                               # Fine step for every refinement run
+    for w0, w1 in wins:                                                                             # Loop through windows
+        if whole is None:                                                                           # Still running window by window (or first window)
+            try:                                                                                    # Only the window, at the fine step
+                qds.calcPeriod, qds.startTime, qds.endTime = QDS_USER_PERIOD, int(w0), int(w1)      # User-defined period = the window
+            except AttributeError:                                                                  # No user-defined period: one fine run, cut by merge()
+                qds.calcPeriod = QDS_CALC_PERIOD                                                    # Back to the full period
+                whole = {}                                                                          # Marks the fallback, filled after the run
+            check_stage("qds")                                                                      # Stop point before each fine run (4.14)
+            print(f"4.13.0    Adaptive QDS: fine pass {w0:.0f}–{w1:.0f}.")                          # Print fine pass start
+            if not run_quasi_dynamic(qds):                                                          # Run fine QDS
+                pf_trace_report()                                                                   # Where a failed run spent its PF time
+                return False                                                                        # Return False
+            run = read_registered(app, res)[0]                                                      # Fine series, every row
+            if whole is not None:                                                                   # Fallback run
+                whole = run                                                                         # Reused for every remaining window
+        runs.append(whole if whole is not None else run)                                            # One fine result per window
+
+    check_stage("extract")                                                                          # Stop point before RESULTS is rewritten (4.14)
+    merged = otaki_adaptive.merge(first, runs, wins)                                                # One non-uniform axis per element
+    for group in RESULT_FIELD:                                                                     # Loop through RESULTS groups
+        RESULTS[group].clear()                                                                     # Drop the previous run
+        RESULTS[group].update(merged.get(group, {}))                                               # Store merged series
+    bus_extremes(RESULTS["bus"])                                                                   # 4.2.1 min / max, hours from the time stamps
+    record_pv_meta(app)                                                                            # 4.2.4 nameplate
+    build_associations()                                                                           # 4.2.7 / 4.2.8
+    record_pf_run()                                                                                # Reference for radial profiles / validate_radial (4.6)
+    record_surrogate_run(pv_overrides or PV_INV_OVERRIDES, otaki_adaptive.resample(RESULTS, t))    # Live preview fits by row: the coarse axis, refined values
+
+    steps = otaki_adaptive.step_counts(t, wins, otaki_adaptive.step_seconds(coarse), otaki_adaptive.step_seconds(fine)) # Steps run vs a full fine run
+    ADAPTIVE["last"] = {"windows": wins, "steps": steps, "coarse": tuple(coarse), "fine": tuple(fine), # Keep what was refined for the GUI / reports
+                        "rows_near": {k: int(v.sum()) for k, v in reasons.items()},                # Rows near a limit per group
+                        "full_fine_run": whole is not None}                                        # Fallback taken: step saving not realised
+    print(f"4.13.0     Adaptive QDS: {steps['total']} steps ({steps['coarse']} coarse + {steps['fine']} fine) " # Print step saving
+          f"vs {steps['full_fine']} for a full fine run, {steps['saving_pct']:.0f} % fewer.")      # … against a full fine run
+    print()                                                                                         # Blank line
+    record_metrics()                                                                                # Row-weighted, so the uneven axis is fine (4.10)
+    pf_trace_report()                                                                               # Hotspot report when tracing is on (4.9)
+    return True                                                                                     # Return success flag
+
+
+# 4.14 Stage checks — called between PF stages, never from inside a PF call or a print ---------------
+STAGE_CHECK = {"fn": None}                                                                          # callable(stage) that raises to stop the run, e.g. otaki_async's cancel
+
+
+def check_stage(stage):                                                                             # "overrides" | "qds" | "extract": the stage about to start
+    fn = STAGE_CHECK["fn"]                                                                          # None: nobody can stop this run
+    if fn is not None:                                                                              # Caller decides; its exception ends the run here
+        fn(stage)                                                                                   # Raises to stop
+
+
+# 4.15 Study runs — QDS runs made by a study, not by the user ------------------------------------
+#   Between begin_study() and end_study() run_simulation still fills RESULTS (the study
+#   reads each run from there) but neither refits the surrogate nor replaces PF_RUN;
+#   end_study() puts the user's RESULTS and PF_RUN back as they were.
+STUDY = {"depth": 0}                                                                                # > 0 while a study is running; studies may nest
+
+
+def begin_study():                                                                                  # Returns what end_study needs
+    import otaki_results
+    STUDY["depth"] += 1
+    return {"results": otaki_results.snapshot(RESULTS), "pf_run": PF_RUN["results"]}
+
+
+def end_study(saved):                                                                               # Always call in a finally
+    STUDY["depth"] = max(0, STUDY["depth"] - 1)
+    for key in [k for k in RESULTS if k not in saved["results"]]:                                   # e.g. metrics of a sample
+        RESULTS.pop(key)
+    for key, value in saved["results"].items():                                                     # In place, the GUI holds these dicts
+        if isinstance(value, dict) and isinstance(RESULTS.get(key), dict):
+            RESULTS[key].clear(); RESULTS[key].update(value)
+        else:
+            RESULTS[key] = value
+    PF_RUN["results"] = saved["pf_run"]
+
+
+if TRACE_PF:
+    enable_pf_trace()
+
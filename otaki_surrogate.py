@@ -0,0 +1,187 @@
+# otaki_surrogate.py
+# 1.0 Set Up Environment
+    # 1.1.0 Fit settings
+    # 1.2.0 Fitted state
+
+# 2.0 Fitting (one call per finished QDS run)
+    # 2.1.0 _run_arrays
+    # 2.2.0 add_run
+    # 2.3.0 reset / run_count
+
+# 3.0 Prediction
+    # 3.1.0 _coefficients
+    # 3.2.0 predict
+    # 3.3.0 predict_series (batched, full time series)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+
+
+import numpy as np                                                                                  # Every fit / predict is a handful of batched array ops
+
+
+# 1.1.0 Fit settings ---------------------------------------------------------------------------------
+RIDGE   = 1e-3                                                                                      # Slope penalty (relative to PV scale) so one run = flat prediction, not a blow-up
+OUTPUTS = (("bus", "bus", "u_pu"),                                                                  # (PV_CONFIG field, RESULTS group, value field) per predicted output
+           ("tx", "tx", "loading_pct"),
+           ("pline", "line", "loading_pct"))
+
+
+# 1.2.0 Fitted state (module level, like otaki_sim.RESULTS) ------------------------------------------
+#   Model per suburb k, output j, time step t:
+#       y[t,k,j] ≈ a + b · own_pv[t,k] + c · other_pv[t,k]
+#   own_pv = that suburb's PV injection, other_pv = everyone else's (shared 11 kV voltage rise).
+#   Normal equations are summed run by run so every new run refines the fit.
+STATE = {
+    "keys":  [],                                                                                    # PV_CONFIG keys in column order
+    "T":     0,                                                                                     # Time steps per run (first run fixes it)
+    "XtX":   None,                                                                                  # (T, K, J, 3, 3) summed normal matrices
+    "Xty":   None,                                                                                  # (T, K, J, 3) summed right-hand sides
+    "scale": None,                                                                                  # (K,) largest |PV| seen, scales the ridge
+    "unit":  None,                                                                                  # (T, K) PV per (inverter × panel) from the latest run, NaN = unknown
+    "runs":  0,                                                                                     # Runs folded in so far
+    "coef":  None,                                                                                  # (T, K, J, 3) solved fit, cleared whenever a run is added
+}
+
+
+#====================================================================================================
+# 2.0  Fitting
+#====================================================================================================
+
+
+# 2.1.0 _run_arrays — RESULTS → (own pv, outputs) arrays for one run --------------------------------
+def _series(results, group, name, field, T):                                                        # One series cropped / NaN-padded to T steps
+    out = np.full(T, np.nan)
+    vals = ((results.get(group) or {}).get(name) or {}).get(field) or []
+    n = min(T, len(vals))
+    if n:
+        out[:n] = np.asarray(vals[:n], dtype=float)
+    return out
+
+
+def _run_arrays(results, keys, pv_config, T):                                                       # Returns pv (T, K) and Y (T, K, J)
+    pv = np.stack([_series(results, "pv", k, "P_W", T) for k in keys], axis=1)                      # Measured PV injection per suburb
+    Y = np.stack([np.stack([_series(results, grp, pv_config.get(k, {}).get(cfg), fld, T)
+                            for cfg, grp, fld in OUTPUTS], axis=1)
+                  for k in keys], axis=1)                                                           # Bus p.u., Tx %, line % per suburb
+    return pv, Y
+
+
+# 2.2.0 add_run — fold one finished run into the fit ------------------------------------------------
+def add_run(results, inverters, panels, pv_config):                                                 # inverters / panels: {pv_key: count} as applied to PF
+    """
+    Add one QDS run to the sensitivity fit.
+    results   : otaki_sim.RESULTS after extract_qds_results
+    inverters : {pv_key: ngnum} used for the run
+    panels    : {pv_key: panels per inverter} used for the run
+    """
+    keys = list(pv_config)                                                                          # Column order
+    if STATE["runs"] == 0 or keys != STATE["keys"]:                                                 # First run (or network changed) → start over
+        T = max((len((results.get("pv") or {}).get(k, {}).get("P_W") or []) for k in keys), default=0)
+        if T == 0:                                                                                  # No PV series → nothing to learn from
+            return False
+        K, J = len(keys), len(OUTPUTS)
+        STATE.update(keys=keys, T=T, runs=0, coef=None,
+                     XtX=np.zeros((T, K, J, 3, 3)), Xty=np.zeros((T, K, J, 3)),
+                     scale=np.zeros(K), unit=np.full((T, K), np.nan))
+    T = STATE["T"]
+    pv, Y = _run_arrays(results, keys, pv_config, T)
+    pv0 = np.nan_to_num(pv)                                                                         # Missing PV series → 0 injection
+    own, other = pv0, pv0.sum(axis=1, keepdims=True) - pv0                                          # (T, K) each
+    X = np.stack([np.ones_like(own), own, other], axis=-1)[:, :, None, :]                           # (T, K, 1, 3) shared by all outputs
+    ok = np.isfinite(Y)[..., None]                                                                  # Missing outputs add nothing
+    Xw = np.where(ok, X, 0.0)                                                                       # (T, K, J, 3)
+    STATE["XtX"] += Xw[..., :, None] * Xw[..., None, :]                                             # Outer products, summed over runs
+    STATE["Xty"] += Xw * np.nan_to_num(Y)[..., None]
+    STATE["scale"] = np.maximum(STATE["scale"], np.nanmax(np.abs(pv0), axis=0))
+
+    n_units = np.array([float(inverters.get(k, 0) or 0) * float(panels.get(k, 0) or 0)
+                        for k in keys])                                                             # inverter × panel count per suburb
+    has = n_units > 0
+    STATE["unit"][:, has] = pv0[:, has] / n_units[has]                                              # Latest per-unit PV profile (irradiance shape)
+    STATE["runs"] += 1
+    STATE["coef"] = None                                                                            # Solved again at the next predict
+    return True
+
+
+# 2.3.0 reset / run_count ---------------------------------------------------------------------------
+def reset():                                                                                        # Forget every run (e.g. network model changed)
+    STATE.update(keys=[], T=0, XtX=None, Xty=None, scale=None, unit=None, runs=0, coef=None)
+
+
+def run_count():                                                                                    # Runs behind the current fit
+    return STATE["runs"]
+
+
+#====================================================================================================
+# 3.0  Prediction
+#====================================================================================================
+
+
+# 3.1.0 _coefficients — batched ridge solve, (T, K, J, 3), once per fit not once per predict ---------
+def _coefficients():
+    if STATE["coef"] is not None:                                                                   # Slider previews reuse the last solve
+        return STATE["coef"]
+    s = np.maximum(STATE["scale"], 1e-9)                                                            # (K,) PV scale per suburb
+    ridge = np.zeros(STATE["XtX"].shape)
+    ridge[..., 1, 1] = (RIDGE * s ** 2)[None, :, None]                                              # Penalise slopes only, never the intercept
+    ridge[..., 2, 2] = (RIDGE * s ** 2)[None, :, None]
+    ridge[..., 0, 0] = 1e-12                                                                        # Keeps outputs with no data solvable (→ 0)
+    STATE["coef"] = np.linalg.solve(STATE["XtX"] + ridge, STATE["Xty"][..., None])[..., 0]
+    return STATE["coef"]
+
+
+# 3.2.0 predict — estimated min/max voltage and peak loading per suburb -----------------------------
+def predict(inverters, panels):                                                                     # Same dict shapes as add_run
+    """
+    Estimate each suburb's daily voltage band and peak loading for new
+    inverter / panel counts. Returns {} until at least one run has been added,
+    otherwise {pv_key: {"u_min", "u_min_hour", "u_max", "u_max_hour",
+    "tx_max", "line_max"}} (None where no data).
+    """
+    if not STATE["runs"]:
+        return {}
+    keys = STATE["keys"]
+    n_units = np.array([float(inverters.get(k, 0) or 0) * float(panels.get(k, 0) or 0)
+                        for k in keys])
+    own = np.nan_to_num(STATE["unit"]) * n_units[None, :]                                           # (T, K) new PV injection
+    other = own.sum(axis=1, keepdims=True) - own
+    X = np.stack([np.ones_like(own), own, other], axis=-1)[:, :, None, :]                           # (T, K, 1, 3)
+    Y = (_coefficients() * X).sum(axis=-1)                                                          # (T, K, J)
+    seen = STATE["XtX"][..., 0, 0] > 0                                                              # Outputs that ever had data
+    Y = np.where(seen, Y, np.nan)
+
+    out = {}
+    for i, k in enumerate(keys):
+        u, tx, ln = Y[:, i, 0], Y[:, i, 1], Y[:, i, 2]
+        rec = {"u_min": None, "u_min_hour": None, "u_max": None, "u_max_hour": None,
+               "tx_max": None, "line_max": None}
+        if np.isfinite(u).any():
+            rec.update(u_min=float(np.nanmin(u)), u_min_hour=int(np.nanargmin(u)),
+                       u_max=float(np.nanmax(u)), u_max_hour=int(np.nanargmax(u)))
+        if np.isfinite(tx).any():
+            rec["tx_max"] = float(np.nanmax(tx))
+        if np.isfinite(ln).any():
+            rec["line_max"] = float(np.nanmax(ln))
+        out[k] = rec
+    return out
+
+
+# 3.3.0 predict_series — (S, T, K, J) outputs for S sets of inverter × panel counts at once ---------
+def predict_series(n_units):                                                                        # n_units: (S, K) inverter × panel count per suburb
+    """
+    Full time series for many scenarios in one pass, for Monte Carlo screening.
+    Returns (S, T, K, J) in OUTPUTS order (NaN where the output never had data),
+    or None before the first run. Load changes are not modelled by the fit.
+    """
+    if not STATE["runs"]:
+        return None
+    n_units = np.asarray(n_units, dtype=float)
+    own = np.nan_to_num(STATE["unit"])[None, :, :] * n_units[:, None, :]                            # (S, T, K)
+    other = own.sum(axis=2, keepdims=True) - own
+    c = _coefficients()                                                                             # (T, K, J, 3)
+    Y = c[..., 0] + c[..., 1] * own[..., None] + c[..., 2] * other[..., None]
+    return np.where(STATE["XtX"][..., 0, 0] > 0, Y, np.nan)
@@ -0,0 +1,221 @@
+# otaki_topology.py
+# 1.0 Set Up Environment
+    # 1.1.0 Levels
+
+# 2.0 Topology Index
+    # 2.1.0 Topology (parent array, children CSR, pre-order intervals)
+    # 2.2.0 downstream / upstream
+    # 2.3.0 aggregate (element series → totals per zone / tx / …)
+    # 2.4.0 to_dict / from_dict
+
+# 3.0 Building the Index
+    # 3.1.0 zone_of (transformer → zone substation)
+    # 3.2.0 from_config (PV_CONFIG + load names)
+
+# 4.0 Feeder Aggregation
+    # 4.1.0 feeder_totals
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Radial network as a tree of named nodes:
+#       network → zone → tx → line → bus → load / pv
+#   stored as flat arrays: parent index per node, children in CSR form and a
+#   pre-order numbering in which every subtree is one contiguous interval. So:
+#       downstream("tx", "OTB_T1", "pv")   O(log n + k)  bisect into the pre-order of PV nodes
+#       upstream("pv", "OTBa_PV", "zone")  O(1)          one array lookup per level
+#       aggregate(M, names, "pv", "zone")  one reduceat over the (time × element) matrix
+#   Built from PV_CONFIG (the network's declared wiring), or from a saved dict for
+#   networks larger than the GUI's.
+
+
+import re, bisect                                                                                   # Zone names, interval lookups
+import numpy as np                                                                                  # Index arrays, vectorised sums
+
+
+# 1.1.0 Levels ---------------------------------------------------------------------------------------
+LEVELS = ("network", "zone", "tx", "line", "bus", "load", "pv")                                     # Kinds of node, upstream first
+RESULT_GROUP = {"tx": "tx", "line": "line", "bus": "bus", "load": "load", "pv": "pv"}               # Node kind → RESULTS group
+ZONE_PATTERN = re.compile(r"^(.+?)_T\d+$")                                                          # "OTB_T2" → zone "OTB"
+
+
+#====================================================================================================
+# 2.0  Topology Index
+#====================================================================================================
+
+
+# 2.1.0 Topology — arrays built once, every query reads them only ----------------------------------
+class Topology:
+    """
+    edges: iterable of ((parent_kind, parent_name), (child_kind, child_name)).
+    Each node has one parent (radial network); a repeated edge is ignored and a
+    node given a second, different parent is a ValueError.
+    """
+    def __init__(self, edges):
+        self.names, self.kinds, self.ids = [], [], {k: {} for k in LEVELS}
+        parent = []
+
+        def node(kind, name):
+            i = self.ids[kind].get(name)
+            if i is None:
+                i = self.ids[kind][name] = len(self.names)
+                self.names.append(name); self.kinds.append(LEVELS.index(kind)); parent.append(-1)
+            return i
+
+        for (pk, pn), (ck, cn) in edges:
+            p, c = node(pk, pn), node(ck, cn)
+            if parent[c] not in (-1, p):
+                raise ValueError(f"2.1.0  {ck} '{cn}' has two parents: "
+                                 f"{self.names[parent[c]]} and {pn}")
+            parent[c] = p
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.kind = np.asarray(self.kinds, dtype=np.int8)
+        n = len(self.names)
+
+        order = np.argsort(self.parent, kind="stable")                                              # Children CSR: grouped by parent
+        counts = np.bincount(self.parent[self.parent >= 0], minlength=n)
+        self.child_ptr = np.concatenate([[0], np.cumsum(counts)])
+        self.child_idx = order[n - int(counts.sum()):]                                              # Roots (-1) sort first, skip them
+
+        self.tin = np.zeros(n, dtype=np.int64)                                                      # Pre-order number
+        self.tout = np.zeros(n, dtype=np.int64)                                                     # One past the subtree's last number
+        clock = 0
+        for root in np.flatnonzero(self.parent < 0):
+            stack = [(int(root), False)]
+            while stack:
+                v, done = stack.pop()
+                if done:
+                    self.tout[v] = clock
+                    continue
+                self.tin[v] = clock; clock += 1
+                stack.append((v, True))
+                kids = self.child_idx[self.child_ptr[v]:self.child_ptr[v + 1]]
+                stack.extend((int(c), False) for c in kids[::-1])
+        self.by_tin = np.argsort(self.tin)                                                          # Pre-order number → node
+
+        self.pre = {}                                                                               # kind → sorted pre-order numbers of its nodes
+        for k, kind in enumerate(LEVELS):
+            self.pre[kind] = np.sort(self.tin[self.kind == k])
+
+        self.anc = {}                                                                               # kind → ancestor-or-self of that kind per node (-1 none)
+        for k, kind in enumerate(LEVELS):
+            a = np.where(self.kind == k, np.arange(n), -1)
+            has_parent = self.parent >= 0
+            for _ in range(len(LEVELS)):                                                            # One level of depth per pass
+                fill = (a < 0) & has_parent
+                if not fill.any():
+                    break
+                a[fill] = a[self.parent[fill]]
+            self.anc[kind] = a
+
+    def __len__(self):
+        return len(self.names)
+
+    def node(self, kind, name):                                                                     # KeyError for an unknown element
+        return self.ids[kind][name]
+
+    # 2.2.0 downstream / upstream -----------------------------------------------------------------
+    def downstream(self, kind, name, of="pv"):
+        """Names of every `of` node below (kind, name), in network order."""
+        v = self.node(kind, name)
+        pre = self.pre[of]
+        lo, hi = bisect.bisect_left(pre, self.tin[v]), bisect.bisect_left(pre, self.tout[v])
+        return [self.names[i] for i in self.by_tin[pre[lo:hi]]]
+
+    def upstream(self, kind, name, of="zone"):
+        """Name of the `of` node above (kind, name), or None."""
+        a = self.anc[of][self.node(kind, name)]
+        return self.names[a] if a >= 0 else None
+
+    def members(self, kind):                                                                        # All names of one kind, in network order
+        return [self.names[i] for i in self.by_tin[self.pre[kind]]]
+
+    # 2.3.0 aggregate — sum element columns into their ancestors, one reduceat --------------------
+    def aggregate(self, M, names, kind, level):
+        """
+        M: (time × len(names)) array of `kind` elements (NaN = missing, counted as 0).
+        Returns (level_names, totals) with totals of shape (time × len(level_names));
+        elements without a `level` ancestor, or unknown to the index, are left out.
+        """
+        M = np.asarray(M, dtype=float)
+        ids = self.ids[kind]
+        cols = np.array([j for j, n in enumerate(names) if n in ids], dtype=np.int64)
+        groups = self.anc[level][[ids[names[j]] for j in cols]] if cols.size else np.zeros(0, dtype=np.int64)
+        keep = groups >= 0
+        cols, groups = cols[keep], groups[keep]
+        level_names = self.members(level)
+        out = np.zeros((M.shape[0], len(level_names)))
+        if cols.size and M.shape[0]:
+            pos = {v: i for i, v in enumerate(self.by_tin[self.pre[level]])}                        # Node → output column
+            gcol = np.array([pos[g] for g in groups])
+            order = np.argsort(gcol, kind="stable")
+            gcol, cols = gcol[order], cols[order]
+            starts = np.flatnonzero(np.r_[True, gcol[1:] != gcol[:-1]])
+            out[:, gcol[starts]] = np.add.reduceat(np.nan_to_num(M[:, cols]), starts, axis=1)
+        return level_names, out
+
+    # 2.4.0 to_dict / from_dict — JSON-friendly, the edge list is enough ---------------------------
+    def to_dict(self):
+        return {"edges": [[LEVELS[self.kind[p]], self.names[p], LEVELS[self.kind[c]], self.names[c]]
+                          for c, p in enumerate(self.parent.tolist()) if p >= 0]}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(((pk, pn), (ck, cn)) for pk, pn, ck, cn in d["edges"])
+
+
+#====================================================================================================
+# 3.0  Building the Index
+#====================================================================================================
+
+
+# 3.1.0 zone_of — zone substation of a transformer: explicit map first, then its name -----------
+def zone_of(tx, zones=None):
+    if zones and tx in zones:
+        return zones[tx]
+    m = ZONE_PATTERN.match(tx or "")
+    return m.group(1) if m else tx
+
+
+# 3.2.0 from_config — the wiring PV_CONFIG already declares, as a tree ---------------------------
+def from_config(pv_config, load_names=None, zones=None, network="network"):
+    """
+    pv_config: otaki_sim.PV_CONFIG ({pv_key: {"bus", "load", "pline", "tx"}}).
+    load_names: load code → PF load name, so load nodes carry RESULTS["load"] keys.
+    zones: optional {tx: zone}; otherwise the zone is the tx name's prefix (OTB_T1 → OTB).
+    """
+    load_names = load_names or {}
+    edges = []
+    for pv_key, cfg in pv_config.items():
+        tx, line, bus = cfg.get("tx"), cfg.get("pline"), cfg.get("bus")
+        chain = [("network", network)]
+        if tx:
+            chain += [("zone", zone_of(tx, zones)), ("tx", tx)]
+        if line:
+            chain.append(("line", line))
+        if bus:
+            chain.append(("bus", bus))
+        edges += list(zip(chain, chain[1:]))
+        if cfg.get("load"):
+            edges.append((chain[-1], ("load", load_names.get(cfg["load"], cfg["load"]))))
+        edges.append((chain[-1], ("pv", pv_key)))
+    return Topology(edges)
+
+
+#====================================================================================================
+# 4.0  Feeder Aggregation
+#====================================================================================================
+
+
+# 4.1.0 feeder_totals — stored series summed per zone / transformer / … in one pass -------------
+def feeder_totals(results, topo, level="zone", kind="pv", field="P_W"):
+    """
+    e.g. feeder_totals(RESULTS, topo, "zone", "load") → (zones, t, (time × zone) load).
+    Sums are in RESULTS units; loading % does not add up, aggregate P series.
+    """
+    from otaki_results import results_matrix
+    names, t, M = results_matrix(results, RESULT_GROUP[kind], field)
+    level_names, totals = topo.aggregate(M, names, kind, level)
+    return level_names, t, totals
@@ -0,0 +1,207 @@
+# otaki_trace.py
+# 1.0 Set Up Environment
+    # 1.1.0 Report settings
+
+# 2.0 Call Statistics
+    # 2.1.0 _summary (argument summary)
+    # 2.2.0 _caller (first frame outside this module)
+    # 2.3.0 Tracer
+
+# 3.0 Tracing Proxy
+    # 3.1.0 Traced
+    # 3.2.0 wrap / unwrap
+
+# 4.0 Report
+    # 4.1.0 _report (by API name, then by caller)
+
+
+
+#====================================================================================================
+# 1.0  Set Up Environment
+#====================================================================================================
+#   Optional wrapper around the PowerFactory `app` object (and everything it hands
+#   back: results objects, ComStatsim, elements, types). Every method call and
+#   attribute read / write is counted and timed per API name and per calling
+#   function, so a run can be ranked by where the PF time really goes. Arguments
+#   are unwrapped before they reach PF, so traced code behaves exactly as untraced.
+#   Timings include the proxy's own overhead (about a microsecond per call).
+
+
+import sys, time                                                                                    # Frame walk for the caller, perf_counter for latency
+
+_PRIMITIVE = (int, float, str, bytes, bool, type(None))                                             # Returned as is, never wrapped
+
+
+# 1.1.0 Report settings ------------------------------------------------------------------------------
+TOP_N     = 15                                                                                      # Rows per report table
+ARG_CHARS = 48                                                                                      # Argument summary length
+EXAMPLES  = 3                                                                                       # Distinct argument summaries kept per API name
+
+
+#====================================================================================================
+# 2.0  Call Statistics
+#====================================================================================================
+
+
+# 2.1.0 _summary — short, stable text for a call's arguments ---------------------------------------
+def _summary(args):
+    parts = []
+    for a in args:
+        if isinstance(a, Traced):
+            a = object.__getattribute__(a, "_label")
+        elif isinstance(a, str):
+            a = repr(a)
+        elif not isinstance(a, _PRIMITIVE):
+            a = type(a).__name__
+        parts.append(str(a))
+    text = ", ".join(parts)
+    return text if len(text) <= ARG_CHARS else text[:ARG_CHARS - 1] + "…"
+
+
+# 2.2.0 _caller — "module.function" of the code that made the PF call -----------------------------
+def _caller():
+    f = sys._getframe(2)
+    while f is not None and f.f_globals.get("__name__") == __name__:
+        f = f.f_back
+    if f is None:
+        return "?"
+    return f"{f.f_globals.get('__name__', '?')}.{f.f_code.co_name}"
+
+
+# 2.3.0 Tracer — counts, cumulative and worst latency per API name and per caller ----------------
+class Tracer:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = {}                                                                             # name → [count, total_s, max_s, [examples]]
+        self.by_caller = {}                                                                         # (caller, name) → [count, total_s]
+        self.started = time.perf_counter()
+
+    def record(self, name, dt, args=()):
+        rec = self.calls.get(name)
+        if rec is None:
+            rec = self.calls[name] = [0, 0.0, 0.0, []]
+        rec[0] += 1
+        rec[1] += dt
+        if dt > rec[2]:
+            rec[2] = dt
+        if len(rec[3]) < EXAMPLES and args:
+            s = _summary(args)
+            if s not in rec[3]:
+                rec[3].append(s)
+        key = (_caller(), name)
+        c = self.by_caller.get(key)
+        if c is None:
+            c = self.by_caller[key] = [0, 0.0]
+        c[0] += 1
+        c[1] += dt
+
+    def as_dict(self):                                                                              # JSON-friendly copy for saving / comparing
+        return {
+            "wall_s": time.perf_counter() - self.started,
+            "calls": {n: {"count": r[0], "total_s": r[1], "max_s": r[2], "examples": list(r[3])}
+                      for n, r in self.calls.items()},
+            "by_caller": [{"caller": c, "name": n, "count": r[0], "total_s": r[1]}
+                          for (c, n), r in self.by_caller.items()],
+        }
+
+    def report(self, top=TOP_N):                                                                    # 4.1.0
+        return _report(self, top)
+
+
+#====================================================================================================
+# 3.0  Tracing Proxy
+#====================================================================================================
+
+
+# 3.1.0 Traced — forwards everything to the wrapped object, timing each step ----------------------
+class Traced:
+    __slots__ = ("_target", "_tracer", "_label")
+
+    def __init__(self, target, tracer, label):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_tracer", tracer)
+        object.__setattr__(self, "_label", label)
+
+    def __getattr__(self, attr):
+        target, tracer, label = (object.__getattribute__(self, k) for k in ("_target", "_tracer", "_label"))
+        t0 = time.perf_counter()
+        value = getattr(target, attr)                                                               # AttributeError passes through (getattr / hasattr defaults)
+        if callable(value) and not isinstance(value, _PRIMITIVE):
+            name = f"{label}.{attr}"
+
+            def call(*args, **kwargs):
+                t1 = time.perf_counter()
+                out = value(*[unwrap(a) for a in args], **{k: unwrap(v) for k, v in kwargs.items()})
+                tracer.record(name, time.perf_counter() - t1, args)
+                return wrap(out, tracer)
+            return call
+        tracer.record(f"{label}.{attr}", time.perf_counter() - t0)
+        return wrap(value, tracer)
+
+    def __setattr__(self, attr, value):
+        target, tracer, label = (object.__getattribute__(self, k) for k in ("_target", "_tracer", "_label"))
+        t0 = time.perf_counter()
+        setattr(target, attr, unwrap(value))
+        tracer.record(f"{label}.{attr}=", time.perf_counter() - t0, (value,))
+
+    def __bool__(self):                                                                             # `if not app:` / `if not qds:` checks
+        return bool(object.__getattribute__(self, "_target"))
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, "_target") == unwrap(other)
+
+    def __hash__(self):                                                                             # Same dict key as the real object
+        return hash(object.__getattribute__(self, "_target"))
+
+    def __repr__(self):
+        return f"Traced({object.__getattribute__(self, '_target')!r})"
+
+
+# 3.2.0 wrap / unwrap ------------------------------------------------------------------------------
+def wrap(value, tracer, label=None):
+    """PF objects (and lists of them) → Traced; numbers, strings and None unchanged."""
+    if isinstance(value, _PRIMITIVE) or isinstance(value, Traced):
+        return value
+    if isinstance(value, (list, tuple)):
+        if all(isinstance(v, _PRIMITIVE) for v in value):
+            return value
+        return type(value)(wrap(v, tracer) for v in value)
+    if label is None:
+        try:
+            label = value.GetClassName()                                                            # ElmTerm, ElmRes, ComStatsim …, not traced
+        except Exception:
+            label = type(value).__name__
+    return Traced(value, tracer, label)
+
+
+def unwrap(value):
+    if isinstance(value, Traced):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)) and any(isinstance(v, Traced) for v in value):
+        return type(value)(unwrap(v) for v in value)
+    return value
+
+
+#====================================================================================================
+# 4.0  Report
+#====================================================================================================
+
+
+# 4.1.0 _report — hotspot tables: by API name, then by calling function ---------------------------
+def _report(tracer, top=TOP_N):
+    total = sum(r[1] for r in tracer.calls.values())
+    n = sum(r[0] for r in tracer.calls.values())
+    wall = time.perf_counter() - tracer.started
+    lines = [f"4.9.0     PF API trace: {n} calls, {total * 1e3:.1f} ms in PF of {wall * 1e3:.1f} ms wall"]
+    lines.append(f"4.9.0      {'calls':>8} {'total ms':>10} {'mean µs':>9} {'max ms':>8} {'share':>6}  API (example arguments)")
+    for name, (cnt, tot, mx, ex) in sorted(tracer.calls.items(), key=lambda kv: -kv[1][1])[:top]:
+        share = 100.0 * tot / total if total else 0.0
+        lines.append(f"4.9.0      {cnt:>8} {tot * 1e3:>10.2f} {tot / cnt * 1e6:>9.1f} {mx * 1e3:>8.2f} {share:>5.1f}%  "
+                     f"{name}" + (f"  ({' | '.join(ex)})" if ex else ""))
+    lines.append(f"4.9.0      {'calls':>8} {'total ms':>10} {'share':>6}  caller → API")
+    for (caller, name), (cnt, tot) in sorted(tracer.by_caller.items(), key=lambda kv: -kv[1][1])[:top]:
+        share = 100.0 * tot / total if total else 0.0
+        lines.append(f"4.9.0      {cnt:>8} {tot * 1e3:>10.2f} {share:>5.1f}%  {caller} → {name}")
+    return "\n".join(lines)